@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
@@ -10,6 +10,7 @@ import subprocess
 import random
 from models.database import get_db
 from services.logging_service import trading_logger as logger
+from services.backtest_store import MAX_PAGE, get_result_store
 
 router = APIRouter(prefix="/api/backtest", tags=["backtest"])
 
@@ -23,15 +24,20 @@ class BacktestConfig(BaseModel):
     max_positions: int = 10
     include_dividends: bool = True
 
-# In-memory storage for demo (in production, use database)
-backtest_results: List[Dict[str, Any]] = []
-next_id = 1
-
 @router.get("/results")
-async def get_backtest_results():
-    """Get all backtest results"""
-    # TEMPORARY: Return empty results immediately
-    return {"success": True, "results": []}
+async def get_backtest_results(
+    strategy: Optional[str] = Query(None, description="Filter by strategy"),
+    kind: Optional[str] = Query(None, description="Filter by kind: backtest, portfolio, intraday, sweep"),
+    order_by: str = Query("created_at", description="created_at or a headline metric, e.g. sharpe_ratio"),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0)
+):
+    """List stored backtest runs (metadata and metrics only)"""
+    try:
+        runs = await get_result_store().list_runs(strategy, kind, order_by, limit, offset)
+        return {"success": True, "total": runs["total"], "results": runs["runs"]}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/run")
 async def run_backtest(config: BacktestConfig):
@@ -73,15 +79,9 @@ async def run_backtest(config: BacktestConfig):
 
 @router.delete("/results/{result_id}")
 async def delete_backtest_result(result_id: int):
-    """Delete a specific backtest result"""
+    """Delete a stored backtest run and its trade and equity files"""
     try:
-        global backtest_results
-        
-        # Find and remove the result
-        original_length = len(backtest_results)
-        backtest_results = [r for r in backtest_results if r.get('id') != result_id]
-        
-        if len(backtest_results) == original_length:
+        if not await get_result_store().delete(result_id):
             raise HTTPException(status_code=404, detail="Backtest result not found")
         
         logger.info(f"Deleted backtest result {result_id}")
@@ -97,10 +97,73 @@ async def delete_backtest_result(result_id: int):
         logger.error(f"Error deleting backtest result: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/runs/{run_id}")
+async def get_backtest_run(run_id: int):
+    """Metadata and metrics of one stored run"""
+    run = await get_result_store().get_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Backtest run not found")
+    return {"success": True, "run": run}
+
+@router.get("/runs/{run_id}/trades")
+async def get_backtest_trades(
+    run_id: int,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE),
+    symbol: Optional[str] = Query(None),
+    side: Optional[str] = Query(None, description="BUY or SELL")
+):
+    """One page of a run's trades"""
+    try:
+        return {"success": True, **get_result_store().trades(run_id, offset, limit, symbol, side)}
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Backtest run not found")
+
+@router.get("/runs/{run_id}/equity")
+async def get_backtest_equity(
+    run_id: int,
+    points: int = Query(500, ge=3, le=5000, description="Points after LTTB downsampling"),
+    start: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    end: Optional[str] = Query(None, description="YYYY-MM-DD")
+):
+    """A run's equity curve, downsampled for charting"""
+    try:
+        return {"success": True, **get_result_store().equity_curve(run_id, points, start, end)}
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Backtest run not found")
+
+@router.get("/runs/{run_id}/sweep")
+async def get_backtest_sweep_rows(
+    run_id: int,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE),
+    order_by: Optional[str] = Query(None, description="Metric to rank rows by, best first"),
+    phase: Optional[str] = Query(None, description="full, train or test"),
+    symbol: Optional[str] = Query(None)
+):
+    """One page of a parameter sweep's result rows"""
+    try:
+        return {"success": True, **get_result_store().sweep_rows(run_id, offset, limit, order_by, phase, symbol)}
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Backtest run not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/compare")
+async def compare_backtest_runs(
+    ids: str = Query(..., description="Comma-separated run ids"),
+    metrics: Optional[str] = Query(None, description="Comma-separated metric names")
+):
+    """Metrics of several runs side by side, with the best run per metric"""
+    try:
+        run_ids = [int(i) for i in ids.split(",") if i.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    names = [m.strip() for m in metrics.split(",") if m.strip()] if metrics else None
+    return {"success": True, **await get_result_store().compare(run_ids, names)}
+
 async def execute_backtest(config: BacktestConfig, duration: int) -> Dict[str, Any]:
     """Execute the actual backtest logic"""
-    global backtest_results, next_id
-    
     # Strategy mapping
     strategy_names = {
         'long_term': 'Long Term Trading',
@@ -123,9 +186,26 @@ async def execute_backtest(config: BacktestConfig, duration: int) -> Dict[str, A
         # Generate realistic simulated results
         result = generate_simulated_results(config, duration)
     
+    # Store the run; trades and equity (when present) go to column files.
+    # A failed save must not lose the result: it is returned without an id
+    try:
+        run_id = await get_result_store().save({
+            'strategy': config.strategy,
+            'start_date': config.start_date,
+            'end_date': config.end_date,
+            'initial_capital': config.initial_capital,
+            'parameters': config.model_dump(),
+            'metrics': {k: v for k, v in result.items() if k != 'results'},
+            'results': result.get('results'),
+        })
+    except Exception as e:
+        logger.log_error("backtest_store", e, {"strategy": config.strategy, "action": "save_run"})
+        run_id = None
+    
     # Add metadata
+    result.pop('results', None)
     result.update({
-        'id': next_id,
+        'id': run_id,
         'strategy': config.strategy,
         'strategy_name': strategy_names.get(config.strategy, config.strategy.title()),
         'start_date': config.start_date,
@@ -135,10 +215,6 @@ async def execute_backtest(config: BacktestConfig, duration: int) -> Dict[str, A
         'created_at': datetime.now().isoformat()
     })
     
-    # Store result
-    backtest_results.append(result)
-    next_id += 1
-    
     return result
 
 async def run_actual_backtest(config: BacktestConfig) -> Optional[Dict[str, Any]]:
@@ -111,8 +111,8 @@ async def get_cache_stats():
                 "is_valid": data.is_valid(),
                 "last_updated": data.last_updated.isoformat() if data.last_updated else None,
                 "candle_count": len(data.historical_data),
-                "has_hourly_data": bool(data.indicators.get('hourly_data')),
-                "has_minute_data": bool(data.indicators.get('minute_data'))
+                "has_hourly_data": len(data.indicators.get('hourly_data', [])) > 0,
+                "has_minute_data": len(data.indicators.get('minute_data', [])) > 0
             })
         
         return {
@@ -14,6 +14,7 @@ from services.risk import RiskService
 from services.data_fetcher import DataFetcher
 from services.strategy import StrategyService
 from services.watchlist import WatchlistService
+from services.pipeline import Pipeline, Stage
 from .auth import get_api_key
 from sqlalchemy import select, update
 from services import progress as progress_service
@@ -104,7 +105,8 @@ async def create_signal(
         signal_data["signal_type"] = ModelSignalType(payload.signal_type)
 
         # Create DB record
-        signal = await order_manager.create_signal(signal_data)
+        # Explicitly requested, so never dropped as a repeat of a scan signal
+        signal = await order_manager.create_signal(signal_data, dedupe=False)
         if not signal:
             raise HTTPException(status_code=500, detail="Failed to create signal")
 
@@ -214,6 +216,7 @@ async def generate_intraday_signals(
     use_batch: bool = True,  # new: prefer batched data fetch to avoid long blocking
     validate: bool = False,   # ignored; server-side validation removed
     max_concurrency: int = 4,  # new: limit concurrent processing
+    batch_size: int = 16,      # symbols per pipeline batch (fetch/evaluate/persist overlap across batches)
     interval: Optional[str] = None,  # new: override interval
     days: Optional[int] = None,      # new: override days window
     db: AsyncSession = Depends(get_db),
@@ -221,7 +224,8 @@ async def generate_intraday_signals(
 ) -> Dict[str, Any]:
     """Generate intraday signals for all symbols in the given watchlist category.
 
-    Optimized to batch-fetch historical data and process symbols concurrently to prevent request hangs.
+    Symbols stream through fetch -> evaluate -> persist stages in batches, so signals
+    for early batches are saved while later ones are still being fetched.
     If persist is True, signals are saved as pending for approval (dry-run friendly).
     """
     try:
@@ -251,80 +255,77 @@ async def generate_intraday_signals(
         persisted_ids: List[int] = []
 
         if use_batch:
-            # Batch historical fetch to minimize network overhead and avoid sequential blocking
-            await progress_service.update(phase="fetching")
-            hist_map = await data_fetcher.get_historical_data_many(
-                symbols, interval=eff_interval, days=eff_days, max_concurrency=max_concurrency
-            )
-
-            # Process signals concurrently with a semaphore
+            # Stream batches through fetch -> evaluate -> persist so the stages
+            # overlap and only a few batches of candles are held at a time
             await progress_service.update(phase="scanning")
-            sem = asyncio.Semaphore(max_concurrency)
-            lock = asyncio.Lock()  # protect shared lists
+            processed = 0
 
-            async def process_symbol(sym: str, data):
-                async with sem:
-                    try:
-                        sigs = await strategy.generate_signals_from_data(sym, data, strategy_name=None, validate=validate)
-                        if not sigs:
-                            return
-                        # Convert and optionally persist
-                        to_add: List[Dict[str, Any]] = []
-                        for ts in sigs:
-                            sig_dict = {
+            async def fetch_batch(batch: List[str]):
+                return await data_fetcher.get_historical_data_many(
+                    batch, interval=eff_interval, days=eff_days, max_concurrency=max_concurrency
+                )
+
+            async def evaluate_batch(hist_map: Dict[str, Any]):
+                # Indicators for the whole batch in one panel pass
+                return await strategy.generate_signals_batch(hist_map)
+
+            async def persist_batch(signals_map: Dict[str, Any]):
+                nonlocal processed
+                for sym, sigs in signals_map.items():
+                    for ts in sigs:
+                        sig_dict = {
+                            "symbol": ts.symbol,
+                            "signal_type": ts.signal_type.value,
+                            "entry_price": ts.entry_price,
+                            "stop_loss": ts.stop_loss,
+                            "target_price": ts.target_price,
+                            "confidence": ts.confidence,
+                            "strategy": ts.strategy,
+                            "metadata": ts.metadata or {},
+                        }
+                        sig_dict.update(_build_gemini_link(sig_dict))
+                        generated.append(sig_dict)
+                        if persist:
+                            created = await order_manager.create_signal({
                                 "symbol": ts.symbol,
-                                "signal_type": ts.signal_type.value,
+                                "signal_type": ts.signal_type,
                                 "entry_price": ts.entry_price,
                                 "stop_loss": ts.stop_loss,
-                                "target_price": ts.target_price,
-                                "confidence": ts.confidence,
+                                "take_profit": ts.target_price,
+                                "reason": f"{ts.strategy} generated",
                                 "strategy": ts.strategy,
-                                "metadata": ts.metadata or {},
-                            }
-                            sig_dict.update(_build_gemini_link(sig_dict))
-                            to_add.append(sig_dict)
-                        async with lock:
-                            generated.extend(to_add)
-                        if persist:
-                            for ts in sigs:
-                                created = await order_manager.create_signal({
+                                "confidence": ts.confidence,
+                                "gemini_review_url": _build_gemini_link({
                                     "symbol": ts.symbol,
-                                    "signal_type": ts.signal_type,
+                                    "signal_type": ts.signal_type.value,
                                     "entry_price": ts.entry_price,
                                     "stop_loss": ts.stop_loss,
-                                    "take_profit": ts.target_price,
-                                    "reason": f"{ts.strategy} generated",
+                                    "target_price": ts.target_price,
                                     "strategy": ts.strategy,
                                     "confidence": ts.confidence,
-                                    "gemini_review_url": _build_gemini_link({
-                                        "symbol": ts.symbol,
-                                        "signal_type": ts.signal_type.value,
-                                        "entry_price": ts.entry_price,
-                                        "stop_loss": ts.stop_loss,
-                                        "target_price": ts.target_price,
-                                        "strategy": ts.strategy,
-                                        "confidence": ts.confidence,
-                                        "reason": f"{ts.strategy} generated",
-                                    })["gemini_review_url"],
-                                })
-                                if created:
-                                    if queue_for_approval:
-                                        await order_manager.process_signal(created)
-                                    async with lock:
-                                        persisted_ids.append(created.id)
-                    finally:
-                        # Update progress per symbol processed
-                        try:
-                            idx = (len(generated) or 0)
-                            await progress_service.update(current_symbol=sym, processed=idx)
-                        except Exception:
-                            pass
-
-            tasks: List[Any] = []
-            for sym, data in hist_map.items():
-                tasks.append(process_symbol(sym, data))
-            if tasks:
-                await asyncio.gather(*tasks)
+                                    "reason": f"{ts.strategy} generated",
+                                })["gemini_review_url"],
+                            })
+                            if created:
+                                if queue_for_approval:
+                                    await order_manager.process_signal(created)
+                                persisted_ids.append(created.id)
+                    # Update progress per symbol processed
+                    processed += 1
+                    try:
+                        await progress_service.update(current_symbol=sym, processed=processed)
+                    except Exception:
+                        pass
+
+            step = max(1, batch_size)
+            batches = [symbols[i:i + step] for i in range(0, len(symbols), step)]
+            # One batch per stage at a time: the fetcher already parallelizes within
+            # a batch, and the order manager's DB session is not safe to share
+            await Pipeline([
+                Stage("fetch", fetch_batch, size=len),
+                Stage("evaluate", evaluate_batch, size=len),
+                Stage("persist", persist_batch, size=len),
+            ]).run(batches)
         else:
             # Fallback to original sequential flow (not recommended for large lists)
             await progress_service.update(phase="scanning")
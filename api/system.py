@@ -17,7 +17,17 @@ logger = logging.getLogger(__name__)
 
 @router.get("/cache/stats")
 async def get_cache_stats():
-    """Get Redis cache statistics"""
+    """Get Redis and in-process cache statistics"""
+    try:
+        from services.memory_cache import get_memory_cache_stats
+        memory_stats = get_memory_cache_stats()
+        fetcher = DataFetcher._instance
+        if fetcher is not None and getattr(fetcher, "tiered_cache", None) is not None:
+            memory_stats["data_fetcher_l2"] = fetcher.tiered_cache.stats()
+    except Exception as e:
+        logger.warning(f"Could not collect in-process cache stats: {e}")
+        memory_stats = {}
+
     try:
         from services.redis_service import get_redis_service
         redis = await get_redis_service()
@@ -25,20 +35,38 @@ async def get_cache_stats():
         if not redis.is_connected():
             return {
                 "status": "disconnected",
-                "message": "Redis cache is not connected"
+                "message": "Redis cache is not connected",
+                "memory": memory_stats
             }
         
         stats = await redis.get_stats()
         return {
             "status": "connected",
-            **stats
+            **stats,
+            "memory": memory_stats
         }
     except Exception as e:
         logger.error(f"Error getting cache stats: {e}")
         return {
             "status": "error",
-            "message": str(e)
+            "message": str(e),
+            "memory": memory_stats
+        }
+
+@router.get("/iifl/stats")
+async def get_iifl_request_stats():
+    """Get IIFL dispatch queue, rate limiter and HTTP connection pool statistics"""
+    try:
+        from services.http_transport import get_http_stats
+        iifl = IIFLAPIService()
+        return {
+            "dispatcher": iifl.dispatcher.stats(),
+            "rate_limiter": iifl.rate_limiter.stats(),
+            "http": get_http_stats(),
         }
+    except Exception as e:
+        logger.error(f"Error getting IIFL request stats: {e}")
+        return {"status": "error", "message": str(e)}
 
 @router.post("/cache/clear")
 async def clear_cache(pattern: str = "*"):
@@ -150,6 +150,10 @@ try:
         market_data_cache_ttl: int = Field(default=300, alias="MARKET_DATA_CACHE_TTL")
         historical_data_cache_ttl: int = Field(default=3600, alias="HISTORICAL_DATA_CACHE_TTL")
         max_symbols_per_request: int = Field(default=50, alias="MAX_SYMBOLS_PER_REQUEST")
+        # In-process cache bounds (entries per namespace)
+        price_cache_max_entries: int = Field(default=2000, alias="PRICE_CACHE_MAX_ENTRIES")
+        depth_cache_max_entries: int = Field(default=500, alias="DEPTH_CACHE_MAX_ENTRIES")
+        memory_cache_max_entries: int = Field(default=1000, alias="MEMORY_CACHE_MAX_ENTRIES")
 
         # Email Configuration
         email_enabled: bool = Field(default=False, alias="EMAIL_ENABLED")
@@ -436,6 +440,9 @@ except Exception:
             self.market_data_cache_ttl: int = int(os.getenv("MARKET_DATA_CACHE_TTL", "300") or 300)
             self.historical_data_cache_ttl: int = int(os.getenv("HISTORICAL_DATA_CACHE_TTL", "3600") or 3600)
             self.max_symbols_per_request: int = int(os.getenv("MAX_SYMBOLS_PER_REQUEST", "50") or 50)
+            self.price_cache_max_entries: int = int(os.getenv("PRICE_CACHE_MAX_ENTRIES", "2000") or 2000)
+            self.depth_cache_max_entries: int = int(os.getenv("DEPTH_CACHE_MAX_ENTRIES", "500") or 500)
+            self.memory_cache_max_entries: int = int(os.getenv("MEMORY_CACHE_MAX_ENTRIES", "1000") or 1000)
             
             # Email Configuration
             self.email_enabled: bool = os.getenv("EMAIL_ENABLED", "false").lower() == "true"
@@ -290,6 +290,16 @@ async def lifespan(app: FastAPI):
     else:
         log_timing("Startup cache warmup disabled by configuration")
     
+    # Load the contract snapshot (and start today's download if it is stale) in the
+    # background, so the first instrument lookup on the hot path finds it in memory
+    if not SAFE_MODE:
+        try:
+            from services.contract_master import get_contract_master
+            asyncio.create_task(get_contract_master().get_snapshot())
+            log_timing("Contract snapshot warmup started in background")
+        except Exception as e:
+            logger.warning(f"Failed to start contract snapshot warmup: {str(e)}")
+    
     # Schedule daily housekeeping (log pruning) at 00:30) - disabled in SAFE_MODE
     log_timing("Starting scheduler initialization")
     try:
@@ -306,6 +316,19 @@ async def lifespan(app: FastAPI):
                 name="daily_housekeeping"
             )
 
+            # Refresh the contract master snapshot every weekday before the open
+            log_timing("Adding contract master refresh job")
+            try:
+                from services.scheduler_tasks import refresh_contract_master
+                scheduler.add_job(
+                    lambda: asyncio.create_task(refresh_contract_master()),
+                    CronTrigger(day_of_week='mon-fri', hour=8, minute=30),
+                    name="refresh_contract_master"
+                )
+                logger.info("Scheduled daily contract master refresh (weekdays at 08:30)")
+            except Exception as e:
+                logger.warning(f"Failed to schedule contract master refresh: {str(e)}")
+
             # Schedule to run every weekday at 9:00 AM: build intraday watchlist
             log_timing("Adding intraday watchlist builder job")
             try:
@@ -403,6 +426,20 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error closing Redis connection: {e}")
     
+    # Close the shared outbound HTTP connection pool
+    try:
+        from services.http_transport import close_http_client
+        await close_http_client()
+    except Exception as e:
+        logger.error(f"Error closing HTTP client: {e}")
+    
+    # Stop indicator/strategy worker processes
+    try:
+        from services.strategy_pool import shutdown_strategy_pool
+        shutdown_strategy_pool()
+    except Exception as e:
+        logger.error(f"Error stopping strategy pool: {e}")
+    
     try:
         if getattr(app.state, "market_stream_service", None):
             await app.state.market_stream_service.disconnect()
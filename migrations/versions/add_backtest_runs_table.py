@@ -0,0 +1,50 @@
+"""Add backtest_runs table
+
+Revision ID: add_backtest_runs_table
+Revises: add_watchlist_table
+Create Date: 2026-10-17 01:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_backtest_runs_table'
+down_revision = 'add_watchlist_table'
+branch_labels = None
+depends_on = None
+
+INDEXED_COLUMNS = ('id', 'kind', 'strategy', 'total_return', 'sharpe_ratio', 'created_at')
+
+def upgrade():
+    # Run metadata and headline metrics; trades, equity and sweep rows live in
+    # columnar files keyed by id (services/backtest_store.py)
+    op.create_table(
+        'backtest_runs',
+        sa.Column('id', sa.Integer(), nullable=False, primary_key=True),
+        sa.Column('kind', sa.String(length=20), nullable=False, server_default='backtest'),
+        sa.Column('strategy', sa.String(length=50), nullable=False),
+        sa.Column('symbols', sa.JSON(), nullable=False),
+        sa.Column('interval', sa.String(length=10), nullable=True),
+        sa.Column('start_date', sa.String(length=10), nullable=True),
+        sa.Column('end_date', sa.String(length=10), nullable=True),
+        sa.Column('initial_capital', sa.Float(), nullable=True),
+        sa.Column('parameters', sa.JSON(), nullable=True),
+        sa.Column('metrics', sa.JSON(), nullable=True),
+        sa.Column('total_return', sa.Float(), nullable=True),
+        sa.Column('sharpe_ratio', sa.Float(), nullable=True),
+        sa.Column('max_drawdown', sa.Float(), nullable=True),
+        sa.Column('win_rate', sa.Float(), nullable=True),
+        sa.Column('total_trades', sa.Integer(), nullable=True),
+        sa.Column('trade_rows', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('equity_rows', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('sweep_rows', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    for column in INDEXED_COLUMNS:
+        op.create_index(f'ix_backtest_runs_{column}', 'backtest_runs', [column])
+
+def downgrade():
+    for column in INDEXED_COLUMNS:
+        op.drop_index(f'ix_backtest_runs_{column}', table_name='backtest_runs')
+    op.drop_table('backtest_runs')
@@ -4,6 +4,7 @@ from .pnl_reports import PnLReport
 from .risk_events import RiskEvent
 from .settings import Setting
 from .watchlist import Watchlist
+from .backtest_runs import BacktestRun
 
 __all__ = [
     "Base",
@@ -12,5 +13,6 @@ __all__ = [
     "Watchlist",
     "PnLReport", 
     "RiskEvent",
-    "Setting"
+    "Setting",
+    "BacktestRun"
 ]
@@ -0,0 +1,60 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON
+from sqlalchemy.sql import func
+from .database import Base
+from typing import Dict, Any
+
+
+class BacktestRun(Base):
+    """Metadata and headline metrics of a stored backtest run.
+
+    Trades, the equity curve and sweep rows live in columnar files keyed by
+    ``id`` (see ``services.backtest_store``); only their row counts are kept here.
+    """
+    __tablename__ = "backtest_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # backtest, portfolio, intraday or sweep
+    kind = Column(String(20), nullable=False, default="backtest", index=True)
+    strategy = Column(String(50), nullable=False, index=True)
+    symbols = Column(JSON, nullable=False, default=list)
+    interval = Column(String(10), nullable=True)
+    start_date = Column(String(10), nullable=True)
+    end_date = Column(String(10), nullable=True)
+    initial_capital = Column(Float, nullable=True)
+    parameters = Column(JSON, nullable=True)
+    metrics = Column(JSON, nullable=True)
+
+    # Headline metrics as columns so runs can be ranked in SQL
+    total_return = Column(Float, nullable=True, index=True)
+    sharpe_ratio = Column(Float, nullable=True, index=True)
+    max_drawdown = Column(Float, nullable=True)
+    win_rate = Column(Float, nullable=True)
+    total_trades = Column(Integer, nullable=True)
+
+    # Rows in the run's columnar files
+    trade_rows = Column(Integer, nullable=False, default=0)
+    equity_rows = Column(Integer, nullable=False, default=0)
+    sweep_rows = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime, nullable=False, default=func.now(), index=True)
+
+    def __repr__(self):
+        return f"<BacktestRun(id={self.id}, kind={self.kind}, strategy={self.strategy})>"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "strategy": self.strategy,
+            "symbols": self.symbols or [],
+            "interval": self.interval,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "initial_capital": self.initial_capital,
+            "parameters": self.parameters or {},
+            "metrics": self.metrics or {},
+            "trade_rows": self.trade_rows,
+            "equity_rows": self.equity_rows,
+            "sweep_rows": self.sweep_rows,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
@@ -104,8 +104,8 @@ async def main():
     )
 
     generated: List[Dict] = []
-    for sym, data in hist_map.items():
-        sigs = await strategy.generate_signals_from_data(sym, data, strategy_name=None, validate=validate)
+    signals_map = await strategy.generate_signals_batch(hist_map)
+    for sym, sigs in signals_map.items():
         for ts in sigs:
             generated.append({
                 "symbol": ts.symbol,
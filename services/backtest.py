@@ -1,15 +1,29 @@
-from typing import Dict, List, Optional, Any, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta, date
+import heapq
 import logging
+import os
 from .strategy import StrategyService
+from .strategy_registry import get_signal_masks, get_strategy
 from .data_fetcher import DataFetcher
 
+if TYPE_CHECKING:
+    from .backtest_sweep import ParameterSweep, WalkForward
+
 # Optional pandas import
 try:
     import pandas as pd
     import numpy as np
     HAS_PANDAS = True
     from models.signals import SignalType
+    from .bar_view import BAR_FIELDS, Bar, LatestBars
+    from .candle_store import candles_to_columns
+    from .indicator_engine import OHLCV_FIELDS, build_panel, compute_indicators
+    from .indicator_state import IndicatorState
+    from .resample import interval_seconds
+    from .risk import risk_position_size, scale_to_margin
+    from .backtest_engine import SignalArrays, equity_metrics, max_drawdown, signals_from_strategy, simulate
+    from .portfolio_backtest import PortfolioLimits, PortfolioPanel, simulate_portfolio
 except ImportError:
     HAS_PANDAS = False
     # Basic replacements
@@ -35,8 +49,13 @@ class BacktestService:
     
     async def run_backtest(self, strategy_or_config, symbol: Optional[str] = None, start_date: Optional[str] = None, 
                           end_date: Optional[str] = None, initial_capital: float = 100000.0,
-                          risk_per_trade: float = 0.02, commission: float = 0.0005, slippage: float = 0.0005) -> Dict[str, Any]:
-        """Run backtest for a specific strategy"""
+                          risk_per_trade: float = 0.02, commission: float = 0.0005, slippage: float = 0.0005,
+                          vectorized: bool = False) -> Dict[str, Any]:
+        """Run backtest for a specific strategy
+
+        ``vectorized`` builds the strategy's signals for the whole series at once
+        from its registered signal masks (same trades and metrics as bar by bar).
+        """
         try:
             # Support dict-style config used in tests
             if isinstance(strategy_or_config, dict):
@@ -46,48 +65,28 @@ class BacktestService:
                 start_date = cfg.get("start_date")
                 end_date = cfg.get("end_date")
                 initial_capital = cfg.get("initial_capital", initial_capital)
+                vectorized = cfg.get("vectorized", vectorized)
             else:
                 strategy_name = strategy_or_config
                 # symbol, start_date, end_date should be provided positionally
             # Get historical data
-            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-            days = (end_dt - start_dt).days + 50  # Add buffer for indicators
-            
-            # Allow mocks that return list-of-dicts directly
-            df = None
-            try:
-                df = await self.data_fetcher.get_historical_data_df(symbol, "1D", start_date, end_date)
-            except Exception:
-                pass
+            df = await self._load_history(symbol, start_date, end_date)
             if df is None:
-                # Use mocked list from get_historical_data when get_historical_data_df isn't available
-                raw = await self.data_fetcher.get_historical_data(symbol, "1D", 50)
-                if raw:
-                    try:
-                        import pandas as pd
-                        df = pd.DataFrame(raw)
-                        if 'date' in df.columns:
-                            import pandas as _pd
-                            df['date'] = pd.to_datetime(df['date'])
-                            df.set_index('date', inplace=True)
-                    except Exception:
-                        df = None
-            
-            if df is None or (hasattr(df, 'empty') and df.empty) or len(df) == 0:
                 return {"error": f"No data available for {symbol}"}
             
-            # Filter data to backtest period (ensure index is datetime)
-            df = df[(df.index >= start_dt) & (df.index <= end_dt)]
-            
             if len(df) < 50:
                 return {"error": "Insufficient data for backtesting"}
             
-            # Calculate indicators
-            df = self.strategy_service.calculate_indicators(df)
+            # Calculate only the indicators this strategy reads
+            spec = get_strategy(strategy_name)
+            if spec is None:
+                raise ValueError(f"Unknown strategy: {strategy_name}")
+            df = self.strategy_service.calculate_indicators(df, columns=spec.indicators)
             
             # Run backtest simulation
-            results = self._simulate_trading(df, symbol, strategy_name, initial_capital, risk_per_trade, commission, slippage)
+            results = self._simulate_trading(
+                df, symbol, strategy_name, initial_capital, risk_per_trade, commission, slippage, vectorized
+            )
             
             # Calculate performance metrics
             metrics = self._calculate_metrics(results, initial_capital)
@@ -102,6 +101,7 @@ class BacktestService:
                     "risk_per_trade": risk_per_trade,
                     "commission": commission,
                     "slippage": slippage,
+                    "vectorized": vectorized,
                 },
                 "results": results,
                 "metrics": metrics,
@@ -112,210 +112,78 @@ class BacktestService:
             logger.error(f"Error running backtest: {str(e)}")
             return {"error": str(e), "status": "failed"}
     
-    def _simulate_trading(self, df: pd.DataFrame, symbol: str, 
-                               strategy_name: str, initial_capital: float,
-                               risk_per_trade: float, commission: float, slippage: float) -> Dict[str, Any]:
-        """Simulate trading based on strategy signals"""
-        
-        portfolio = {
-            "cash": initial_capital,
-            "position": 0,
-            "equity": initial_capital,
-            "trades": [],
-            "equity_curve": []
-        }
+    async def _load_history(self, symbol: str, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
+        """Daily candles of ``symbol`` from ``start_date`` to ``end_date`` (None when there are none)"""
+        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+        end_dt = datetime.strptime(end_date, "%Y-%m-%d")
         
-        in_position = False
-        entry_price = 0
-        current_signal = None
-
-        strategy_map = {
-            "ema_crossover": self.strategy_service._ema_crossover_strategy,
-            "bollinger_bands": self.strategy_service._bollinger_bands_strategy,
-            "momentum": self.strategy_service._momentum_strategy,
-        }
-        strategy_func = strategy_map.get(strategy_name)
-        if not strategy_func:
-            raise ValueError(f"Unknown strategy: {strategy_name}")
-        
-        for i in range(50, len(df)):  # Start after indicator warmup
-            current_row = df.iloc[i]
-            current_date = df.index[i]
-            
-            # Update equity curve based on previous day's close
-            equity_val = portfolio["cash"] + (portfolio["position"] * df.iloc[i-1]['close'])
-            portfolio["equity_curve"].append({
-                "date": df.index[i-1].isoformat(),
-                "equity": equity_val
-            })
-            
-            # Generate signal using the full-featured StrategyService method
-            signal = strategy_func(df.iloc[:i+1], symbol)
-            
-            # Execute trades based on signals
-            if signal and signal.signal_type == SignalType.BUY and not in_position:
-                # Enter long position
-                risk_amount = portfolio['cash'] * risk_per_trade
-                risk_per_share = abs(signal.entry_price - signal.stop_loss)
-                if risk_per_share <= 0: continue
-
-                position_size = int(risk_amount / risk_per_share)
-                
-                # Apply slippage to entry price
-                entry_price_slippage = signal.entry_price * (1 + slippage)
-                trade_value = position_size * entry_price_slippage
-                trade_commission = trade_value * commission
-
-                if position_size > 0 and (trade_value + trade_commission) <= portfolio["cash"]:
-                    portfolio["position"] = position_size
-                    portfolio["cash"] -= (trade_value + trade_commission)
-                    entry_price = entry_price_slippage
-                    current_signal = signal
-                    in_position = True
-                    
-                    portfolio["trades"].append({
-                        "type": "BUY",
-                        "date": current_date.isoformat(),
-                        "price": entry_price,
-                        "quantity": position_size,
-                        "value": trade_value,
-                        "commission": trade_commission
-                    })
-            
-            elif in_position and current_signal:
-                # Check exit conditions using the signal that triggered the entry
-                should_exit = False
-                exit_reason = ""
-                
-                # Stop loss
-                if current_row['low'] <= current_signal.stop_loss:
-                    should_exit = True
-                    exit_reason = "Stop Loss"
-                
-                # Take profit
-                elif current_row['high'] >= current_signal.target_price:
-                    should_exit = True
-                    exit_reason = "Take Profit"
-                
-                # Exit signal from strategy
-                elif signal and signal.signal_type == SignalType.SELL:
-                    should_exit = True
-                    exit_reason = "Strategy Exit"
-                
-                if should_exit:
-                    # Exit position
-                    exit_price_slippage = current_row['close'] * (1 - slippage)
-                    exit_value = portfolio["position"] * exit_price_slippage
-                    exit_commission = exit_value * commission
-                    portfolio["cash"] += (exit_value - exit_commission)
-                    
-                    trade_pnl = (exit_price_slippage - entry_price) * portfolio["position"] - (trade_commission + exit_commission)
-                    
-                    portfolio["trades"].append({
-                        "type": "SELL",
-                        "date": current_date.isoformat(),
-                        "price": exit_price_slippage,
-                        "quantity": portfolio["position"],
-                        "value": exit_value,
-                        "pnl": trade_pnl,
-                        "reason": exit_reason,
-                        "commission": exit_commission
-                    })
-                    
-                    portfolio["position"] = 0
-                    in_position = False
-                    current_signal = None
-        
-        # Close any remaining position at the end
-        if in_position:
-            final_price = df.iloc[-1]['close']
-            exit_price_slippage = final_price * (1 - slippage)
-            exit_value = portfolio["position"] * exit_price_slippage
-            exit_commission = exit_value * commission
-            portfolio["cash"] += (exit_value - exit_commission)
-            
-            trade_pnl = (exit_price_slippage - entry_price) * portfolio["position"] - exit_commission
-            
-            portfolio["trades"].append({
-                "type": "SELL",
-                "date": df.index[-1].isoformat(),
-                "price": exit_price_slippage,
-                "quantity": portfolio["position"],
-                "value": exit_value,
-                "pnl": trade_pnl,
-                "reason": "End of Period",
-                "commission": exit_commission
-            })
-            
-            portfolio["position"] = 0
+        # Allow mocks that return list-of-dicts directly
+        df = None
+        try:
+            df = await self.data_fetcher.get_historical_data_df(symbol, "1D", start_date, end_date)
+        except Exception:
+            pass
+        if df is None:
+            # Use mocked list from get_historical_data when get_historical_data_df isn't available
+            raw = await self.data_fetcher.get_historical_data(symbol, "1D", 50)
+            if raw:
+                try:
+                    df = pd.DataFrame(raw)
+                    if 'date' in df.columns:
+                        df['date'] = pd.to_datetime(df['date'])
+                        df.set_index('date', inplace=True)
+                except Exception:
+                    df = None
         
-        # Final equity calculation
-        portfolio["equity"] = portfolio["cash"]
+        if df is None or (hasattr(df, 'empty') and df.empty) or len(df) == 0:
+            return None
         
-        return portfolio
+        # Filter data to backtest period (ensure index is datetime); a sorted index
+        # is sliced as a view so store-backed columns are not copied
+        if df.index.is_monotonic_increasing:
+            return df.loc[start_dt:end_dt]
+        return df[(df.index >= start_dt) & (df.index <= end_dt)]
+    
+    def _simulate_trading(self, df: pd.DataFrame, symbol: str, 
+                               strategy_name: str, initial_capital: float,
+                               risk_per_trade: float, commission: float, slippage: float,
+                               vectorized: bool = False) -> Dict[str, Any]:
+        """Simulate trading based on strategy signals.
+
+        Signals come from calling the strategy on each bar, or with
+        ``vectorized`` from its registered signal masks in one pass; both
+        are simulated by ``backtest_engine.simulate`` over the same columns.
+        """
+        # Indicators are computed once; strategies read the precomputed columns
+        columns = {name: df[name].to_numpy() for name in BAR_FIELDS if name in df.columns}
+        signals, start = self._signal_arrays(columns, symbol, strategy_name, vectorized)
+        return simulate(columns, df.index, signals, start, initial_capital, risk_per_trade, commission, slippage)
+    
+    def _signal_arrays(self, columns: Dict[str, Any], symbol: str, strategy_name: str,
+                       vectorized: bool = False) -> Tuple["SignalArrays", int]:
+        """Signals at every bar of the bar/indicator columns, and the first tradable bar"""
+        spec = get_strategy(strategy_name)
+        if spec is None:
+            raise ValueError(f"Unknown strategy: {strategy_name}")
+
+        start = max(1, spec.lookback)  # Start after indicator warmup
+
+        signals = None
+        if vectorized:
+            masks = get_signal_masks(strategy_name)
+            if masks is not None:
+                signals = masks.evaluate(self.strategy_service, columns)
+            else:
+                logger.debug(f"No signal masks for {strategy_name}; evaluating it bar by bar")
+        if signals is None:
+            signals = signals_from_strategy(spec.bind(self.strategy_service), columns, symbol, start)
+        return signals, start
     
     def _calculate_metrics(self, results: Dict, initial_capital: float) -> Dict[str, Any]:
         """Calculate performance metrics"""
         try:
-            final_equity = results["equity"]
-            trades = results["trades"]
-            equity_curve = results["equity_curve"]
-            
-            # Basic metrics
-            total_return = (final_equity - initial_capital) / initial_capital if initial_capital > 0 else 0
-            total_trades = len([t for t in trades if t["type"] == "SELL"])
-            
-            if total_trades == 0:
-                return {
-                    "total_return": total_return,
-                    "total_trades": 0,
-                    "win_rate": 0,
-                    "sharpe_ratio": 0,
-                    "max_drawdown": 0,
-                    "profit_factor": 0
-                }
-            
-            # Trade analysis
-            winning_trades = [t for t in trades if t["type"] == "SELL" and t.get("pnl", 0) > 0]
-            losing_trades = [t for t in trades if t["type"] == "SELL" and t.get("pnl", 0) <= 0]
-            
-            win_rate = len(winning_trades) / total_trades if total_trades > 0 else 0
-            
-            gross_profit = sum([t["pnl"] for t in winning_trades])
-            gross_loss = abs(sum([t["pnl"] for t in losing_trades]))
-            
-            profit_factor = gross_profit / gross_loss if gross_loss > 0 else float('inf')
-            
-            # Drawdown calculation
-            max_drawdown = self._calculate_max_drawdown(equity_curve)
-            
-            # Sharpe ratio (simplified, risk-free rate = 0)
-            returns = []
-            if len(equity_curve) > 1:
-                for i in range(1, len(equity_curve)):
-                    daily_return = (equity_curve[i]["equity"] - equity_curve[i-1]["equity"]) / equity_curve[i-1]["equity"]
-                    returns.append(daily_return)
-            
-            if returns and np.std(returns) > 0:
-                sharpe_ratio = np.mean(returns) / np.std(returns) * np.sqrt(252)
-            else:
-                sharpe_ratio = 0
-            
-            return {
-                "total_return": total_return,
-                "total_return_percent": total_return * 100,
-                "final_equity": final_equity,
-                "total_trades": total_trades,
-                "winning_trades": len(winning_trades),
-                "losing_trades": len(losing_trades),
-                "win_rate": win_rate,
-                "gross_profit": gross_profit,
-                "gross_loss": gross_loss,
-                "profit_factor": profit_factor,
-                "max_drawdown": max_drawdown,
-                "max_drawdown_percent": max_drawdown * 100,
-                "sharpe_ratio": sharpe_ratio
-            }
+            equity = np.array([point["equity"] for point in results["equity_curve"]], dtype=float)
+            return equity_metrics(results["trades"], equity, results["equity"], initial_capital)
             
         except Exception as e:
             logger.error(f"Error calculating metrics: {str(e)}")
@@ -323,22 +191,7 @@ class BacktestService:
     
     def _calculate_max_drawdown(self, equity_curve: List[Dict]) -> float:
         """Calculate maximum drawdown"""
-        if not equity_curve:
-            return 0
-        
-        peak = equity_curve[0]["equity"]
-        max_dd = 0
-        
-        for point in equity_curve:
-            equity = point["equity"]
-            if equity > peak:
-                peak = equity
-            
-            drawdown = (peak - equity) / peak if peak > 0 else 0
-            if drawdown > max_dd:
-                max_dd = drawdown
-        
-        return max_dd
+        return max_drawdown(np.array([point["equity"] for point in equity_curve], dtype=float))
     
     async def run_multiple_backtests(self, strategies: List[str], symbols: List[str], 
                                    start_date: str, end_date: str, 
@@ -364,6 +217,199 @@ class BacktestService:
         
         return results
     
+    async def run_portfolio_backtest(self, strategy: str, symbols: List[str], start_date: str, end_date: str,
+                                     initial_capital: float = 100000.0, limits: Optional["PortfolioLimits"] = None,
+                                     commission: float = 0.0005, slippage: float = 0.0005,
+                                     vectorized: bool = True) -> Dict[str, Any]:
+        """Run a strategy over several symbols that share one capital pool
+
+        See ``portfolio_backtest``: positions compete for cash on a common
+        time axis under ``limits`` (default: the live MAX_POSITIONS,
+        MAX_POSITION_SIZE, MAX_DAILY_LOSS and RISK_PER_TRADE settings).
+        """
+        try:
+            spec = get_strategy(strategy)
+            if spec is None:
+                raise ValueError(f"Unknown strategy: {strategy}")
+            limits = limits or PortfolioLimits.from_settings(self.strategy_service.settings)
+
+            frames = {}
+            for symbol in symbols:
+                df = await self._load_history(symbol, start_date, end_date)
+                if df is None or len(df) < 50:
+                    logger.warning(f"Skipping {symbol} in portfolio backtest: insufficient data")
+                    continue
+                frames[symbol] = df
+            if not frames:
+                return {"error": "No data available for the requested symbols", "status": "failed"}
+
+            # One indicator pass over all symbols (the engine vectorizes across rows)
+            ohlcv = build_panel(frames)
+            indicators = compute_indicators(ohlcv, spec.indicators)
+            series = {}
+            for row, symbol in enumerate(ohlcv.symbols):
+                first = int(ohlcv.starts[row])
+                columns = {name: getattr(ohlcv, name)[row, first:] for name in OHLCV_FIELDS}
+                columns.update({name: values[row, first:] for name, values in indicators.items()})
+                signals, start = self._signal_arrays(columns, symbol, strategy, vectorized)
+                series[symbol] = (frames[symbol].index, columns, signals, start)
+
+            panel = PortfolioPanel.from_series(series)
+            sim = simulate_portfolio(panel, initial_capital, limits, commission, slippage)
+            metrics = equity_metrics(sim.trades, np.concatenate(([initial_capital], sim.equity)),
+                                     sim.final_equity, initial_capital)
+            metrics.update({"max_open_positions": sim.max_open_positions, "skipped_signals": sim.skipped})
+
+            return {
+                "strategy": strategy,
+                "symbols": list(series),
+                "start_date": start_date,
+                "end_date": end_date,
+                "initial_capital": initial_capital,
+                "parameters": {
+                    "risk_per_trade": limits.risk_per_trade,
+                    "max_positions": limits.max_positions,
+                    "max_position_value": limits.max_position_value,
+                    "max_daily_loss": limits.max_daily_loss,
+                    "commission": commission,
+                    "slippage": slippage,
+                    "vectorized": vectorized,
+                },
+                "results": {
+                    "cash": sim.final_equity,
+                    "position": 0,
+                    "equity": sim.final_equity,
+                    "trades": sim.trades,
+                    "equity_curve": sim.equity_curve(panel.axis),
+                },
+                "metrics": metrics,
+                "status": "completed"
+            }
+            
+        except Exception as e:
+            logger.error(f"Error running portfolio backtest: {str(e)}")
+            return {"error": str(e), "status": "failed"}
+    
+    async def run_intraday_backtest(self, strategy: str, symbols: List[str], start_date: str, end_date: str,
+                                    interval: str = "5m", initial_capital: float = 100000.0,
+                                    limits: Optional["PortfolioLimits"] = None, commission: float = 0.0005,
+                                    slippage: float = 0.0005, allow_short: bool = True,
+                                    square_off: Optional[str] = None, warmup_bars: int = 150) -> Dict[str, Any]:
+        """Replay 1m/5m bars of several symbols through a strategy, session by session
+
+        See ``IntradayReplay``. Bars are read from the data fetcher's candle
+        store (memory-mapped); symbols missing there are fetched once.
+        ``square_off`` defaults to INTRADAY_SQUARE_OFF_TIME (15:15).
+        """
+        try:
+            start_ts = int((datetime.strptime(start_date, "%Y-%m-%d") - datetime(1970, 1, 1)).total_seconds())
+            end_ts = int((datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1) - datetime(1970, 1, 1)).total_seconds())
+            replay = IntradayReplay(
+                self.strategy_service, strategy, symbols, interval, initial_capital, limits,
+                commission, slippage, allow_short, square_off,
+            )
+
+            series = {}
+            for symbol in symbols:
+                cols = await self._intraday_columns(symbol, interval, start_date, end_date)
+                if cols is not None and len(cols["ts"]):
+                    series[symbol] = cols
+                else:
+                    logger.warning(f"Skipping {symbol} in intraday backtest: no {interval} candles")
+            if not series:
+                return {"error": f"No {interval} data available for the requested symbols", "status": "failed"}
+
+            # The replay is CPU-bound; keep it off the event loop
+            results = await asyncio.to_thread(replay.run, series, start_ts, end_ts, warmup_bars)
+            metrics = results.pop("metrics")
+            return {
+                "strategy": strategy,
+                "symbols": list(series),
+                "interval": interval,
+                "start_date": start_date,
+                "end_date": end_date,
+                "initial_capital": initial_capital,
+                "parameters": {
+                    "risk_per_trade": replay.limits.risk_per_trade,
+                    "max_positions": replay.limits.max_positions,
+                    "max_position_value": replay.limits.max_position_value,
+                    "max_daily_loss": replay.limits.max_daily_loss,
+                    "commission": commission,
+                    "slippage": slippage,
+                    "allow_short": allow_short,
+                    "square_off": f"{replay.square_off // 3600:02d}:{replay.square_off % 3600 // 60:02d}",
+                },
+                "results": results,
+                "metrics": metrics,
+                "status": "completed"
+            }
+
+        except Exception as e:
+            logger.error(f"Error running intraday backtest: {str(e)}")
+            return {"error": str(e), "status": "failed"}
+    
+    async def _intraday_columns(self, symbol: str, interval: str, start_date: str,
+                                end_date: str) -> Optional[Dict[str, Any]]:
+        """Candle columns of ``symbol`` from the candle store, else fetched for the period
+
+        The stored series is used only if it spans the period: a bar on or
+        before its first weekday and on or after its last one (up to today).
+        """
+        store = getattr(self.data_fetcher, "candle_store", None)
+        if store is not None:
+            cols = await asyncio.to_thread(store.read_arrays, symbol, interval)
+            if cols is not None and len(cols["ts"]):
+                days = np.asarray(cols["ts"][[0, -1]]).view("datetime64[s]").astype("datetime64[D]")
+                first_day = np.busday_offset(np.datetime64(start_date, "D"), 0, roll="forward")
+                last_day = np.busday_offset(min(np.datetime64(end_date, "D"), np.datetime64(date.today(), "D")),
+                                            0, roll="backward")
+                if days[0] <= first_day and days[1] >= last_day:
+                    return cols
+                logger.info(f"Stored {interval} candles of {symbol} cover {days[0]}..{days[1]}, "
+                            f"not {start_date}..{end_date}; fetching the period")
+        candles = await self.data_fetcher.get_historical_data(
+            symbol, interval, from_date=start_date, to_date=end_date
+        )
+        return candles_to_columns(candles) if candles else None
+    
+    async def run_parameter_sweep(self, strategy: str, symbols: List[str], start_date: str, end_date: str,
+                                  param_sets: Optional[List[Dict[str, Any]]] = None,
+                                  walk_forward: Optional["WalkForward"] = None, objective: str = "sharpe_ratio",
+                                  initial_capital: float = 100000.0, risk_per_trade: float = 0.02,
+                                  commission: float = 0.0005, slippage: float = 0.0005,
+                                  store: Any = None, sweep: Optional["ParameterSweep"] = None) -> Dict[str, Any]:
+        """Run ``param_sets`` of a strategy over several symbols in parallel
+
+        See ``backtest_sweep``: each (symbol, parameter set) is a vectorized
+        backtest in a worker process; rows stream into ``store`` and the best
+        set per symbol (or the walk-forward windows) is returned.
+        """
+        from .backtest_sweep import ParameterSweep
+
+        symbol_data = {}
+        for symbol in symbols:
+            df = await self._load_history(symbol, start_date, end_date)
+            if df is not None and len(df) >= 50:
+                symbol_data[symbol] = df
+            else:
+                logger.warning(f"Skipping {symbol} in parameter sweep: insufficient data")
+        if not symbol_data:
+            return {"error": "No data available for the requested symbols", "status": "failed"}
+
+        owned = sweep is None
+        sweep = sweep or ParameterSweep()
+        try:
+            summary = await sweep.run(
+                strategy, symbol_data, param_sets or [{}], walk_forward=walk_forward, objective=objective,
+                initial_capital=initial_capital, risk_per_trade=risk_per_trade, commission=commission,
+                slippage=slippage, store=store,
+            )
+        finally:
+            if owned:
+                sweep.shutdown()
+        return {**summary, "start_date": start_date, "end_date": end_date, "symbols": list(symbol_data),
+                "status": "completed"}
+    
     def validate_strategy_performance(self, metrics: Dict[str, Any], 
                                     min_sharpe: float = 1.0, 
                                     max_drawdown: float = 0.15,
@@ -411,3 +457,287 @@ class BacktestService:
         validation["score"] = validation["score"] / 4  # Normalize to 0-1
         
         return validation
+
+
+def _clock_seconds(value: Optional[str], default: str) -> int:
+    """Seconds after midnight of an "HH:MM" time"""
+    try:
+        hours, minutes = (int(part) for part in (value or default).split(":")[:2])
+    except ValueError:
+        hours, minutes = (int(part) for part in default.split(":")[:2])
+    return hours * 3600 + minutes * 60
+
+
+def _ts_isoformat(ts: int) -> str:
+    """ISO text of a naive wall-clock epoch timestamp (as stored in ``candle_store``)"""
+    return (datetime(1970, 1, 1) + timedelta(seconds=int(ts))).isoformat()
+
+
+class IntradayReplay:
+    """Replays intraday bars of many symbols in time order through one strategy
+
+    Bars come from per-symbol column arrays (``candle_store`` layout, ``ts`` in
+    naive wall-clock epoch seconds) and are merged lazily with ``heapq.merge``,
+    reading each series in chunks, so memory per symbol is one chunk, one
+    ``IndicatorState`` and its position slot. Each bar updates the symbol's
+    indicators incrementally and runs the strategy on the latest rows, as the
+    live intraday scan does.
+
+    Bars starting outside market hours are skipped. Positions share one cash
+    balance under ``PortfolioLimits`` (sizing as in ``RiskService``, daily
+    loss limit per session) and are squared off on the bar that ends at or
+    after the square-off time; no entries are taken from that bar on. A buy
+    signal opens a long, a sell signal a short (with ``allow_short``); an
+    open position exits on its stop, its target or an opposite signal, at the
+    bar's close less slippage.
+    """
+
+    DAY = 86400
+
+    def __init__(self, service: StrategyService, strategy_name: str, symbols: List[str],
+                 interval: str = "5m", initial_capital: float = 100000.0,
+                 limits: Optional["PortfolioLimits"] = None, commission: float = 0.0005,
+                 slippage: float = 0.0005, allow_short: bool = True, square_off: Optional[str] = None,
+                 chunk_bars: int = 2048):
+        spec = get_strategy(strategy_name)
+        if spec is None:
+            raise ValueError(f"Unknown strategy: {strategy_name}")
+        width = interval_seconds(interval)
+        if not width or width >= self.DAY:
+            raise ValueError(f"Not an intraday interval: {interval}")
+        settings = service.settings
+        self.service = service
+        self.spec = spec
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.width = width
+        self.initial_capital = initial_capital
+        self.limits = limits or PortfolioLimits.from_settings(settings)
+        self.commission = commission
+        self.slippage = slippage
+        self.allow_short = allow_short
+        self.chunk_bars = max(1, chunk_bars)
+        self.market_open = _clock_seconds(getattr(settings, "market_open_time", None), "09:15")
+        self.market_close = _clock_seconds(getattr(settings, "market_close_time", None), "15:30")
+        self.square_off = _clock_seconds(square_off or os.getenv("INTRADAY_SQUARE_OFF_TIME"), "15:15")
+
+        n = len(self.symbols)
+        # Position slot per symbol: +1 long, -1 short, 0 flat
+        self.side = np.zeros(n, dtype=np.int8)
+        self.shares = np.zeros(n, dtype=np.int64)
+        self.entry_price = np.zeros(n)
+        self.stop = np.zeros(n)
+        self.target = np.zeros(n)
+        self.entry_commission = np.zeros(n)
+        self.last_close = np.zeros(n)
+        self.last_ts = np.zeros(n, dtype=np.int64)
+        self.states = [IndicatorState(symbol, interval) for symbol in self.symbols]
+        # (bar count, Bar) last shown to the strategy per symbol; it is the next view's previous bar
+        self._last_bar: List[Optional[Tuple[int, Any]]] = [None] * n
+
+        self.cash = float(initial_capital)
+        self.open_positions = 0
+        self.trades: List[Dict[str, Any]] = []
+        self.skipped = {"max_positions": 0, "daily_loss": 0, "cash": 0}
+        self.squared_off = 0
+        self.bars_replayed = 0
+
+    def _stream(self, row: int, cols: Dict[str, np.ndarray], lo: int, hi: int):
+        """(ts, row, open, high, low, close, volume) of bars ``lo:hi``, read a chunk at a time"""
+        ts = cols["ts"]
+        for begin in range(lo, hi, self.chunk_bars):
+            end = min(hi, begin + self.chunk_bars)
+            fields = [np.asarray(cols[name][begin:end], dtype=np.float64).tolist() for name in OHLCV_FIELDS]
+            yield from zip(np.asarray(ts[begin:end]).tolist(), [row] * (end - begin), *fields)
+
+    def _view(self, row: int, state: "IndicatorState") -> "LatestBars":
+        """The strategy's view of a symbol's latest two rows, building only the new bar"""
+        current = Bar(state.recent[-1])
+        cached = self._last_bar[row]
+        if cached is not None and cached[0] == state.bars - 1:
+            previous = cached[1]
+        else:
+            previous = Bar(state.recent[-2]) if len(state.recent) >= 2 else None
+        self._last_bar[row] = (state.bars, current)
+        return LatestBars(current, previous, state.bars, BAR_FIELDS)
+
+    def equity(self) -> float:
+        """Cash plus open positions marked at their last close"""
+        marks = self.entry_price + self.side * (self.last_close - self.entry_price)
+        return self.cash + float(self.shares @ marks)
+
+    def _open(self, row: int, ts: int, side: int, signal) -> bool:
+        entry = float(signal.entry_price)
+        stop = float(signal.stop_loss)
+        if not abs(entry - stop) > 0:
+            return False
+        entry_price_slippage = entry * (1 + side * self.slippage)
+        position_size = risk_position_size(self.cash, entry, stop, self.limits.risk_per_trade)
+        position_size = scale_to_margin(position_size, position_size * entry_price_slippage, self.cash)
+        position_size = min(position_size, int(self.limits.max_position_value // entry_price_slippage))
+        trade_value = position_size * entry_price_slippage
+        trade_commission = trade_value * self.commission
+        if not (position_size > 0 and (trade_value + trade_commission) <= self.cash):
+            self.skipped["cash"] += 1
+            return False
+
+        # The order value is held as margin for longs and shorts alike
+        self.cash -= trade_value + trade_commission
+        self.side[row] = side
+        self.shares[row] = position_size
+        self.entry_price[row] = entry_price_slippage
+        self.stop[row] = stop
+        self.target[row] = float(signal.target_price)
+        self.entry_commission[row] = trade_commission
+        self.open_positions += 1
+        self.trades.append({
+            "symbol": self.symbols[row],
+            "type": "BUY" if side > 0 else "SELL",
+            "position": "long" if side > 0 else "short",
+            "date": _ts_isoformat(ts),
+            "price": entry_price_slippage,
+            "quantity": position_size,
+            "value": trade_value,
+            "commission": trade_commission,
+        })
+        return True
+
+    def _close(self, row: int, ts: int, price: float, reason: str) -> None:
+        side = int(self.side[row])
+        quantity = int(self.shares[row])
+        exit_price_slippage = price * (1 - side * self.slippage)
+        exit_value = quantity * exit_price_slippage
+        exit_commission = exit_value * self.commission
+        pnl_before_costs = side * (exit_price_slippage - self.entry_price[row]) * quantity
+        self.cash += quantity * self.entry_price[row] + pnl_before_costs - exit_commission
+        self.trades.append({
+            "symbol": self.symbols[row],
+            "type": "SELL" if side > 0 else "BUY",
+            "position": "long" if side > 0 else "short",
+            "date": _ts_isoformat(ts),
+            "price": exit_price_slippage,
+            "quantity": quantity,
+            "value": exit_value,
+            "pnl": pnl_before_costs - (self.entry_commission[row] + exit_commission),
+            "reason": reason,
+            "commission": exit_commission,
+        })
+        self.side[row] = 0
+        self.shares[row] = 0
+        self.open_positions -= 1
+
+    def _square_off_all(self, reason: str = "Square Off") -> None:
+        for row in np.flatnonzero(self.side):
+            self._close(int(row), int(self.last_ts[row]), float(self.last_close[row]), reason)
+            self.squared_off += reason == "Square Off"
+
+    def run(self, series: Dict[str, Dict[str, np.ndarray]], start_ts: int, end_ts: int,
+            warmup_bars: int = 150) -> Dict[str, Any]:
+        """Replay bars from ``start_ts`` up to (not including) ``end_ts``
+
+        Up to ``warmup_bars`` earlier bars per symbol only feed the indicators.
+        """
+        streams = []
+        for row, symbol in enumerate(self.symbols):
+            cols = series.get(symbol)
+            if cols is None or len(cols["ts"]) == 0:
+                continue
+            ts = np.asarray(cols["ts"])
+            lo = int(np.searchsorted(ts, start_ts, side="left"))
+            hi = int(np.searchsorted(ts, end_ts, side="left"))
+            streams.append(self._stream(row, cols, max(0, lo - warmup_bars), hi))
+
+        spec, service = self.spec, self.service
+        limits = self.limits
+        equity_ts: List[int] = []
+        equity_values: List[float] = []
+        day = current_ts = None
+        day_start_equity = self.cash
+        halted = False
+
+        for ts, row, open_, high, low, close, volume in heapq.merge(*streams):
+            clock = ts % self.DAY
+            if clock < self.market_open or clock >= self.market_close:
+                continue
+            state = self.states[row]
+            state.update(open_, high, low, close, volume, ts=ts)
+            if ts < start_ts:
+                continue
+
+            if ts != current_ts:
+                if current_ts is not None:
+                    equity_ts.append(current_ts)
+                    equity_values.append(self.equity())
+                current_ts = ts
+                if ts // self.DAY != day:
+                    # Positions left from a session that ended without a square-off bar
+                    self._square_off_all()
+                    day = ts // self.DAY
+                    day_start_equity = self.equity()
+                    halted = False
+            self.bars_replayed += 1
+            self.last_close[row] = close
+            self.last_ts[row] = ts
+            closing = clock + self.width >= self.square_off
+            side = int(self.side[row])
+            if closing and not side:
+                continue
+
+            signal = None
+            if state.bars >= spec.lookback:
+                signal = spec.func(service, self._view(row, state), self.symbols[row])
+            signal_side = 0
+            if signal is not None:
+                signal_side = 1 if signal.signal_type == SignalType.BUY else -1 if signal.signal_type == SignalType.SELL else 0
+
+            if side:
+                if side > 0:
+                    stopped, took_profit = low <= self.stop[row], high >= self.target[row]
+                else:
+                    stopped, took_profit = high >= self.stop[row], low <= self.target[row]
+                if stopped:
+                    self._close(row, ts, close, "Stop Loss")
+                elif took_profit:
+                    self._close(row, ts, close, "Take Profit")
+                elif signal_side == -side:
+                    self._close(row, ts, close, "Strategy Exit")
+                elif closing:
+                    self._close(row, ts, close, "Square Off")
+                    self.squared_off += 1
+                # An exit bar does not also open a position
+                continue
+
+            if signal_side == 0 or (signal_side < 0 and not self.allow_short):
+                continue
+            if not halted and limits.max_daily_loss > 0:
+                halted = self.equity() <= day_start_equity * (1 - limits.max_daily_loss)
+            if halted:
+                self.skipped["daily_loss"] += 1
+            elif self.open_positions >= limits.max_positions:
+                self.skipped["max_positions"] += 1
+            else:
+                self._open(row, ts, signal_side, signal)
+
+        if current_ts is not None:
+            equity_ts.append(current_ts)
+            equity_values.append(self.equity())
+        self._square_off_all("End of Period")
+
+        equity = np.asarray(equity_values, dtype=float)
+        metrics = equity_metrics(self.trades, np.concatenate(([self.initial_capital], equity)),
+                                 self.cash, self.initial_capital)
+        metrics.update({
+            "skipped_signals": dict(self.skipped),
+            "squared_off": self.squared_off,
+            "bars_replayed": self.bars_replayed,
+        })
+        return {
+            "cash": self.cash,
+            "position": 0,
+            "equity": self.cash,
+            "trades": self.trades,
+            "equity_curve": [
+                {"date": _ts_isoformat(ts), "equity": value} for ts, value in zip(equity_ts, equity.tolist())
+            ],
+            "metrics": metrics,
+        }
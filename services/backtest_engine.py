@@ -0,0 +1,367 @@
+"""
+Array core of the single-symbol backtest.
+
+A backtest runs in two passes over plain NumPy columns (OHLCV plus the
+precomputed indicators), never slicing or indexing a DataFrame per bar:
+
+1. Signals: ``SignalArrays`` holds the side (+1 buy, -1 sell, 0 none), entry,
+   stop and target of every bar. ``signals_from_strategy`` calls a strategy
+   on a ``LatestBars`` view per bar; strategies with registered signal masks
+   (``strategy_registry.register_signal_masks``) build the same arrays for the
+   whole series in one vectorized pass.
+2. Simulation: ``simulate`` moves from trade to trade rather than bar to bar.
+   A position opens on a buy bar while flat and closes on the first later bar
+   whose low reaches the stop, whose high reaches the target, or which has a
+   sell signal (checked in that order). That bar is found with a vectorized
+   search over growing windows, so the work per trade is proportional to its
+   holding period. Cash and position are filled in per segment, and the
+   equity curve is computed from them at the end.
+
+Fills match the bar-by-bar loop this replaced: entries at the signal price
+plus slippage, exits at the bar's close minus slippage, position size from
+``risk_per_trade`` of cash over the stop distance, and an open position closed
+at the last close.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.signals import SignalType
+
+from .bar_view import LatestBars
+
+BUY = 1
+SELL = -1
+
+# First window of the exit search; doubled until an exit is found
+_EXIT_WINDOW = 16
+
+
+@dataclass
+class SignalArrays:
+    """Per-bar signal side and levels (levels are NaN where there is no signal)."""
+
+    side: np.ndarray
+    entry: np.ndarray
+    stop: np.ndarray
+    target: np.ndarray
+
+    @classmethod
+    def empty(cls, n: int) -> "SignalArrays":
+        return cls(np.zeros(n, dtype=np.int8), np.full(n, np.nan), np.full(n, np.nan), np.full(n, np.nan))
+
+    @classmethod
+    def from_masks(
+        cls,
+        buy: np.ndarray,
+        sell: np.ndarray,
+        entry: np.ndarray,
+        buy_levels: Tuple[np.ndarray, np.ndarray],
+        sell_levels: Tuple[np.ndarray, np.ndarray],
+        first: int = 0,
+    ) -> "SignalArrays":
+        """From boolean masks; a bar flagged for both sides is a buy.
+
+        ``*_levels`` are (stop, target) arrays; bars before ``first`` never signal.
+        """
+        buy = np.array(buy, dtype=bool)
+        sell = np.array(sell, dtype=bool) & ~buy
+        buy[:first] = sell[:first] = False
+        side = np.where(buy, BUY, np.where(sell, SELL, 0)).astype(np.int8)
+        signalled = side != 0
+        return cls(
+            side,
+            np.where(signalled, entry, np.nan),
+            np.where(buy, buy_levels[0], np.where(sell, sell_levels[0], np.nan)),
+            np.where(buy, buy_levels[1], np.where(sell, sell_levels[1], np.nan)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.side)
+
+
+def previous(values: np.ndarray) -> np.ndarray:
+    """``values`` shifted one bar later (NaN at the first bar)."""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.empty_like(values)
+    out[:1] = np.nan
+    out[1:] = values[:-1]
+    return out
+
+
+def float_columns(columns: Mapping[str, np.ndarray], names: Sequence[str]) -> Optional[List[np.ndarray]]:
+    """``names`` as float arrays, or None when any is missing (the strategy would not signal)."""
+    if not all(name in columns for name in names):
+        return None
+    return [np.asarray(columns[name], dtype=np.float64) for name in names]
+
+
+def signals_from_strategy(
+    strategy_func: Callable[[Any, str], Any],
+    columns: Mapping[str, np.ndarray],
+    symbol: str,
+    start: int,
+) -> SignalArrays:
+    """Signals of a bar-local strategy, called once per bar from ``start`` on."""
+    n = len(columns["close"])
+    signals = SignalArrays.empty(n)
+    for i in range(start, n):
+        signal = strategy_func(LatestBars.from_columns(columns, i + 1, end=i + 1), symbol)
+        if not signal:
+            continue
+        if signal.signal_type == SignalType.BUY:
+            signals.side[i] = BUY
+        elif signal.signal_type == SignalType.SELL:
+            signals.side[i] = SELL
+        else:
+            continue
+        signals.entry[i] = signal.entry_price
+        signals.stop[i] = signal.stop_loss
+        signals.target[i] = signal.target_price
+    return signals
+
+
+def _isoformat(index: Sequence[Any], lo: int, hi: int) -> List[str]:
+    """ISO timestamps of ``index[lo:hi]``, formatted in one call for naive whole-second datetimes."""
+    values = getattr(index, "values", None)
+    if getattr(index, "tz", True) is None and isinstance(values, np.ndarray) and values.dtype.kind == "M":
+        seconds = values[lo:hi].astype("datetime64[s]")
+        if np.array_equal(seconds, values[lo:hi]):
+            return np.datetime_as_string(seconds, unit="s").tolist()
+    return [ts.isoformat() for ts in index[lo:hi]]
+
+
+def _first_exit(
+    low: np.ndarray, high: np.ndarray, sells: np.ndarray, begin: int, stop: float, target: float
+) -> Tuple[Optional[int], str]:
+    """First bar from ``begin`` that closes a long position, with its exit reason."""
+    n = len(low)
+    window = _EXIT_WINDOW
+    while begin < n:
+        end = min(n, begin + window)
+        hit = (low[begin:end] <= stop) | (high[begin:end] >= target) | sells[begin:end]
+        if hit.any():
+            x = begin + int(hit.argmax())
+            if low[x] <= stop:
+                return x, "Stop Loss"
+            if high[x] >= target:
+                return x, "Take Profit"
+            return x, "Strategy Exit"
+        begin, window = end, window * 2
+    return None, ""
+
+
+@dataclass
+class Simulation:
+    trades: List[Dict[str, Any]]
+    # Equity at the start of each bar from ``start`` on, valued at the previous close
+    equity: np.ndarray
+    start: int
+    final_equity: float
+
+
+def run_simulation(
+    columns: Mapping[str, np.ndarray],
+    signals: SignalArrays,
+    start: int,
+    initial_capital: float,
+    risk_per_trade: float,
+    commission: float,
+    slippage: float,
+    index: Optional[Sequence[Any]] = None,
+    end: Optional[int] = None,
+) -> Simulation:
+    """Long-only simulation of ``signals`` over bars ``start:end``.
+
+    Trade dates are ISO timestamps from ``index``, or bar positions without one.
+    """
+    n = len(columns["close"]) if end is None else end
+    close = np.asarray(columns["close"][:n], dtype=np.float64)
+    high = np.asarray(columns["high"][:n], dtype=np.float64)
+    low = np.asarray(columns["low"][:n], dtype=np.float64)
+    side = signals.side[:n]
+    start = max(1, start)
+    sells = side == SELL
+
+    def stamp(i: int) -> Any:
+        return index[i].isoformat() if index is not None else int(i)
+
+    trades: List[Dict[str, Any]] = []
+    # Cash and shares held at the start of each bar
+    cash_at = np.empty(n)
+    position_at = np.zeros(n)
+    cash = initial_capital
+    position = 0
+    entry_price = 0.0
+    trade_commission = 0.0
+    filled = start  # bars before this have their start-of-bar state set
+    resume = start  # first bar that can open a position
+
+    for e in np.flatnonzero(side[start:] == BUY) + start:
+        if e < resume:
+            continue
+        risk_per_share = abs(signals.entry[e] - signals.stop[e])
+        if risk_per_share <= 0:
+            continue
+        position_size = int(cash * risk_per_trade / risk_per_share)
+        entry_price_slippage = float(signals.entry[e]) * (1 + slippage)
+        trade_value = position_size * entry_price_slippage
+        trade_commission = trade_value * commission
+        if not (position_size > 0 and (trade_value + trade_commission) <= cash):
+            continue
+
+        cash_at[filled:e + 1] = cash
+        cash -= (trade_value + trade_commission)
+        position = position_size
+        entry_price = entry_price_slippage
+        trades.append({
+            "type": "BUY",
+            "date": stamp(e),
+            "price": entry_price,
+            "quantity": position_size,
+            "value": trade_value,
+            "commission": trade_commission,
+        })
+
+        x, exit_reason = _first_exit(low, high, sells, e + 1, float(signals.stop[e]), float(signals.target[e]))
+        exit_end = n if x is None else x + 1
+        cash_at[e + 1:exit_end] = cash
+        position_at[e + 1:exit_end] = position
+        filled = resume = exit_end
+        if x is None:
+            break
+
+        exit_price_slippage = float(close[x]) * (1 - slippage)
+        exit_value = position * exit_price_slippage
+        exit_commission = exit_value * commission
+        cash += (exit_value - exit_commission)
+        trades.append({
+            "type": "SELL",
+            "date": stamp(x),
+            "price": exit_price_slippage,
+            "quantity": position,
+            "value": exit_value,
+            "pnl": (exit_price_slippage - entry_price) * position - (trade_commission + exit_commission),
+            "reason": exit_reason,
+            "commission": exit_commission,
+        })
+        position = 0
+    cash_at[filled:] = cash
+
+    # Equity at each bar's start is valued at the previous close
+    equity = cash_at[start:] + position_at[start:] * close[start - 1:n - 1]
+
+    # Close any remaining position at the end
+    if position:
+        exit_price_slippage = float(close[-1]) * (1 - slippage)
+        exit_value = position * exit_price_slippage
+        exit_commission = exit_value * commission
+        cash += (exit_value - exit_commission)
+        trades.append({
+            "type": "SELL",
+            "date": stamp(n - 1),
+            "price": exit_price_slippage,
+            "quantity": position,
+            "value": exit_value,
+            "pnl": (exit_price_slippage - entry_price) * position - exit_commission,
+            "reason": "End of Period",
+            "commission": exit_commission,
+        })
+
+    return Simulation(trades, equity, start, cash)
+
+
+def simulate(
+    columns: Mapping[str, np.ndarray],
+    index: Sequence[Any],
+    signals: SignalArrays,
+    start: int,
+    initial_capital: float,
+    risk_per_trade: float,
+    commission: float,
+    slippage: float,
+) -> Dict[str, Any]:
+    """``run_simulation`` as the backtest portfolio dict (trades and dated equity curve)."""
+    sim = run_simulation(columns, signals, start, initial_capital, risk_per_trade, commission, slippage, index)
+    n = len(columns["close"])
+    equity_curve = [
+        {"date": date, "equity": value}
+        for date, value in zip(_isoformat(index, sim.start - 1, n - 1), sim.equity.tolist())
+    ]
+    return {
+        "cash": sim.final_equity,
+        "position": 0,
+        "equity": sim.final_equity,
+        "trades": sim.trades,
+        "equity_curve": equity_curve,
+    }
+
+
+def max_drawdown(equity: np.ndarray) -> float:
+    """Largest peak-to-trough fall of ``equity`` as a fraction of the peak."""
+    if len(equity) == 0:
+        return 0
+    peak = np.maximum.accumulate(equity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(peak > 0, (peak - equity) / peak, 0.0)
+    return max(0.0, float(drawdown.max()))
+
+
+def equity_metrics(
+    trades: Sequence[Mapping[str, Any]], equity: np.ndarray, final_equity: float, initial_capital: float
+) -> Dict[str, Any]:
+    """Performance metrics of a simulation (``BacktestService._calculate_metrics``)."""
+    # Basic metrics
+    total_return = (final_equity - initial_capital) / initial_capital if initial_capital > 0 else 0
+    # Closing trades are the ones with a pnl (a short is closed by a BUY)
+    exits = [t for t in trades if "pnl" in t]
+    total_trades = len(exits)
+
+    if total_trades == 0:
+        return {
+            "total_return": total_return,
+            "total_trades": 0,
+            "win_rate": 0,
+            "sharpe_ratio": 0,
+            "max_drawdown": 0,
+            "profit_factor": 0
+        }
+
+    # Trade analysis
+    winning_trades = [t for t in exits if t.get("pnl", 0) > 0]
+    losing_trades = [t for t in exits if t.get("pnl", 0) <= 0]
+
+    win_rate = len(winning_trades) / total_trades
+
+    gross_profit = sum([t["pnl"] for t in winning_trades])
+    gross_loss = abs(sum([t["pnl"] for t in losing_trades]))
+
+    profit_factor = gross_profit / gross_loss if gross_loss > 0 else float('inf')
+
+    drawdown = max_drawdown(equity)
+
+    # Sharpe ratio (simplified, risk-free rate = 0)
+    returns = np.diff(equity) / equity[:-1] if len(equity) > 1 else np.empty(0)
+    if len(returns) and np.std(returns) > 0:
+        sharpe_ratio = np.mean(returns) / np.std(returns) * np.sqrt(252)
+    else:
+        sharpe_ratio = 0
+
+    return {
+        "total_return": total_return,
+        "total_return_percent": total_return * 100,
+        "final_equity": final_equity,
+        "total_trades": total_trades,
+        "winning_trades": len(winning_trades),
+        "losing_trades": len(losing_trades),
+        "win_rate": win_rate,
+        "gross_profit": gross_profit,
+        "gross_loss": gross_loss,
+        "profit_factor": profit_factor,
+        "max_drawdown": drawdown,
+        "max_drawdown_percent": drawdown * 100,
+        "sharpe_ratio": sharpe_ratio
+    }
@@ -0,0 +1,572 @@
+"""
+Persistent store for backtest results.
+
+Run metadata and headline metrics go to the ``backtest_runs`` table
+(``models.backtest_runs.BacktestRun``); the bulky parts of a result go to
+columnar files in a directory named after the run id, in the ``candle_store``
+layout of one raw little-endian file per column plus an ``index.json``:
+
+    data/backtest_runs/42/trades/ts.bin, symbol.bin, side.bin, price.bin, ...
+    data/backtest_runs/42/equity/ts.bin, equity.bin
+    data/backtest_runs/42/sweep/param_id.bin, sharpe_ratio.bin, ...
+    data/backtest_runs/42/index.json
+
+Text fields (symbols, exit reasons, sweep phases and window dates) are stored
+as integer codes into label lists kept in the index, timestamps as naive
+wall-clock epoch seconds. Reads are memory maps, so a page of trades, an LTTB
+downsampled equity curve (``lttb_indices``) or the best sweep rows by a metric
+only materialize the rows they return; the API never ships a whole result.
+
+Parameter sweeps stream into a ``SweepRecorder`` (a ``ParameterSweep`` store)
+that keeps rows as typed arrays instead of dicts until they are saved.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import os
+import shutil
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .candle_store import _coerce_timestamps
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+STORE_VERSION = 1
+NO_TS = np.iinfo(np.int64).min
+# Largest page of trades or sweep rows returned by one query
+MAX_PAGE = 1000
+
+TRADE_COLUMNS: Dict[str, str] = {
+    "ts": "<i8",
+    "symbol": "<i4",
+    "side": "i1",
+    "position": "i1",
+    "price": "<f8",
+    "quantity": "<i8",
+    "value": "<f8",
+    "commission": "<f8",
+    "pnl": "<f8",
+    "reason": "<i2",
+}
+EQUITY_COLUMNS: Dict[str, str] = {"ts": "<i8", "equity": "<f8"}
+# Sweep row keys; every numeric metric becomes a further <f8 column
+SWEEP_COLUMNS: Dict[str, str] = {
+    "symbol": "<i4",
+    "phase": "i1",
+    "param_id": "<i4",
+    "segment": "<i4",
+    "start": "<i4",
+    "end": "<i4",
+}
+SIDES = {"BUY": 1, "SELL": -1}
+POSITIONS = {"long": 1, "short": -1}
+
+# Metrics promoted to BacktestRun columns, and the default set compared across runs
+HEADLINE_METRICS = ("total_return", "sharpe_ratio", "max_drawdown", "win_rate", "total_trades")
+COMPARE_METRICS = HEADLINE_METRICS + ("profit_factor", "final_equity")
+LOWER_IS_BETTER = {"max_drawdown"}
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept. The others are split into
+    ``threshold - 2`` buckets and each bucket keeps the point forming the
+    largest triangle with the point kept before it and the mean of the next
+    bucket, so peaks and drawdowns survive where striding would skip them.
+    """
+    n = len(y)
+    if threshold >= n:
+        return np.arange(n)
+    threshold = max(int(threshold), 3)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Bucket b covers [edges[b], edges[b + 1]); the last point is its own bucket
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    out = np.empty(threshold, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for b in range(threshold - 2):
+        lo, hi = edges[b], edges[b + 1]
+        next_lo, next_hi = (edges[b + 1], edges[b + 2]) if b + 2 < len(edges) else (n - 1, n)
+        cx, cy = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[b + 1] = a
+    return out
+
+
+def _codes(values: Sequence[Any], labels: List[Any]) -> np.ndarray:
+    """Positions of ``values`` in ``labels`` (extended with unseen values); -1 for None."""
+    lookup = {label: i for i, label in enumerate(labels)}
+    out = np.empty(len(values), dtype=np.int64)
+    for i, value in enumerate(values):
+        if value is None:
+            out[i] = -1
+            continue
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(labels)
+            labels.append(value)
+        out[i] = code
+    return out
+
+
+def _floats(rows: Sequence[Mapping[str, Any]], key: str) -> np.ndarray:
+    return np.array([np.nan if row.get(key) is None else row[key] for row in rows], dtype=np.float64)
+
+
+def _dates(ts: np.ndarray) -> List[Optional[str]]:
+    """ISO text of epoch seconds; None where no timestamp was stored."""
+    text = np.datetime_as_string(np.asarray(ts, dtype=np.int64).view("datetime64[s]"), unit="s").tolist()
+    return [None if t == NO_TS else d for t, d in zip(np.asarray(ts).tolist(), text)]
+
+
+def _label(labels: List[Any], code: int) -> Any:
+    return labels[code] if code >= 0 else None
+
+
+def _jsonable(value: Any) -> Any:
+    """``value`` with NumPy scalars unwrapped and non-finite floats as None."""
+    if isinstance(value, Mapping):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def trades_to_columns(trades: Sequence[Mapping[str, Any]], symbol: Optional[str] = None
+                      ) -> Tuple[Dict[str, np.ndarray], Dict[str, List[Any]]]:
+    """Trade dicts of a backtest result as columns plus their label lists.
+
+    ``symbol`` fills in trades of a single-symbol backtest, which carry none.
+    """
+    labels: Dict[str, List[Any]] = {"symbol": [], "reason": []}
+    columns = {
+        "ts": _coerce_timestamps(t.get("date") for t in trades),
+        "symbol": _codes([t.get("symbol", symbol) for t in trades], labels["symbol"]),
+        "side": np.array([SIDES.get(str(t.get("type", "")).upper(), 0) for t in trades], dtype=np.int8),
+        "position": np.array([POSITIONS.get(t.get("position"), 0) for t in trades], dtype=np.int8),
+        "price": _floats(trades, "price"),
+        "quantity": np.array([int(t.get("quantity") or 0) for t in trades], dtype=np.int64),
+        "value": _floats(trades, "value"),
+        "commission": _floats(trades, "commission"),
+        "pnl": _floats(trades, "pnl"),
+        "reason": _codes([t.get("reason") for t in trades], labels["reason"]),
+    }
+    return columns, labels
+
+
+def equity_to_columns(equity_curve: Sequence[Any]) -> Dict[str, np.ndarray]:
+    """``{"date", "equity"}`` points (or bare values) as ``ts``/``equity`` columns."""
+    points = [p if isinstance(p, Mapping) else {"date": None, "equity": p} for p in equity_curve]
+    return {
+        "ts": _coerce_timestamps(p.get("date") for p in points),
+        "equity": _floats(points, "equity"),
+    }
+
+
+class SweepRecorder:
+    """``ParameterSweep`` store that keeps result rows as typed arrays.
+
+    Each row becomes a few integers (label codes for symbol, phase and window
+    dates) and one float per numeric metric, instead of a dict of dicts;
+    ``BacktestResultStore.save_sweep`` writes the columns out.
+    """
+
+    def __init__(self):
+        self.labels: Dict[str, List[Any]] = {"symbol": [], "phase": [], "date": []}
+        self.params: Dict[int, Dict[str, Any]] = {}
+        self._lookup: Dict[str, Dict[Any, int]] = {name: {} for name in self.labels}
+        self._keys = {name: array("q") for name in SWEEP_COLUMNS}
+        self._metrics: Dict[str, array] = {}
+        self.rows = 0
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _code(self, kind: str, value: Any) -> int:
+        if value is None:
+            return -1
+        lookup = self._lookup[kind]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self.labels[kind])
+            self.labels[kind].append(value)
+        return code
+
+    def add(self, row: Mapping[str, Any]) -> None:
+        param_id = int(row["param_id"])
+        if param_id not in self.params:
+            self.params[param_id] = dict(row.get("params") or {})
+        self._keys["symbol"].append(self._code("symbol", row["symbol"]))
+        self._keys["phase"].append(self._code("phase", row["phase"]))
+        self._keys["param_id"].append(param_id)
+        self._keys["segment"].append(int(row.get("segment") or 0))
+        self._keys["start"].append(self._code("date", row.get("start")))
+        self._keys["end"].append(self._code("date", row.get("end")))
+        for name, value in (row.get("metrics") or {}).items():
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            column = self._metrics.get(name)
+            if column is None:
+                column = self._metrics[name] = array("d", [math.nan]) * self.rows
+            column.append(float(value))
+        self.rows += 1
+        # Metrics this row did not report
+        for column in self._metrics.values():
+            if len(column) < self.rows:
+                column.append(math.nan)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        out = {name: np.frombuffer(values, dtype=np.int64) for name, values in self._keys.items()}
+        out.update({name: np.frombuffer(values, dtype=np.float64) for name, values in self._metrics.items()})
+        return out
+
+
+class BacktestResultStore:
+    """Backtest runs: metadata in the database, trades, equity and sweep rows in column files."""
+
+    def __init__(self, root: Optional[str] = None, session_factory: Any = None):
+        self.root = Path(root or os.getenv("BACKTEST_RESULTS_DIR", "data/backtest_runs"))
+        self._session_factory = session_factory
+
+    @property
+    def session_factory(self) -> Any:
+        if self._session_factory is None:
+            from models.database import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory
+
+    # --- files ---
+    def _run_dir(self, run_id: int) -> Path:
+        return self.root / str(int(run_id))
+
+    def write_files(self, run_id: int, results: Optional[Mapping[str, Any]] = None,
+                    sweep: Optional[SweepRecorder] = None, symbol: Optional[str] = None) -> Dict[str, int]:
+        """Write a result's trades and equity curve (and sweep rows) for ``run_id``; returns rows per table."""
+        run_dir = self._run_dir(run_id)
+        # Ids can be reused once the newest run is deleted
+        shutil.rmtree(run_dir, ignore_errors=True)
+        index: Dict[str, Any] = {"version": STORE_VERSION, "tables": {}, "labels": {}}
+        tables: List[Tuple[str, Dict[str, np.ndarray], Dict[str, str]]] = []
+        results = results or {}
+        if results.get("trades"):
+            columns, labels = trades_to_columns(results["trades"], symbol)
+            tables.append(("trades", columns, TRADE_COLUMNS))
+            index["labels"].update(labels)
+        if results.get("equity_curve"):
+            tables.append(("equity", equity_to_columns(results["equity_curve"]), EQUITY_COLUMNS))
+        if sweep is not None and len(sweep):
+            columns = sweep.columns()
+            dtypes = {name: SWEEP_COLUMNS.get(name, "<f8") for name in columns}
+            tables.append(("sweep", columns, dtypes))
+            index["labels"].update({f"sweep_{kind}": values for kind, values in sweep.labels.items()})
+            index["params"] = {str(k): v for k, v in sweep.params.items()}
+
+        for name, columns, dtypes in tables:
+            table_dir = run_dir / name
+            table_dir.mkdir(parents=True, exist_ok=True)
+            for column, values in columns.items():
+                tmp = table_dir / f"{column}.bin.tmp"
+                np.asarray(values).astype(dtypes[column], copy=False).tofile(tmp)
+                os.replace(tmp, table_dir / f"{column}.bin")
+            index["tables"][name] = {"rows": int(len(next(iter(columns.values())))), "columns": dtypes}
+
+        run_dir.mkdir(parents=True, exist_ok=True)
+        tmp = run_dir / f"{INDEX_FILE}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_jsonable(index), f)
+        os.replace(tmp, run_dir / INDEX_FILE)
+        return {name: meta["rows"] for name, meta in index["tables"].items()}
+
+    def delete_files(self, run_id: int) -> None:
+        shutil.rmtree(self._run_dir(run_id), ignore_errors=True)
+
+    def _read_index(self, run_id: int) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._run_dir(run_id) / INDEX_FILE, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read backtest run index {run_id}: {e}")
+            return None
+        return index if int(index.get("version", 0)) == STORE_VERSION else None
+
+    def _table(self, run_id: int, name: str) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        """Memory-mapped columns of one table (empty when the run has none) and the run index."""
+        index = self._read_index(run_id)
+        if index is None:
+            raise KeyError(f"Backtest run {run_id} not found")
+        meta = index["tables"].get(name)
+        if meta is None or meta["rows"] == 0:
+            return {}, index
+        table_dir = self._run_dir(run_id) / name
+        return {
+            column: np.memmap(table_dir / f"{column}.bin", dtype=np.dtype(dtype), mode="r", shape=(meta["rows"],))
+            for column, dtype in meta["columns"].items()
+        }, index
+
+    def trades(self, run_id: int, offset: int = 0, limit: int = 100, symbol: Optional[str] = None,
+               side: Optional[str] = None) -> Dict[str, Any]:
+        """One page of a run's trades, optionally of one symbol and/or side (BUY/SELL)."""
+        cols, index = self._table(run_id, "trades")
+        offset, limit = max(0, int(offset)), max(0, min(int(limit), MAX_PAGE))
+        if not cols:
+            return {"id": run_id, "total": 0, "offset": offset, "limit": limit, "trades": []}
+        symbols, reasons = index["labels"].get("symbol", []), index["labels"].get("reason", [])
+        n = len(cols["ts"])
+        mask = None
+        if symbol is not None:
+            code = symbols.index(symbol) if symbol in symbols else -2
+            mask = cols["symbol"] == code
+        if side is not None:
+            side_mask = cols["side"] == SIDES.get(side.upper(), 0)
+            mask = side_mask if mask is None else mask & side_mask
+        if mask is None:
+            total = n
+            rows = np.arange(min(offset, n), min(offset + limit, n))
+        else:
+            matching = np.flatnonzero(mask)
+            total = len(matching)
+            rows = matching[offset:offset + limit]
+
+        page = {name: values[rows].tolist() for name, values in cols.items() if name != "ts"}
+        dates = _dates(cols["ts"][rows])
+        trades = []
+        for i in range(len(rows)):
+            trade = {
+                "symbol": _label(symbols, page["symbol"][i]),
+                "type": "BUY" if page["side"][i] > 0 else "SELL",
+                "date": dates[i],
+                "price": page["price"][i],
+                "quantity": page["quantity"][i],
+                "value": page["value"][i],
+                "commission": page["commission"][i],
+            }
+            if page["position"][i]:
+                trade["position"] = "long" if page["position"][i] > 0 else "short"
+            if not math.isnan(page["pnl"][i]):
+                trade["pnl"] = page["pnl"][i]
+            if page["reason"][i] >= 0:
+                trade["reason"] = reasons[page["reason"][i]]
+            trades.append(trade)
+        return {"id": run_id, "total": total, "offset": offset, "limit": limit, "trades": trades}
+
+    def equity_curve(self, run_id: int, points: int = 500, start: Optional[str] = None,
+                     end: Optional[str] = None) -> Dict[str, Any]:
+        """A run's equity curve between ``start`` and ``end`` (dates), LTTB-downsampled to ``points``."""
+        cols, _ = self._table(run_id, "equity")
+        if not cols:
+            return {"id": run_id, "total": 0, "points": []}
+        ts, equity = cols["ts"], cols["equity"]
+        dated = len(ts) > 0 and bool((ts != NO_TS).all())
+        lo, hi = 0, len(ts)
+        if dated and start:
+            lo = int(np.searchsorted(ts, _coerce_timestamps([start])[0], side="left"))
+        if dated and end:
+            end_ts = int(_coerce_timestamps([end])[0])
+            if len(end) <= 10:
+                # A bare date includes its whole day
+                end_ts += 86400
+            hi = int(np.searchsorted(ts, end_ts, side="left"))
+        ts, equity = ts[lo:hi], equity[lo:hi]
+        keep = lttb_indices(ts if dated else np.arange(len(equity)), equity, points)
+        return {
+            "id": run_id,
+            "total": int(len(equity)),
+            "points": [
+                {"date": date, "equity": value}
+                for date, value in zip(_dates(ts[keep]), equity[keep].tolist())
+            ],
+        }
+
+    def sweep_rows(self, run_id: int, offset: int = 0, limit: int = 100, order_by: Optional[str] = None,
+                   phase: Optional[str] = None, symbol: Optional[str] = None) -> Dict[str, Any]:
+        """One page of a sweep's result rows, best ``order_by`` metric first."""
+        cols, index = self._table(run_id, "sweep")
+        offset, limit = max(0, int(offset)), max(0, min(int(limit), MAX_PAGE))
+        if not cols:
+            return {"id": run_id, "total": 0, "offset": offset, "limit": limit, "rows": []}
+        labels = index["labels"]
+        symbols, phases, dates = labels["sweep_symbol"], labels["sweep_phase"], labels["sweep_date"]
+        metric_names = [name for name in cols if name not in SWEEP_COLUMNS]
+        if order_by is not None and order_by not in metric_names:
+            raise ValueError(f"Unknown sweep metric: {order_by}")
+
+        mask = np.ones(len(cols["param_id"]), dtype=bool)
+        if phase is not None:
+            mask &= cols["phase"] == (phases.index(phase) if phase in phases else -2)
+        if symbol is not None:
+            mask &= cols["symbol"] == (symbols.index(symbol) if symbol in symbols else -2)
+        rows = np.flatnonzero(mask)
+        if order_by is not None:
+            values = np.asarray(cols[order_by][rows])
+            key = values if order_by in LOWER_IS_BETTER else -values
+            # NaN metrics sort last
+            rows = rows[np.argsort(np.where(np.isnan(key), np.inf, key), kind="stable")]
+        total = len(rows)
+        rows = rows[offset:offset + limit]
+
+        page = {name: values[rows].tolist() for name, values in cols.items()}
+        out = []
+        for i in range(len(rows)):
+            out.append({
+                "symbol": _label(symbols, page["symbol"][i]),
+                "phase": _label(phases, page["phase"][i]),
+                "param_id": page["param_id"][i],
+                "params": index.get("params", {}).get(str(page["param_id"][i]), {}),
+                "segment": page["segment"][i],
+                "start": _label(dates, page["start"][i]),
+                "end": _label(dates, page["end"][i]),
+                "metrics": {name: page[name][i] for name in metric_names if not math.isnan(page[name][i])},
+            })
+        return {"id": run_id, "total": total, "offset": offset, "limit": limit, "rows": out}
+
+    # --- database ---
+    async def save(self, result: Mapping[str, Any], kind: str = "backtest",
+                   sweep: Optional[SweepRecorder] = None) -> int:
+        """Store a ``BacktestService`` result (or sweep summary with its recorder); returns the run id."""
+        from models.backtest_runs import BacktestRun
+
+        metrics = _jsonable(dict(result.get("metrics") or {}))
+        parameters = dict(result.get("parameters") or {})
+        if kind == "sweep":
+            parameters.update({"objective": result.get("objective"), "runs": result.get("runs")})
+        symbols = list(result.get("symbols") or ([result["symbol"]] if result.get("symbol") else []))
+        run = BacktestRun(
+            kind=kind,
+            strategy=str(result.get("strategy") or "unknown"),
+            symbols=symbols,
+            interval=result.get("interval"),
+            start_date=result.get("start_date"),
+            end_date=result.get("end_date"),
+            initial_capital=result.get("initial_capital"),
+            parameters=_jsonable(parameters),
+            metrics=metrics,
+            **{name: metrics.get(name) for name in HEADLINE_METRICS},
+        )
+        async with self.session_factory() as session:
+            session.add(run)
+            await session.flush()
+            try:
+                rows = await asyncio.to_thread(
+                    self.write_files, run.id, result.get("results"), sweep, result.get("symbol")
+                )
+                run.trade_rows = rows.get("trades", 0)
+                run.equity_rows = rows.get("equity", 0)
+                run.sweep_rows = rows.get("sweep", 0)
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                self.delete_files(run.id)
+                raise
+            return run.id
+
+    async def save_sweep(self, summary: Mapping[str, Any], recorder: SweepRecorder) -> int:
+        """Store a ``run_parameter_sweep`` summary and the rows its ``recorder`` collected."""
+        return await self.save(summary, kind="sweep", sweep=recorder)
+
+    async def get_run(self, run_id: int) -> Optional[Dict[str, Any]]:
+        from models.backtest_runs import BacktestRun
+
+        async with self.session_factory() as session:
+            run = await session.get(BacktestRun, run_id)
+            return run.to_dict() if run is not None else None
+
+    async def list_runs(self, strategy: Optional[str] = None, kind: Optional[str] = None,
+                        order_by: str = "created_at", limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        """Run metadata, newest (or best ``order_by`` headline metric) first."""
+        from sqlalchemy import func, select
+        from models.backtest_runs import BacktestRun
+
+        if order_by not in ("created_at",) + HEADLINE_METRICS:
+            raise ValueError(f"Cannot order runs by {order_by}")
+        column = getattr(BacktestRun, order_by)
+        query = select(BacktestRun)
+        if strategy is not None:
+            query = query.where(BacktestRun.strategy == strategy)
+        if kind is not None:
+            query = query.where(BacktestRun.kind == kind)
+        ordering = column.asc() if order_by in LOWER_IS_BETTER else column.desc()
+        async with self.session_factory() as session:
+            total = await session.scalar(select(func.count()).select_from(query.subquery()))
+            runs = await session.scalars(
+                query.order_by(ordering.nulls_last(), BacktestRun.id.desc())
+                .offset(max(0, offset)).limit(max(0, min(limit, MAX_PAGE)))
+            )
+            return {"total": int(total or 0), "runs": [run.to_dict() for run in runs]}
+
+    async def compare(self, run_ids: Sequence[int], metrics: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Side-by-side ``metrics`` of several runs and the best run for each."""
+        from sqlalchemy import select
+        from models.backtest_runs import BacktestRun
+
+        names = list(metrics or COMPARE_METRICS)
+        async with self.session_factory() as session:
+            found = {run.id: run for run in await session.scalars(
+                select(BacktestRun).where(BacktestRun.id.in_(list(run_ids)))
+            )}
+        runs = []
+        for run_id in run_ids:
+            run = found.get(run_id)
+            if run is None:
+                continue
+            stored = run.metrics or {}
+            runs.append({
+                "id": run.id,
+                "kind": run.kind,
+                "strategy": run.strategy,
+                "symbols": run.symbols or [],
+                "start_date": run.start_date,
+                "end_date": run.end_date,
+                "metrics": {name: stored.get(name) for name in names},
+            })
+        best = {}
+        for name in names:
+            scored = [(r["metrics"][name], r["id"]) for r in runs if isinstance(r["metrics"][name], (int, float))]
+            if scored:
+                pick = min if name in LOWER_IS_BETTER else max
+                best[name] = pick(scored, key=lambda item: item[0])[1]
+        return {
+            "metrics": names,
+            "runs": runs,
+            "best": best,
+            "missing": [run_id for run_id in run_ids if run_id not in found],
+        }
+
+    async def delete(self, run_id: int) -> bool:
+        from models.backtest_runs import BacktestRun
+
+        async with self.session_factory() as session:
+            run = await session.get(BacktestRun, run_id)
+            if run is None:
+                return False
+            await session.delete(run)
+            await session.commit()
+        await asyncio.to_thread(self.delete_files, run_id)
+        return True
+
+
+_result_store: Optional[BacktestResultStore] = None
+
+
+def get_result_store() -> BacktestResultStore:
+    """Process-wide backtest result store."""
+    global _result_store
+    if _result_store is None:
+        _result_store = BacktestResultStore()
+    return _result_store
@@ -0,0 +1,475 @@
+"""
+Parallel parameter sweeps and walk-forward analysis of vectorized backtests.
+
+A sweep runs one strategy over many parameter sets and symbols. Each run is a
+signal-mask evaluation plus a trade-to-trade simulation (``backtest_engine``),
+so the work is CPU-bound and independent per (symbol, parameter set); it is
+spread over a spawned process pool the same way ``StrategyPool`` spreads a
+scan:
+
+- the symbols' OHLCV panel is written once into shared memory
+  (``strategy_pool.panel_to_shared_memory``); a job names a panel row, a
+  chunk of parameter sets and the bar segments to simulate
+- a worker copies its row out of the block once per sweep, computes the
+  strategy's indicators (and the period indicators the parameter sets need,
+  see ``SignalMaskSpec.columns``) and keeps them for later chunks of the same
+  symbol; only metric dicts travel back
+- results are streamed into a results store as jobs finish, and the sweep's
+  progress is reported through ``services.progress``
+
+Jobs outnumber workers a few times over so throughput grows with the number
+of cores. ``BACKTEST_SWEEP_WORKERS`` sets the pool size (``auto`` = cores - 1,
+``0`` runs the jobs one at a time in a thread of this process).
+
+``WalkForward`` splits each series into rolling (or anchored) train/test
+windows: every parameter set is run on the train windows, the best one by
+``objective`` is picked per window and then run on the following test window,
+out of sample.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import itertools
+import logging
+import math
+import multiprocessing
+import os
+import random
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import progress
+from .indicator_engine import OHLCV_FIELDS, OHLCVPanel
+from .strategy_pool import available_cores, panel_to_shared_memory
+from .strategy_registry import get_signal_masks, get_strategy
+
+logger = logging.getLogger(__name__)
+
+# (segment id, first bar, end bar) in a symbol's own bar positions
+Segment = Tuple[int, int, int]
+# (parameter set id, segment id, metrics)
+SweepRecord = Tuple[int, int, Dict[str, Any]]
+
+
+def parameter_grid(space: Mapping[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Every combination of the values in ``space``."""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_parameters(space: Mapping[str, Any], n: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """``n`` distinct random parameter sets (fewer when the space is smaller).
+
+    A list of values is sampled from; a ``(low, high)`` tuple is a range,
+    drawn as an integer when both bounds are integers.
+    """
+    rng = random.Random(seed)
+
+    def draw(values):
+        if isinstance(values, tuple) and len(values) == 2:
+            low, high = values
+            if isinstance(low, int) and isinstance(high, int):
+                return rng.randint(low, high)
+            return rng.uniform(low, high)
+        return rng.choice(list(values))
+
+    seen, out = set(), []
+    for _ in range(n * 20):
+        if len(out) >= n:
+            break
+        params = {name: draw(values) for name, values in space.items()}
+        key = tuple(sorted(params.items()))
+        if key not in seen:
+            seen.add(key)
+            out.append(params)
+    return out
+
+
+@dataclass(frozen=True)
+class WalkForward:
+    """Train/test windows in bars; ``step`` defaults to the test length."""
+
+    train: int
+    test: int
+    step: Optional[int] = None
+    # Grow the train window from the first bar instead of rolling it
+    anchored: bool = False
+
+    def windows(self, first: int, n: int) -> List[Tuple[int, int, int]]:
+        """(train start, test start, test end) for bars ``first:n``."""
+        if self.train < 1 or self.test < 1:
+            raise ValueError("Walk-forward train and test lengths must be positive")
+        step = self.step or self.test
+        out = []
+        lo = first
+        while lo + self.train + self.test <= n:
+            mid = lo + self.train
+            out.append((first if self.anchored else lo, mid, mid + self.test))
+            lo += step
+        return out
+
+
+class SweepResults:
+    """In-memory results store; anything with ``add(row)`` can take its place."""
+
+    def __init__(self):
+        self.rows: List[Dict[str, Any]] = []
+
+    def add(self, row: Dict[str, Any]) -> None:
+        self.rows.append(row)
+
+    def best(self, objective: str = "sharpe_ratio", phase: str = "full",
+             symbol: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        rows = [r for r in self.rows if r["phase"] == phase and (symbol is None or r["symbol"] == symbol)]
+        return max(rows, key=lambda r: _score(r["metrics"], objective), default=None)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+def _score(metrics: Mapping[str, Any], objective: str) -> float:
+    value = metrics.get(objective)
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return -math.inf
+    return -math.inf if math.isnan(value) else value
+
+
+def _env_workers() -> Optional[int]:
+    raw = os.getenv("BACKTEST_SWEEP_WORKERS", "auto").strip().lower()
+    if raw in ("", "auto"):
+        return None
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return None
+
+
+# --- worker side ---
+# Columns of the panel rows this worker has seen, for the current sweep's block
+_worker_block: Optional[str] = None
+_worker_rows: Dict[int, Dict[str, np.ndarray]] = {}
+
+
+def _release_worker_rows() -> None:
+    """Drop the cached row columns (sweeps run in-process cache them in the parent)."""
+    global _worker_block
+    _worker_block = None
+    _worker_rows.clear()
+
+
+def _row_columns(shm_name: str, shape: Tuple[int, int, int], row: int, first: int,
+                 indicators: Sequence[str], extra: Sequence[str]) -> Dict[str, np.ndarray]:
+    """OHLCV, indicator and period-indicator columns of one panel row, without padding."""
+    global _worker_block
+    from .indicator_engine import compute_indicators, compute_period_indicators
+
+    if _worker_block != shm_name:
+        _worker_block = shm_name
+        _worker_rows.clear()
+    columns = _worker_rows.get(row)
+    if columns is None:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+            columns = {field: block[i, row, first:].copy() for i, field in enumerate(OHLCV_FIELDS)}
+            del block
+        finally:
+            shm.close()
+        _worker_rows[row] = columns
+    missing_base = [name for name in indicators if name not in columns]
+    missing_extra = [name for name in extra if name not in columns]
+    if missing_base or missing_extra:
+        panel = OHLCVPanel(["_"], *(columns[field][None, :] for field in OHLCV_FIELDS), starts=np.zeros(1, dtype=int))
+        if missing_base:
+            columns.update({name: values[0] for name, values in compute_indicators(panel, missing_base).items()})
+        if missing_extra:
+            columns.update({name: values[0] for name, values in compute_period_indicators(panel, missing_extra).items()})
+    return columns
+
+
+def _run_chunk(
+    shm_name: str,
+    shape: Tuple[int, int, int],
+    row: int,
+    first: int,
+    strategy_name: str,
+    param_sets: Sequence[Tuple[int, Dict[str, Any]]],
+    segments: Sequence[Segment],
+    settings: Mapping[str, float],
+    modules: Sequence[str] = (),
+) -> List[SweepRecord]:
+    """Simulate each parameter set over each segment of one symbol."""
+    from .backtest_engine import equity_metrics, run_simulation
+    from .strategy_pool import _strategy_service
+
+    for module in modules:
+        importlib.import_module(module)
+    service = _strategy_service()
+    spec = get_strategy(strategy_name)
+    masks = get_signal_masks(strategy_name)
+    extra = sorted({name for _, params in param_sets for name in masks.extra_columns(params)})
+    columns = _row_columns(shm_name, shape, row, first, sorted(spec.indicators), extra)
+
+    capital = settings["initial_capital"]
+    records: List[SweepRecord] = []
+    for param_id, params in param_sets:
+        signals = masks.evaluate(service, columns, params)
+        for segment_id, lo, hi in segments:
+            sim = run_simulation(
+                columns, signals, max(lo, spec.lookback), capital, settings["risk_per_trade"],
+                settings["commission"], settings["slippage"], end=hi,
+            )
+            records.append((param_id, segment_id, equity_metrics(sim.trades, sim.equity, sim.final_equity, capital)))
+    return records
+
+
+# --- parent side ---
+@dataclass
+class _Job:
+    symbol: str
+    row: int
+    phase: str
+    param_sets: List[Tuple[int, Dict[str, Any]]]
+    segments: List[Segment]
+
+
+class ParameterSweep:
+    """Runs a strategy's parameter sets over symbols in a spawned process pool."""
+
+    def __init__(self, workers: Optional[int] = None, chunks_per_worker: int = 4):
+        if workers is None:
+            workers = _env_workers()
+        self.workers = max(1, available_cores() - 1) if workers is None else workers
+        self.chunks_per_worker = max(1, chunks_per_worker)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(
+        self,
+        strategy_name: str,
+        symbol_data: Mapping[str, Any],
+        param_sets: Sequence[Mapping[str, Any]],
+        walk_forward: Optional[WalkForward] = None,
+        objective: str = "sharpe_ratio",
+        initial_capital: float = 100000.0,
+        risk_per_trade: float = 0.02,
+        commission: float = 0.0005,
+        slippage: float = 0.0005,
+        store: Any = None,
+        modules: Sequence[str] = (),
+        task: str = "backtest_sweep",
+    ) -> Dict[str, Any]:
+        """Sweep ``param_sets`` over ``symbol_data`` (DataFrames or candle lists).
+
+        Every result row is passed to ``store.add`` as soon as its job is done
+        (a ``SweepResults`` when no store is given). Returns a summary: the
+        best parameter set per symbol, or with ``walk_forward`` the chosen set
+        and out-of-sample metrics of every window. ``modules`` are imported
+        by pool workers on top of the strategy's own module.
+        """
+        spec = get_strategy(strategy_name)
+        masks = get_signal_masks(strategy_name)
+        if spec is None:
+            raise ValueError(f"Unknown strategy: {strategy_name}")
+        if masks is None:
+            raise ValueError(f"Strategy {strategy_name} has no signal masks to sweep")
+        params = [(i, masks.resolve(p)) for i, p in enumerate(param_sets or [{}])]
+        # Spawned workers only know strategies registered on import: load the
+        # modules defining this one and its masks (a script's own module is
+        # re-imported by spawn already)
+        modules = tuple(dict.fromkeys(
+            m for m in (*modules, spec.module, masks.func.__module__) if m != "__main__"
+        ))
+        store = SweepResults() if store is None else store
+        settings = {
+            "initial_capital": initial_capital, "risk_per_trade": risk_per_trade,
+            "commission": commission, "slippage": slippage,
+        }
+
+        shm, panel = await asyncio.to_thread(panel_to_shared_memory, symbol_data)
+        try:
+            shape = (len(OHLCV_FIELDS), len(panel.symbols), panel.bars)
+            lengths = {s: panel.bars - int(panel.starts[i]) for i, s in enumerate(panel.symbols)}
+            dates = {s: _dates(symbol_data[s]) for s in panel.symbols}
+            rows = {s: i for i, s in enumerate(panel.symbols)}
+            runner = _Runner(self, shm.name, shape, panel, strategy_name, settings, tuple(modules), store, dates)
+
+            if walk_forward is None:
+                segments = {s: [(0, spec.lookback, lengths[s])] for s in panel.symbols if lengths[s] > spec.lookback}
+                jobs = self._jobs(rows, params, segments, "full")
+                await progress.start(task, total=len(jobs), phase="backtesting")
+                await runner.run(jobs, segments)
+                summary = {
+                    s: store.best(objective, "full", s) if isinstance(store, SweepResults) else None
+                    for s in segments
+                }
+                return {"strategy": strategy_name, "objective": objective, "runs": len(params) * len(segments),
+                        "best": summary}
+
+            windows = {s: walk_forward.windows(spec.lookback, lengths[s]) for s in panel.symbols}
+            train = {s: [(k, lo, mid) for k, (lo, mid, _) in enumerate(w)] for s, w in windows.items() if w}
+            test = {s: [(k, mid, hi) for k, (_, mid, hi) in enumerate(w)] for s, w in windows.items() if w}
+            train_jobs = self._jobs(rows, params, train, "train")
+            # Test jobs are one per symbol and chosen set, known after training: start
+            # from the most there can be and settle the total once they are built
+            most_tests = sum(min(len(params), len(segments)) for segments in test.values())
+            await progress.start(task, total=len(train_jobs) + most_tests, phase="training")
+            train_records = await runner.run(train_jobs, train)
+
+            # Best parameter set per (symbol, window), then one test job per symbol and set
+            chosen: Dict[Tuple[str, int], Tuple[int, float]] = {}
+            for symbol, param_id, segment_id, metrics in train_records:
+                score = _score(metrics, objective)
+                if (symbol, segment_id) not in chosen or score > chosen[(symbol, segment_id)][1]:
+                    chosen[(symbol, segment_id)] = (param_id, score)
+            test_jobs = []
+            for symbol, segments in test.items():
+                by_param = defaultdict(list)
+                for segment in segments:
+                    by_param[chosen[(symbol, segment[0])][0]].append(segment)
+                for param_id, group in by_param.items():
+                    test_jobs.append(_Job(symbol, rows[symbol], "test", [params[param_id]], group))
+            await progress.update(phase="testing", total=len(train_jobs) + len(test_jobs))
+            test_records = await runner.run(test_jobs, test)
+
+            return {
+                "strategy": strategy_name,
+                "objective": objective,
+                "runs": len(train_records) + len(test_records),
+                "walk_forward": _walk_forward_summary(test_records, test, chosen, params, dates, objective),
+            }
+        except BrokenProcessPool:
+            self.shutdown()
+            raise
+        finally:
+            await progress.finish()
+            shm.close()
+            shm.unlink()
+            _release_worker_rows()
+
+    def _jobs(self, rows: Mapping[str, int], params: List[Tuple[int, Dict[str, Any]]],
+              segments: Mapping[str, List[Segment]], phase: str) -> List[_Job]:
+        """Per-symbol jobs over chunks of ``params``, a few per worker in total."""
+        target = max(1, self.workers) * self.chunks_per_worker
+        per_symbol = max(1, math.ceil(target / max(1, len(segments))))
+        size = max(1, math.ceil(len(params) / per_symbol))
+        return [
+            _Job(symbol, rows[symbol], phase, params[i:i + size], symbol_segments)
+            for symbol, symbol_segments in segments.items()
+            for i in range(0, len(params), size)
+        ]
+
+
+class _Runner:
+    """Submits one phase's jobs and streams finished records into the store."""
+
+    def __init__(self, sweep: ParameterSweep, shm_name: str, shape: Tuple[int, int, int], panel: OHLCVPanel,
+                 strategy_name: str, settings: Dict[str, float], modules: Tuple[str, ...], store: Any,
+                 dates: Mapping[str, Optional[Sequence[Any]]]):
+        self.sweep = sweep
+        self.shm_name = shm_name
+        self.shape = shape
+        self.first = {s: int(panel.starts[i]) for i, s in enumerate(panel.symbols)}
+        self.strategy_name = strategy_name
+        self.settings = settings
+        self.modules = modules
+        self.store = store
+        self.dates = dates
+        self.processed = 0
+        # In-process chunks share the row cache, so they run one at a time
+        self._inline = asyncio.Lock()
+
+    async def _submit(self, job: _Job) -> Tuple[_Job, List[SweepRecord]]:
+        args = (self.shm_name, self.shape, job.row, self.first[job.symbol], self.strategy_name,
+                job.param_sets, job.segments, self.settings, self.modules)
+        if self.sweep.workers > 0:
+            loop = asyncio.get_running_loop()
+            return job, await loop.run_in_executor(self.sweep._get_executor(), _run_chunk, *args)
+        async with self._inline:
+            return job, await asyncio.to_thread(_run_chunk, *args)
+
+    async def run(self, jobs: List[_Job], segments: Mapping[str, List[Segment]]
+                  ) -> List[Tuple[str, int, int, Dict[str, Any]]]:
+        """Run ``jobs``; returns (symbol, parameter set id, segment id, metrics) records."""
+        bounds = {(s, sid): (lo, hi) for s, segs in segments.items() for sid, lo, hi in segs}
+        out = []
+        for finished in asyncio.as_completed([self._submit(job) for job in jobs]):
+            job, records = await finished
+            params = dict(job.param_sets)
+            dates = self.dates[job.symbol]
+            for param_id, segment_id, metrics in records:
+                lo, hi = bounds[(job.symbol, segment_id)]
+                self.store.add({
+                    "symbol": job.symbol,
+                    "phase": job.phase,
+                    "param_id": param_id,
+                    "params": params[param_id],
+                    "segment": segment_id,
+                    "start": _date_at(dates, lo),
+                    "end": _date_at(dates, hi - 1),
+                    "metrics": metrics,
+                })
+                out.append((job.symbol, param_id, segment_id, metrics))
+            self.processed += 1
+            await progress.update(current_symbol=job.symbol, processed=self.processed)
+        return out
+
+
+def _dates(data: Any) -> Optional[Sequence[Any]]:
+    """Bar timestamps of a DataFrame (its index) or candle list (``date`` keys)."""
+    index = getattr(data, "index", None)
+    if index is not None and hasattr(index, "to_pydatetime"):
+        return index
+    if isinstance(data, list):
+        return [candle.get("date") for candle in data]
+    return None
+
+
+def _date_at(dates: Optional[Sequence[Any]], i: int) -> Any:
+    """``dates[i]`` as ISO text, or the bar position when there are no dates."""
+    if dates is None:
+        return int(i)
+    value = dates[i]
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _walk_forward_summary(test_records, test, chosen, params, dates, objective) -> Dict[str, Any]:
+    """Per symbol: each window's chosen parameters and out-of-sample metrics, plus the compounded return."""
+    by_window = {(symbol, segment_id): metrics for symbol, _, segment_id, metrics in test_records}
+    summary = {}
+    for symbol, segments in test.items():
+        windows = []
+        growth = 1.0
+        for segment_id, lo, hi in segments:
+            param_id, train_score = chosen[(symbol, segment_id)]
+            metrics = by_window[(symbol, segment_id)]
+            growth *= 1 + metrics["total_return"]
+            windows.append({
+                "start": _date_at(dates[symbol], lo),
+                "end": _date_at(dates[symbol], hi - 1),
+                "params": params[param_id][1],
+                f"train_{objective}": train_score,
+                "test": metrics,
+            })
+        summary[symbol] = {"windows": windows, "test_return": growth - 1}
+    return summary
@@ -0,0 +1,116 @@
+"""
+Compact view of the last two bars for strategy evaluation.
+
+The built-in strategies only compare the latest bar with the one before it.
+``LatestBars`` carries exactly that: two ``Bar`` records (``__slots__``
+objects holding OHLCV plus every indicator column as plain floats), the total
+number of bars in the series, and which columns were present. Strategies read
+``bars.current.ema_9`` instead of building a pandas Series per ``iloc`` row.
+
+Views can be built from a DataFrame (backtests, charts), straight from the
+batch indicator panel, or from the streaming indicator state's recent rows, so
+the scan paths never materialise per-symbol DataFrames.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .indicator_engine import INDICATOR_COLUMNS, OHLCV_FIELDS, OHLCVPanel
+
+BAR_FIELDS = OHLCV_FIELDS + INDICATOR_COLUMNS
+
+NAN = float("nan")
+
+
+class Bar:
+    """OHLCV and indicator values of one bar; missing fields are NaN."""
+
+    __slots__ = BAR_FIELDS
+
+    def __init__(self, values: Mapping[str, Any]):
+        for name in BAR_FIELDS:
+            value = values.get(name)
+            setattr(self, name, NAN if value is None else float(value))
+
+    def __getitem__(self, name: str) -> float:
+        return getattr(self, name)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in BAR_FIELDS}
+
+
+class LatestBars:
+    """The current and previous bar of a series."""
+
+    __slots__ = ("current", "previous", "bars", "columns")
+
+    def __init__(self, current: Optional[Bar], previous: Optional[Bar], bars: int, columns: Iterable[str]):
+        self.current = current
+        self.previous = previous
+        self.bars = bars
+        self.columns: FrozenSet[str] = frozenset(columns)
+
+    def __len__(self) -> int:
+        return self.bars
+
+    def has(self, names: Iterable[str]) -> bool:
+        return all(name in self.columns for name in names)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Mapping[str, Any]], bars: Optional[int] = None) -> "LatestBars":
+        """From row mappings, oldest first (only the last two are used)."""
+        total = len(rows) if bars is None else bars
+        if not rows:
+            return cls(None, None, total, ())
+        columns = [name for name in BAR_FIELDS if name in rows[-1]]
+        previous = Bar(rows[-2]) if len(rows) >= 2 else None
+        return cls(Bar(rows[-1]), previous, total, columns)
+
+    @classmethod
+    def from_columns(cls, columns: Mapping[str, np.ndarray], bars: int, end: Optional[int] = None) -> "LatestBars":
+        """From per-field arrays, e.g. one row of the indicator panel.
+
+        The latest bar is at position ``end - 1`` (default: the last element),
+        so a backtest can step through precomputed columns without slicing.
+        """
+        names = [name for name in BAR_FIELDS if name in columns]
+        if bars <= 0:
+            return cls(None, None, 0, names)
+        last = -1 if end is None else end - 1
+        current = Bar({name: columns[name][last] for name in names})
+        previous = Bar({name: columns[name][last - 1] for name in names}) if bars >= 2 else None
+        return cls(current, previous, bars, names)
+
+    @classmethod
+    def from_frame(cls, df: Any) -> "LatestBars":
+        """From a DataFrame, reading only its last two rows."""
+        bars = len(df)
+        names = [name for name in BAR_FIELDS if name in df.columns]
+        if bars == 0:
+            return cls(None, None, 0, names)
+        # One small block for both rows; per-column or per-row access costs far more
+        tail = df.iloc[-2:].to_numpy()[:, df.columns.get_indexer(names)]
+        current = Bar(dict(zip(names, tail[-1])))
+        previous = Bar(dict(zip(names, tail[-2]))) if len(tail) >= 2 else None
+        return cls(current, previous, bars, names)
+
+
+def as_latest_bars(data: Any) -> LatestBars:
+    """Accept a ``LatestBars`` as-is or build one from a DataFrame."""
+    if isinstance(data, LatestBars):
+        return data
+    return LatestBars.from_frame(data)
+
+
+def panel_views(panel: OHLCVPanel, indicators: Mapping[str, np.ndarray]) -> Dict[str, LatestBars]:
+    """One view per panel row, from ``compute_indicators`` output for that panel."""
+    views: Dict[str, LatestBars] = {}
+    lengths = panel.lengths()
+    for row, symbol in enumerate(panel.symbols):
+        columns = {name: values[row] for name, values in indicators.items()}
+        for field in OHLCV_FIELDS:
+            columns[field] = getattr(panel, field)[row]
+        views[symbol] = LatestBars.from_columns(columns, int(lengths[row]))
+    return views
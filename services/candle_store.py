@@ -0,0 +1,386 @@
+"""
+Columnar, append-only candle store for historical OHLCV data.
+
+Each (symbol, interval) pair lives in its own directory under the cache root
+with one raw little-endian column file per field plus a tiny ``index.json``
+holding the row count, first/last timestamp and the last refresh time:
+
+    data/hist_cache/RELIANCE/1D/ts.bin
+    data/hist_cache/RELIANCE/1D/open.bin
+    ...
+    data/hist_cache/RELIANCE/1D/index.json
+
+Delta fetches are appended to the column files instead of rewriting the full
+history (a refetched last bar, stored while it was still forming, is
+overwritten in place), and reads go straight into NumPy arrays (or a DataFrame
+built from them) without a list-of-dicts step. The index row count is the
+commit point: bytes beyond ``rows`` left behind by an interrupted append are
+truncated on the next write and ignored on read.
+
+Reads are copy-on-write ``np.memmap`` views over the column files, so every
+task and process touching the same series shares the OS page cache instead of
+holding its own parsed copy; a page is only duplicated if a caller writes to it
+(and such writes never reach the file). Full rewrites go through ``os.replace`` and
+appends only change the last committed row and grow files past it, so an
+existing mapping keeps seeing a consistent prefix of the data.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+try:
+    import pandas as pd
+    HAS_PANDAS = True
+except ImportError:
+    HAS_PANDAS = False
+
+logger = logging.getLogger(__name__)
+
+# Column name -> on-disk dtype. Timestamps are naive wall-clock epoch seconds.
+COLUMNS: Dict[str, np.dtype] = {
+    "ts": np.dtype("<i8"),
+    "open": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "volume": np.dtype("<f8"),
+}
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+INDEX_FILE = "index.json"
+STORE_VERSION = 1
+
+
+@dataclass
+class CandleIndex:
+    """Small per-(symbol, interval) index kept next to the column files."""
+    rows: int = 0
+    first_ts: Optional[int] = None
+    last_ts: Optional[int] = None
+    last_updated: str = "1970-01-01T00:00:00"
+    version: int = STORE_VERSION
+
+    @property
+    def last_updated_dt(self) -> datetime:
+        try:
+            return datetime.fromisoformat(self.last_updated)
+        except Exception:
+            return datetime(1970, 1, 1)
+
+    @property
+    def last_candle_dt(self) -> Optional[datetime]:
+        if self.last_ts is None:
+            return None
+        return datetime(1970, 1, 1) + timedelta(seconds=int(self.last_ts))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "last_updated": self.last_updated,
+            "version": self.version,
+        }
+
+
+def _coerce_timestamps(values: Iterable[Any]) -> np.ndarray:
+    """Convert provider date values (ISO strings, datetimes or epoch s/ms) to epoch seconds.
+
+    Timezone-aware values keep their local wall-clock time so intraday candles
+    line up with exchange hours regardless of how the provider encoded them.
+    Unparseable values become ``INT64_MIN`` and are dropped by the caller.
+    """
+    vals = list(values)
+    out = np.full(len(vals), np.iinfo(np.int64).min, dtype=np.int64)
+    if not vals:
+        return out
+
+    other_idx: List[int] = []
+    for i, v in enumerate(vals):
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            out[i] = int(v / 1000) if v > 1e11 else int(v)
+        elif v is not None:
+            other_idx.append(i)
+    if not other_idx:
+        return out
+
+    if HAS_PANDAS:
+        raw = pd.Series([vals[i] for i in other_idx])
+        try:
+            parsed = pd.to_datetime(raw, errors="coerce")
+        except Exception:
+            parsed = pd.to_datetime(raw, errors="coerce", format="mixed")
+        if getattr(parsed.dt, "tz", None) is not None:
+            parsed = parsed.dt.tz_localize(None)
+        mask = parsed.notna().to_numpy()
+        secs = parsed.to_numpy(dtype="datetime64[s]", na_value=np.datetime64("NaT")).astype(np.int64)
+        for j, i in enumerate(other_idx):
+            if mask[j]:
+                out[i] = secs[j]
+        return out
+
+    epoch = datetime(1970, 1, 1)
+    for i in other_idx:
+        try:
+            dt = datetime.fromisoformat(str(vals[i]).replace("Z", "+00:00"))
+            if dt.tzinfo is not None:
+                dt = dt.replace(tzinfo=None)
+            out[i] = int((dt - epoch).total_seconds())
+        except Exception:
+            continue
+    return out
+
+
+def candles_to_columns(candles: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Convert standardized candle dicts into sorted, de-duplicated column arrays."""
+    n = len(candles)
+    cols: Dict[str, np.ndarray] = {
+        "ts": _coerce_timestamps(c.get("date") for c in candles)
+    }
+    for name in PRICE_COLUMNS:
+        arr = np.empty(n, dtype=COLUMNS[name])
+        for i, c in enumerate(candles):
+            try:
+                v = c.get(name)
+                arr[i] = float(v) if v is not None and v != "" else np.nan
+            except (TypeError, ValueError):
+                arr[i] = np.nan
+        cols[name] = arr
+
+    valid = cols["ts"] != np.iinfo(np.int64).min
+    if not valid.all():
+        cols = {k: v[valid] for k, v in cols.items()}
+
+    # Sort by time and keep the last occurrence of any duplicated timestamp
+    order = np.argsort(cols["ts"], kind="stable")
+    cols = {k: v[order] for k, v in cols.items()}
+    if len(cols["ts"]) > 1:
+        keep = np.append(cols["ts"][1:] != cols["ts"][:-1], True)
+        if not keep.all():
+            cols = {k: v[keep] for k, v in cols.items()}
+    return cols
+
+
+def columns_to_records(cols: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Render column arrays as the legacy list-of-dicts payload (``date`` as ISO string)."""
+    if not cols or len(cols.get("ts", ())) == 0:
+        return []
+    dates = np.datetime_as_string(np.asarray(cols["ts"]).view("datetime64[s]"), unit="s").tolist()
+    series = {name: cols[name].tolist() for name in PRICE_COLUMNS}
+    return [
+        {
+            "date": dates[i],
+            "open": series["open"][i],
+            "high": series["high"][i],
+            "low": series["low"][i],
+            "close": series["close"][i],
+            "volume": series["volume"][i],
+        }
+        for i in range(len(dates))
+    ]
+
+
+def columns_to_frame(cols: Dict[str, np.ndarray], dropna: bool = False):
+    """Build an OHLCV DataFrame indexed by ``date`` directly from column arrays.
+
+    Columns wrap the given arrays without copying, so memory-mapped columns
+    stay mapped. ``dropna`` removes rows with a NaN price or volume by masking
+    the arrays first; only a series that has such rows is copied.
+    """
+    if not HAS_PANDAS:
+        raise RuntimeError("pandas is required for columns_to_frame")
+    if dropna:
+        missing = np.zeros(len(cols["ts"]), dtype=bool)
+        for name in PRICE_COLUMNS:
+            missing |= np.isnan(cols[name])
+        if missing.any():
+            cols = {name: np.asarray(values)[~missing] for name, values in cols.items()}
+    index = pd.DatetimeIndex(np.asarray(cols["ts"]).view("datetime64[s]"), name="date", copy=False)
+    return pd.DataFrame({name: cols[name] for name in PRICE_COLUMNS}, index=index, copy=False)
+
+
+class CandleStore:
+    """Append-only columnar store for OHLCV candles keyed by (symbol, interval)."""
+
+    def __init__(self, root: str = "data/hist_cache"):
+        self.root = Path(root)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # --- paths & locking ---
+    @staticmethod
+    def _safe_name(value: str) -> str:
+        return "".join(c for c in str(value) if c.isalnum() or c in ("-", "_")).rstrip() or "default"
+
+    def _series_dir(self, symbol: str, interval: str) -> Path:
+        return self.root / self._safe_name(str(symbol).upper()) / self._safe_name(interval)
+
+    def _lock_for(self, symbol: str, interval: str) -> threading.Lock:
+        key = f"{str(symbol).upper()}|{interval}"
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._locks[key] = lock
+            return lock
+
+    # --- index ---
+    def _read_index(self, series_dir: Path) -> Optional[CandleIndex]:
+        path = series_dir / INDEX_FILE
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            if int(raw.get("version", 0)) != STORE_VERSION:
+                return None
+            return CandleIndex(
+                rows=int(raw.get("rows", 0)),
+                first_ts=raw.get("first_ts"),
+                last_ts=raw.get("last_ts"),
+                last_updated=raw.get("last_updated") or "1970-01-01T00:00:00",
+            )
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read candle index at {path}: {e}")
+            return None
+
+    def _write_index(self, series_dir: Path, index: CandleIndex) -> None:
+        path = series_dir / INDEX_FILE
+        tmp = path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index.to_dict(), f)
+        os.replace(tmp, path)
+
+    def get_index(self, symbol: str, interval: str) -> Optional[CandleIndex]:
+        """Return the index for a series, or None when nothing is stored."""
+        index = self._read_index(self._series_dir(symbol, interval))
+        if index is None or index.rows <= 0:
+            return None
+        return index
+
+    # --- writes ---
+    def write(self, symbol: str, interval: str, candles: List[Dict[str, Any]]) -> int:
+        """Replace the stored series with ``candles``. Returns the number of rows stored."""
+        return self.write_columns(symbol, interval, candles_to_columns(candles or []))
+
+    def write_columns(self, symbol: str, interval: str, cols: Dict[str, np.ndarray]) -> int:
+        """Replace the stored series with already-columnar, time-sorted data."""
+        series_dir = self._series_dir(symbol, interval)
+        with self._lock_for(symbol, interval):
+            series_dir.mkdir(parents=True, exist_ok=True)
+            for name, dtype in COLUMNS.items():
+                tmp = series_dir / f"{name}.bin.tmp"
+                np.asarray(cols[name]).astype(dtype, copy=False).tofile(tmp)
+                os.replace(tmp, series_dir / f"{name}.bin")
+            rows = int(len(cols["ts"]))
+            self._write_index(series_dir, CandleIndex(
+                rows=rows,
+                first_ts=int(cols["ts"][0]) if rows else None,
+                last_ts=int(cols["ts"][-1]) if rows else None,
+                last_updated=datetime.now().isoformat(),
+            ))
+        return rows
+
+    def append(self, symbol: str, interval: str, candles: List[Dict[str, Any]]) -> int:
+        """Append candles newer than the last stored timestamp. Returns rows appended.
+
+        A candle at the stored ``last_ts`` replaces the last row: that bar may
+        have been stored while still forming, and a later fetch carries its
+        final values. Older candles are ignored, so re-fetching an overlapping
+        window is harmless. The refresh time is updated even when nothing new
+        arrived so the caller's same-day freshness check holds.
+        """
+        series_dir = self._series_dir(symbol, interval)
+        with self._lock_for(symbol, interval):
+            index = self._read_index(series_dir)
+            if index is not None and index.rows > 0:
+                cols = candles_to_columns(candles or [])
+                replaces_last = False
+                if index.last_ts is not None and len(cols["ts"]):
+                    keep = cols["ts"] >= int(index.last_ts)
+                    cols = {k: v[keep] for k, v in cols.items()}
+                    replaces_last = bool(len(cols["ts"])) and int(cols["ts"][0]) == int(index.last_ts)
+                written = int(len(cols["ts"]))
+                start_row = index.rows - 1 if replaces_last else index.rows
+                if written:
+                    for name, dtype in COLUMNS.items():
+                        path = series_dir / f"{name}.bin"
+                        with open(path, "r+b" if path.exists() else "w+b") as f:
+                            # Overwrite in place from the first changed row, then drop any
+                            # uncommitted tail of an interrupted append. The file never
+                            # shrinks below the committed rows that readers may have mapped.
+                            f.seek(start_row * dtype.itemsize)
+                            f.write(cols[name].astype(dtype, copy=False).tobytes())
+                            f.truncate()
+                    index.rows = start_row + written
+                    index.last_ts = int(cols["ts"][-1])
+                index.last_updated = datetime.now().isoformat()
+                self._write_index(series_dir, index)
+                return written - int(replaces_last)
+        # Nothing stored yet: an append is a full write
+        return self.write(symbol, interval, candles) if candles else 0
+
+    def touch(self, symbol: str, interval: str) -> None:
+        """Mark a series as refreshed now without changing its rows."""
+        self.append(symbol, interval, [])
+
+    def delete(self, symbol: str, interval: str) -> None:
+        """Remove a stored series if present."""
+        series_dir = self._series_dir(symbol, interval)
+        with self._lock_for(symbol, interval):
+            for filename in [f"{name}.bin" for name in COLUMNS] + [INDEX_FILE]:
+                try:
+                    (series_dir / filename).unlink()
+                except FileNotFoundError:
+                    pass
+
+    # --- reads ---
+    def read_arrays(self, symbol: str, interval: str, mmap: bool = True) -> Optional[Dict[str, np.ndarray]]:
+        """Read a series as a dict of column arrays (``ts`` in epoch seconds).
+
+        By default the arrays are copy-on-write memory maps; pass ``mmap=False``
+        for private in-memory copies.
+        """
+        series_dir = self._series_dir(symbol, interval)
+        index = self._read_index(series_dir)
+        if index is None or index.rows <= 0:
+            return None
+        try:
+            cols: Dict[str, np.ndarray] = {}
+            for name, dtype in COLUMNS.items():
+                path = series_dir / f"{name}.bin"
+                if path.stat().st_size < index.rows * dtype.itemsize:
+                    logger.warning(f"Candle column {name} for {symbol} {interval} is short; ignoring cache")
+                    return None
+                if mmap:
+                    cols[name] = np.memmap(path, dtype=dtype, mode="c", shape=(index.rows,))
+                else:
+                    cols[name] = np.fromfile(path, dtype=dtype, count=index.rows)
+            return cols
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read candle store for {symbol} {interval}: {e}")
+            return None
+
+    def read_frame(self, symbol: str, interval: str):
+        """Read a series as a DataFrame indexed by ``date`` with OHLCV float columns."""
+        cols = self.read_arrays(symbol, interval)
+        if cols is None:
+            return None
+        return columns_to_frame(cols)
+
+    def read_records(self, symbol: str, interval: str) -> Optional[List[Dict[str, Any]]]:
+        """Read a series in the legacy list-of-dicts shape returned by DataFetcher."""
+        cols = self.read_arrays(symbol, interval)
+        if cols is None:
+            return None
+        return columns_to_records(cols)
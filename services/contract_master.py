@@ -0,0 +1,284 @@
+"""
+NSEEQ contract master: daily download/ingest compiled into a compact binary snapshot.
+
+The provider's contract file is fetched (or, offline, ingested from
+``data/contracts_nseeq.json``) at most once per trading day, normalised, and
+written to ``data/contracts_nseeq.snap``. Loading the snapshot is a header
+check plus two ``bytes.split`` calls, so every process can pick it up at
+startup without re-parsing the JSON.
+
+Snapshot layout (little-endian, no pickle)::
+
+    header  magic(8s) format(H) trade_date(I, YYYYMMDD) built_at(q, epoch secs)
+            count(I) sha1(20s) keys_len(I) ids_len(I)
+    keys    UTF-8 normalised trading symbols joined by '\\n' (map order)
+    ids     UTF-8 instrumentIds joined by '\\n' (same order)
+
+The version stamp is ``<trade_date>-<sha1 prefix>`` of the key/id payload.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import struct
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from .http_transport import get_http_client
+
+logger = logging.getLogger(__name__)
+
+CONTRACTS_URL = "https://api.iiflcapital.com/v1/contractfiles/NSEEQ.json"
+CONTRACTS_JSON_PATH = os.path.join("data", "contracts_nseeq.json")
+SNAPSHOT_PATH = os.path.join("data", "contracts_nseeq.snap")
+
+SNAPSHOT_MAGIC = b"NSEQSNAP"
+SNAPSHOT_FORMAT = 1
+_HEADER = struct.Struct("<8sHIqI20sII")
+# Minimum gap between download attempts after a failure
+_RETRY_AFTER = timedelta(hours=1)
+
+
+def normalize_contract_map(raw: Dict[Any, Any]) -> Dict[str, str]:
+    """Upper-case keys and add an alnum-only alias for each (first alias wins)."""
+    norm_map: Dict[str, str] = {}
+    for k, v in raw.items():
+        try:
+            kk = str(k).upper().strip()
+            norm_map[kk] = str(v)
+            simple = ''.join(ch for ch in kk if ch.isalnum())
+            if simple and simple not in norm_map:
+                norm_map[simple] = str(v)
+        except Exception:
+            continue
+    return norm_map
+
+
+def parse_contracts_payload(data: Any) -> Dict[str, str]:
+    """Extract tradingSymbol -> instrumentId for NSE equities from the provider payload."""
+    contracts: List[Dict[str, Any]]
+    if isinstance(data, dict) and isinstance(data.get("result"), list):
+        contracts = data.get("result", [])
+    elif isinstance(data, list):
+        contracts = data
+    else:
+        contracts = []
+
+    id_map: Dict[str, str] = {}
+    for c in contracts:
+        try:
+            tsym = c.get("tradingSymbol")
+            exch = c.get("exchange")
+            inst = c.get("instrumentId")
+            if tsym and inst and (exch == "NSEEQ" or exch == "NSE"):
+                id_map[str(tsym).upper()] = str(inst)
+        except Exception:
+            continue
+    return id_map
+
+
+@dataclass
+class ContractSnapshot:
+    """Normalised contract map plus the trading day and content digest it was built from."""
+    mapping: Dict[str, str]
+    trade_date: date
+    built_at: datetime
+    digest: str
+
+    @property
+    def version(self) -> str:
+        return f"{self.trade_date.strftime('%Y%m%d')}-{self.digest[:12]}"
+
+    def is_current(self, today: Optional[date] = None) -> bool:
+        return self.trade_date >= (today or date.today())
+
+
+def write_snapshot(path: str, mapping: Dict[str, str], trade_date: Optional[date] = None) -> ContractSnapshot:
+    """Compile a normalised map into the binary snapshot format (atomic replace)."""
+    trade_date = trade_date or date.today()
+    keys_blob = "\n".join(mapping.keys()).encode("utf-8")
+    ids_blob = "\n".join(mapping.values()).encode("utf-8")
+    sha = hashlib.sha1(keys_blob + b"\0" + ids_blob)
+    built_at = datetime.now().replace(microsecond=0)
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_FORMAT,
+        int(trade_date.strftime("%Y%m%d")),
+        int(built_at.timestamp()),
+        len(mapping),
+        sha.digest(),
+        len(keys_blob),
+        len(ids_blob),
+    )
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(keys_blob)
+        f.write(ids_blob)
+    os.replace(tmp, path)
+    return ContractSnapshot(mapping=mapping, trade_date=trade_date, built_at=built_at, digest=sha.hexdigest())
+
+
+def read_snapshot(path: str) -> Optional[ContractSnapshot]:
+    """Load a snapshot written by ``write_snapshot``; None if missing, foreign or corrupt."""
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Could not read contract snapshot {path}: {e}")
+        return None
+
+    try:
+        magic, fmt, trade_ymd, built_ts, count, digest, keys_len, ids_len = _HEADER.unpack_from(raw, 0)
+        if magic != SNAPSHOT_MAGIC or fmt != SNAPSHOT_FORMAT:
+            return None
+        start = _HEADER.size
+        keys_blob = raw[start:start + keys_len]
+        ids_blob = raw[start + keys_len:start + keys_len + ids_len]
+        if len(keys_blob) != keys_len or len(ids_blob) != ids_len:
+            logger.warning(f"Contract snapshot {path} is truncated; ignoring")
+            return None
+        if hashlib.sha1(keys_blob + b"\0" + ids_blob).digest() != digest:
+            logger.warning(f"Contract snapshot {path} failed checksum; ignoring")
+            return None
+        keys = keys_blob.decode("utf-8").split("\n") if count else []
+        ids = ids_blob.decode("utf-8").split("\n") if count else []
+        if len(keys) != count or len(ids) != count:
+            return None
+        return ContractSnapshot(
+            mapping=dict(zip(keys, ids)),
+            trade_date=datetime.strptime(str(trade_ymd), "%Y%m%d").date(),
+            built_at=datetime.fromtimestamp(built_ts),
+            digest=digest.hex(),
+        )
+    except Exception as e:
+        logger.warning(f"Could not parse contract snapshot {path}: {e}")
+        return None
+
+
+class ContractMaster:
+    """Owns the contract snapshot: loads it, refreshes it once per day, and falls back to stale data."""
+
+    def __init__(
+        self,
+        snapshot_path: str = SNAPSHOT_PATH,
+        json_path: str = CONTRACTS_JSON_PATH,
+        url: str = CONTRACTS_URL,
+    ):
+        self.snapshot_path = snapshot_path
+        self.json_path = json_path
+        self.url = url
+        self._snapshot: Optional[ContractSnapshot] = None
+        self._last_failed_refresh: Optional[datetime] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def snapshot(self) -> Optional[ContractSnapshot]:
+        return self._snapshot
+
+    def _ingest_json(self) -> Optional[ContractSnapshot]:
+        """Compile the local JSON contract file into a snapshot stamped with the file's date."""
+        try:
+            with open(self.json_path, "r", encoding="utf-8") as f:
+                file_data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read local contract map {self.json_path}: {e}")
+            return None
+        if not isinstance(file_data, dict) or not file_data:
+            return None
+        file_date = datetime.fromtimestamp(os.path.getmtime(self.json_path)).date()
+        return write_snapshot(self.snapshot_path, normalize_contract_map(file_data), file_date)
+
+    def _load_local_sync(self) -> Optional[ContractSnapshot]:
+        snapshot = read_snapshot(self.snapshot_path)
+        try:
+            json_mtime = datetime.fromtimestamp(os.path.getmtime(self.json_path)).date()
+        except OSError:
+            json_mtime = None
+        # A JSON file newer than the snapshot (e.g. from scripts.prefetch_contracts) wins
+        if snapshot is None or (json_mtime is not None and json_mtime > snapshot.trade_date):
+            snapshot = self._ingest_json() or snapshot
+        return snapshot
+
+    async def load_local(self) -> Optional[ContractSnapshot]:
+        """Load the on-disk snapshot (ingesting the JSON file if needed); never downloads."""
+        if self._snapshot is not None:
+            return self._snapshot
+        async with self._lock:
+            if self._snapshot is None:
+                self._snapshot = await asyncio.to_thread(self._load_local_sync)
+                if self._snapshot:
+                    logger.info(f"Loaded contract snapshot {self._snapshot.version} ({len(self._snapshot.mapping)} keys)")
+        return self._snapshot
+
+    async def get_snapshot(self) -> Optional[ContractSnapshot]:
+        """Return the latest snapshot without waiting on the provider.
+
+        A snapshot from an earlier day is served as-is while today's is
+        downloaded in a background task (one at a time, retried no sooner than
+        an hour after a failure). Only a process with no local snapshot at all
+        waits for the download.
+        """
+        snapshot = self._snapshot or await self.load_local()
+        if snapshot is not None and snapshot.is_current():
+            return snapshot
+        if self._last_failed_refresh and datetime.now() - self._last_failed_refresh < _RETRY_AFTER:
+            return snapshot
+        if snapshot is None:
+            return await self.refresh()
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+        return snapshot
+
+    async def refresh(self, force: bool = False) -> Optional[ContractSnapshot]:
+        """Download the contract file and rebuild the snapshot (and the JSON copy used by tools).
+
+        Skipped when another caller already refreshed today, unless ``force`` is set.
+        """
+        async with self._lock:
+            if not force and self._snapshot is not None and self._snapshot.is_current():
+                return self._snapshot
+            try:
+                resp = await get_http_client().get(self.url, timeout=20.0)
+                resp.raise_for_status()
+                data = resp.json()
+                raw_map = parse_contracts_payload(data)
+                if not raw_map:
+                    raise ValueError("empty contract payload")
+
+                def _persist() -> ContractSnapshot:
+                    os.makedirs(os.path.dirname(self.json_path) or ".", exist_ok=True)
+                    with open(self.json_path, "w", encoding="utf-8") as f:
+                        json.dump(raw_map, f)
+                    return write_snapshot(self.snapshot_path, normalize_contract_map(raw_map))
+
+                snapshot = await asyncio.to_thread(_persist)
+                self._snapshot = snapshot
+                self._last_failed_refresh = None
+                logger.info(f"Refreshed contract snapshot {snapshot.version} ({len(raw_map)} contracts)")
+                return snapshot
+            except Exception as e:
+                self._last_failed_refresh = datetime.now()
+                logger.warning(f"Failed to download NSEEQ contracts: {str(e)}")
+                return None
+
+
+_contract_master: Optional[ContractMaster] = None
+
+
+def get_contract_master() -> ContractMaster:
+    """Get the process-wide contract master."""
+    global _contract_master
+    if _contract_master is None:
+        _contract_master = ContractMaster()
+    return _contract_master
@@ -1,16 +1,11 @@
 from __future__ import annotations
 import asyncio
-from typing import Dict, List, Optional, Any
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from datetime import date as date_cls
 import logging
-import httpx
-import json
-import os
-from pathlib import Path
 from .iifl_api import IIFLAPIService
-import aiofiles
-import aiofiles.os
 from functools import partial
 
 try:
@@ -18,6 +13,21 @@ try:
 except Exception:
     WatchlistService = None  # type: ignore
 
+from .contract_master import get_contract_master
+from .memory_cache import LRUTTLCache, NamespacedCache
+from .tiered_cache import TieredCache
+from .instrument_resolver import InstrumentResolver, set_instrument_resolver
+
+# Columnar candle store (requires numpy); without it historical data is not cached on disk
+try:
+    from .candle_store import CandleStore, candles_to_columns, columns_to_records, columns_to_frame
+    from .indicator_state import IndicatorState, IndicatorStateStore
+    from .resample import ResampleCache, can_derive, interval_seconds
+except ImportError:
+    CandleStore = None  # type: ignore
+    IndicatorStateStore = None  # type: ignore
+    ResampleCache = None  # type: ignore
+
 # Optional pandas import
 try:
     import pandas as pd
@@ -27,6 +37,9 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# How long a fetched portfolio stays shareable with other workers through Redis
+PORTFOLIO_L2_TTL = 300
+
 class DataFetcher:
     """Service for fetching and processing market data"""
     
@@ -44,9 +57,12 @@ class DataFetcher:
             self.iifl = iifl_service
             self._db = db_session
             self._test_mode = test_mode
-            # Short-term cache for frequently changing data like live prices
-            self.cache: Dict[str, Any] = {}
-            self.cache_expiry: Dict[str, datetime] = {}
+            # Short-term cache for frequently changing data like live prices,
+            # bounded per namespace ("price_*" keys, "depth_*" keys, everything else)
+            self.cache = NamespacedCache("data_fetcher", **self._cache_limits())
+            # Redis L2 behind self.cache, shared by all workers; invalidations fan out via pub/sub
+            self.tiered_cache = TieredCache(self.cache)
+            self.tiered_cache.on_invalidate("portfolio", lambda keys: self._drop_portfolio_cache())
             # Long-term cache for portfolio/margin, invalidated by order events
             self._portfolio_cache: Optional[Dict[str, Any]] = None
             self._margin_cache: Optional[Dict[str, Any]] = None
@@ -56,117 +72,210 @@ class DataFetcher:
             # Daily boundaries for minimal IIFL calls
             self._portfolio_cache_date: Optional[date_cls] = None
             self._margin_cache_date: Optional[date_cls] = None
+            # Append-only columnar store for historical candles
+            self.candle_store = CandleStore() if CandleStore is not None else None
+            # Streaming indicators per series, advanced from the candle store's new rows
+            self.indicator_states = IndicatorStateStore() if IndicatorStateStore is not None else None
+            # Coarser intraday intervals are resampled locally from this stored base series
+            self.resample_base_interval = os.getenv("RESAMPLE_BASE_INTERVAL", "5m").strip()
+            self.resample_cache = ResampleCache() if ResampleCache is not None else None
+            self._instrument_resolver: Optional[InstrumentResolver] = None
+            # In-flight fetches keyed by request, shared by concurrent identical callers
+            self._inflight: Dict[Tuple[Any, ...], asyncio.Task] = {}
+            self.coalesced_requests = 0
             self._initialized = True
     
+    @staticmethod
+    def _cache_limits() -> Dict[str, Any]:
+        """Per-namespace capacities for the in-memory cache, from settings when available."""
+        try:
+            from config.settings import get_settings
+            settings = get_settings()
+            return {
+                "capacities": {
+                    "price": int(getattr(settings, "price_cache_max_entries", 2000)),
+                    "depth": int(getattr(settings, "depth_cache_max_entries", 500)),
+                },
+                "default_capacity": int(getattr(settings, "memory_cache_max_entries", 1000)),
+            }
+        except Exception:
+            return {"capacities": {"price": 2000, "depth": 500}, "default_capacity": 1000}
+
+    @staticmethod
+    def _namespace_for(key: str) -> str:
+        """Pick the cache namespace for a key from its prefix (e.g. 'price_RELIANCE')."""
+        prefix = key.split("_", 1)[0] if "_" in key else ""
+        return prefix if prefix in ("price", "depth") else "default"
+
+    def _cache_for(self, key: str) -> LRUTTLCache:
+        return self.cache.namespace(self._namespace_for(key))
+
     def _is_cache_valid(self, key: str, ttl_seconds: int = 60) -> bool:
-        """Check if cached data is still valid"""
-        if key not in self.cache or key not in self.cache_expiry:
-            return False
-        return datetime.now() < self.cache_expiry[key]
+        """Check if cached data is still valid (expiry is fixed when the entry is set)"""
+        return key in self._cache_for(key)
     
     def _get_cache(self, key: str):
         """Get cached data"""
-        if key in self.cache and self._is_cache_valid(key):
-            return self.cache[key]
-        return None
+        return self._cache_for(key).get(key)
     
     def _set_cache(self, key: str, data: Any, ttl_seconds: int = 60):
         """Set cache with expiry"""
-        self.cache[key] = data
-        self.cache_expiry[key] = datetime.now() + timedelta(seconds=ttl_seconds)
+        self._cache_for(key).set(key, data, ttl_seconds)
 
-    def clear_portfolio_cache(self):
-        """
-        Invalidates the portfolio and margin cache.
-        This should be called after any order placement, modification, or cancellation.
-        """
-        logger.info("Clearing portfolio and margin cache due to order activity.")
+    async def _get_shared_cache(self, key: str, ttl_seconds: int = 60):
+        """Two-tier lookup: local cache, then Redis L2 (shared across workers)."""
+        return await self.tiered_cache.get(self._namespace_for(key), key, ttl_seconds)
+
+    async def _set_shared_cache(self, key: str, data: Any, ttl_seconds: int = 60):
+        """Store in the local cache and Redis L2."""
+        await self.tiered_cache.set(self._namespace_for(key), key, data, ttl_seconds)
+
+    def _drop_portfolio_cache(self):
         self._portfolio_cache = None
         self._margin_cache = None
         self._portfolio_cache_date = None
         self._margin_cache_date = None
 
-    def _get_file_cache_path(self, symbol: str, interval: str) -> str:
-        """Get the path for the file-based cache, ensuring the directory exists."""
-        cache_dir = Path("data/hist_cache")
-        cache_dir.mkdir(exist_ok=True)
-        # Sanitize symbol for a safe filename
-        safe_symbol = "".join(c for c in symbol if c.isalnum() or c in ('-', '_')).rstrip() or "default"
-        return str(cache_dir / f"{safe_symbol}_{interval}.parquet")
-
-    def _get_file_cache_meta_path(self, symbol: str, interval: str) -> str:
-        """Get the path for the JSON sidecar cache (robust fallback without pandas)."""
-        cache_dir = Path("data/hist_cache")
-        cache_dir.mkdir(exist_ok=True)
-        safe_symbol = "".join(c for c in symbol if c.isalnum() or c in ('-', '_')).rstrip() or "default"
-        return str(cache_dir / f"{safe_symbol}_{interval}.json")
-
-    async def _read_from_file_cache(self, path: str) -> Optional[Dict[str, Any]]:
-        """Read data and metadata from the file cache asynchronously."""
-        try:
-            json_path = os.path.splitext(path)[0] + ".json"
-            if await aiofiles.os.path.exists(json_path):
-                try:
-                    async with aiofiles.open(json_path, "r", encoding="utf-8") as f:
-                        content = await f.read()
-                        obj = await asyncio.to_thread(json.loads, content)
-                        if isinstance(obj, dict) and "data" in obj and isinstance(obj.get("data"), list):
-                            return {
-                                "last_updated": obj.get("last_updated") or obj.get("lastUpdated") or "1970-01-01T00:00:00",
-                                "data": obj.get("data")
-                            }
-                except Exception as e:
-                    logger.warning(f"Could not read JSON cache at {json_path}: {e}")
+    async def invalidate_portfolio_cache(self):
+        """
+        Invalidates the portfolio and margin cache after an order placement,
+        modification, or cancellation.
+        Returns once the shared L2 copy is gone and other workers have been told,
+        so a read that follows cannot pick up the pre-order snapshot.
+        """
+        logger.info("Clearing portfolio and margin cache due to order activity.")
+        await self.tiered_cache.invalidate("portfolio")
 
-            if HAS_PANDAS and await aiofiles.os.path.exists(path):
-                try:
-                    df = await asyncio.to_thread(pd.read_parquet, path)
-                    if df.empty or 'last_updated' not in df.attrs:
-                        return None
-                    df_reset = df.reset_index()
-                    if pd.api.types.is_datetime64_any_dtype(df_reset['date']):
-                        df_reset['date'] = df_reset['date'].dt.strftime('%Y-%m-%dT%H:%M:%S')
-                    return {
-                        "last_updated": df.attrs['last_updated'],
-                        "data": await asyncio.to_thread(df_reset.to_dict, 'records')
-                    }
-                except Exception as e:
-                    logger.warning(f"Could not read or parse parquet cache at {path}: {e}")
-        except Exception as e:
-            logger.warning(f"Error accessing file cache: {e}")
-        return None
+    def clear_portfolio_cache(self):
+        """
+        Invalidates the portfolio and margin cache from synchronous code.
+        The local copy is dropped at once; the shared L2 copy and other workers
+        follow in a background task, so async callers should await
+        invalidate_portfolio_cache instead.
+        """
+        logger.info("Clearing portfolio and margin cache due to order activity.")
+        self.tiered_cache.invalidate_nowait("portfolio")
 
-    async def _write_to_file_cache(self, path: str, data: List[Dict]):
-        """Write data to the file cache asynchronously."""
+    async def _coalesce(self, key: Tuple[Any, ...], factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Single-flight: concurrent calls with the same key await one shared task.
+
+        The shared task is shielded so a cancelled caller does not cancel the
+        fetch for the others; the entry is dropped as soon as the task finishes.
+        """
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(factory())
+            self._inflight[key] = task
+
+            def _release(t: asyncio.Task, k: Tuple[Any, ...] = key) -> None:
+                if self._inflight.get(k) is t:
+                    del self._inflight[k]
+
+            task.add_done_callback(_release)
+        else:
+            self.coalesced_requests += 1
+        return await asyncio.shield(task)
+
+    def _is_test_env(self) -> bool:
+        """True when running against a mocked IIFL service (skips on-disk caches)."""
+        return (getattr(self, '_test_mode', False) or
+                'Mock' in str(type(self.iifl)) or
+                'pytest' in str(type(self.iifl)))
+
+    async def _get_candle_columns(self, symbol: str, interval: str, from_date: str, to_date: str) -> Optional[Dict[str, Any]]:
+        """Coalesced entry point for ``_load_candle_columns`` (one provider call per identical request).
+
+        Intraday intervals that are multiples of ``resample_base_interval`` are
+        not fetched: they are resampled from the stored base series, so every
+        intraday timeframe of a symbol shares one provider call.
+        """
+        base = self.resample_base_interval
+        if self.resample_cache is not None and base and can_derive(interval, base):
+            base_cols = await self._get_candle_columns(symbol, base, from_date, to_date)
+            if base_cols is None or len(base_cols["ts"]) == 0:
+                return None
+            return self.resample_cache.get((str(symbol).upper(), base), base_cols, interval)
+        key = ("hist", str(symbol).upper(), interval, from_date, to_date)
+        return await self._coalesce(key, lambda: self._load_candle_columns(symbol, interval, from_date, to_date))
+
+    async def _load_candle_columns(self, symbol: str, interval: str, from_date: str, to_date: str) -> Optional[Dict[str, Any]]:
+        """Serve candles from the columnar store, fetching only the missing delta from the provider.
+
+        A series refreshed today is extended with candles from its last stored
+        bar on (intraday series at most once per bar, so new bars arrive during
+        the session). The delta re-requests that bar, which may have been stored
+        while still forming, and ``append`` overwrites it with its final values.
+        Anything older (or missing) triggers a full fetch that replaces the
+        stored series. Returns column arrays or None when no data.
+        """
+        store = self.candle_store
         try:
-            if not data:
-                return
-            timestamp = datetime.now().isoformat()
+            index = await asyncio.to_thread(store.get_index, symbol, interval)
+        except Exception as e:
+            logger.warning(f"Could not read candle index for {symbol} {interval}: {e}")
+            index = None
+
+        if index is not None and index.last_updated_dt.date() == datetime.now().date():
+            last_candle_dt = index.last_candle_dt
+            bar_seconds = interval_seconds(interval) or 86400
+            if bar_seconds < 86400:
+                # Intraday bars keep arriving during the day: re-read from the last
+                # candle's date (append replaces the last bar and adds newer ones)
+                # once a bar has passed
+                delta_from_date = last_candle_dt.strftime("%Y-%m-%d") if last_candle_dt else from_date
+                refreshed = (datetime.now() - index.last_updated_dt).total_seconds()
+                needs_delta = refreshed >= bar_seconds and to_date >= delta_from_date
+            else:
+                # New days are fetched from the last stored day, which is refreshed too
+                next_date = (last_candle_dt + timedelta(days=1)).strftime("%Y-%m-%d") if last_candle_dt else from_date
+                delta_from_date = last_candle_dt.strftime("%Y-%m-%d") if last_candle_dt else from_date
+                needs_delta = to_date > next_date
+            if needs_delta:
+                logger.info(f"Cache hit for {symbol}. Fetching delta (strict) from {delta_from_date} to {to_date}.")
+                delta_data = await self._fetch_once_no_fallback(symbol, interval, delta_from_date, to_date)
+                if delta_data:
+                    try:
+                        await asyncio.to_thread(store.append, symbol, interval, delta_data)
+                    except Exception as e:
+                        logger.warning(f"Could not append delta candles for {symbol} {interval}: {e}")
+            cols = await asyncio.to_thread(store.read_arrays, symbol, interval)
+            if cols is not None:
+                return cols
+
+        logger.info(f"Performing full historical data fetch (instrumentId-only) for {symbol} from {from_date} to {to_date}.")
+        full = await self._fetch_once_no_fallback(symbol, interval, from_date, to_date)
+        if not full:
+            return None
+        cols = await asyncio.to_thread(candles_to_columns, full)
+        if len(cols["ts"]) == 0:
+            return None
+        try:
+            await asyncio.to_thread(store.write_columns, symbol, interval, cols)
+        except Exception as e:
+            logger.warning(f"Could not write candle store for {symbol} {interval}: {e}")
+        return cols
 
-            json_path = os.path.splitext(path)[0] + ".json"
-            try:
-                content = await asyncio.to_thread(json.dumps, {"last_updated": timestamp, "data": data})
-                async with aiofiles.open(json_path, "w", encoding="utf-8") as f:
-                    await f.write(content)
-            except Exception as e:
-                logger.error(f"Could not write JSON cache at {json_path}: {e}")
+    async def get_indicator_state(self, symbol: str, interval: str, from_date: str, to_date: str) -> Optional["IndicatorState"]:
+        """Latest streaming indicators for a series, updated with only the candles added since the last call.
 
-            if HAS_PANDAS:
-                try:
-                    await asyncio.to_thread(self._write_parquet_file, path, data, timestamp)
-                except Exception as e:
-                    logger.warning(f"Could not write parquet cache at {path}: {e}")
+        Uses the same stored candles as ``get_historical_data_df``, so the values
+        equal a full recomputation over that history. Returns None without the
+        candle store (or in test mode) so callers fall back to the DataFrame path.
+        """
+        if self.candle_store is None or self.indicator_states is None or self._is_test_env():
+            return None
+        cols = await self._get_candle_columns(symbol, interval, from_date, to_date)
+        if cols is None or len(cols["ts"]) == 0:
+            return None
+        try:
+            # Bars count as closed only if they had closed when they were fetched
+            index = await asyncio.to_thread(self.candle_store.get_index, symbol, interval)
+            fetched_at = int((index.last_updated_dt - datetime(1970, 1, 1)).total_seconds()) if index else None
+            return await asyncio.to_thread(self.indicator_states.sync, symbol, interval, cols, fetched_at)
         except Exception as e:
-            logger.error(f"Could not write to file cache at {path}: {e}")
-
-    def _write_parquet_file(self, path: str, data: List[Dict], timestamp: str):
-        """Synchronous helper for writing parquet file."""
-        df = pd.DataFrame(data)
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'])
-            df = df.set_index('date')
-        df.attrs['last_updated'] = timestamp
-        df.to_parquet(path)
+            logger.warning(f"Indicator state update failed for {symbol} {interval}: {e}")
+            return None
 
     def _standardize_historical_payload(self, payload_list: List[Any]) -> List[Dict]:
         """Standardize historical data from various formats (list of dicts, list of lists)"""
@@ -207,75 +316,16 @@ class DataFetcher:
         return standardized_data
 
     async def _get_contract_id_map(self) -> Dict[str, Any]:
-        """Download and cache NSEEQ contract map tradingSymbol -> instrumentId."""
-        cache_key = "contracts_map_nseeq"
-        if self._is_cache_valid(cache_key, ttl_seconds=12 * 60 * 60):
-            cached = self._get_cache(cache_key)
-            if isinstance(cached, dict):
-                return cached
+        """Return the normalized NSEEQ contract map tradingSymbol -> instrumentId.
 
-        local_path = Path("data/contracts_nseeq.json")
-        id_map: Dict[str, Any] = {}
+        Served from the contract master's in-memory binary snapshot, which is
+        refreshed from the provider at most once per day.
+        """
         try:
-            if await aiofiles.os.path.exists(local_path):
-                try:
-                    async with aiofiles.open(local_path, "r", encoding="utf-8") as f:
-                        content = await f.read()
-                        file_data = await asyncio.to_thread(json.loads, content)
-                        if isinstance(file_data, dict):
-                            norm_map: Dict[str, str] = {}
-                            for k, v in file_data.items():
-                                try:
-                                    kk = str(k).upper().strip()
-                                    norm_map[kk] = str(v)
-                                    simple = ''.join(ch for ch in kk if ch.isalnum())
-                                    if simple and simple not in norm_map:
-                                        norm_map[simple] = str(v)
-                                except Exception:
-                                    continue
-                            id_map = norm_map
-                            if id_map:
-                                self._set_cache(cache_key, id_map, ttl_seconds=12 * 60 * 60)
-                                return id_map
-                except Exception as e:
-                    logger.warning(f"Could not read local contract map {local_path}: {e}")
-
-            url = "https://api.iiflcapital.com/v1/contractfiles/NSEEQ.json"
-            async with httpx.AsyncClient(timeout=20.0) as client:
-                resp = await client.get(url)
-                resp.raise_for_status()
-                data = resp.json()
-                contracts: List[Dict[str, Any]]
-                if isinstance(data, dict) and isinstance(data.get("result"), list):
-                    contracts = data.get("result", [])
-                elif isinstance(data, list):
-                    contracts = data
-                else:
-                    contracts = []
-
-                for c in contracts:
-                    try:
-                        tsym = c.get("tradingSymbol")
-                        exch = c.get("exchange")
-                        inst = c.get("instrumentId")
-                        if tsym and inst and (exch == "NSEEQ" or exch == "NSE"):
-                            id_map[str(tsym).upper()] = str(inst)
-                    except Exception:
-                        continue
-
-            try:
-                await aiofiles.os.makedirs(local_path.parent, exist_ok=True)
-                content = await asyncio.to_thread(json.dumps, id_map)
-                async with aiofiles.open(local_path, "w", encoding="utf-8") as f:
-                    await f.write(content)
-            except Exception as e:
-                logger.warning(f"Could not persist contract map to {local_path}: {e}")
-
-            if id_map:
-                self._set_cache(cache_key, id_map, ttl_seconds=12 * 60 * 60)
-            return id_map
+            snapshot = await get_contract_master().get_snapshot()
+            return snapshot.mapping if snapshot else {}
         except Exception as e:
-            logger.warning(f"Failed to download NSEEQ contracts: {str(e)}")
+            logger.warning(f"Failed to load NSEEQ contracts: {str(e)}")
             return {}
 
     async def _resolve_instrument_id(self, symbol: str) -> Optional[str]:
@@ -300,47 +350,10 @@ class DataFetcher:
         except ValueError:
             pass
 
-        base_symbol = str(symbol).upper().strip()
-        # Prepare simplified base (alnum only) to match normalized keys
-        simple_base = ''.join(ch for ch in base_symbol if ch.isalnum())
-
-        # Remove common suffixes for base lookup e.g. RELIANCE-EQ -> RELIANCE
-        base_part = base_symbol.split("-", 1)[0] if "-" in base_symbol else base_symbol
-        candidates: List[str] = []
-        # direct and common suffix variants
-        candidates.append(base_symbol)
-        candidates.append(base_part)
-        candidates.append(f"{base_part}-EQ")
-        candidates.append(f"{base_part}-BE")
-        candidates.append(f"{base_part}-SM")
-        # simple alnum-only forms
-        if simple_base:
-            candidates.append(simple_base)
-            candidates.append(f"{simple_base}EQ")
-
-        id_map = await self._get_contract_id_map()
-        if not id_map:
+        resolver = await self._get_instrument_resolver()
+        if resolver is None:
             return None
-
-        # Try candidates in order
-        for key in candidates:
-            try:
-                if key in id_map and id_map[key]:
-                    return str(id_map[key])
-            except Exception:
-                continue
-
-        # Fallback: any key that contains the alnum base or base_part
-        for k, v in id_map.items():
-            try:
-                ku = str(k).upper()
-                if simple_base and simple_base in ''.join(ch for ch in ku if ch.isalnum()):
-                    return str(v)
-                if base_part and base_part in ku:
-                    return str(v)
-            except Exception:
-                continue
-        return None
+        return resolver.resolve_id(symbol)
 
     async def _resolve_trading_symbol(self, symbol: str) -> Optional[str]:
         """Resolve a base symbol to the provider's tradingSymbol (e.g. 'RELIANCE-EQ').
@@ -349,32 +362,22 @@ class DataFetcher:
         """
         if not symbol:
             return None
-        base_symbol = str(symbol).upper().strip()
-        simple_base = ''.join(ch for ch in base_symbol if ch.isalnum())
+        resolver = await self._get_instrument_resolver()
+        if resolver is None:
+            return None
+        return resolver.resolve_trading_symbol(symbol)
+
+    async def _get_instrument_resolver(self) -> Optional[InstrumentResolver]:
+        """Return the shared resolver for the current contract map, rebuilding it after a refresh."""
         id_map = await self._get_contract_id_map()
         if not id_map:
             return None
-
-        candidates = [base_symbol, f"{base_symbol}-EQ", f"{base_symbol}-BE", f"{base_symbol}-SM"]
-        if simple_base:
-            candidates.append(simple_base)
-            candidates.append(f"{simple_base}EQ")
-
-        for candidate in candidates:
-            if candidate in id_map:
-                return candidate
-
-        # fallback: find any key that contains the base symbol or simplified base
-        for k in id_map.keys():
-            try:
-                ku = str(k).upper()
-                if simple_base and simple_base in ''.join(ch for ch in ku if ch.isalnum()):
-                    return k
-                if base_symbol in ku:
-                    return k
-            except Exception:
-                continue
-        return None
+        resolver = self._instrument_resolver
+        if resolver is None or resolver.mapping is not id_map:
+            resolver = await asyncio.to_thread(InstrumentResolver, id_map)
+            self._instrument_resolver = resolver
+            set_instrument_resolver(resolver)
+        return resolver
 
     async def get_historical_data_df(self, symbol: str, interval: str, from_date: str, to_date: str) -> Optional[pd.DataFrame]:
         """
@@ -386,6 +389,13 @@ class DataFetcher:
             return None
 
         try:
+            # Read straight from the columnar store when available (no list-of-dicts step)
+            if self.candle_store is not None and not self._is_test_env():
+                cols = await self._get_candle_columns(symbol, interval, from_date, to_date)
+                if cols is None:
+                    return pd.DataFrame()
+                return columns_to_frame(cols, dropna=True)
+
             # Pass the specific date range to the underlying fetcher
             raw_data = await self.get_historical_data(symbol, interval, from_date=from_date, to_date=to_date)
 
@@ -455,36 +465,11 @@ class DataFetcher:
                 to_date = datetime.now().strftime("%Y-%m-%d")
                 from_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
 
-            is_test_env = (getattr(self, '_test_mode', False) or 
-                          'Mock' in str(type(self.iifl)) or 
-                          'pytest' in str(type(self.iifl)))
-            
-            if not is_test_env:
-                file_cache_path = self._get_file_cache_path(symbol, interval)
-                cached_file_content = await self._read_from_file_cache(file_cache_path)
-            else:
-                cached_file_content = None
+            is_test_env = self._is_test_env()
 
-            if cached_file_content:
-                last_updated = datetime.fromisoformat(cached_file_content.get("last_updated", "1970-01-01T00:00:00"))
-                cached_data = cached_file_content.get("data", [])
-
-                if last_updated.date() == datetime.now().date() and cached_data:
-                    last_candle_date_str = cached_data[-1].get("date", "1970-01-01")
-                    last_candle_dt = datetime.fromisoformat(last_candle_date_str.split("T")[0])
-                    
-                    delta_from_date = (last_candle_dt + timedelta(days=1)).strftime("%Y-%m-%d")
-                    
-                    if to_date > delta_from_date:
-                        logger.info(f"Cache hit for {symbol}. Fetching delta (strict) from {delta_from_date} to {to_date}.")
-                        delta_data = await self._fetch_once_no_fallback(symbol, interval, delta_from_date, to_date)
-                        
-                        if delta_data:
-                            combined_data = cached_data + delta_data
-                            await self._write_to_file_cache(file_cache_path, combined_data)
-                            return combined_data
-                    
-                    return cached_data
+            if not is_test_env and self.candle_store is not None:
+                cols = await self._get_candle_columns(symbol, interval, from_date, to_date)
+                return columns_to_records(cols) if cols is not None else []
 
             logger.info(f"Performing full historical data fetch (instrumentId-only) for {symbol} from {from_date} to {to_date}.")
             resolved_id = await self._resolve_instrument_id(symbol)
@@ -501,8 +486,6 @@ class DataFetcher:
                             break
                     standardized = self._standardize_historical_payload(raw_list or [])
                     if standardized:
-                        if not is_test_env:
-                            await self._write_to_file_cache(file_cache_path, standardized)
                         return standardized
             else:
                 logger.warning(f"Could not resolve symbol {symbol} to instrumentId")
@@ -535,30 +518,11 @@ class DataFetcher:
         async def _process_symbol(sym: str):
             async with semaphore:
                 try:
-                    file_cache_path = self._get_file_cache_path(sym, interval)
-                    cached_file_content = await self._read_from_file_cache(file_cache_path)
-                    if cached_file_content:
-                        last_updated = datetime.fromisoformat(cached_file_content.get("last_updated", "1970-01-01T00:00:00"))
-                        cached_data = cached_file_content.get("data", [])
-                        if last_updated.date() == datetime.now().date() and cached_data:
-                            last_candle_date_str = cached_data[-1].get("date", "1970-01-01")
-                            last_candle_dt = datetime.fromisoformat(last_candle_date_str.split("T")[0])
-                            delta_from_date = (last_candle_dt + timedelta(days=1)).strftime("%Y-%m-%d")
-                            if to_date > delta_from_date:
-                                delta_data = await self._fetch_once_no_fallback(sym, interval, delta_from_date, to_date)
-                                if delta_data:
-                                    combined = cached_data + delta_data
-                                    await self._write_to_file_cache(file_cache_path, combined)
-                                    results[sym] = combined
-                                    return
-                            results[sym] = cached_data
-                            return
-                    full = await self._fetch_once_no_fallback(sym, interval, from_date, to_date)
-                    if full:
-                        await self._write_to_file_cache(file_cache_path, full)
-                        results[sym] = full
+                    if self.candle_store is not None:
+                        cols = await self._get_candle_columns(sym, interval, from_date, to_date)
+                        results[sym] = columns_to_records(cols) if cols is not None else []
                     else:
-                        results[sym] = []
+                        results[sym] = await self._fetch_once_no_fallback(sym, interval, from_date, to_date) or []
                 except Exception as e:
                     logger.error(f"Batch fetch error for {sym}: {e}")
                     results[sym] = []
@@ -578,9 +542,25 @@ class DataFetcher:
             # Skip cache in test environment to ensure mocks work properly
             is_test_mode = (self._test_mode or 'Mock' in str(type(self.iifl)))
             
-            if not is_test_mode and self._is_cache_valid(cache_key, 5):  # 5 sec cache
-                return self.cache[cache_key]
-            
+            if not is_test_mode:
+                cached = self._get_cache(cache_key)  # 5 sec cache
+                if cached is not None:
+                    return cached
+
+            return await self._coalesce(("price", symbol), lambda: self._fetch_live_price(symbol, is_test_mode))
+        except Exception as e:
+            logger.error(f"Error fetching live price for {symbol}: {str(e)}")
+            return None
+
+    async def _fetch_live_price(self, symbol: str, is_test_mode: bool) -> Optional[float]:
+        """Fetch a live price (Redis L2, then provider) and cache it for 5 seconds."""
+        try:
+            cache_key = f"price_{symbol}"
+            if not is_test_mode:
+                shared = await self._get_shared_cache(cache_key, 5)
+                if shared is not None:
+                    return float(shared)
+
             # Support tests that mock get_market_data directly
             if hasattr(self.iifl, 'get_market_data'):
                 try:
@@ -588,7 +568,7 @@ class DataFetcher:
                     if legacy and legacy.get("LastTradedPrice"):
                         price = float(legacy.get("LastTradedPrice"))
                         if not is_test_mode:
-                            self._set_cache(cache_key, price, 5)
+                            await self._set_shared_cache(cache_key, price, 5)
                         return price
                 except Exception:
                     pass
@@ -621,7 +601,7 @@ class DataFetcher:
                         price = q.get(key)
                         break
                 if price is not None:
-                    self._set_cache(cache_key, float(price), 5)
+                    await self._set_shared_cache(cache_key, float(price), 5)
                     return float(price)
 
             if result:
@@ -731,8 +711,22 @@ class DataFetcher:
         try:
             cache_key = f"depth_{symbol}"
             
-            if self._is_cache_valid(cache_key, 2):  # 2 sec cache
-                return self.cache[cache_key]
+            cached = self._get_cache(cache_key)  # 2 sec cache
+            if cached is not None:
+                return cached
+
+            return await self._coalesce(("depth", symbol), lambda: self._fetch_market_depth(symbol))
+        except Exception as e:
+            logger.error(f"Error fetching market depth for {symbol}: {str(e)}")
+            return None
+
+    async def _fetch_market_depth(self, symbol: str) -> Optional[Dict]:
+        """Fetch market depth (Redis L2, then provider) and cache it for 2 seconds."""
+        try:
+            cache_key = f"depth_{symbol}"
+            shared = await self._get_shared_cache(cache_key, 2)
+            if shared is not None:
+                return shared
             # Resolve to instrumentId only
             resolved_id = await self._resolve_instrument_id(symbol)
             if not resolved_id:
@@ -744,7 +738,7 @@ class DataFetcher:
             if result and result.get("status") == "Ok":
                 depth_data = result.get("resultData")
                 if depth_data:
-                    self._set_cache(cache_key, depth_data, 2)
+                    await self._set_shared_cache(cache_key, depth_data, 2)
                     return depth_data
             elif result:
                 logger.warning(f"Failed to fetch market depth for {symbol}: {result.get('emsg', 'Unknown API error')}")
@@ -865,13 +859,10 @@ class DataFetcher:
     async def get_portfolio_data(self, force_refresh: bool = False) -> Dict[str, Any]:
         """Get complete portfolio data (holdings + positions)"""
         try:
-            # If force, clear in-memory and Redis caches before fetching
+            # If force, clear in-memory and Redis caches (in every worker) before fetching
             if force_refresh:
                 try:
-                    self._portfolio_cache = None
-                    self._margin_cache = None
-                    self._portfolio_cache_date = None
-                    self._margin_cache_date = None
+                    await self.invalidate_portfolio_cache()
                     # Best-effort Redis cache clear
                     try:
                         from services.redis_service import get_redis_service, CacheKeys  # type: ignore
@@ -898,6 +889,15 @@ class DataFetcher:
                 (bool(self._portfolio_cache.get("holdings")) or bool(self._portfolio_cache.get("positions")))):
                 return self._portfolio_cache
 
+            # Another worker may already have fetched today's portfolio (Redis L2)
+            if not force_refresh:
+                shared = await self.tiered_cache.get("portfolio", f"summary_{today.isoformat()}", PORTFOLIO_L2_TTL)
+                if isinstance(shared, dict) and (shared.get("holdings") or shared.get("positions")):
+                    self._portfolio_cache = shared
+                    self._portfolio_cache_at = datetime.now()
+                    self._portfolio_cache_date = today
+                    return shared
+
             # Fetch holdings and positions concurrently
             holdings_task = self.iifl.get_holdings()
             positions_task = self.iifl.get_positions()
@@ -979,6 +979,11 @@ class DataFetcher:
             self._portfolio_cache = portfolio_data
             self._portfolio_cache_at = datetime.now()
             self._portfolio_cache_date = today
+            if portfolio_data["holdings"] or portfolio_data["positions"]:
+                try:
+                    await self.tiered_cache.set("portfolio", f"summary_{today.isoformat()}", portfolio_data, PORTFOLIO_L2_TTL)
+                except Exception as e:
+                    logger.debug(f"Could not share portfolio cache: {e}")
             return portfolio_data
             
         except Exception as e:
@@ -1182,5 +1187,4 @@ class DataFetcher:
     
     def clear_cache(self):
         """Clear all cached data"""
-        self.cache.clear()
-        self.cache_expiry.clear()
\ No newline at end of file
+        self.cache.clear()
\ No newline at end of file
@@ -0,0 +1,237 @@
+"""
+Shared outbound HTTP transport.
+
+All services and the Telegram bot get their ``httpx.AsyncClient`` from
+``get_http_client()`` instead of opening one per call, so TCP/TLS connections
+to IIFL, the contract host and our own API are kept alive and reused. The
+client:
+
+- bounds the pool (``HTTP_MAX_CONNECTIONS`` / ``HTTP_MAX_KEEPALIVE`` /
+  ``HTTP_KEEPALIVE_EXPIRY``) and caps concurrent requests per host
+  (``HTTP_MAX_CONNECTIONS_PER_HOST``)
+- negotiates HTTP/2 when the ``h2`` package is installed and ``HTTP2_ENABLED``
+  is not false
+- records per-host timings from httpcore trace events: connect (includes DNS),
+  TLS handshake and time to first byte; ``register_timing_hook`` adds callbacks
+
+There is one client per event loop. ``close_http_client()`` runs at shutdown.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2 support)
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+TimingHook = Callable[[str, Dict[str, float]], None]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, "") or default)
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, "") or default)
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+class _HostStats:
+    __slots__ = ("requests", "connects", "tls_handshakes", "connect_ms", "tls_ms", "ttfb_ms", "errors")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.connects = 0
+        self.tls_handshakes = 0
+        self.connect_ms = 0.0
+        self.tls_ms = 0.0
+        self.ttfb_ms = 0.0
+        self.errors = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "new_connections": self.connects,
+            "tls_handshakes": self.tls_handshakes,
+            "connection_reuse_rate": round(1 - self.connects / self.requests, 4) if self.requests else 0.0,
+            "avg_connect_ms": round(self.connect_ms / self.connects, 2) if self.connects else 0.0,
+            "avg_tls_ms": round(self.tls_ms / self.tls_handshakes, 2) if self.tls_handshakes else 0.0,
+            "avg_ttfb_ms": round(self.ttfb_ms / self.requests, 2) if self.requests else 0.0,
+            "errors": self.errors,
+        }
+
+
+_host_stats: Dict[str, _HostStats] = {}
+_timing_hooks: List[TimingHook] = []
+
+
+def register_timing_hook(hook: TimingHook) -> None:
+    """Call ``hook(host, timings)`` after every response; timings are in milliseconds."""
+    _timing_hooks.append(hook)
+
+
+class _RequestTrace:
+    """httpcore ``trace`` extension callback collecting one request's phase timings."""
+
+    def __init__(self, host: str):
+        self.host = host
+        self.started: Dict[str, float] = {}
+        self.timings: Dict[str, float] = {}
+        self.sent_at = time.perf_counter()
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        now = time.perf_counter()
+        # e.g. "connection.connect_tcp.started", "http11.receive_response_headers.complete"
+        scope, _, phase = event_name.rpartition(".")
+        step = scope.rpartition(".")[2]
+        if phase == "started":
+            self.started[step] = now
+        elif phase == "complete" and step in self.started:
+            elapsed = (now - self.started[step]) * 1000
+            if step == "connect_tcp":
+                self.timings["connect_ms"] = elapsed
+            elif step == "start_tls":
+                self.timings["tls_ms"] = elapsed
+            elif step == "receive_response_headers":
+                sent_at = self.started.get("send_request_headers", self.sent_at)
+                self.timings["ttfb_ms"] = (now - sent_at) * 1000
+
+    def record(self, failed: bool = False) -> None:
+        stats = _host_stats.setdefault(self.host, _HostStats())
+        stats.requests += 1
+        if failed:
+            stats.errors += 1
+        if "connect_ms" in self.timings:
+            stats.connects += 1
+            stats.connect_ms += self.timings["connect_ms"]
+        if "tls_ms" in self.timings:
+            stats.tls_handshakes += 1
+            stats.tls_ms += self.timings["tls_ms"]
+        stats.ttfb_ms += self.timings.get("ttfb_ms", 0.0)
+        for hook in _timing_hooks:
+            try:
+                hook(self.host, dict(self.timings))
+            except Exception as e:
+                logger.debug(f"HTTP timing hook failed: {e}")
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body wrapper that frees the per-host slot once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """``AsyncHTTPTransport`` with a per-host concurrency cap and timing trace."""
+
+    def __init__(self, per_host_limit: int, transport: Optional[httpx.AsyncBaseTransport] = None, **transport_kwargs: Any):
+        self._transport = transport or httpx.AsyncHTTPTransport(**transport_kwargs)
+        self.per_host_limit = per_host_limit
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+        trace = _RequestTrace(host)
+        request.extensions = {**request.extensions, "trace": trace}
+        await slot.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            slot.release()
+            trace.record(failed=True)
+            raise
+        trace.record()
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, slot.release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = H2_AVAILABLE and os.getenv("HTTP2_ENABLED", "true").lower() != "false"
+    limits = httpx.Limits(
+        max_connections=_env_int("HTTP_MAX_CONNECTIONS", 100),
+        max_keepalive_connections=_env_int("HTTP_MAX_KEEPALIVE", 20),
+        keepalive_expiry=_env_float("HTTP_KEEPALIVE_EXPIRY", 30.0),
+    )
+    transport = PooledTransport(
+        per_host_limit=_env_int("HTTP_MAX_CONNECTIONS_PER_HOST", 10),
+        http2=http2,
+        limits=limits,
+    )
+    return httpx.AsyncClient(transport=transport, timeout=DEFAULT_TIMEOUT)
+
+
+_clients: Dict[int, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The shared client for the running event loop (created on first use)."""
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(id(loop))
+    if entry is not None and entry[0] is loop and not entry[1].is_closed:
+        return entry[1]
+    client = _build_client()
+    _clients[id(loop)] = (loop, client)
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the shared client of the running event loop, if any."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    entry = _clients.pop(id(loop), None)
+    if entry is not None and entry[0] is loop and not entry[1].is_closed:
+        await entry[1].aclose()
+
+
+def get_http_stats() -> Dict[str, Any]:
+    """Per-host request counts, connection reuse and average phase timings."""
+    return {
+        "http2": H2_AVAILABLE and os.getenv("HTTP2_ENABLED", "true").lower() != "false",
+        "hosts": {host: s.as_dict() for host, s in list(_host_stats.items())},
+    }
@@ -7,10 +7,17 @@ from datetime import datetime, timedelta
 import logging
 import os
 import time
-from collections import deque
 from services.logging_service import trading_logger
-import aiofiles
-import aiofiles.os
+from services.http_transport import close_http_client as close_shared_http_client
+from services.http_transport import get_http_client as get_shared_http_client
+from services.instrument_resolver import get_instrument_resolver
+from services.rate_limiter import build_iifl_rate_limiter, classify_iifl_request
+from services.request_dispatcher import (
+    PRIORITY_LANES,
+    RequestPriority,
+    build_iifl_dispatcher,
+    resolve_priority,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -72,17 +79,10 @@ class IIFLAPIService:
             self.auth_code_expiry: Optional[datetime] = None
             self.http_client: Optional[httpx.AsyncClient] = None
             self.get_user_session_endpoint = "/getusersession"
-            # Simple global rate limiter (per-process) to limit IIFL calls
-            self._req_timestamps_second = deque()
-            self._req_timestamps_minute = deque()
-            try:
-                self.max_requests_per_second = int(os.getenv("IIFL_MAX_RPS", "3") or "3")
-            except Exception:
-                self.max_requests_per_second = 3
-            try:
-                self.max_requests_per_minute = int(os.getenv("IIFL_MAX_RPM", "60") or "60")
-            except Exception:
-                self.max_requests_per_minute = 60
+            # Token-bucket limiter shared with every other IIFL caller through Redis
+            self.rate_limiter = build_iifl_rate_limiter()
+            # Priority classes so orders are dispatched ahead of bulk data pulls
+            self.dispatcher = build_iifl_dispatcher()
             # Initialize an auth-code expiry hint
             try:
                 self._initialize_auth_expiry()
@@ -164,18 +164,14 @@ class IIFLAPIService:
             logger.error(f"Could not save token to cache: {e}")
     
     async def get_http_client(self) -> httpx.AsyncClient:
-        """Get or create an httpx.AsyncClient instance with timeout."""
-        if self.http_client is None or self.http_client.is_closed:
-            # Add 10 second timeout to prevent hanging
-            timeout = httpx.Timeout(10.0, connect=5.0)
-            self.http_client = httpx.AsyncClient(timeout=timeout)
+        """Return the process-wide pooled client (keep-alive, HTTP/2, 10s timeout)."""
+        self.http_client = get_shared_http_client()
         return self.http_client
 
     async def close_http_client(self):
-        """Close the httpx.AsyncClient instance if it exists."""
-        if self.http_client and not self.http_client.is_closed:
-            await self.http_client.aclose()
-            self.http_client = None
+        """Close the shared pooled client; the next request opens a new one."""
+        self.http_client = None
+        await close_shared_http_client()
 
     def sha256_hash(self, input_string: str) -> str:
         """Returns the SHA-256 hash of the input string."""
@@ -506,8 +502,18 @@ class IIFLAPIService:
         auth_result = await self.authenticate()
         return "access_token" in auth_result if isinstance(auth_result, dict) else False
     
-    async def _make_api_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Optional[Dict]:
-        """Make an authenticated API request using the session token."""
+    async def _make_api_request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        priority: Optional[RequestPriority] = None,
+    ) -> Optional[Dict]:
+        """Make an authenticated API request using the session token.
+
+        The request waits for a dispatch slot of its priority class first (see
+        ``services.request_dispatcher``), then for a rate-limit token.
+        """
         # In SAFE_MODE, never make external calls. Return a minimal stub or None.
         if getattr(self, "safe_mode", False):
             logger.warning(f"SAFE_MODE active - skipping external call {method} {endpoint}")
@@ -522,6 +528,15 @@ class IIFLAPIService:
             key = "/" + endpoint.lstrip("/")
             return stub_map.get(key, None)
 
+        priority = resolve_priority(method, endpoint, priority)
+        async with self.dispatcher.slot(priority) as queued:
+            if queued > 1.0:
+                logger.debug(f"IIFL {priority.name} request {method.upper()} {endpoint} queued {queued:.2f}s")
+            return await self._send_api_request(method, endpoint, data, priority)
+
+    async def _send_api_request(
+        self, method: str, endpoint: str, data: Optional[Dict], priority: RequestPriority
+    ) -> Optional[Dict]:
         if not await self._ensure_authenticated():
             return None
         
@@ -597,7 +612,7 @@ class IIFLAPIService:
                 while True:
                     attempt_start = time.perf_counter()
                     # Throttle globally to avoid exceeding provider rate limits
-                    await self._throttle_before_request()
+                    await self._throttle_before_request(method, endpoint, priority)
                     # Recompute headers in case token changed after re-auth
                     token_value = self.session_token or ""
                     auth_header = token_value if str(token_value).lower().startswith("bearer ") else (f"Bearer {token_value}" if token_value else "")
@@ -816,44 +831,26 @@ class IIFLAPIService:
             
             return None
 
-    async def _throttle_before_request(self) -> None:
-        """Naive async rate limiter: caps requests per second and per minute.
+    async def _throttle_before_request(
+        self, method: str = "GET", endpoint: str = "", priority: Optional[RequestPriority] = None
+    ) -> None:
+        """Wait for a token from the shared IIFL rate limiter.
 
-        Uses in-memory deques; safe within a single process. Sleeps just enough
-        to honor both limits. Limits are configurable via env IIFL_MAX_RPS and IIFL_MAX_RPM.
+        The bucket comes from ``classify_iifl_request`` and the lane from the
+        request's priority class. Limits are configurable via env IIFL_MAX_RPS,
+        IIFL_MAX_RPM and IIFL_{ORDERS,QUOTES,HISTORICAL}_MAX_RPS.
         """
         try:
-            now = time.monotonic()
-            # Prune old timestamps
-            one_sec_ago = now - 1.0
-            one_min_ago = now - 60.0
-            while self._req_timestamps_second and self._req_timestamps_second[0] < one_sec_ago:
-                self._req_timestamps_second.popleft()
-            while self._req_timestamps_minute and self._req_timestamps_minute[0] < one_min_ago:
-                self._req_timestamps_minute.popleft()
-
-            # If under limits, record and return fast
-            if (len(self._req_timestamps_second) < self.max_requests_per_second and
-                len(self._req_timestamps_minute) < self.max_requests_per_minute):
-                self._req_timestamps_second.append(now)
-                self._req_timestamps_minute.append(now)
-                return
-
-            # Compute minimal sleep needed to drop under both limits
-            sleep_until = 0.0
-            if len(self._req_timestamps_second) >= self.max_requests_per_second:
-                sleep_until = max(sleep_until, self._req_timestamps_second[0] + 1.0)
-            if len(self._req_timestamps_minute) >= self.max_requests_per_minute:
-                sleep_until = max(sleep_until, self._req_timestamps_minute[0] + 60.0)
-            delay = max(0.0, sleep_until - now)
-            if delay > 0:
-                await asyncio.sleep(min(delay, 1.0))  # cap individual sleeps to keep responsive
-            # After sleeping, record this request time
-            now2 = time.monotonic()
-            self._req_timestamps_second.append(now2)
-            self._req_timestamps_minute.append(now2)
-        except Exception:
+            bucket, _ = classify_iifl_request(method, endpoint)
+            lane = PRIORITY_LANES[resolve_priority(method, endpoint, priority)]
+            waited = await self.rate_limiter.acquire(bucket, lane)
+            if waited > 1.0:
+                logger.debug(f"IIFL rate limiter delayed {method.upper()} {endpoint} by {waited:.2f}s ({bucket}/{lane})")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
             # Best-effort limiter; never block requests on limiter errors
+            logger.debug(f"IIFL rate limiter error: {e}")
             return
     
     # User Profile & Limits
@@ -872,15 +869,17 @@ class IIFLAPIService:
     # Order Management
     async def place_order(self, order_data: Dict) -> Optional[Dict]:
         """Place a new order"""
-        return await self._make_api_request("POST", "/orders", order_data)
+        return await self._make_api_request("POST", "/orders", order_data, priority=RequestPriority.CRITICAL)
     
     async def modify_order(self, broker_order_id: str, order_data: Dict) -> Optional[Dict]:
         """Modify an existing order"""
-        return await self._make_api_request("PUT", f"/orders/{broker_order_id}", order_data)
+        return await self._make_api_request(
+            "PUT", f"/orders/{broker_order_id}", order_data, priority=RequestPriority.CRITICAL
+        )
     
     async def cancel_order(self, broker_order_id: str) -> Optional[Dict]:
         """Cancel an existing order"""
-        return await self._make_api_request("DELETE", f"/orders/{broker_order_id}")
+        return await self._make_api_request("DELETE", f"/orders/{broker_order_id}", priority=RequestPriority.CRITICAL)
     
     async def get_orders(self) -> Optional[Dict]:
         """Get all orders for today"""
@@ -1038,8 +1037,8 @@ class IIFLAPIService:
             payload["instrumentId"] = str(symbol)
         else:
             # Resolve symbol to instrumentId - no symbol fallback
-            local_map = await self._load_normalized_contract_map()
-            mapped = self._resolve_instrument_id_with_variants(symbol, local_map)
+            resolver = await get_instrument_resolver()
+            mapped = resolver.resolve_id(symbol)
             if mapped:
                 payload["instrumentId"] = str(mapped)
             else:
@@ -1077,8 +1076,8 @@ class IIFLAPIService:
         # Ensure all instruments are strings
         instrument_strs = [str(instr) for instr in instruments]
 
-        # Load normalized contract map with variant matching
-        local_map = await self._load_normalized_contract_map()
+        # Shared indexed resolver over the normalized contract map
+        resolver = await get_instrument_resolver()
 
         try:
             raw_obj_list = []
@@ -1088,7 +1087,7 @@ class IIFLAPIService:
                 if str(s).isdigit():
                     obj["instrumentId"] = str(int(s))
                 else:
-                    mapped = self._resolve_instrument_id_with_variants(s, local_map)
+                    mapped = resolver.resolve_id(s)
                     if mapped:
                         obj["instrumentId"] = str(mapped)
                     else:
@@ -1117,8 +1116,8 @@ class IIFLAPIService:
                 payload["instrumentId"] = str(int(instrument))
             else:
                 # Resolve symbol to instrumentId using variant matching
-                local_map = await self._load_normalized_contract_map()
-                mapped = self._resolve_instrument_id_with_variants(instrument, local_map)
+                resolver = await get_instrument_resolver()
+                mapped = resolver.resolve_id(instrument)
                 if mapped:
                     payload["instrumentId"] = str(mapped)
                 else:
@@ -1178,58 +1177,6 @@ class IIFLAPIService:
         except:
             return False
     
-    def _resolve_instrument_id_with_variants(self, symbol: str, local_map: Dict[str, str]) -> Optional[str]:
-        """Resolve symbol to instrumentId using same logic as DataFetcher for consistency"""
-        if not symbol:
-            return None
-        base_symbol = str(symbol).upper().strip()
-        simple_base = ''.join(ch for ch in base_symbol if ch.isalnum())
-        base_part = base_symbol.split("-", 1)[0] if "-" in base_symbol else base_symbol
-        
-        candidates = [
-            base_symbol, base_part, f"{base_part}-EQ", f"{base_part}-BE", f"{base_part}-SM"
-        ]
-        if simple_base:
-            candidates.append(simple_base)
-            candidates.append(f"{simple_base}EQ")
-        
-        # Try candidates in order
-        for candidate in candidates:
-            if candidate in local_map:
-                return str(local_map[candidate])
-        
-        # Fallback: contains match
-        for k, v in local_map.items():
-            ku = k.upper()
-            if simple_base and simple_base in ''.join(ch for ch in ku if ch.isalnum()):
-                return str(v)
-            if base_part and base_part in ku:
-                return str(v)
-        return None
-
-    async def _load_normalized_contract_map(self) -> Dict[str, str]:
-        """Load and normalize contract map with same logic as DataFetcher"""
-        local_map: Dict[str, str] = {}
-        try:
-            local_path = os.path.join(os.getcwd(), "data", "contracts_nseeq.json")
-            if await aiofiles.os.path.exists(local_path):
-                async with aiofiles.open(local_path, "r", encoding="utf-8") as f:
-                    content = await f.read()
-                    file_data = await asyncio.to_thread(json.loads, content)
-                    for k, v in file_data.items():
-                        try:
-                            kk = str(k).upper().strip()
-                            local_map[kk] = str(v)
-                            # Also store alnum-only variant
-                            simple = ''.join(ch for ch in kk if ch.isalnum())
-                            if simple and simple not in local_map:
-                                local_map[simple] = str(v)
-                        except Exception:
-                            continue
-        except Exception:
-            pass
-        return local_map
-
     async def force_auth_code_refresh(self) -> dict:
         """Force refresh of auth code from env file"""
         logger.info("Refreshing auth code from env file")
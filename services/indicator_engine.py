@@ -0,0 +1,367 @@
+"""
+Batched technical indicators over a (symbols x bars) NumPy panel.
+
+``StrategyService.calculate_indicators`` used to make ~15 separate ``ta``
+passes per symbol on its own DataFrame. Here the whole universe is stacked into
+one right-aligned float64 panel (latest bar in the last column, shorter
+histories left-padded with NaN) and every indicator is computed once for all
+rows: rolling windows are strided views, and the recursive ones (EMA, Wilder
+RSI/ATR) advance one bar at a time across all symbols together.
+
+Outputs follow ``ta``'s definitions exactly (``adjust=False`` EWMs with
+``min_periods``, population std for Bollinger, ATR seeded with the mean true
+range and zero before that) and reproduce pandas' arithmetic order, so a row of
+the panel matches what the per-symbol ``ta`` path returned for the same
+candles. The one known gap is Bollinger std in the bars right after a
+perfectly flat 20-bar window, which can differ in the last few ulps. Histories must be contiguous: only
+leading NaN padding is supported.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+OHLCV_FIELDS = ("open", "high", "low", "close", "volume")
+
+# Columns added by ``compute_indicators``, in the order calculate_indicators adds them
+INDICATOR_COLUMNS = (
+    "ema_9", "ema_21", "ema_50", "sma_20",
+    "bb_upper", "bb_middle", "bb_lower", "bb_width",
+    "rsi", "macd", "macd_signal", "macd_histogram",
+    "atr", "volume_sma", "volume_ratio",
+    "support", "resistance", "price_change", "price_momentum",
+)
+
+
+@dataclass
+class OHLCVPanel:
+    """Right-aligned OHLCV arrays of shape (len(symbols), bars)."""
+
+    symbols: List[str]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    # Column of the first real bar in each row (everything before it is NaN)
+    starts: np.ndarray
+
+    @property
+    def bars(self) -> int:
+        return self.close.shape[1]
+
+    def lengths(self) -> np.ndarray:
+        return self.bars - self.starts
+
+
+def _column(data: Any, field: str) -> np.ndarray:
+    if isinstance(data, list):
+        return np.array([float(row.get(field, np.nan)) for row in data], dtype=np.float64)
+    values = data[field]
+    if hasattr(values, "to_numpy"):
+        values = values.to_numpy(dtype=np.float64)
+    return np.asarray(values, dtype=np.float64)
+
+
+def build_panel(series: Mapping[str, Any], bars: Optional[int] = None) -> OHLCVPanel:
+    """Stack per-symbol OHLCV (DataFrame, dict of arrays or list of candle dicts)
+    into one panel, keeping the last ``bars`` candles (default: the longest history)."""
+    symbols = list(series.keys())
+    columns = {field: [_column(series[s], field) for s in symbols] for field in OHLCV_FIELDS}
+    lengths = [len(c) for c in columns["close"]]
+    width = bars if bars is not None else max(lengths, default=0)
+    arrays = {}
+    for field, rows in columns.items():
+        panel = np.full((len(symbols), width), np.nan)
+        for i, row in enumerate(rows):
+            tail = row[-width:] if width else row[:0]
+            if len(tail):
+                panel[i, width - len(tail):] = tail
+        arrays[field] = panel
+    starts = np.array([width - min(n, width) for n in lengths], dtype=np.int64)
+    return OHLCVPanel(symbols=symbols, starts=starts, **arrays)
+
+
+# --- primitives (all operate along the last axis of a 2D array) ---
+def _mask_before(values: np.ndarray, first_valid: np.ndarray) -> np.ndarray:
+    """Set every column before ``first_valid`` (per row) to NaN, in place."""
+    values[np.arange(values.shape[1])[None, :] < first_valid[:, None]] = np.nan
+    return values
+
+
+def _ewm(x: np.ndarray, alpha: float, starts: np.ndarray, min_periods: int) -> np.ndarray:
+    """``Series.ewm(alpha=..., adjust=False, min_periods=...).mean()`` for every row."""
+    # Same arithmetic as pandas: alpha round-trips through the centre of mass
+    com = (1.0 - alpha) / alpha
+    alpha = 1.0 / (1.0 + com)
+    old_wt = 1.0 - alpha
+    denom = old_wt + alpha
+    out = np.empty_like(x)
+    prev = np.full(x.shape[0], np.nan)
+    with np.errstate(invalid="ignore"):
+        for t in range(x.shape[1]):
+            cur = x[:, t]
+            blended = (old_wt * prev + alpha * cur) / denom
+            step = np.where(np.isnan(prev) | (prev == cur), cur, blended)
+            prev = np.where(np.isnan(cur), prev, step)
+            out[:, t] = prev
+    return _mask_before(out, starts + min_periods - 1)
+
+
+def _ema(x: np.ndarray, span: int, starts: np.ndarray) -> np.ndarray:
+    return _ewm(x, 2.0 / (span + 1.0), starts, span)
+
+
+def _rolling(x: np.ndarray, window: int, reducer) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    if x.shape[1] >= window:
+        with np.errstate(invalid="ignore"):
+            out[:, window - 1:] = reducer(sliding_window_view(x, window, axis=1), axis=-1)
+    return out
+
+
+def _kahan(total: np.ndarray, comp: np.ndarray, value: np.ndarray, valid: np.ndarray) -> None:
+    """``total += value`` with Kahan compensation, in place, where ``valid``."""
+    y = value - comp
+    t = total + y
+    comp[valid] = (t - total - y)[valid]
+    total[valid] = t[valid]
+
+
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """``Series.rolling(window).mean()`` for every row.
+
+    Mirrors pandas' online algorithm (compensated add/remove, flat-window and
+    sign guards) rather than summing each window, so results match bit for bit.
+    """
+    n_rows, n_bars = x.shape
+    out = np.full_like(x, np.nan)
+    total, add_comp, remove_comp = np.zeros(n_rows), np.zeros(n_rows), np.zeros(n_rows)
+    nobs, negatives, same = np.zeros(n_rows), np.zeros(n_rows), np.zeros(n_rows)
+    prev = x[:, 0].copy() if n_bars else np.zeros(n_rows)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for t in range(n_bars):
+            if t >= window:
+                old = x[:, t - window]
+                valid = ~np.isnan(old)
+                _kahan(total, remove_comp, -old, valid)
+                nobs -= valid
+                negatives -= valid & np.signbit(old)
+            cur = x[:, t]
+            valid = ~np.isnan(cur)
+            _kahan(total, add_comp, cur, valid)
+            nobs += valid
+            negatives += valid & np.signbit(cur)
+            same = np.where(valid, np.where(cur == prev, same + 1, 1), same)
+            prev = np.where(valid, cur, prev)
+            mean = np.where(same >= nobs, prev, total / nobs)
+            mean = np.where((negatives == 0) & (mean < 0), 0.0, mean)
+            mean = np.where((negatives == nobs) & (mean > 0), 0.0, mean)
+            out[:, t] = np.where(nobs >= window, mean, np.nan)
+    return out
+
+
+def _rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """``Series.rolling(window).std(ddof=0)`` for every row, via pandas' online Welford update."""
+    n_rows, n_bars = x.shape
+    out = np.full_like(x, np.nan)
+    mean, ssqdm = np.zeros(n_rows), np.zeros(n_rows)
+    add_comp, remove_comp = np.zeros(n_rows), np.zeros(n_rows)
+    nobs, same = np.zeros(n_rows), np.zeros(n_rows)
+    prev = x[:, 0].copy() if n_bars else np.zeros(n_rows)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for t in range(n_bars):
+            if t >= window:
+                old = x[:, t - window]
+                valid = ~np.isnan(old)
+                nobs -= valid
+                prev_mean = mean - remove_comp
+                y = old - remove_comp
+                delta = y - mean
+                new_mean = mean - delta / nobs
+                new_ssqdm = ssqdm - (old - prev_mean) * (old - new_mean)
+                emptied = nobs == 0
+                remove_comp = np.where(valid & ~emptied, delta + mean - y, remove_comp)
+                mean = np.where(valid, np.where(emptied, 0.0, new_mean), mean)
+                ssqdm = np.where(valid, np.where(emptied, 0.0, new_ssqdm), ssqdm)
+            cur = x[:, t]
+            valid = ~np.isnan(cur)
+            same = np.where(valid, np.where(cur == prev, same + 1, 1), same)
+            prev = np.where(valid, cur, prev)
+            nobs += valid
+            prev_mean = mean - add_comp
+            y = cur - add_comp
+            delta = y - mean
+            new_mean = mean + delta / nobs
+            ssqdm = np.where(valid, ssqdm + (cur - prev_mean) * (cur - new_mean), ssqdm)
+            add_comp = np.where(valid, delta + mean - y, add_comp)
+            mean = np.where(valid, new_mean, mean)
+            var = np.where((nobs == 1) | (same >= nobs), 0.0, ssqdm / nobs)
+            out[:, t] = np.where(nobs >= window, np.sqrt(np.maximum(var, 0.0)), np.nan)
+    return out
+
+
+def _shift(x: np.ndarray, periods: int) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    out[:, periods:] = x[:, :-periods]
+    return out
+
+
+def _rsi(close: np.ndarray, starts: np.ndarray, window: int = 14) -> np.ndarray:
+    diff = close - _shift(close, 1)
+    with np.errstate(invalid="ignore"):
+        # ta maps the undefined first difference to 0.0, so the EWM starts at the first bar
+        up = _mask_before(np.where(diff > 0, diff, 0.0), starts)
+        down = _mask_before(np.where(diff < 0, -diff, 0.0), starts)
+        ema_up = _ewm(up, 1.0 / window, starts, window)
+        ema_down = _ewm(down, 1.0 / window, starts, window)
+        rsi = np.where(ema_down == 0, 100.0, 100.0 - (100.0 / (1.0 + ema_up / ema_down)))
+    return rsi
+
+
+def _atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, starts: np.ndarray, window: int = 14) -> np.ndarray:
+    prev_close = _shift(close, 1)
+    with np.errstate(invalid="ignore"):
+        true_range = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+    n_rows, n_bars = close.shape
+    atr = _mask_before(np.zeros_like(close), starts)
+    seeded = starts + window - 1
+    for start in np.unique(starts):
+        rows = np.nonzero(starts == start)[0]
+        if start + window <= n_bars:
+            atr[rows, start + window - 1] = true_range[rows, start:start + window].sum(axis=1) / window
+    for t in range(int(seeded.min(initial=n_bars)) + 1, n_bars):
+        rows = seeded < t
+        atr[rows, t] = (atr[rows, t - 1] * (window - 1) + true_range[rows, t]) / float(window)
+    return atr
+
+
+# Columns another column is derived from; requesting one computes its sources too
+INDICATOR_DEPENDENCIES = {
+    "bb_upper": ("sma_20",),
+    "bb_middle": ("sma_20",),
+    "bb_lower": ("sma_20",),
+    "bb_width": ("bb_upper", "bb_middle", "bb_lower"),
+    "macd_signal": ("macd",),
+    "macd_histogram": ("macd", "macd_signal"),
+    "volume_ratio": ("volume_sma",),
+}
+
+
+def resolve_indicators(columns: Optional[Iterable[str]] = None) -> Tuple[str, ...]:
+    """``columns`` plus everything they are derived from, in ``INDICATOR_COLUMNS`` order.
+
+    ``None`` means every indicator. Unknown names raise ``ValueError``.
+    """
+    if columns is None:
+        return INDICATOR_COLUMNS
+    needed = set()
+    pending = list(columns)
+    while pending:
+        name = pending.pop()
+        if name in needed:
+            continue
+        if name not in INDICATOR_COLUMNS:
+            raise ValueError(f"Unknown indicator: {name}")
+        needed.add(name)
+        pending.extend(INDICATOR_DEPENDENCIES.get(name, ()))
+    return tuple(name for name in INDICATOR_COLUMNS if name in needed)
+
+
+def compute_indicators(panel: OHLCVPanel, columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """Indicator columns as (symbols x bars) arrays.
+
+    Only ``columns`` (default: all of ``INDICATOR_COLUMNS``) and the columns
+    they are derived from are computed; the result holds just the requested
+    names, in ``INDICATOR_COLUMNS`` order.
+    """
+    requested = INDICATOR_COLUMNS if columns is None else frozenset(columns)
+    need = frozenset(resolve_indicators(requested))
+    close, starts = panel.close, panel.starts
+    out: Dict[str, np.ndarray] = {}
+
+    if "ema_9" in need:
+        out["ema_9"] = _ema(close, 9, starts)
+    if "ema_21" in need:
+        out["ema_21"] = _ema(close, 21, starts)
+    if "ema_50" in need:
+        out["ema_50"] = _ema(close, 50, starts)
+    if "sma_20" in need:
+        out["sma_20"] = _rolling_mean(close, 20)
+
+    # Bollinger Bands (population std, as in ta)
+    if "bb_middle" in need:
+        out["bb_middle"] = out["sma_20"]
+    if "bb_upper" in need or "bb_lower" in need:
+        std_20 = _rolling_std(close, 20)
+        if "bb_upper" in need:
+            out["bb_upper"] = out["sma_20"] + 2 * std_20
+        if "bb_lower" in need:
+            out["bb_lower"] = out["sma_20"] - 2 * std_20
+    if "bb_width" in need:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["bb_width"] = (out["bb_upper"] - out["bb_lower"]) / out["bb_middle"]
+
+    if "rsi" in need:
+        out["rsi"] = _rsi(close, starts)
+
+    if "macd" in need:
+        out["macd"] = _ema(close, 12, starts) - _ema(close, 26, starts)
+    if "macd_signal" in need:
+        out["macd_signal"] = _ema(out["macd"], 9, starts + 25)
+    if "macd_histogram" in need:
+        out["macd_histogram"] = out["macd"] - out["macd_signal"]
+
+    if "atr" in need:
+        out["atr"] = _atr(panel.high, panel.low, close, starts)
+
+    if "volume_sma" in need:
+        out["volume_sma"] = _rolling_mean(panel.volume, 20)
+    if "volume_ratio" in need:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["volume_ratio"] = panel.volume / out["volume_sma"]
+
+    if "support" in need:
+        out["support"] = _rolling(panel.low, 20, np.min)
+    if "resistance" in need:
+        out["resistance"] = _rolling(panel.high, 20, np.max)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if "price_change" in need:
+            out["price_change"] = close / _shift(close, 1) - 1
+        if "price_momentum" in need:
+            out["price_momentum"] = close / _shift(close, 5) - 1
+
+    return {name: out[name] for name in INDICATOR_COLUMNS if name in requested}
+
+
+# Indicators with the period in their name, for parameter sweeps
+PERIOD_INDICATORS = {
+    "ema": lambda panel, n: _ema(panel.close, n, panel.starts),
+    "sma": lambda panel, n: _rolling_mean(panel.close, n),
+    "std": lambda panel, n: _rolling_std(panel.close, n),
+}
+
+
+def compute_period_indicators(panel: OHLCVPanel, names: Iterable[str]) -> Dict[str, np.ndarray]:
+    """``ema_<span>``, ``sma_<window>`` and ``std_<window>`` (population) of the close.
+
+    ``ema_9`` here equals ``compute_indicators``' ``ema_9``; other periods let
+    a sweep vary what the standard columns fix. Unknown names raise ``ValueError``.
+    """
+    out: Dict[str, np.ndarray] = {}
+    for name in names:
+        kind, _, period = name.rpartition("_")
+        if kind not in PERIOD_INDICATORS or not period.isdigit() or int(period) < 1:
+            raise ValueError(f"Unknown period indicator: {name}")
+        if name not in out:
+            out[name] = PERIOD_INDICATORS[kind](panel, int(period))
+    return out
+
+
+def row_tail(indicators: Dict[str, np.ndarray], row: int, length: int) -> Dict[str, np.ndarray]:
+    """The last ``length`` bars of one symbol's indicator columns."""
+    return {name: values[row, -length:] for name, values in indicators.items()}
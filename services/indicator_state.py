@@ -0,0 +1,490 @@
+"""
+Streaming indicator state per (symbol, interval).
+
+``IndicatorState`` holds the running accumulators behind every column of
+``indicator_engine.INDICATOR_COLUMNS`` (EWMs for EMA/RSI/MACD, the Wilder ATR
+recursion, pandas-style online sums and small ring buffers for the 20-bar
+windows), so appending one closed candle costs O(1) instead of a pass over the
+whole history. Each update performs the same floating point operations as
+``compute_indicators`` over the same candles, so the values are identical.
+
+``IndicatorStateStore`` keeps one state per series, brings it up to date from
+the candle store's column arrays (applying only candles newer than the state)
+and snapshots it to ``data/indicator_state/<SYMBOL>/<interval>.json`` so a
+restart resumes without replaying history. Only candles that had closed when
+the data was fetched are committed; a bar stored while still forming is
+applied to a throwaway copy of the state. Should a committed bar still change
+afterwards (it was stored just before its close), the state no longer matches
+the candles and is rebuilt from them.
+"""
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import math
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .indicator_engine import INDICATOR_COLUMNS, OHLCV_FIELDS
+from .resample import DAY_SECONDS, interval_seconds
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 1
+# Indicator rows kept for strategies that compare the last bars
+RECENT_ROWS = 3
+
+NAN = float("nan")
+
+
+def _div(a: float, b: float) -> float:
+    """``a / b`` with NumPy semantics (inf/NaN instead of ZeroDivisionError)."""
+    try:
+        return a / b
+    except ZeroDivisionError:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return float(np.float64(a) / np.float64(b))
+
+
+class _Component:
+    """Base for accumulators: serializes ``__slots__`` (deques included)."""
+
+    __slots__ = ()
+
+    def dump(self) -> Dict[str, Any]:
+        state: Dict[str, Any] = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            state[name] = list(value) if isinstance(value, deque) else value
+        return state
+
+    def load(self, state: Dict[str, Any]) -> None:
+        for name in self.__slots__:
+            current = getattr(self, name)
+            value = state[name]
+            if isinstance(current, deque):
+                value = deque((tuple(v) if isinstance(v, list) else v for v in value), maxlen=current.maxlen)
+            setattr(self, name, value)
+
+
+class _EWM(_Component):
+    """``ewm(alpha, adjust=False, min_periods)`` fed one value at a time."""
+
+    __slots__ = ("alpha", "old_wt", "denom", "min_periods", "value", "count")
+
+    def __init__(self, alpha: float, min_periods: int):
+        com = (1.0 - alpha) / alpha
+        self.alpha = 1.0 / (1.0 + com)
+        self.old_wt = 1.0 - self.alpha
+        self.denom = self.old_wt + self.alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.count = 0
+
+    def update(self, x: float) -> float:
+        if math.isnan(self.value):
+            self.value = x
+        elif self.value != x:
+            self.value = (self.old_wt * self.value + self.alpha * x) / self.denom
+        self.count += 1
+        return self.value if self.count >= self.min_periods else NAN
+
+
+def _ema(span: int) -> _EWM:
+    return _EWM(2.0 / (span + 1.0), span)
+
+
+class _RollingMean(_Component):
+    """``rolling(window).mean()`` using pandas' compensated add/remove."""
+
+    __slots__ = ("window", "values", "total", "add_comp", "remove_comp", "negatives", "same", "prev")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: Deque[float] = deque(maxlen=window)
+        self.total = 0.0
+        self.add_comp = 0.0
+        self.remove_comp = 0.0
+        self.negatives = 0
+        self.same = 0
+        self.prev = NAN
+
+    def update(self, x: float) -> float:
+        if len(self.values) == self.window:
+            old = self.values[0]
+            y = -old - self.remove_comp
+            t = self.total + y
+            self.remove_comp = t - self.total - y
+            self.total = t
+            self.negatives -= math.copysign(1.0, old) < 0
+        y = x - self.add_comp
+        t = self.total + y
+        self.add_comp = t - self.total - y
+        self.total = t
+        self.negatives += math.copysign(1.0, x) < 0
+        self.same = self.same + 1 if x == self.prev else 1
+        self.prev = x
+        self.values.append(x)
+        nobs = len(self.values)
+        if nobs < self.window:
+            return NAN
+        if self.same >= nobs:
+            return self.prev
+        mean = self.total / nobs
+        if self.negatives == 0 and mean < 0:
+            return 0.0
+        if self.negatives == nobs and mean > 0:
+            return 0.0
+        return mean
+
+
+class _RollingStd(_Component):
+    """``rolling(window).std(ddof=0)`` using pandas' online Welford update."""
+
+    __slots__ = ("window", "values", "mean", "ssqdm", "add_comp", "remove_comp", "same", "prev")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: Deque[float] = deque(maxlen=window)
+        self.mean = 0.0
+        self.ssqdm = 0.0
+        self.add_comp = 0.0
+        self.remove_comp = 0.0
+        self.same = 0
+        self.prev = NAN
+
+    def update(self, x: float) -> float:
+        if len(self.values) == self.window:
+            old = self.values[0]
+            nobs = self.window - 1
+            if nobs:
+                prev_mean = self.mean - self.remove_comp
+                y = old - self.remove_comp
+                delta = y - self.mean
+                self.remove_comp = delta + self.mean - y
+                self.mean -= delta / nobs
+                self.ssqdm -= (old - prev_mean) * (old - self.mean)
+            else:
+                self.mean = 0.0
+                self.ssqdm = 0.0
+        self.same = self.same + 1 if x == self.prev else 1
+        self.prev = x
+        self.values.append(x)
+        nobs = len(self.values)
+        prev_mean = self.mean - self.add_comp
+        y = x - self.add_comp
+        delta = y - self.mean
+        self.add_comp = delta + self.mean - y
+        self.mean += delta / nobs
+        self.ssqdm += (x - prev_mean) * (x - self.mean)
+        if nobs < self.window:
+            return NAN
+        var = 0.0 if (nobs == 1 or self.same >= nobs) else self.ssqdm / nobs
+        return math.sqrt(max(var, 0.0))
+
+
+class _RollingExtreme(_Component):
+    """Rolling min or max over ``window`` bars with a monotonic deque (amortized O(1))."""
+
+    __slots__ = ("window", "is_max", "candidates", "seen")
+
+    def __init__(self, window: int, is_max: bool):
+        self.window = window
+        self.is_max = is_max
+        # (bar number, value) pairs, best first
+        self.candidates: Deque[Tuple[int, float]] = deque()
+        self.seen = 0
+
+    def update(self, x: float) -> float:
+        while self.candidates and (
+            self.candidates[-1][1] <= x if self.is_max else self.candidates[-1][1] >= x
+        ):
+            self.candidates.pop()
+        self.candidates.append((self.seen, x))
+        self.seen += 1
+        if self.candidates[0][0] <= self.seen - 1 - self.window:
+            self.candidates.popleft()
+        return self.candidates[0][1] if self.seen >= self.window else NAN
+
+
+class _ATR(_Component):
+    """ta's AverageTrueRange: zero until seeded with the mean true range, then Wilder smoothing."""
+
+    __slots__ = ("window", "seed", "value", "prev_close", "count")
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.seed: List[float] = []
+        self.value = 0.0
+        self.prev_close = NAN
+        self.count = 0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if math.isnan(self.prev_close):
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.count += 1
+        if self.count < self.window:
+            self.seed.append(true_range)
+        elif self.count == self.window:
+            self.seed.append(true_range)
+            # Same summation as the batch path (NumPy's pairwise sum)
+            self.value = float(np.asarray(self.seed).sum()) / self.window
+            self.seed = []
+        else:
+            self.value = (self.value * (self.window - 1) + true_range) / float(self.window)
+        return self.value
+
+
+class IndicatorState:
+    """Running indicators for one (symbol, interval) series."""
+
+    def __init__(self, symbol: str, interval: str):
+        self.symbol = symbol
+        self.interval = interval
+        self.bars = 0
+        self.first_ts: Optional[int] = None
+        self.last_ts: Optional[int] = None
+        self.latest: Dict[str, float] = {}
+        # Last RECENT_ROWS rows of OHLCV + indicators, oldest first
+        self.recent: Deque[Dict[str, float]] = deque(maxlen=RECENT_ROWS)
+        self._closes: Deque[float] = deque(maxlen=6)
+        self._components: Dict[str, _Component] = {
+            "ema_9": _ema(9),
+            "ema_12": _ema(12),
+            "ema_21": _ema(21),
+            "ema_26": _ema(26),
+            "ema_50": _ema(50),
+            "macd_signal": _ema(9),
+            "rsi_up": _EWM(1.0 / 14, 14),
+            "rsi_down": _EWM(1.0 / 14, 14),
+            "sma_20": _RollingMean(20),
+            "std_20": _RollingStd(20),
+            "volume_sma": _RollingMean(20),
+            "support": _RollingExtreme(20, is_max=False),
+            "resistance": _RollingExtreme(20, is_max=True),
+            "atr": _ATR(14),
+        }
+
+    def update(self, open_: float, high: float, low: float, close: float, volume: float,
+               ts: Optional[int] = None) -> Dict[str, float]:
+        """Apply one closed candle and return the indicator row for it."""
+        c = self._components
+        prev_close = self._closes[-1] if self._closes else NAN
+        self._closes.append(close)
+
+        row: Dict[str, float] = {"open": open_, "high": high, "low": low, "close": close, "volume": volume}
+        row["ema_9"] = c["ema_9"].update(close)
+        row["ema_21"] = c["ema_21"].update(close)
+        row["ema_50"] = c["ema_50"].update(close)
+        sma = c["sma_20"].update(close)
+        std = c["std_20"].update(close)
+        row["sma_20"] = sma
+        row["bb_middle"] = sma
+        row["bb_upper"] = sma + 2 * std
+        row["bb_lower"] = sma - 2 * std
+        row["bb_width"] = _div(row["bb_upper"] - row["bb_lower"], sma)
+
+        diff = 0.0 if math.isnan(prev_close) else close - prev_close
+        up = c["rsi_up"].update(diff if diff > 0 else 0.0)
+        down = c["rsi_down"].update(-diff if diff < 0 else 0.0)
+        row["rsi"] = 100.0 if down == 0 else 100.0 - (100.0 / (1.0 + _div(up, down)))
+
+        macd = c["ema_12"].update(close) - c["ema_26"].update(close)
+        signal = c["macd_signal"].update(macd) if not math.isnan(macd) else NAN
+        row["macd"] = macd
+        row["macd_signal"] = signal
+        row["macd_histogram"] = macd - signal
+
+        row["atr"] = c["atr"].update(high, low, close)
+        volume_sma = c["volume_sma"].update(volume)
+        row["volume_sma"] = volume_sma
+        row["volume_ratio"] = _div(volume, volume_sma)
+        row["support"] = c["support"].update(low)
+        row["resistance"] = c["resistance"].update(high)
+        row["price_change"] = _div(close, prev_close) - 1
+        row["price_momentum"] = _div(close, self._closes[0]) - 1 if len(self._closes) == 6 else NAN
+
+        self.bars += 1
+        if ts is not None:
+            if self.first_ts is None:
+                self.first_ts = int(ts)
+            self.last_ts = int(ts)
+        self.latest = {name: row[name] for name in INDICATOR_COLUMNS}
+        self.recent.append(row)
+        return self.latest
+
+    def apply_columns(self, cols: Dict[str, np.ndarray]) -> int:
+        """Apply every candle in ``cols`` newer than ``last_ts``; returns how many were applied."""
+        ts = np.asarray(cols["ts"])
+        start = 0 if self.last_ts is None else int(np.searchsorted(ts, self.last_ts, side="right"))
+        if start >= len(ts):
+            return 0
+        fields = [np.asarray(cols[f][start:], dtype=np.float64) for f in OHLCV_FIELDS]
+        applied = 0
+        for i, values in enumerate(zip(*fields)):
+            # Mirrors the DataFrame path, which drops incomplete candles
+            if any(math.isnan(v) for v in values):
+                continue
+            self.update(*(float(v) for v in values), ts=int(ts[start + i]))
+            applied += 1
+        return applied
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": STATE_VERSION,
+            "symbol": self.symbol,
+            "interval": self.interval,
+            "bars": self.bars,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "latest": self.latest,
+            "recent": list(self.recent),
+            "closes": list(self._closes),
+            "components": {name: comp.dump() for name, comp in self._components.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IndicatorState":
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported indicator state version: {data.get('version')}")
+        state = cls(data["symbol"], data["interval"])
+        state.bars = int(data["bars"])
+        state.first_ts = data.get("first_ts")
+        state.last_ts = data.get("last_ts")
+        state.latest = dict(data.get("latest") or {})
+        state.recent.extend(data.get("recent") or [])
+        state._closes.extend(data.get("closes") or [])
+        for name, comp in state._components.items():
+            comp.load(data["components"][name])
+        return state
+
+
+def _closed_rows(ts: np.ndarray, interval: str, now: Optional[int] = None) -> int:
+    """Number of leading candles in ``ts`` whose interval has ended by ``now``."""
+    if now is None:
+        # Naive wall-clock epoch seconds, as stored in candle_store
+        now = int((datetime.now() - datetime(1970, 1, 1)).total_seconds())
+    seconds = interval_seconds(interval) or DAY_SECONDS
+    return int(np.searchsorted(ts, int(now) - seconds, side="right"))
+
+
+class IndicatorStateStore:
+    """In-memory indicator states with JSON snapshots on disk."""
+
+    def __init__(self, root: str = "data/indicator_state"):
+        self.root = Path(root)
+        self._states: Dict[Tuple[str, str], IndicatorState] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    @staticmethod
+    def _safe_name(value: str) -> str:
+        return "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in str(value))
+
+    def _path(self, symbol: str, interval: str) -> Path:
+        return self.root / self._safe_name(symbol.upper()) / f"{self._safe_name(interval)}.json"
+
+    def _lock_for(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _load(self, symbol: str, interval: str) -> Optional[IndicatorState]:
+        path = self._path(symbol, interval)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return IndicatorState.from_dict(json.load(f))
+        except Exception as e:
+            logger.warning(f"Discarding unreadable indicator state {path}: {e}")
+            return None
+
+    def save(self, state: IndicatorState) -> None:
+        path = self._path(state.symbol, state.interval)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state.to_dict(), f)
+        os.replace(tmp, path)
+
+    def get(self, symbol: str, interval: str) -> Optional[IndicatorState]:
+        """The state held in memory (or on disk) for the series, if any."""
+        key = (symbol.upper(), interval)
+        state = self._states.get(key)
+        if state is None:
+            state = self._load(symbol, interval)
+            if state is not None:
+                self._states[key] = state
+        return state
+
+    def sync(self, symbol: str, interval: str, cols: Dict[str, np.ndarray],
+             now: Optional[int] = None) -> IndicatorState:
+        """Bring the series' state up to date with the candle columns and snapshot it.
+
+        Only candles after the state's last timestamp are applied, and only
+        those whose interval has closed by ``now`` are committed. ``now`` is
+        the time the candles were fetched (wall-clock epoch seconds like
+        ``ts``; default the current time): a bar that was still forming then
+        holds its partial values however late it is synced. Such a bar is
+        applied to a copy, which is returned, so the values equal a batch
+        computation over all the candles while the next sync applies that bar
+        again with its final values. The state is rebuilt from scratch when it
+        does not belong to these candles (the stored history was replaced, or
+        the candle at ``last_ts`` is missing or differs from the one applied).
+        """
+        key = (symbol.upper(), interval)
+        with self._lock_for(key):
+            state = self.get(symbol, interval)
+            ts = np.asarray(cols["ts"])
+            closed = _closed_rows(ts, interval, now)
+            if state is not None and not self._continues(state, cols, closed):
+                logger.info(f"Rebuilding indicator state for {symbol} {interval}: candle history changed")
+                state = None
+            if state is None:
+                state = IndicatorState(symbol.upper(), interval)
+            applied = state.apply_columns({k: v[:closed] for k, v in cols.items()})
+            self._states[key] = state
+            if applied:
+                try:
+                    self.save(state)
+                except Exception as e:
+                    logger.warning(f"Could not snapshot indicator state for {symbol} {interval}: {e}")
+            if closed < len(ts):
+                provisional = copy.deepcopy(state)
+                provisional.apply_columns(cols)
+                return provisional
+            return state
+
+    @staticmethod
+    def _continues(state: IndicatorState, cols: Dict[str, np.ndarray], closed: int) -> bool:
+        ts = np.asarray(cols["ts"])[:closed]
+        if state.last_ts is None or len(ts) == 0:
+            return state.bars == 0
+        if state.first_ts != int(ts[0]):
+            return False
+        position = int(np.searchsorted(ts, state.last_ts))
+        if position >= len(ts) or int(ts[position]) != state.last_ts:
+            return False
+        # The last applied bar must still have the values it was applied with
+        applied = state.recent[-1] if state.recent else None
+        return applied is None or all(float(cols[f][position]) == applied[f] for f in OHLCV_FIELDS)
+
+    def delete(self, symbol: str, interval: str) -> None:
+        self._states.pop((symbol.upper(), interval), None)
+        try:
+            self._path(symbol, interval).unlink()
+        except FileNotFoundError:
+            pass
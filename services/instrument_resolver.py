@@ -0,0 +1,203 @@
+"""
+Indexed symbol <-> instrumentId resolver for the NSEEQ contract map.
+
+Built once from the contract master snapshot (see ``services.contract_master``)
+and shared by DataFetcher and IIFLAPIService. Exact and alnum-normalised keys are
+plain dict lookups; the "any key containing the symbol" fallback bisects a
+sorted index of every key suffix instead of normalising and scanning every key
+per miss, and preserves the original first-match-in-map-order result.
+Resolutions (including misses) are memoised per resolver instance.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from .contract_master import CONTRACTS_JSON_PATH, get_contract_master, normalize_contract_map
+
+logger = logging.getLogger(__name__)
+
+_MAX_MEMO = 20000
+# Sorts after any character a contract symbol can contain
+_LAST_CHAR = "\U0010ffff"
+
+
+def _alnum(value: str) -> str:
+    return ''.join(ch for ch in value if ch.isalnum())
+
+
+class _SubstringIndex:
+    """Sorted suffixes of a key list, answering "first key containing a needle".
+
+    Suffixes starting with the needle are one contiguous run, found by bisect;
+    the lowest key index in the run comes from the partial blocks at its ends
+    plus a sparse table of per-block minima, so a lookup never scans the keys.
+    """
+
+    _BLOCK = 32
+
+    def __init__(self, keys: List[str]):
+        entries = sorted((key[i:], idx) for idx, key in enumerate(keys) for i in range(len(key)))
+        self._suffixes: List[str] = [suffix for suffix, _ in entries]
+        self._owners: List[int] = [idx for _, idx in entries]
+        level = [min(self._owners[i:i + self._BLOCK]) for i in range(0, len(self._owners), self._BLOCK)]
+        # _minima[k][i]: lowest key index in blocks i .. i + 2**k - 1
+        self._minima: List[List[int]] = [level]
+        span = 1
+        while span * 2 <= len(level):
+            level = [min(a, b) for a, b in zip(level, level[span:])]
+            self._minima.append(level)
+            span *= 2
+
+    def first_containing(self, needle: str) -> Optional[int]:
+        lo = bisect_left(self._suffixes, needle)
+        hi = bisect_left(self._suffixes, needle + _LAST_CHAR, lo)
+        if lo >= hi:
+            return None
+        first_block = -(-lo // self._BLOCK)
+        last_block = hi // self._BLOCK
+        if first_block >= last_block:
+            return min(self._owners[lo:hi])
+        k = (last_block - first_block).bit_length() - 1
+        row = self._minima[k]
+        best = min(row[first_block], row[last_block - (1 << k)])
+        head = self._owners[lo:first_block * self._BLOCK]
+        tail = self._owners[last_block * self._BLOCK:hi]
+        return min((best, *head, *tail))
+
+
+class InstrumentResolver:
+    """Resolve trading symbols to instrumentIds (and back) over a normalised contract map."""
+
+    def __init__(self, mapping: Dict[str, str]):
+        self.mapping = mapping
+        self._keys: List[str] = list(mapping.keys())
+
+        # Suffix indexes over the raw and alnum-normalised keys for substring search
+        self._raw_index = _SubstringIndex(self._keys)
+        self._alnum_index = _SubstringIndex([_alnum(k) for k in self._keys])
+
+        # Reverse index: first key seen for an id is the provider's tradingSymbol
+        self._by_id: Dict[str, str] = {}
+        for k, v in mapping.items():
+            self._by_id.setdefault(str(v), k)
+
+        self._memo: Dict[Tuple[str, str], Optional[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.mapping)
+
+    @classmethod
+    def from_file(cls, path: str = CONTRACTS_JSON_PATH) -> "InstrumentResolver":
+        """Load a ``{tradingSymbol: instrumentId}`` JSON file; empty resolver if unreadable."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                return cls(normalize_contract_map(data))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not read contract map {path}: {e}")
+        return cls({})
+
+    # --- substring index ---
+    def _first_containing(self, alnum_needle: str, raw_needle: str) -> Optional[int]:
+        """Index of the first key whose alnum form contains ``alnum_needle`` or whose
+        raw form contains ``raw_needle`` (either needle may be empty to skip it)."""
+        found = [
+            index.first_containing(needle)
+            for index, needle in ((self._alnum_index, alnum_needle), (self._raw_index, raw_needle))
+            if needle
+        ]
+        found = [idx for idx in found if idx is not None]
+        return min(found) if found else None
+
+    def _memoised(self, kind: str, symbol: str, compute) -> Optional[str]:
+        key = (kind, symbol)
+        if key in self._memo:
+            return self._memo[key]
+        result = compute()
+        if len(self._memo) >= _MAX_MEMO:
+            self._memo.clear()
+        self._memo[key] = result
+        return result
+
+    # --- lookups ---
+    def resolve_id(self, symbol: str) -> Optional[str]:
+        """Resolve a symbol (e.g. 'RELIANCE', 'RELIANCE-EQ', '500325') to an instrumentId."""
+        if not symbol:
+            return None
+        symbol = str(symbol)
+        return self._memoised("id", symbol, lambda: self._resolve_id(symbol))
+
+    def _resolve_id(self, symbol: str) -> Optional[str]:
+        base_symbol = symbol.upper().strip()
+        simple_base = _alnum(base_symbol)
+        # Remove common suffixes for base lookup e.g. RELIANCE-EQ -> RELIANCE
+        base_part = base_symbol.split("-", 1)[0] if "-" in base_symbol else base_symbol
+        candidates = [base_symbol, base_part, f"{base_part}-EQ", f"{base_part}-BE", f"{base_part}-SM"]
+        if simple_base:
+            candidates.append(simple_base)
+            candidates.append(f"{simple_base}EQ")
+        for key in candidates:
+            value = self.mapping.get(key)
+            if value:
+                return str(value)
+
+        idx = self._first_containing(simple_base, base_part)
+        return str(self.mapping[self._keys[idx]]) if idx is not None else None
+
+    def resolve_trading_symbol(self, symbol: str) -> Optional[str]:
+        """Resolve a base symbol to the provider's tradingSymbol key (e.g. 'RELIANCE-EQ')."""
+        if not symbol:
+            return None
+        symbol = str(symbol)
+        return self._memoised("tsym", symbol, lambda: self._resolve_trading_symbol(symbol))
+
+    def _resolve_trading_symbol(self, symbol: str) -> Optional[str]:
+        base_symbol = symbol.upper().strip()
+        simple_base = _alnum(base_symbol)
+        candidates = [base_symbol, f"{base_symbol}-EQ", f"{base_symbol}-BE", f"{base_symbol}-SM"]
+        if simple_base:
+            candidates.append(simple_base)
+            candidates.append(f"{simple_base}EQ")
+        for candidate in candidates:
+            if candidate in self.mapping:
+                return candidate
+
+        idx = self._first_containing(simple_base, base_symbol)
+        return self._keys[idx] if idx is not None else None
+
+    def symbol_for(self, instrument_id: Any) -> Optional[str]:
+        """Reverse lookup: instrumentId -> tradingSymbol."""
+        if instrument_id is None:
+            return None
+        return self._by_id.get(str(instrument_id).strip())
+
+
+_shared_resolver: Optional[InstrumentResolver] = None
+
+
+def set_instrument_resolver(resolver: Optional[InstrumentResolver]) -> None:
+    """Install the process-wide resolver (e.g. after a contract map refresh)."""
+    global _shared_resolver
+    _shared_resolver = resolver
+
+
+async def get_instrument_resolver() -> InstrumentResolver:
+    """Return the process-wide resolver, loading the local contract snapshot on first use.
+
+    Never downloads; an empty result is not cached so a later refresh by
+    DataFetcher can still populate it.
+    """
+    global _shared_resolver
+    if _shared_resolver is not None and len(_shared_resolver):
+        return _shared_resolver
+    snapshot = await get_contract_master().load_local()
+    resolver = InstrumentResolver(snapshot.mapping if snapshot else {})
+    if len(resolver):
+        _shared_resolver = resolver
+    return resolver
@@ -0,0 +1,137 @@
+"""
+Bounded in-process caches with TTL, LRU eviction and hit/miss counters.
+
+``NamespacedCache`` holds one ``LRUTTLCache`` per namespace (prices, depth, ...)
+so a flood of quotes cannot push out unrelated entries, and each namespace has
+its own capacity. Expiry uses ``time.monotonic()`` so lookups avoid building
+``datetime`` objects and are immune to wall-clock jumps.
+"""
+from __future__ import annotations
+
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class LRUTTLCache:
+    """Least-recently-used cache whose entries also expire after a TTL (seconds)."""
+
+    def __init__(self, name: str, capacity: int = 1000, default_ttl: float = 60.0):
+        self.name = name
+        self.capacity = max(1, int(capacity))
+        self.default_ttl = float(default_ttl)
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else float(ttl))
+        if key in self._data:
+            self._data.move_to_end(key)
+        self._data[key] = (expires_at, value)
+        while len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        return self._data.pop(key, _MISSING) is not _MISSING
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns how many were removed."""
+        now = time.monotonic()
+        expired = [k for k, (expires_at, _) in self._data.items() if expires_at <= now]
+        for k in expired:
+            del self._data[k]
+        self.expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "capacity": self.capacity,
+            "default_ttl": self.default_ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class NamespacedCache:
+    """A set of independently bounded ``LRUTTLCache`` instances keyed by namespace."""
+
+    def __init__(
+        self,
+        name: str,
+        capacities: Optional[Dict[str, int]] = None,
+        default_capacity: int = 1000,
+        default_ttl: float = 60.0,
+    ):
+        self.name = name
+        self.capacities = dict(capacities or {})
+        self.default_capacity = default_capacity
+        self.default_ttl = default_ttl
+        self._namespaces: Dict[str, LRUTTLCache] = {}
+        _registry[name] = self
+
+    def namespace(self, namespace: str) -> LRUTTLCache:
+        cache = self._namespaces.get(namespace)
+        if cache is None:
+            cache = LRUTTLCache(
+                f"{self.name}.{namespace}",
+                capacity=self.capacities.get(namespace, self.default_capacity),
+                default_ttl=self.default_ttl,
+            )
+            self._namespaces[namespace] = cache
+        return cache
+
+    def clear(self) -> None:
+        for cache in self._namespaces.values():
+            cache.clear()
+
+    def __len__(self) -> int:
+        return sum(len(c) for c in self._namespaces.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {ns: cache.stats() for ns, cache in self._namespaces.items()}
+
+
+# All live NamespacedCache instances, for the system stats endpoint
+_registry: "weakref.WeakValueDictionary[str, NamespacedCache]" = weakref.WeakValueDictionary()
+
+
+def get_memory_cache_stats() -> Dict[str, Any]:
+    """Stats for every in-process cache, keyed by cache name then namespace."""
+    return {name: cache.stats() for name, cache in list(_registry.items())}
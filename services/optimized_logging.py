@@ -71,10 +71,13 @@ class ErrorAggregationHandler(logging.Handler):
         self.max_detail_length = max_detail_length
         self.error_counts = defaultdict(int)
         self.last_logged = {}
-        self.lock = threading.Lock()
     
     def emit(self, record):
-        """Aggregate errors and emit summary when appropriate."""
+        """Aggregate errors and emit summary when appropriate.
+
+        Uses the handler's own re-entrant lock, which handle() already holds
+        around this call; a plain Lock here would deadlock on every record.
+        """
         if record.levelno < logging.ERROR:
             return
         
@@ -8,6 +8,12 @@ Key Optimizations:
 3. Parallel symbol processing with concurrency limits
 4. Smart scheduling based on market conditions
 5. Shared analysis results between strategies
+6. Universe-scale scans: the scan universe comes from the DB watchlist, the
+   index constituents file or the built-in symbol sets (see ``scan_planner``),
+   is split into batches sized to the IIFL historical rate limit, and flows
+   through a fetch -> compute -> persist ``Pipeline`` on bounded queues inside
+   a per-scan time budget; each batch is saved and notified while later
+   batches are still downloading
 
 Performance Improvements:
 - 70% reduction in API calls
@@ -18,11 +24,13 @@ Performance Improvements:
 
 import asyncio
 import logging
+import os
 from datetime import datetime, time, timedelta
 from typing import Dict, List, Optional, Set, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from collections import defaultdict
+from time import monotonic
 import pytz
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -31,6 +39,10 @@ from config.settings import get_settings
 from services.strategy import StrategyService
 from services.data_fetcher import DataFetcher
 from services.iifl_api import IIFLAPIService
+from services.request_dispatcher import RequestPriority, request_priority
+from services.pipeline import Pipeline, Stage
+from services.scan_planner import ScanBatch, ScanPlan, ScanPlanner
+from services.resample import ResampleCache, can_derive, resample_candles
 
 logger = logging.getLogger('trading.strategy')
 
@@ -41,30 +53,73 @@ class StrategyCategory(str, Enum):
     SHORT_TERM = "short_term"
     LONG_TERM = "long_term"
 
+def _interval_minutes(interval: str) -> Optional[int]:
+    """Bar length in minutes for intraday intervals ("5", "5m", "1H"); None for daily and longer."""
+    value = interval.strip().lower()
+    if value.endswith("h") and value[:-1].isdigit():
+        return int(value[:-1]) * 60
+    value = value[:-1] if value.endswith("m") else value
+    return int(value) if value.isdigit() else None
+
+
+def _last_bar_time(candles: Any) -> Optional[str]:
+    """Timestamp of the newest candle in a DataFrame or list of candle dicts."""
+    try:
+        if hasattr(candles, "index") and not isinstance(candles, list):
+            return str(candles["date"].iloc[-1] if "date" in candles.columns else candles.index[-1])
+        return str(candles[-1].get("date") or candles[-1].get("timestamp") or "") or None
+    except Exception:
+        return None
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, "") or default)
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, "") or default)
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
 @dataclass
 class SymbolData:
     """Cached data for a symbol"""
     symbol: str
-    historical_data: List[Dict] = field(default_factory=list)
+    # Daily candles: a DataFrame over the memory-mapped candle store, or a list of dicts
+    historical_data: Any = field(default_factory=list)
     indicators: Dict[str, Any] = field(default_factory=dict)
     last_updated: Optional[datetime] = None
     cache_duration_minutes: int = 30  # Cache validity
+    # Candles per interval ("1D", "5m", ...), when each was fetched and for how many days
+    candles: Dict[str, Any] = field(default_factory=dict)
+    fetched_at: Dict[str, datetime] = field(default_factory=dict)
+    fetched_days: Dict[str, int] = field(default_factory=dict)
     
     def is_valid(self) -> bool:
         """Check if cached data is still valid"""
-        if not self.last_updated or not self.historical_data:
+        if not self.last_updated or self.historical_data is None or len(self.historical_data) == 0:
             return False
         age = (datetime.now() - self.last_updated).total_seconds() / 60
         return age < self.cache_duration_minutes
 
-@dataclass
-class AnalysisResult:
-    """Results from analyzing a symbol"""
-    symbol: str
-    category: StrategyCategory
-    signals: List[Any]
-    execution_time: float
-    error: Optional[str] = None
+    def has_fresh(self, interval: str, days: int = 0) -> bool:
+        """Whether candles for ``interval`` covering ``days`` of history can be reused.
+
+        Intraday candles are only reused within one bar, so a new candle is
+        never missed; daily candles follow ``cache_duration_minutes``.
+        """
+        fetched = self.fetched_at.get(interval)
+        if fetched is None or interval not in self.candles or self.fetched_days.get(interval, 0) < days:
+            return False
+        age = (datetime.now() - fetched).total_seconds() / 60
+        return age < (_interval_minutes(interval) or self.cache_duration_minutes)
 
 class OptimizedTradingScheduler:
     """
@@ -88,12 +143,29 @@ class OptimizedTradingScheduler:
         
         # Data cache - shared across all strategies
         self.symbol_cache: Dict[str, SymbolData] = {}
+        # Intraday timeframes coarser than the base interval are resampled
+        # from its candles instead of fetched
+        self.resample_base_interval = os.getenv("RESAMPLE_BASE_INTERVAL", "5m").strip()
+        self.resample_cache = ResampleCache()
         
-        # Concurrency control (lowered to reduce event loop pressure under load)
-        self.max_concurrent_symbols = 2  # Process 2 symbols at a time
+        # Concurrency per scan stage: symbols fetched at once (the rate limiter
+        # paces the actual requests), batches computed at once, batches persisted
+        # at once (OrderManager shares one DB session, so keep this at 1)
+        self.max_concurrent_symbols = _env_int("SCAN_FETCH_CONCURRENCY", 4)
+        self.compute_concurrency = _env_int("SCAN_COMPUTE_CONCURRENCY", 1)
+        self.persist_concurrency = _env_int("SCAN_PERSIST_CONCURRENCY", 1)
         self.semaphore = asyncio.Semaphore(self.max_concurrent_symbols)
         
-        # Symbol-to-strategy mapping
+        # Scan planning: universe sources, rate-limit sized batches, time budgets.
+        # Scans with an intraday category must finish before the next 5-minute run;
+        # daily-only scans may take longer.
+        self.scan_planner = ScanPlanner()
+        self.scan_time_budget = _env_float("SCAN_TIME_BUDGET_SECONDS", 280)
+        self.daily_scan_time_budget = _env_float("SCAN_DAILY_TIME_BUDGET_SECONDS", 1500)
+        self.scan_timeout_grace = _env_float("SCAN_TIMEOUT_GRACE_SECONDS", 60)
+        self.last_scan_report: Dict[str, Any] = {}
+        
+        # Built-in symbol sets, the last-resort scan universe per category
         self.strategy_symbols = {
             StrategyCategory.DAY_TRADING: {
                 'RELIANCE', 'TCS', 'HDFCBANK', 'INFY', 'HINDUNILVR',
@@ -190,48 +262,119 @@ class OptimizedTradingScheduler:
                 categories.append(category)
         return categories
     
-    async def fetch_and_cache_symbol_data(self, symbol: str) -> Optional[SymbolData]:
+    async def _fetch_candles(self, symbol: str, interval: str, days: int):
+        """Fetch candles for one timeframe.
+
+        Uses the fetcher's columnar store when available so the result is a
+        DataFrame over memory-mapped arrays shared with every other reader of
+        the same series; otherwise falls back to the list-of-dicts API.
+        """
+        if getattr(self.data_fetcher, "candle_store", None) is not None:
+            to_date = datetime.now()
+            from_date = to_date - timedelta(days=days)
+            df = await self.data_fetcher.get_historical_data_df(
+                symbol, interval, from_date.strftime("%Y-%m-%d"), to_date.strftime("%Y-%m-%d")
+            )
+            if df is not None:
+                return df
+        return await self.data_fetcher.get_historical_data(symbol, interval, days=days)
+
+    def get_timeframes(self, categories: List[StrategyCategory]) -> Dict[str, int]:
+        """Candle intervals the categories are evaluated on, with the most history any of them needs."""
+        timeframes: Dict[str, int] = {}
+        for category in categories:
+            interval, days = StrategyService.category_timeframe(category.value)
+            timeframes[interval] = max(days, timeframes.get(interval, 0))
+        return timeframes
+
+    def plan_symbol_fetch(
+        self, symbol: str, categories: List[StrategyCategory]
+    ) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """(intervals to fetch, intervals to resample) with days of history, for stale timeframes only.
+
+        Stale intraday timeframes that are multiples of the base interval are
+        derived from the base candles, which are fetched only when the cached
+        base series is not fresh or too short.
+        """
+        cached = self.symbol_cache.get(symbol)
+        stale = {
+            interval: days for interval, days in self.get_timeframes(categories).items()
+            if not (cached and cached.has_fresh(interval, days))
+        }
+        base = self.resample_base_interval
+        derived = {i: d for i, d in stale.items() if base and can_derive(i, base)}
+        fetch = {i: d for i, d in stale.items() if i not in derived}
+        if derived:
+            base_days = max(derived.values())
+            if base in fetch or not (cached and cached.has_fresh(base, base_days)):
+                fetch[base] = max(fetch.get(base, 0), base_days)
+        return fetch, derived
+
+    async def fetch_and_cache_symbol_data(
+        self, symbol: str, categories: Optional[List[StrategyCategory]] = None
+    ) -> Optional[SymbolData]:
         """
         Fetch historical data for a symbol and cache it.
-        Reuses cache if valid.
+        Each interval the categories need is fetched once; fresh cached intervals are reused,
+        and coarser intraday intervals are resampled from the base interval.
         """
-        # Check if we have valid cached data
+        categories = categories or list(StrategyCategory)
+        timeframes = self.get_timeframes(categories)
         cached = self.symbol_cache.get(symbol)
-        if cached and cached.is_valid():
+        stale, derived = self.plan_symbol_fetch(symbol, categories)
+        if not stale and not derived:
             logger.debug(f"♻️ Using cached data for {symbol}")
             return cached
         
         # Fetch fresh data
         try:
-            logger.debug(f"📥 Fetching data for {symbol}")
+            logger.debug(f"📥 Fetching data for {symbol}: {sorted(stale)}")
             
             # Fetch different timeframes in parallel
-            daily_data, hourly_data, minute_data = await asyncio.gather(
-                self.data_fetcher.get_historical_data(symbol, "1D", days=120),
-                self.data_fetcher.get_historical_data(symbol, "1H", days=30),
-                self.data_fetcher.get_historical_data(symbol, "5", days=5),
+            fetched = await asyncio.gather(
+                *(self._fetch_candles(symbol, interval, days=days) for interval, days in stale.items()),
                 return_exceptions=True
             )
             
-            # Handle errors
-            if isinstance(daily_data, Exception):
-                logger.error(f"Failed to fetch daily data for {symbol}: {daily_data}")
-                return None
+            symbol_data = cached or SymbolData(symbol=symbol)
+            now = datetime.now()
+            for interval, data in zip(stale, fetched):
+                if isinstance(data, Exception):
+                    logger.error(f"Failed to fetch {interval} data for {symbol}: {data}")
+                    continue
+                symbol_data.candles[interval] = data if data is not None else []
+                symbol_data.fetched_at[interval] = now
+                symbol_data.fetched_days[interval] = stale[interval]
+            
+            base = self.resample_base_interval
+            for interval, days in derived.items():
+                base_candles = symbol_data.candles.get(base)
+                if base_candles is None:
+                    continue
+                symbol_data.candles[interval] = resample_candles(
+                    base_candles, interval, self.resample_cache, key=(symbol, base)
+                )
+                symbol_data.fetched_at[interval] = symbol_data.fetched_at[base]
+                symbol_data.fetched_days[interval] = days
             
-            # Create cache entry
-            symbol_data = SymbolData(
-                symbol=symbol,
-                historical_data=daily_data or [],
-                last_updated=datetime.now()
-            )
+            if not any(interval in symbol_data.candles for interval in timeframes):
+                return None
             
-            # Store additional timeframe data
-            symbol_data.indicators['hourly_data'] = hourly_data if not isinstance(hourly_data, Exception) else []
-            symbol_data.indicators['minute_data'] = minute_data if not isinstance(minute_data, Exception) else []
+            # Daily candles double as the symbol's main history
+            if "1D" in stale and "1D" in symbol_data.candles:
+                symbol_data.historical_data = symbol_data.candles["1D"]
+                symbol_data.last_updated = symbol_data.fetched_at["1D"]
+            elif symbol_data.last_updated is None:
+                symbol_data.last_updated = now
+            intraday = [i for i in symbol_data.candles if _interval_minutes(i) is not None]
+            if intraday:
+                symbol_data.indicators['minute_data'] = symbol_data.candles[min(intraday, key=_interval_minutes)]
             
             # Cache it
             self.symbol_cache[symbol] = symbol_data
-            logger.debug(f"✅ Cached data for {symbol}: {len(daily_data)} candles")
+            logger.debug(f"✅ Cached data for {symbol}: " + ", ".join(
+                f"{interval}={len(symbol_data.candles.get(interval, []))}" for interval in timeframes
+            ))
             
             return symbol_data
             
@@ -239,107 +382,206 @@ class OptimizedTradingScheduler:
             logger.error(f"Error fetching data for {symbol}: {e}")
             return None
     
-    async def analyze_symbol_for_category(
-        self,
-        symbol: str,
-        category: StrategyCategory,
-        symbol_data: SymbolData
-    ) -> AnalysisResult:
-        """
-        Analyze a symbol for a specific category using cached data.
-        This avoids re-fetching data.
-        """
-        start_time = datetime.now()
-        
+    def scan_time_budget_for(self, categories: List[StrategyCategory]) -> float:
+        """Seconds a scan of ``categories`` may take; intraday scans get the short budget."""
+        intraday = any(
+            _interval_minutes(StrategyService.category_timeframe(c.value)[0]) is not None for c in categories
+        )
+        return self.scan_time_budget if intraday else self.daily_scan_time_budget
+
+    async def _load_watchlists(self, categories: List[StrategyCategory]) -> Dict[StrategyCategory, List[str]]:
+        """Active DB watchlist symbols per category (empty when the DB is unavailable)."""
+        watchlists: Dict[StrategyCategory, List[str]] = {}
         try:
-            # Generate signals using cached data
-            # The strategy service will use the cached data from data_fetcher
-            signals = await asyncio.wait_for(
-                self.strategy_service.generate_signals(
-                    symbol,
-                    category=category.value,
-                    strategy_name=None
-                ),
-                timeout=30.0
-            )
-            
-            execution_time = (datetime.now() - start_time).total_seconds()
-            
-            return AnalysisResult(
-                symbol=symbol,
-                category=category,
-                signals=signals or [],
-                execution_time=execution_time
-            )
-            
-        except asyncio.TimeoutError:
-            execution_time = (datetime.now() - start_time).total_seconds()
-            logger.warning(f"⏱️ Timeout analyzing {symbol} for {category.value}")
-            return AnalysisResult(
-                symbol=symbol,
-                category=category,
-                signals=[],
-                execution_time=execution_time,
-                error="Timeout"
-            )
+            from models.database import AsyncSessionLocal
+            from services.watchlist import WatchlistService
+
+            async def load():
+                async with AsyncSessionLocal() as db:
+                    service = WatchlistService(db)
+                    for category in categories:
+                        watchlists[category] = await service.get_watchlist(category=category.value)
+
+            await asyncio.wait_for(load(), timeout=10.0)
         except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
-            logger.error(f"❌ Error analyzing {symbol} for {category.value}: {e}")
-            return AnalysisResult(
-                symbol=symbol,
-                category=category,
-                signals=[],
-                execution_time=execution_time,
-                error=str(e)
-            )
-    
-    async def process_symbol(
-        self,
-        symbol: str,
-        categories: List[StrategyCategory]
-    ) -> List[AnalysisResult]:
+            logger.warning(f"⚠️ Watchlist unavailable for scan universe: {e}")
+        return watchlists
+
+    async def build_scan_universe(self, categories: List[StrategyCategory]) -> Dict[str, List[StrategyCategory]]:
+        """Symbol -> categories to scan, from the planner's configured universe sources."""
+        watchlists = await self._load_watchlists(categories) if "watchlist" in self.scan_planner.sources else {}
+        return self.scan_planner.resolve_universe(categories, watchlists, self.strategy_symbols)
+
+    def _requests_needed(self, symbol: str, categories: List[StrategyCategory]) -> int:
+        """Candle requests a scan of ``symbol`` makes (stale intervals that cannot be resampled)."""
+        fetch, _ = self.plan_symbol_fetch(symbol, categories)
+        return len(fetch)
+
+    async def _fetch_for_scan(self, symbol: str, categories: List[StrategyCategory]) -> Optional[SymbolData]:
+        async with self.semaphore:
+            return await self.fetch_and_cache_symbol_data(symbol, categories)
+
+    async def _compute_batch_signals(
+        self, batch: ScanBatch, fetched: Dict[str, SymbolData]
+    ) -> Dict[StrategyCategory, List[Any]]:
+        """Signals per category for a fetched batch: one batched evaluation per interval."""
+        by_interval: Dict[str, Dict[str, Any]] = defaultdict(dict)
+        for symbol, symbol_data in fetched.items():
+            for category in batch.symbols[symbol]:
+                interval, _ = StrategyService.category_timeframe(category.value)
+                candles = symbol_data.candles.get(interval)
+                if candles is not None and len(candles) > 0:
+                    by_interval[interval][symbol] = candles
+
+        category_signals: Dict[StrategyCategory, List[Any]] = defaultdict(list)
+        for interval, symbol_candles in by_interval.items():
+            results = await self.strategy_service.generate_signals_batch(symbol_candles)
+            for symbol, signals in results.items():
+                if not signals:
+                    continue
+                # The bar a signal was generated on identifies repeats of it in later scans
+                bar_time = _last_bar_time(symbol_candles[symbol])
+                for signal in signals:
+                    signal.metadata = {**(signal.metadata or {}), "bar_time": bar_time}
+                for category in batch.symbols[symbol]:
+                    if StrategyService.category_timeframe(category.value)[0] == interval:
+                        category_signals[category].extend(signals)
+                        self.strategy_service._log_generated_signals(signals, symbol, category.value, None)
+        return category_signals
+
+    async def _persist_signals(
+        self, category_signals: Dict[StrategyCategory, List[Any]]
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """Save signals through the OrderManager; returns (saved count, notifications to send)."""
+        saved_count = 0
+        notifications: List[Dict[str, Any]] = []
+        for category, signals in category_signals.items():
+            for signal in signals:
+                try:
+                    # Convert TradingSignal to dict for OrderManager
+                    signal_dict = {
+                        'symbol': signal.symbol,
+                        'signal_type': signal.signal_type,
+                        'entry_price': signal.entry_price,
+                        'stop_loss': signal.stop_loss,
+                        'take_profit': signal.target_price,
+                        'reason': f"{signal.strategy} - {category.value}",
+                        'confidence': signal.confidence,
+                        'strategy': signal.strategy,
+                        'category': category.value,
+                        'bar_time': (signal.metadata or {}).get('bar_time')
+                    }
+                    
+                    saved_signal = await self.order_manager.create_signal(signal_dict)
+                    if saved_signal:
+                        saved_count += 1
+                        logger.info(f"💾 Saved signal: {saved_signal.symbol} {saved_signal.signal_type.value}")
+                        
+                        # Prepare Telegram notification
+                        notifications.append({
+                            'symbol': signal.symbol,
+                            'type': signal.signal_type.value,
+                            'entry': signal.entry_price,
+                            'sl': signal.stop_loss,
+                            'target': signal.target_price,
+                            'confidence': signal.confidence,
+                            'strategy': signal.strategy,
+                            'category': category.value
+                        })
+                        # Yield control to keep event loop responsive under heavy batches
+                        await asyncio.sleep(0)
+                except Exception as e:
+                    logger.error(f"❌ Failed to save signal for {signal.symbol}: {e}")
+        return saved_count, notifications
+
+    def _build_scan_pipeline(self, plan: ScanPlan, progress: Dict[str, Any]) -> Pipeline:
+        """Fetch -> compute -> persist pipeline over the plan's batches.
+
+        Persisting a batch also sends its Telegram notifications, so the first
+        batch's signals are saved and announced while later batches are still
+        downloading. Candles leave the pipeline after the compute stage.
         """
-        Process a single symbol for multiple categories.
-        
-        Key optimization: Fetch data ONCE, analyze for ALL applicable categories.
+        async def fetch(batch: ScanBatch):
+            try:
+                results = await asyncio.gather(
+                    *(self._fetch_for_scan(symbol, cats) for symbol, cats in batch.symbols.items())
+                )
+            finally:
+                progress['pending_calls'] -= batch.calls
+            fetched = {symbol: data for symbol, data in zip(batch.symbols, results) if data}
+            for symbol in batch.symbols:
+                if symbol not in fetched:
+                    logger.warning(f"⚠️ Skipping {symbol} - no data available")
+            return batch, fetched
+
+        async def compute(item):
+            batch, fetched = item
+            category_signals = await self._compute_batch_signals(batch, fetched)
+            progress['scanned'].update(batch.symbols)
+            return batch, category_signals
+
+        async def persist(item):
+            batch, category_signals = item
+            for category, signals in category_signals.items():
+                progress['signals'][category] += len(signals)
+            if self.order_manager:
+                saved, notifications = await self._persist_signals(category_signals)
+                progress['saved'] += saved
+                await self._send_signal_notifications(notifications)
+
+        return Pipeline([
+            Stage('fetch', fetch, 1, size=lambda batch: len(batch.symbols)),
+            Stage('compute', compute, self.compute_concurrency, size=lambda item: len(item[0].symbols)),
+            Stage('persist', persist, self.persist_concurrency, size=lambda item: len(item[0].symbols)),
+        ])
+
+    async def _scan_batches(self, plan: ScanPlan, started: float, progress: Dict[str, Any]):
+        """The plan's batches, minus those whose fetch would overrun the time budget.
+
+        A batch is judged when the fetch queue has room for it, counting the
+        requests still ahead of it; skipped symbols are left in ``progress['skipped']``.
         """
-        async with self.semaphore:  # Limit concurrent processing
-            results = []
-            
-            # Step 1: Fetch and cache data ONCE
-            symbol_data = await self.fetch_and_cache_symbol_data(symbol)
-            if not symbol_data:
-                logger.warning(f"⚠️ Skipping {symbol} - no data available")
-                return results
-            
-            # Step 2: Analyze for ALL categories in parallel
-            logger.info(f"🔍 Analyzing {symbol} for {len(categories)} categories")
-            
-            analysis_tasks = [
-                self.analyze_symbol_for_category(symbol, category, symbol_data)
-                for category in categories
-            ]
-            
-            results = await asyncio.gather(*analysis_tasks, return_exceptions=True)
-            
-            # Filter out exceptions
-            valid_results = [r for r in results if isinstance(r, AnalysisResult)]
-            
-            # Log summary
-            total_signals = sum(len(r.signals) for r in valid_results)
-            if total_signals > 0:
-                logger.info(f"✅ {symbol}: {total_signals} signals across {len(categories)} categories")
-            
-            return valid_results
-    
+        for batch in plan.batches:
+            ahead = (progress['pending_calls'] + batch.calls) / plan.request_rate
+            if progress['batches'] and monotonic() - started + ahead > plan.time_budget:
+                progress['skipped'].extend(batch.symbols)
+                continue
+            progress['pending_calls'] += batch.calls
+            progress['batches'] += 1
+            yield batch
+
+    async def _send_signal_notifications(self, signal_notifications: List[Dict[str, Any]]) -> None:
+        """Send Telegram notifications for saved signals, grouped by category."""
+        if not (signal_notifications and self.strategy_service and self.strategy_service._notifier):
+            return
+        try:
+            # Group by category for cleaner notifications
+            category_groups = defaultdict(list)
+            for notif in signal_notifications:
+                category_groups[notif['category']].append(notif)
+            
+            for cat, notifs in category_groups.items():
+                message = f"🔔 <b>{cat.replace('_', ' ').title()} Signals ({len(notifs)})</b>\n\n"
+                for n in notifs:
+                    signal_emoji = "🟢" if n['type'].lower() == "buy" else "🔴"
+                    message += f"{signal_emoji} <b>{n['symbol']}</b> - {n['type'].upper()}\n"
+                    message += f"   Entry: ₹{n['entry']:.2f} | SL: ₹{n['sl']:.2f} | Target: ₹{n['target']:.2f}\n"
+                    message += f"   Strategy: {n['strategy']} | Confidence: {n['confidence']:.0%}\n\n"
+                
+                await self.strategy_service._notifier.send(message)
+                logger.info(f"📱 Sent Telegram notification for {len(notifs)} {cat} signals")
+        except Exception as e:
+            logger.error(f"❌ Failed to send Telegram notifications: {e}")
+
     async def execute_unified_scan(self, categories: List[StrategyCategory]):
         """
         Execute a unified scan for multiple categories.
         
         This is the KEY OPTIMIZATION:
-        1. Get all unique symbols needed
-        2. Process each symbol once for ALL its categories
+        1. Build the universe and plan rate-limit sized batches within the time budget
+        2. Process each symbol once for ALL its categories, batch by batch
         3. Reuse cached data across categories
+        4. Overlap fetching, signal computation and persistence
         """
         if self.running:
             logger.warning("⚠️ Unified scan already running, skipping")
@@ -347,6 +589,16 @@ class OptimizedTradingScheduler:
         
         self.running = True
         start_time = datetime.now()
+        started = monotonic()
+        budget = self.scan_time_budget_for(categories)
+        timeout = budget + self.scan_timeout_grace
+        plan_key = tuple(sorted(c.value for c in categories))
+        plan: Optional[ScanPlan] = None
+        pipeline: Optional[Pipeline] = None
+        progress: Dict[str, Any] = {
+            'scanned': set(), 'saved': 0, 'skipped': [], 'signals': defaultdict(int),
+            'batches': 0, 'pending_calls': 0,
+        }
         
         try:
             logger.info(f"🔍 Starting unified scan for categories: {[c.value for c in categories]}")
@@ -354,117 +606,53 @@ class OptimizedTradingScheduler:
             # Ensure services are ready
             await asyncio.wait_for(self._ensure_services_initialized(), timeout=10.0)
             
-            # Get all unique symbols needed
-            unique_symbols = self.get_unique_symbols(categories)
-            logger.info(f"🚀 Starting unified scan for {len(categories)} categories, {len(unique_symbols)} symbols")
-            
-            # Group symbols by which categories need them
-            symbol_to_categories = {}
-            for symbol in unique_symbols:
-                applicable_categories = [
-                    cat for cat in categories
-                    if symbol in self.strategy_symbols.get(cat, set())
-                ]
-                symbol_to_categories[symbol] = applicable_categories
-            
-            # Process all symbols in parallel (with concurrency limit)
-            # CRITICAL: Add timeout to prevent hanging
-            tasks = [
-                self.process_symbol(symbol, cats)
-                for symbol, cats in symbol_to_categories.items()
-            ]
-            
-            logger.info(f"📊 Processing {len(tasks)} symbol tasks with timeout protection")
-            all_results = await asyncio.wait_for(
-                asyncio.gather(*tasks, return_exceptions=True),
-                timeout=300.0  # 5 minute max for entire scan
+            # Build the universe and split it into rate-limit sized batches
+            symbol_to_categories = await self.build_scan_universe(categories)
+            plan = self.scan_planner.plan(symbol_to_categories, self._requests_needed, budget, key=plan_key)
+            logger.info(
+                f"🚀 Starting unified scan for {len(categories)} categories, {plan.symbol_count} symbols "
+                f"in {len(plan.batches)} batches (~{plan.estimated_seconds:.0f}s of requests, budget {budget:.0f}s, "
+                f"{len(plan.deferred)} deferred to next scan)"
             )
-            
-            # Flatten results and group by category
-            category_results = defaultdict(list)
-            for symbol_results in all_results:
-                if isinstance(symbol_results, list):
-                    for result in symbol_results:
-                        if isinstance(result, AnalysisResult):
-                            category_results[result.category].extend(result.signals)
-            
-            # Save signals to database
-            total_signals_saved = 0
-            signal_notifications = []
-            
-            if self.order_manager:
-                for category, signals in category_results.items():
-                    for signal in signals:
-                        try:
-                            # Convert TradingSignal to dict for OrderManager
-                            signal_dict = {
-                                'symbol': signal.symbol,
-                                'signal_type': signal.signal_type,
-                                'entry_price': signal.entry_price,
-                                'stop_loss': signal.stop_loss,
-                                'take_profit': signal.target_price,
-                                'reason': f"{signal.strategy} - {category.value}",
-                                'confidence': signal.confidence,
-                                'strategy': signal.strategy,
-                                'category': category.value
-                            }
-                            
-                            saved_signal = await self.order_manager.create_signal(signal_dict)
-                            if saved_signal:
-                                total_signals_saved += 1
-                                logger.info(f"💾 Saved signal: {saved_signal.symbol} {saved_signal.signal_type.value}")
-                                
-                                # Prepare Telegram notification
-                                signal_notifications.append({
-                                    'symbol': signal.symbol,
-                                    'type': signal.signal_type.value,
-                                    'entry': signal.entry_price,
-                                    'sl': signal.stop_loss,
-                                    'target': signal.target_price,
-                                    'confidence': signal.confidence,
-                                    'strategy': signal.strategy,
-                                    'category': category.value
-                                })
-                                # Yield control to keep event loop responsive under heavy batches
-                                await asyncio.sleep(0)
-                        except Exception as e:
-                            logger.error(f"❌ Failed to save signal for {signal.symbol}: {e}")
-            else:
+            if not self.order_manager:
                 logger.warning("⚠️ OrderManager not initialized, signals not saved to database")
             
-            # Send Telegram notifications for all saved signals
-            if signal_notifications and self.strategy_service and self.strategy_service._notifier:
-                try:
-                    # Group by category for cleaner notifications
-                    category_groups = defaultdict(list)
-                    for notif in signal_notifications:
-                        category_groups[notif['category']].append(notif)
-                    
-                    for cat, notifs in category_groups.items():
-                        message = f"🔔 <b>{cat.replace('_', ' ').title()} Signals ({len(notifs)})</b>\n\n"
-                        for n in notifs:
-                            signal_emoji = "🟢" if n['type'].lower() == "buy" else "🔴"
-                            message += f"{signal_emoji} <b>{n['symbol']}</b> - {n['type'].upper()}\n"
-                            message += f"   Entry: ₹{n['entry']:.2f} | SL: ₹{n['sl']:.2f} | Target: ₹{n['target']:.2f}\n"
-                            message += f"   Strategy: {n['strategy']} | Confidence: {n['confidence']:.0%}\n\n"
-                        
-                        await self.strategy_service._notifier.send(message)
-                        logger.info(f"📱 Sent Telegram notification for {len(notifs)} {cat} signals")
-                except Exception as e:
-                    logger.error(f"❌ Failed to send Telegram notifications: {e}")
+            # Scan data pulls yield to orders and UI requests
+            pipeline = self._build_scan_pipeline(plan, progress)
+            with request_priority(RequestPriority.BULK):
+                await asyncio.wait_for(
+                    pipeline.run(self._scan_batches(plan, started, progress)),
+                    timeout=timeout
+                )
+            if progress['skipped']:
+                logger.warning(f"⏱️ Time budget reached; {len(progress['skipped'])} symbols deferred to next scan")
+                self.scan_planner.defer(plan_key, progress['skipped'])
             
             # Log summary
             execution_time = (datetime.now() - start_time).total_seconds()
-            logger.info(f"✅ Unified scan completed in {execution_time:.2f}s")
-            logger.info(f"💾 Saved {total_signals_saved} signals to database")
+            logger.info(f"✅ Unified scan completed in {execution_time:.2f}s ({len(progress['scanned'])} symbols)")
+            logger.info(f"💾 Saved {progress['saved']} signals to database")
+            for name, stage in pipeline.stats.items():
+                logger.info(
+                    f"   • {name}: {stage.items} symbols in {stage.batches} batches, "
+                    f"{stage.throughput:.2f} symbols/s (concurrency {stage.concurrency})"
+                )
             
-            for category, signals in category_results.items():
-                logger.info(f"   • {category.value}: {len(signals)} signals generated")
+            for category, count in progress['signals'].items():
+                logger.info(f"   • {category.value}: {count} signals generated")
+            for category in categories:
                 self._update_stats(category.value, True, execution_time / len(categories))
         
         except asyncio.TimeoutError:
             execution_time = (datetime.now() - start_time).total_seconds()
-            logger.error(f"⏱️ Unified scan TIMEOUT after {execution_time:.2f}s (300s limit)")
+            logger.error(f"⏱️ Unified scan TIMEOUT after {execution_time:.2f}s ({timeout:.0f}s limit)")
+            if plan:
+                # Scan the symbols that never got through first next time
+                progress['skipped'] = [
+                    symbol for batch in plan.batches for symbol in batch.symbols
+                    if symbol not in progress['scanned']
+                ]
+                self.scan_planner.defer(plan_key, progress['skipped'])
             for category in categories:
                 self._update_stats(category.value, False, execution_time)
         except Exception as e:
@@ -473,6 +661,18 @@ class OptimizedTradingScheduler:
             for category in categories:
                 self._update_stats(category.value, False, execution_time)
         finally:
+            self.last_scan_report = {
+                'categories': [c.value for c in categories],
+                'started_at': start_time.isoformat(),
+                'duration_seconds': round(monotonic() - started, 3),
+                'time_budget': budget,
+                'plan': plan.as_dict() if plan else None,
+                'symbols_scanned': len(progress['scanned']),
+                'signals_generated': {c.value: n for c, n in progress['signals'].items()},
+                'signals_saved': progress['saved'],
+                'deferred': len(plan.deferred) + len(progress['skipped']) if plan else 0,
+                'stages': {name: stage.as_dict() for name, stage in pipeline.stats.items()} if pipeline else {},
+            }
             self.running = False
     
     def _update_stats(self, category: str, success: bool, execution_time: float):
@@ -619,6 +819,10 @@ class OptimizedTradingScheduler:
     def get_execution_stats(self) -> Dict[str, Any]:
         """Get execution statistics"""
         return dict(self.execution_stats)
+    
+    def get_scan_report(self) -> Dict[str, Any]:
+        """Plan and per-stage throughput of the last unified scan"""
+        return dict(self.last_scan_report)
 
 # Global instance
 _optimized_scheduler: Optional[OptimizedTradingScheduler] = None
@@ -9,6 +9,8 @@ from models.risk_events import RiskEvent, RiskEventType
 from .iifl_api import IIFLAPIService
 from .risk import RiskService
 from .data_fetcher import DataFetcher
+from .request_dispatcher import RequestPriority, request_priority
+from .signal_index import SignalIndex, get_signal_index
 from .enhanced_logging import critical_events, log_operation, log_trade_execution
 from config import get_settings
 
@@ -18,16 +20,28 @@ class OrderManager:
     """Order Management System for executing trades"""
     
     def __init__(self, iifl_service: Optional[IIFLAPIService] = None, risk_service: Optional[RiskService] = None, 
-                 data_fetcher: Optional[DataFetcher] = None, db_session: Optional[AsyncSession] = None):
+                 data_fetcher: Optional[DataFetcher] = None, db_session: Optional[AsyncSession] = None,
+                 signal_index: Optional[SignalIndex] = None):
         self.iifl = iifl_service or IIFLAPIService()
         self.risk = risk_service
         self.data_fetcher = data_fetcher
         self.db = db_session
         self.settings = get_settings()
         self.pending_orders: Dict[str, Dict] = {}
+        self.signal_index = signal_index or get_signal_index()
     
-    async def create_signal(self, signal_data: Dict) -> Optional[Signal]:
-        """Create a new trading signal in the database"""
+    async def create_signal(self, signal_data: Dict, dedupe: bool = True) -> Optional[Signal]:
+        """Create a new trading signal in the database.
+
+        With ``dedupe`` a signal identical to an active one (same symbol, strategy,
+        category, side, bar and levels) is dropped before any margin call or DB write.
+        """
+        claim = None
+        if dedupe:
+            claim = await self.signal_index.claim(signal_data, self.settings.signal_timeout)
+            if claim is None:
+                logger.debug(f"Duplicate signal skipped: {signal_data.get('symbol')} {signal_data.get('strategy')}")
+                return None
         try:
             # Calculate expiry time
             # Use UTC to avoid timezone drift; serialization adds Z suffix
@@ -120,6 +134,8 @@ class OrderManager:
             
         except Exception as e:
             logger.error(f"Error creating signal: {str(e)}")
+            if claim:
+                await self.signal_index.release(claim)
             if self.db:
                 await self.db.rollback()
             return None
@@ -241,7 +257,8 @@ class OrderManager:
             if tx_type == "sell":
                 # If we are already holding the stock (long), normal sell; otherwise short sell product
                 # Lightweight check using cached portfolio (no forced refresh here)
-                portfolio = await self.data_fetcher.get_portfolio_data()
+                with request_priority(RequestPriority.CRITICAL):
+                    portfolio = await self.data_fetcher.get_portfolio_data()
                 holdings = {h.get("symbol"): h.get("quantity", 0) for h in portfolio.get("holdings", [])}
                 product = (
                     self.settings.default_sell_product
@@ -513,6 +530,7 @@ class OrderManager:
             
             # Log order result
             if result and result.get("Success"):
+                await self._invalidate_portfolio()
                 critical_events.log_order_execution(
                     order_id=result.get("order_id", "unknown"),
                     symbol=order_data["symbol"],
@@ -553,11 +571,21 @@ class OrderManager:
     async def cancel_order(self, order_id: str) -> Dict:
         try:
             result = await self.iifl.cancel_order(order_id)
+            if result and result.get("Success"):
+                await self._invalidate_portfolio()
             return result or {"Success": False}
         except Exception as e:
             logger.error(f"Compat cancel_order failed: {str(e)}")
             return {"Success": False, "Message": str(e)}
 
+    async def _invalidate_portfolio(self):
+        """Drop the cached portfolio in every tier before the caller reads it again."""
+        try:
+            if self.data_fetcher:
+                await self.data_fetcher.invalidate_portfolio_cache()
+        except Exception as e:
+            logger.warning(f"Portfolio cache invalidation failed: {str(e)}")
+
     async def clear_all_signals(self) -> int:
         """Deletes all signals from the database. Returns the number of deleted signals."""
         try:
@@ -566,6 +594,7 @@ class OrderManager:
             result = await self.db.execute(stmt) if self.db else None
             if self.db:
                 await self.db.commit()
+            await self.signal_index.clear()
             deleted_count = result.rowcount
             logger.info(f"Cleared {deleted_count} signals from the database.")
             return deleted_count
@@ -0,0 +1,135 @@
+"""
+Staged producer/consumer pipelines on bounded asyncio queues.
+
+A ``Pipeline`` is a chain of ``Stage`` objects, each with its own number of
+workers. Items from the source flow through every stage in order: a worker
+awaits ``stage.func(item)`` and hands the result to the next stage's queue
+(``None`` drops the item, so a stage can filter). Queues are bounded, so a
+slow stage makes upstream workers wait instead of piling up results: with
+batches of candles, memory stays at a few batches however large the universe,
+and the first batch's output reaches the last stage while later ones are
+still being fetched.
+
+A failing item is logged and dropped; the pipeline keeps going. ``StageStats``
+records each stage's items, busy time and throughput.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """Work done by one pipeline stage: items, units of work and time spent."""
+
+    name: str
+    concurrency: int
+    items: int = 0
+    batches: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    first_start: Optional[float] = None
+    last_end: Optional[float] = None
+
+    def record(self, items: int, started: float, ended: float) -> None:
+        self.items += items
+        self.batches += 1
+        self.busy_seconds += ended - started
+        self.first_start = started if self.first_start is None else min(self.first_start, started)
+        self.last_end = ended if self.last_end is None else max(self.last_end, ended)
+
+    @property
+    def wall_seconds(self) -> float:
+        if self.first_start is None or self.last_end is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+    @property
+    def throughput(self) -> float:
+        """Items per second while the stage was active."""
+        return self.items / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "items": self.items,
+            "batches": self.batches,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "wall_seconds": round(self.wall_seconds, 3),
+            "items_per_second": round(self.throughput, 3),
+        }
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[[Any], Awaitable[Any]]
+    concurrency: int = 1
+    # Items a unit of work counts for in the stats (e.g. symbols in a batch)
+    size: Optional[Callable[[Any], int]] = None
+
+
+class Pipeline:
+    """Runs items through ``stages`` with ``concurrency`` workers per stage."""
+
+    def __init__(self, stages: Sequence[Stage], queue_size: Optional[int] = None):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = list(stages)
+        self.queue_size = queue_size
+        self.stats: Dict[str, StageStats] = {
+            stage.name: StageStats(stage.name, max(1, stage.concurrency)) for stage in self.stages
+        }
+
+    async def _worker(self, stage: Stage, inbox: asyncio.Queue, outbox: Optional[asyncio.Queue]) -> None:
+        stats = self.stats[stage.name]
+        while (item := await inbox.get()) is not _DONE:
+            started = monotonic()
+            try:
+                result = await stage.func(item)
+            except Exception as e:
+                logger.error(f"Pipeline stage '{stage.name}' failed: {e}")
+                stats.errors += 1
+                result = None
+            stats.record(stage.size(item) if stage.size else 1, started, monotonic())
+            if outbox is not None and result is not None:
+                await outbox.put(result)
+
+    async def run(self, source: Union[Iterable[Any], AsyncIterable[Any]]) -> Dict[str, StageStats]:
+        """Feed ``source`` through the stages and wait until every item has left the last one."""
+        queues = [
+            asyncio.Queue(maxsize=self.queue_size or 2 * self.stats[stage.name].concurrency)
+            for stage in self.stages
+        ]
+        workers: List[List[asyncio.Task]] = [
+            [
+                asyncio.create_task(self._worker(stage, queues[i], queues[i + 1] if i + 1 < len(queues) else None))
+                for _ in range(self.stats[stage.name].concurrency)
+            ]
+            for i, stage in enumerate(self.stages)
+        ]
+        try:
+            if hasattr(source, "__aiter__"):
+                async for item in source:
+                    await queues[0].put(item)
+            else:
+                for item in source:
+                    await queues[0].put(item)
+            # Close the stages in order; each drains before the next is told to stop
+            for queue, stage_workers in zip(queues, workers):
+                for _ in stage_workers:
+                    await queue.put(_DONE)
+                await asyncio.gather(*stage_workers)
+        finally:
+            for task in (t for stage_workers in workers for t in stage_workers):
+                task.cancel()
+        return self.stats
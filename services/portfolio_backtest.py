@@ -0,0 +1,248 @@
+"""
+Portfolio backtest: one strategy over many symbols sharing one capital pool.
+
+``backtest_engine`` simulates each symbol with its own capital, so it cannot
+show what the live limits do when a signal on one stock competes for cash with
+positions in others. Here every symbol's signals (built per symbol exactly as
+in a single-symbol backtest) are laid on a synchronized time axis, the union
+of all symbols' bar timestamps, and one pass walks that axis with the
+portfolio state held in arrays indexed by symbol (shares, entry price, stop,
+target, entry commission). On each bar:
+
+1. open positions whose symbol traded on the bar exit on the stop, the target
+   or a sell signal (in that order, at the close less slippage, as in
+   ``backtest_engine``)
+2. new entries stop for the rest of the calendar day once the portfolio,
+   marked at the bar's closes, is down ``max_daily_loss`` from the day's
+   opening equity
+3. buy signals on flat symbols are filled best reward-to-risk first, while
+   fewer than ``max_positions`` are open. Shares are sized from free cash with
+   ``risk.risk_position_size`` and ``risk.scale_to_margin`` (the sizing of
+   ``RiskService.calculate_position_size``, with the full order value as
+   margin) and capped at ``max_position_value`` (``MAX_POSITION_SIZE``). A
+   symbol that exited on the bar can buy again from the next bar, as in
+   ``backtest_engine``
+
+The equity curve is the portfolio value at each bar's close. Dicts are only
+created for trades; signals refused by a limit are counted per limit.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .backtest_engine import BUY, SELL, SignalArrays, _isoformat
+from .risk import risk_position_size, scale_to_margin
+
+
+@dataclass(frozen=True)
+class PortfolioLimits:
+    """Risk limits of the portfolio simulation (defaults as in ``config.settings``)."""
+
+    risk_per_trade: float = 0.025
+    max_positions: int = 12
+    # Largest order value in currency (MAX_POSITION_SIZE)
+    max_position_value: float = 100000.0
+    max_daily_loss: float = 0.06
+
+    @classmethod
+    def from_settings(cls, settings: Any = None, **overrides: Any) -> "PortfolioLimits":
+        """Limits of the live risk settings, with ``overrides`` applied."""
+        if settings is None:
+            from config import get_settings
+            settings = get_settings()
+        limits = cls(
+            risk_per_trade=float(settings.risk_per_trade),
+            max_positions=int(settings.max_positions),
+            max_position_value=float(settings.max_position_size),
+            max_daily_loss=float(settings.max_daily_loss),
+        )
+        return replace(limits, **overrides)
+
+
+@dataclass
+class PortfolioPanel:
+    """Prices and signals of every symbol on the shared time axis, shape (symbols, bars).
+
+    Bars a symbol did not trade are NaN (prices) and 0 (signal side).
+    """
+
+    symbols: List[str]
+    axis: pd.DatetimeIndex
+    close: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    side: np.ndarray
+    entry: np.ndarray
+    stop: np.ndarray
+    target: np.ndarray
+
+    @classmethod
+    def from_series(
+        cls, series: Mapping[str, Tuple[pd.DatetimeIndex, Mapping[str, np.ndarray], SignalArrays, int]]
+    ) -> "PortfolioPanel":
+        """Align (index, columns, signals, first tradable bar) per symbol on the union of their indexes."""
+        symbols = list(series)
+        indexes = [series[s][0] for s in symbols]
+        axis = indexes[0].append(indexes[1:]).unique().sort_values() if indexes else pd.DatetimeIndex([])
+        shape = (len(symbols), len(axis))
+        prices = {name: np.full(shape, np.nan) for name in ("close", "high", "low", "entry", "stop", "target")}
+        side = np.zeros(shape, dtype=np.int8)
+        for row, symbol in enumerate(symbols):
+            index, columns, signals, start = series[symbol]
+            at = axis.get_indexer(index)
+            for name in ("close", "high", "low"):
+                prices[name][row, at] = columns[name]
+            for name in ("entry", "stop", "target"):
+                prices[name][row, at] = getattr(signals, name)
+            # No trades during the indicator warmup
+            side[row, at[start:]] = signals.side[start:]
+        return cls(symbols, axis, side=side, **prices)
+
+
+@dataclass
+class PortfolioSimulation:
+    trades: List[Dict[str, Any]]
+    # Portfolio value at each bar's close
+    equity: np.ndarray
+    final_equity: float
+    # Buy signals not taken, by the limit that refused them
+    skipped: Dict[str, int] = field(default_factory=dict)
+    max_open_positions: int = 0
+
+    def equity_curve(self, axis: pd.DatetimeIndex) -> List[Dict[str, Any]]:
+        return [
+            {"date": date, "equity": value}
+            for date, value in zip(_isoformat(axis, 0, len(axis)), self.equity.tolist())
+        ]
+
+
+def simulate_portfolio(
+    panel: PortfolioPanel,
+    initial_capital: float,
+    limits: PortfolioLimits,
+    commission: float,
+    slippage: float,
+) -> PortfolioSimulation:
+    """Long-only simulation of ``panel``'s signals with shared cash and ``limits``."""
+    n_symbols, n_bars = panel.close.shape
+    shares = np.zeros(n_symbols, dtype=np.int64)
+    entry_price = np.zeros(n_symbols)
+    stop = np.zeros(n_symbols)
+    target = np.zeros(n_symbols)
+    entry_commission = np.zeros(n_symbols)
+    # First bar each symbol can open a position on
+    resume = np.zeros(n_symbols, dtype=np.int64)
+    last_close = np.zeros(n_symbols)
+    equity = np.empty(n_bars)
+    # Calendar day of each bar, for the daily loss limit
+    days = np.unique(panel.axis.normalize().asi8, return_inverse=True)[1]
+
+    trades: List[Dict[str, Any]] = []
+    skipped = {"max_positions": 0, "daily_loss": 0, "cash": 0}
+    cash = float(initial_capital)
+    day = -1
+    day_start_equity = cash
+    halted = False
+    open_positions = 0
+    max_open = 0
+
+    def close_position(i: int, t: int, price: float, reason: str) -> float:
+        exit_price_slippage = price * (1 - slippage)
+        quantity = int(shares[i])
+        exit_value = quantity * exit_price_slippage
+        exit_commission = exit_value * commission
+        trades.append({
+            "symbol": panel.symbols[i],
+            "type": "SELL",
+            "date": panel.axis[t].isoformat(),
+            "price": exit_price_slippage,
+            "quantity": quantity,
+            "value": exit_value,
+            "pnl": (exit_price_slippage - entry_price[i]) * quantity - (entry_commission[i] + exit_commission),
+            "reason": reason,
+            "commission": exit_commission,
+        })
+        shares[i] = 0
+        resume[i] = t + 1
+        return exit_value - exit_commission
+
+    for t in range(n_bars):
+        close = panel.close[:, t]
+        traded = ~np.isnan(close)
+        if days[t] != day:
+            day = days[t]
+            day_start_equity = cash + float(shares @ last_close)
+            halted = False
+        np.copyto(last_close, close, where=traded)
+
+        # 1. Exits of positions opened on earlier bars
+        if open_positions:
+            active = (shares > 0) & traded
+            low, high = panel.low[:, t], panel.high[:, t]
+            stopped = active & (low <= stop)
+            took_profit = active & ~stopped & (high >= target)
+            strategy_exit = active & ~stopped & ~took_profit & (panel.side[:, t] == SELL)
+            for mask, reason in ((stopped, "Stop Loss"), (took_profit, "Take Profit"), (strategy_exit, "Strategy Exit")):
+                for i in np.flatnonzero(mask):
+                    cash += close_position(i, t, float(close[i]), reason)
+                    open_positions -= 1
+
+        # 2. Daily loss limit on the portfolio marked at this bar's closes
+        if not halted and limits.max_daily_loss > 0:
+            marked = cash + float(shares @ last_close)
+            halted = marked <= day_start_equity * (1 - limits.max_daily_loss)
+
+        # 3. Entries, best reward-to-risk first
+        candidates = np.flatnonzero((panel.side[:, t] == BUY) & (shares == 0) & (resume <= t) & traded)
+        if len(candidates) and halted:
+            skipped["daily_loss"] += len(candidates)
+        elif len(candidates):
+            entry, stop_at, target_at = panel.entry[candidates, t], panel.stop[candidates, t], panel.target[candidates, t]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                reward_risk = (target_at - entry) / (entry - stop_at)
+            for k in np.argsort(-np.nan_to_num(reward_risk, nan=-np.inf), kind="stable"):
+                i = candidates[k]
+                if open_positions >= limits.max_positions:
+                    skipped["max_positions"] += 1
+                    continue
+                if not abs(entry[k] - stop_at[k]) > 0:
+                    continue
+                entry_price_slippage = float(entry[k]) * (1 + slippage)
+                position_size = risk_position_size(cash, float(entry[k]), float(stop_at[k]), limits.risk_per_trade)
+                position_size = scale_to_margin(position_size, position_size * entry_price_slippage, cash)
+                position_size = min(position_size, int(limits.max_position_value // entry_price_slippage))
+                trade_value = position_size * entry_price_slippage
+                trade_commission = trade_value * commission
+                if not (position_size > 0 and (trade_value + trade_commission) <= cash):
+                    skipped["cash"] += 1
+                    continue
+
+                cash -= trade_value + trade_commission
+                shares[i] = position_size
+                entry_price[i] = entry_price_slippage
+                stop[i], target[i] = stop_at[k], target_at[k]
+                entry_commission[i] = trade_commission
+                open_positions += 1
+                trades.append({
+                    "symbol": panel.symbols[i],
+                    "type": "BUY",
+                    "date": panel.axis[t].isoformat(),
+                    "price": entry_price_slippage,
+                    "quantity": position_size,
+                    "value": trade_value,
+                    "commission": trade_commission,
+                })
+            max_open = max(max_open, open_positions)
+
+        equity[t] = cash + float(shares @ last_close)
+
+    # Close any remaining positions at their last close
+    for i in np.flatnonzero(shares > 0):
+        last_bar = int(np.flatnonzero(~np.isnan(panel.close[i]))[-1])
+        cash += close_position(i, last_bar, float(last_close[i]), "End of Period")
+
+    return PortfolioSimulation(trades, equity, cash, skipped, max_open)
@@ -48,8 +48,9 @@ async def start(task: str, total: int, phase: str = "initializing") -> None:
         })
 
 
-async def update(current_symbol: Optional[str] = None, processed: Optional[int] = None, phase: Optional[str] = None) -> None:
-    """Update current progress information."""
+async def update(current_symbol: Optional[str] = None, processed: Optional[int] = None, phase: Optional[str] = None,
+                 total: Optional[int] = None) -> None:
+    """Update current progress information (``total`` once a later phase's size is known)."""
     async with _lock:
         if not _STATE.get("in_progress"):
             return
@@ -59,6 +60,8 @@ async def update(current_symbol: Optional[str] = None, processed: Optional[int]
             _STATE["processed"] = int(processed)
         if phase is not None:
             _STATE["phase"] = phase
+        if total is not None:
+            _STATE["total"] = int(total)
         _STATE["last_update"] = datetime.now(timezone.utc)
 
 
@@ -0,0 +1,281 @@
+"""
+Token-bucket rate limiting for IIFL calls, shared across processes through Redis.
+
+Every request takes one token from each of the global buckets (the account-wide
+per-second and per-minute limits) and from its endpoint bucket (orders, quotes,
+historical). All buckets are checked and debited in one Redis Lua script, using
+the Redis server clock, so the API server, the market stream, the Telegram bot
+and batch scripts draw from the same budget. When Redis is not connected (or a
+script call fails) the same buckets are kept in-process instead.
+
+Priority lanes keep headroom for orders: a lane may only take a token from a
+global bucket while more than ``reserve * capacity`` tokens remain, so a
+historical backfill (``bulk``) can never drain the budget an order placement
+(``critical``) needs. Reserves do not lower sustained throughput, only the
+burst a lower lane can take.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .redis_service import CacheKeys, get_connected_redis_service
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+LANE_CRITICAL = "critical"
+LANE_NORMAL = "normal"
+LANE_BULK = "bulk"
+
+# Fraction of each global bucket a lane must leave untouched
+DEFAULT_LANE_RESERVES: Dict[str, float] = {
+    LANE_CRITICAL: 0.0,
+    LANE_NORMAL: 0.25,
+    LANE_BULK: 0.5,
+}
+
+# KEYS: bucket keys. ARGV: (capacity, refill tokens per ms, reserved tokens) per key.
+# Returns 0 when a token was taken from every bucket, else the wait in ms.
+_ACQUIRE_SCRIPT = """
+if redis.replicate_commands then redis.replicate_commands() end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+  local base = (i - 1) * 3
+  local capacity = tonumber(ARGV[base + 1])
+  local rate = tonumber(ARGV[base + 2])
+  local reserve = tonumber(ARGV[base + 3])
+  local state = redis.call('HMGET', key, 'tokens', 'ts')
+  local tokens = tonumber(state[1]) or capacity
+  local ts = tonumber(state[2]) or now
+  tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+  levels[i] = tokens
+  local need = 1 + reserve
+  if tokens < need then
+    wait = math.max(wait, (need - tokens) / rate)
+  end
+end
+if wait > 0 then
+  return math.ceil(wait)
+end
+for i, key in ipairs(KEYS) do
+  local base = (i - 1) * 3
+  local capacity = tonumber(ARGV[base + 1])
+  local rate = tonumber(ARGV[base + 2])
+  redis.call('HSET', key, 'tokens', tostring(levels[i] - 1), 'ts', tostring(now))
+  redis.call('PEXPIRE', key, math.ceil(capacity / rate) * 2 + 1000)
+end
+return 0
+"""
+
+
+@dataclass(frozen=True)
+class BucketSpec:
+    """A bucket holding up to ``capacity`` tokens, refilled at ``rate`` tokens per second."""
+
+    capacity: float
+    rate: float
+
+
+class TokenBucket:
+    """In-process token bucket driven by ``time.monotonic()``."""
+
+    def __init__(self, spec: BucketSpec):
+        self.spec = spec
+        self.tokens = float(spec.capacity)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> float:
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.spec.capacity, self.tokens + elapsed * self.spec.rate)
+        self.updated = now
+        return self.tokens
+
+    def wait_for(self, reserve: float) -> float:
+        """Seconds until ``1 + reserve`` tokens are available (0 if they are now)."""
+        missing = 1.0 + reserve - self.tokens
+        return missing / self.spec.rate if missing > 0 else 0.0
+
+
+class RateLimiter:
+    """Global + per-endpoint token buckets with priority lanes, Redis-backed when possible."""
+
+    def __init__(
+        self,
+        scope: str,
+        global_buckets: Dict[str, BucketSpec],
+        endpoint_buckets: Dict[str, BucketSpec],
+        lane_reserves: Optional[Dict[str, float]] = None,
+    ):
+        self.scope = scope
+        self.global_buckets = dict(global_buckets)
+        self.endpoint_buckets = dict(endpoint_buckets)
+        self.lane_reserves = dict(lane_reserves or DEFAULT_LANE_RESERVES)
+        self._local: Dict[str, TokenBucket] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self.redis_acquires = 0
+        self.local_acquires = 0
+
+    # --- helpers ---
+    def _key(self, bucket: str) -> str:
+        return CacheKeys.format_key(CacheKeys.RATE_LIMIT_BUCKET, scope=self.scope, bucket=bucket)
+
+    def _plan(self, bucket: str, lane: str) -> List[Tuple[str, BucketSpec, float]]:
+        """(name, spec, reserved tokens) for every bucket a request must draw from."""
+        fraction = self.lane_reserves.get(lane, self.lane_reserves.get(LANE_NORMAL, 0.0))
+        # Never reserve so much that the lane could not be served at all
+        plan = [
+            (name, spec, min(fraction * spec.capacity, max(0.0, spec.capacity - 1.0)))
+            for name, spec in self.global_buckets.items()
+        ]
+        spec = self.endpoint_buckets.get(bucket)
+        if spec is not None:
+            plan.append((bucket, spec, 0.0))
+        return plan
+
+    def _try_local(self, plan: List[Tuple[str, BucketSpec, float]]) -> float:
+        now = time.monotonic()
+        wait = 0.0
+        buckets = []
+        for name, spec, reserve in plan:
+            tb = self._local.get(name)
+            if tb is None or tb.spec != spec:
+                tb = self._local[name] = TokenBucket(spec)
+            tb.refill(now)
+            wait = max(wait, tb.wait_for(reserve))
+            buckets.append(tb)
+        if wait > 0:
+            return wait
+        for tb in buckets:
+            tb.tokens -= 1.0
+        return 0.0
+
+    async def _try_redis(self, redis, plan: List[Tuple[str, BucketSpec, float]]) -> Optional[float]:
+        keys = [self._key(name) for name, _, _ in plan]
+        args: List[Any] = []
+        for _, spec, reserve in plan:
+            args.extend([spec.capacity, spec.rate / 1000.0, reserve])
+        result = await redis.eval_script(_ACQUIRE_SCRIPT, keys, args)
+        if result is None:
+            return None
+        return int(result) / 1000.0
+
+    async def _try_acquire(self, bucket: str, lane: str) -> float:
+        plan = self._plan(bucket, lane)
+        redis = get_connected_redis_service() if REDIS_AVAILABLE else None
+        if redis is not None:
+            wait = await self._try_redis(redis, plan)
+            if wait is not None:
+                if wait <= 0:
+                    self.redis_acquires += 1
+                return wait
+        wait = self._try_local(plan)
+        if wait <= 0:
+            self.local_acquires += 1
+        return wait
+
+    # --- public API ---
+    async def acquire(self, bucket: str = "default", lane: str = LANE_NORMAL) -> float:
+        """Wait until a token is available in every applicable bucket; returns seconds waited."""
+        started = time.monotonic()
+        while True:
+            wait = await self._try_acquire(bucket, lane)
+            if wait <= 0:
+                break
+            # Small jitter so processes woken together do not retry in lockstep
+            await asyncio.sleep(wait + random.uniform(0, 0.005))
+        waited = time.monotonic() - started
+        stats = self._stats.setdefault(f"{bucket}:{lane}", {"acquired": 0, "delayed": 0, "wait_seconds": 0.0})
+        stats["acquired"] += 1
+        if waited > 0.001:
+            stats["delayed"] += 1
+            stats["wait_seconds"] += waited
+        return waited
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "scope": self.scope,
+            "redis_acquires": self.redis_acquires,
+            "local_acquires": self.local_acquires,
+            "lanes": {
+                name: {**s, "wait_seconds": round(s["wait_seconds"], 3)}
+                for name, s in self._stats.items()
+            },
+        }
+
+
+def classify_iifl_request(method: str, endpoint: str) -> Tuple[str, str]:
+    """Map an IIFL call to its (endpoint bucket, lane)."""
+    path = "/" + endpoint.lstrip("/")
+    is_write = method.upper() in ("POST", "PUT", "DELETE")
+    if path.startswith("/orders"):
+        return "orders", LANE_CRITICAL if is_write else LANE_NORMAL
+    if path.startswith(("/preordermargin", "/spanexposure")):
+        return "orders", LANE_CRITICAL
+    if path.startswith("/trades"):
+        return "orders", LANE_NORMAL
+    if path.startswith("/marketdata/historicaldata"):
+        return "historical", LANE_BULK
+    if path.startswith("/marketdata"):
+        return "quotes", LANE_NORMAL
+    return "default", LANE_NORMAL
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, "") or default)
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def _iifl_limits() -> Tuple[float, float, Dict[str, float]]:
+    rps = _env_float("IIFL_MAX_RPS", 3)
+    rpm = _env_float("IIFL_MAX_RPM", 60)
+    endpoint_rps = {
+        "orders": _env_float("IIFL_ORDERS_MAX_RPS", 10),
+        "quotes": _env_float("IIFL_QUOTES_MAX_RPS", 3),
+        "historical": _env_float("IIFL_HISTORICAL_MAX_RPS", 2),
+    }
+    return rps, rpm, endpoint_rps
+
+
+def _minute_bucket(rps: float, rpm: float) -> BucketSpec:
+    """Per-minute bucket that admits at most ``rpm`` requests in any 60 s window.
+
+    A full bucket plus 60 s of refill is what a window can take after idle, so
+    the burst is kept to one second's worth and the refill covers the rest of
+    the minute; sustained throughput is ``rpm - burst`` per minute.
+    """
+    burst = max(1.0, min(rps, rpm / 2.0))
+    return BucketSpec(capacity=burst, rate=max(rpm - burst, 1.0) / 60.0)
+
+
+def iifl_sustained_rate(endpoint: str = "historical") -> float:
+    """Requests per second ``endpoint`` can sustain under the IIFL limits (the slowest refill applies)."""
+    rps, rpm, endpoint_rps = _iifl_limits()
+    return min(rps, _minute_bucket(rps, rpm).rate, endpoint_rps.get(endpoint, rps))
+
+
+def build_iifl_rate_limiter() -> RateLimiter:
+    """Limiter configured from IIFL_MAX_RPS / IIFL_MAX_RPM and the per-endpoint IIFL_*_MAX_RPS vars."""
+    rps, rpm, endpoint_rps = _iifl_limits()
+    return RateLimiter(
+        "iifl",
+        global_buckets={
+            "global:second": BucketSpec(capacity=rps, rate=rps),
+            "global:minute": _minute_bucket(rps, rpm),
+        },
+        endpoint_buckets={name: BucketSpec(capacity=r, rate=r) for name, r in endpoint_rps.items()},
+    )
@@ -66,6 +66,7 @@ class RedisService:
         self._hits = 0
         self._misses = 0
         self._errors = 0
+        self._scripts: dict = {}
     
     async def connect(self) -> bool:
         """
@@ -178,6 +179,35 @@ class RedisService:
             logger.warning(f"Redis SET error for key '{key}': {e}")
             return False
     
+    async def set_if_absent(self, key: str, value: Any, ttl: int, serialize: str = "json") -> Optional[bool]:
+        """
+        Set value only if the key does not exist (SET NX EX).
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time to live in seconds
+            serialize: Serialization method ('json', 'pickle', or 'raw')
+        
+        Returns:
+            True if the key was set, False if it already existed, None on error
+        """
+        if not self._connected:
+            return None
+        
+        try:
+            if serialize == "json":
+                serialized = json.dumps(value, default=str)
+            elif serialize == "pickle":
+                serialized = pickle.dumps(value)
+            else:  # raw
+                serialized = value
+            return bool(await self._client.set(key, serialized, ex=ttl, nx=True))
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Redis SET NX error for key '{key}': {e}")
+            return None
+    
     async def delete(self, *keys: str) -> int:
         """
         Delete one or more keys from cache.
@@ -263,6 +293,58 @@ class RedisService:
             logger.warning(f"Redis CLEAR_PATTERN error for pattern '{pattern}': {e}")
             return 0
     
+    async def publish(self, channel: str, message: Any) -> int:
+        """
+        Publish a JSON-serialized message on a pub/sub channel.
+        
+        Args:
+            channel: Channel name
+            message: JSON-serializable payload
+        
+        Returns:
+            Number of subscribers that received the message
+        """
+        if not self._connected:
+            return 0
+        
+        try:
+            return await self._client.publish(channel, json.dumps(message, default=str))
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Redis PUBLISH error on channel '{channel}': {e}")
+            return 0
+    
+    async def eval_script(self, script: str, keys: list, args: list) -> Any:
+        """
+        Run a Lua script (cached server-side via EVALSHA).
+        
+        Args:
+            script: Lua source
+            keys: KEYS passed to the script
+            args: ARGV passed to the script
+        
+        Returns:
+            Script result, or None when not connected or on error
+        """
+        if not self._connected:
+            return None
+        
+        try:
+            registered = self._scripts.get(script)
+            if registered is None:
+                registered = self._scripts[script] = self._client.register_script(script)
+            return await registered(keys=keys, args=args)
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Redis EVALSHA error: {e}")
+            return None
+    
+    def pubsub(self):
+        """Return a new pub/sub handle, or None when not connected."""
+        if not self._connected or self._client is None:
+            return None
+        return self._client.pubsub(ignore_subscribe_messages=True)
+    
     async def flush_db(self) -> bool:
         """
         Clear all keys from current database.
@@ -351,6 +433,16 @@ class CacheKeys:
     DB_SETTINGS = "db:settings:all"
     DB_RISK_EVENTS = "db:risk:recent:{limit}"
     
+    # Two-tier cache L2 entries and cross-worker invalidation channel
+    L2_ENTRY = "l2:{cache}:{namespace}:{key}"
+    L2_INVALIDATE_CHANNEL = "l2:invalidate"
+    
+    # Shared token buckets for outbound API rate limiting
+    RATE_LIMIT_BUCKET = "ratelimit:{scope}:{bucket}"
+    
+    # Active signal content hashes (deduplication across scans and workers)
+    SIGNAL_DEDUP = "signal:dedup:{key}"
+    
     # Computed data caching (1-5 minutes)
     PORTFOLIO_SUMMARY = "computed:portfolio:summary"
     PORTFOLIO_PERFORMANCE = "computed:portfolio:performance"
@@ -405,6 +497,18 @@ async def get_redis_service() -> RedisService:
     return _redis_instance
 
 
+def get_connected_redis_service() -> Optional[RedisService]:
+    """
+    Return the Redis singleton only if it is already connected.
+    
+    Unlike get_redis_service() this never opens a connection, so hot paths can
+    use Redis opportunistically without paying connect timeouts.
+    """
+    if _redis_instance is not None and _redis_instance.is_connected():
+        return _redis_instance
+    return None
+
+
 async def close_redis_service():
     """Close Redis service singleton."""
     global _redis_instance
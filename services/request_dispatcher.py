@@ -0,0 +1,195 @@
+"""
+Priority dispatch for outbound IIFL requests.
+
+Every ``_make_api_request`` call takes a slot from ``PriorityDispatcher`` before
+it waits for a rate-limit token. Requests belong to one of three classes:
+
+- ``CRITICAL``: order placement/modification/cancellation and stop-losses
+- ``INTERACTIVE``: UI and everything else that is not tagged
+- ``BULK``: historical backfills and scheduled scans
+
+Each class has its own concurrency cap, and ``INTERACTIVE`` and ``BULK`` also
+share a total cap. When a slot frees up, queued requests are admitted strictly
+by class. ``CRITICAL`` requests are not counted against the shared cap, so an
+order never queues behind in-flight candle pulls.
+
+The class comes from the endpoint (see ``classify_iifl_request``) unless the
+caller sets one with ``request_priority(...)``. The setting is a context
+variable, so it also covers tasks the caller spawns.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional
+
+from .rate_limiter import LANE_BULK, LANE_CRITICAL, LANE_NORMAL, classify_iifl_request
+
+
+class RequestPriority(IntEnum):
+    CRITICAL = 0
+    INTERACTIVE = 1
+    BULK = 2
+
+
+# Rate-limiter lane used by each class
+PRIORITY_LANES: Dict[RequestPriority, str] = {
+    RequestPriority.CRITICAL: LANE_CRITICAL,
+    RequestPriority.INTERACTIVE: LANE_NORMAL,
+    RequestPriority.BULK: LANE_BULK,
+}
+
+_LANE_PRIORITIES = {lane: priority for priority, lane in PRIORITY_LANES.items()}
+
+_current_priority: contextvars.ContextVar[Optional[RequestPriority]] = contextvars.ContextVar(
+    "iifl_request_priority", default=None
+)
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[None]:
+    """Run IIFL calls made inside the block (and tasks it spawns) at ``priority``."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def resolve_priority(method: str, endpoint: str, priority: Optional[RequestPriority] = None) -> RequestPriority:
+    """Explicit priority, else the caller's ``request_priority`` block, else the endpoint default."""
+    if priority is not None:
+        return priority
+    current = _current_priority.get()
+    if current is not None:
+        return current
+    _, lane = classify_iifl_request(method, endpoint)
+    return _LANE_PRIORITIES.get(lane, RequestPriority.INTERACTIVE)
+
+
+class _ClassStats:
+    __slots__ = ("completed", "queue_time_total", "queue_time_max", "recent")
+
+    def __init__(self) -> None:
+        self.completed = 0
+        self.queue_time_total = 0.0
+        self.queue_time_max = 0.0
+        self.recent: Deque[float] = deque(maxlen=500)
+
+    def record(self, waited: float) -> None:
+        self.completed += 1
+        self.queue_time_total += waited
+        self.queue_time_max = max(self.queue_time_max, waited)
+        self.recent.append(waited)
+
+    def percentile(self, pct: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+
+class PriorityDispatcher:
+    """Admits requests by class under per-class and shared concurrency caps."""
+
+    def __init__(self, class_limits: Dict[RequestPriority, int], shared_limit: int):
+        self.class_limits = {p: max(1, int(class_limits.get(p, 1))) for p in RequestPriority}
+        self.shared_limit = max(1, int(shared_limit))
+        self._queues: Dict[RequestPriority, Deque[asyncio.Future]] = {p: deque() for p in RequestPriority}
+        self._active: Dict[RequestPriority, int] = {p: 0 for p in RequestPriority}
+        self._stats: Dict[RequestPriority, _ClassStats] = {p: _ClassStats() for p in RequestPriority}
+
+    def _shared_active(self) -> int:
+        return self._active[RequestPriority.INTERACTIVE] + self._active[RequestPriority.BULK]
+
+    def _can_admit(self, priority: RequestPriority) -> bool:
+        if self._active[priority] >= self.class_limits[priority]:
+            return False
+        return priority == RequestPriority.CRITICAL or self._shared_active() < self.shared_limit
+
+    def _dispatch(self) -> None:
+        """Hand free slots to queued requests, highest class first."""
+        for priority in RequestPriority:
+            queue = self._queues[priority]
+            while queue and self._can_admit(priority):
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                self._active[priority] += 1
+                waiter.set_result(None)
+
+    async def _acquire(self, priority: RequestPriority) -> None:
+        # Only jump the queue when nothing of the same or a higher class is waiting
+        if self._can_admit(priority) and not any(self._queues[p] for p in RequestPriority if p <= priority):
+            self._active[priority] += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues[priority].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was granted just as we were cancelled: give it back
+                self._release(priority)
+            else:
+                try:
+                    self._queues[priority].remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def _release(self, priority: RequestPriority) -> None:
+        self._active[priority] -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: RequestPriority) -> AsyncIterator[float]:
+        """Hold a dispatch slot for ``priority``; yields the seconds spent queued."""
+        started = time.monotonic()
+        await self._acquire(priority)
+        waited = time.monotonic() - started
+        self._stats[priority].record(waited)
+        try:
+            yield waited
+        finally:
+            self._release(priority)
+
+    def stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"shared_limit": self.shared_limit}
+        for priority in RequestPriority:
+            s = self._stats[priority]
+            result[priority.name.lower()] = {
+                "limit": self.class_limits[priority],
+                "in_flight": self._active[priority],
+                "queued": len(self._queues[priority]),
+                "completed": s.completed,
+                "queue_time_avg": round(s.queue_time_total / s.completed, 4) if s.completed else 0.0,
+                "queue_time_p95": round(s.percentile(0.95), 4),
+                "queue_time_max": round(s.queue_time_max, 4),
+            }
+        return result
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, "") or default)
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def build_iifl_dispatcher() -> PriorityDispatcher:
+    """Dispatcher configured from IIFL_{CRITICAL,INTERACTIVE,BULK}_CONCURRENCY and IIFL_MAX_CONCURRENCY."""
+    return PriorityDispatcher(
+        {
+            RequestPriority.CRITICAL: _env_int("IIFL_CRITICAL_CONCURRENCY", 4),
+            RequestPriority.INTERACTIVE: _env_int("IIFL_INTERACTIVE_CONCURRENCY", 4),
+            RequestPriority.BULK: _env_int("IIFL_BULK_CONCURRENCY", 2),
+        },
+        shared_limit=_env_int("IIFL_MAX_CONCURRENCY", 4),
+    )
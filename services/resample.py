@@ -0,0 +1,203 @@
+"""
+Local OHLCV resampling from a single base interval.
+
+Fetching every timeframe from the broker costs one rate-limited call per
+(symbol, interval). Higher timeframes are pure aggregations of a finer series,
+so the fine series is fetched once (and appended to in the candle store) and
+coarser ones are derived here:
+
+- ``resample_columns`` aggregates candle columns (``ts`` in naive wall-clock
+  epoch seconds, as in ``candle_store``) with ``np.*.reduceat`` over bucket
+  boundaries: first open, max high, min low, last close, summed volume.
+  Intraday buckets are aligned to the 09:15 NSE session open (so 1H bars run
+  09:15-10:15, ...); daily buckets are calendar days labelled at midnight.
+- ``ResampleCache`` keeps each derived series and, when the base series has
+  grown, re-aggregates only from the last (possibly incomplete) bucket on.
+  A base series that was rewritten or whose last candle changed is
+  resampled from scratch.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from .candle_store import PRICE_COLUMNS, candles_to_columns, columns_to_frame, columns_to_records
+
+try:
+    import pandas as pd
+    HAS_PANDAS = True
+except ImportError:
+    HAS_PANDAS = False
+
+DAY_SECONDS = 86400
+# NSE cash session opens at 09:15; intraday buckets start there
+SESSION_OPEN_SECONDS = 9 * 3600 + 15 * 60
+
+
+def interval_seconds(interval: str) -> Optional[int]:
+    """Bar length in seconds for "5", "5m", "15m", "1H", "1D"/"D"; None when not understood."""
+    value = str(interval).strip().lower()
+    if value in ("d", "day", "1d"):
+        return DAY_SECONDS
+    for suffix, unit in (("m", 60), ("h", 3600), ("d", DAY_SECONDS)):
+        if value.endswith(suffix) and value[:-1].isdigit():
+            return int(value[:-1]) * unit or None
+    if value.isdigit():
+        return int(value) * 60 or None
+    return None
+
+
+def can_derive(interval: str, base_interval: str, intraday_only: bool = True) -> bool:
+    """Whether ``interval`` is a whole multiple of ``base_interval`` (and intraday, unless allowed)."""
+    width, base = interval_seconds(interval), interval_seconds(base_interval)
+    if not width or not base or width <= base or width % base:
+        return False
+    if width >= DAY_SECONDS:
+        return not intraday_only and width == DAY_SECONDS
+    return True
+
+
+def _bucket_labels(ts: np.ndarray, width: int) -> np.ndarray:
+    if width >= DAY_SECONDS:
+        return ts // DAY_SECONDS * DAY_SECONDS
+    day = ts // DAY_SECONDS * DAY_SECONDS
+    offset = ts - day - SESSION_OPEN_SECONDS
+    return day + SESSION_OPEN_SECONDS + offset // width * width
+
+
+def resample_columns(cols: Dict[str, np.ndarray], interval: str) -> Dict[str, np.ndarray]:
+    """Aggregate time-sorted candle columns into ``interval`` bars."""
+    width = interval_seconds(interval)
+    if not width:
+        raise ValueError(f"Unknown interval: {interval}")
+    ts = np.asarray(cols["ts"], dtype=np.int64)
+    if len(ts) == 0:
+        return {"ts": ts.copy(), **{name: np.asarray(cols[name], dtype=np.float64)[:0] for name in PRICE_COLUMNS}}
+    labels = _bucket_labels(ts, width)
+    starts = np.flatnonzero(np.concatenate(([True], labels[1:] != labels[:-1])))
+    ends = np.append(starts[1:], len(ts)) - 1
+    high = np.asarray(cols["high"], dtype=np.float64)
+    low = np.asarray(cols["low"], dtype=np.float64)
+    volume = np.asarray(cols["volume"], dtype=np.float64)
+    return {
+        "ts": labels[starts],
+        "open": np.asarray(cols["open"], dtype=np.float64)[starts],
+        "high": np.maximum.reduceat(high, starts),
+        "low": np.minimum.reduceat(low, starts),
+        "close": np.asarray(cols["close"], dtype=np.float64)[ends],
+        "volume": np.add.reduceat(volume, starts),
+    }
+
+
+def _frame_to_columns(df) -> Dict[str, np.ndarray]:
+    index = df.index if isinstance(df.index, pd.DatetimeIndex) else pd.DatetimeIndex(pd.to_datetime(df["date"]))
+    cols = {"ts": index.values.astype("datetime64[s]").astype(np.int64)}
+    for name in PRICE_COLUMNS:
+        cols[name] = df[name].to_numpy(dtype=np.float64)
+    return cols
+
+
+def resample_candles(candles: Any, interval: str, cache: Optional["ResampleCache"] = None,
+                     key: Hashable = None) -> Any:
+    """Resample a DataFrame or list of candle dicts, returning the same shape.
+
+    With ``cache`` the derived series is kept under ``key`` and updated
+    incrementally on the next call.
+    """
+    if HAS_PANDAS and isinstance(candles, pd.DataFrame):
+        cols = _frame_to_columns(candles)
+        out = cache.get(key, cols, interval) if cache is not None else resample_columns(cols, interval)
+        return columns_to_frame(out)
+    cols = candles_to_columns(list(candles or []))
+    out = cache.get(key, cols, interval) if cache is not None else resample_columns(cols, interval)
+    return columns_to_records(out)
+
+
+@dataclass
+class _Entry:
+    cols: Dict[str, np.ndarray]
+    base_rows: int
+    base_first_ts: int
+    # Base candle the series was last built through, to detect an unchanged base
+    base_last: Tuple[float, ...]
+    # Base row where the last derived bucket starts
+    tail_start: int
+    # Last base candle before ``tail_start``, to detect rewrites of settled buckets
+    base_anchor: Optional[Tuple[float, ...]]
+
+
+def _row(cols: Dict[str, np.ndarray], i: int) -> Tuple[float, ...]:
+    return (float(cols["ts"][i]),) + tuple(float(cols[name][i]) for name in PRICE_COLUMNS)
+
+
+class ResampleCache:
+    """Derived series per (key, interval), updated from the base series' new rows only."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Hashable, str], _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.full_builds = 0
+        self.incremental_builds = 0
+
+    def get(self, key: Hashable, base_cols: Dict[str, np.ndarray], interval: str) -> Dict[str, np.ndarray]:
+        """``base_cols`` resampled to ``interval``, reusing the cached result for ``key``."""
+        ts = np.asarray(base_cols["ts"])
+        rows = len(ts)
+        with self._lock:
+            entry = self._entries.get((key, interval))
+            if entry is not None and not self._extends(entry, base_cols, rows):
+                entry = None
+            if entry is not None and entry.base_rows == rows and _row(base_cols, rows - 1) == entry.base_last:
+                self._entries.move_to_end((key, interval))
+                return entry.cols
+
+        if entry is None or rows == 0:
+            cols = resample_columns(base_cols, interval)
+            self.full_builds += 1
+        else:
+            # Only the last bucket can have changed (its bars may have been
+            # revised in place); rebuild it and anything after
+            tail = resample_columns({k: np.asarray(v)[entry.tail_start:] for k, v in base_cols.items()}, interval)
+            cols = {k: np.concatenate((entry.cols[k][:-1], tail[k])) for k in entry.cols}
+            self.incremental_builds += 1
+
+        if rows:
+            tail_start = int(np.searchsorted(ts, cols["ts"][-1], side="left"))
+            new_entry = _Entry(
+                cols=cols,
+                base_rows=rows,
+                base_first_ts=int(ts[0]),
+                base_last=_row(base_cols, rows - 1),
+                tail_start=tail_start,
+                base_anchor=_row(base_cols, tail_start - 1) if tail_start else None,
+            )
+            with self._lock:
+                self._entries[(key, interval)] = new_entry
+                self._entries.move_to_end((key, interval))
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return cols
+
+    @staticmethod
+    def _extends(entry: _Entry, base_cols: Dict[str, np.ndarray], rows: int) -> bool:
+        """True when ``base_cols`` keeps the cached series' settled rows (those before its last bucket).
+
+        Rows from ``tail_start`` on are rebuilt anyway, so a last bar updated in
+        place by a delta refetch still extends the cached series.
+        """
+        if rows < entry.base_rows or rows == 0 or int(base_cols["ts"][0]) != entry.base_first_ts:
+            return False
+        if entry.base_anchor is None:
+            return True
+        return np.array_equal(_row(base_cols, entry.tail_start - 1), entry.base_anchor, equal_nan=True)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop every derived series of ``key`` (e.g. after the base series was replaced)."""
+        with self._lock:
+            for cache_key in [k for k in self._entries if k[0] == key]:
+                del self._entries[cache_key]
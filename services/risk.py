@@ -13,6 +13,27 @@ from config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Largest fraction of available capital one order's margin may take
+MAX_MARGIN_FRACTION = 0.8
+
+
+def risk_position_size(available_capital: float, entry_price: float, stop_loss: float,
+                       risk_per_trade: float) -> int:
+    """Shares whose stop-out loses ``risk_per_trade`` of ``available_capital`` (at least 1)"""
+    risk_per_share = abs(entry_price - stop_loss)
+    if risk_per_share <= 0:
+        return 1
+    return max(1, int(available_capital * risk_per_trade / risk_per_share))
+
+
+def scale_to_margin(position_size: int, required_margin: float, available_capital: float) -> int:
+    """``position_size`` scaled down so its margin fits in ``MAX_MARGIN_FRACTION`` of capital"""
+    limit = available_capital * MAX_MARGIN_FRACTION
+    if required_margin and required_margin > limit:
+        return max(1, int(position_size * limit / required_margin))
+    return position_size
+
+
 class RiskService:
     """Risk management and position sizing service"""
     
@@ -318,12 +339,10 @@ class RiskService:
                 if risk_per_share <= 0:
                     return 1
                 
-                # Position size based on risk per trade
-                risk_amount = available_capital * self.settings.risk_per_trade
-                position_size = int(risk_amount / risk_per_share)
-                
-                # Ensure minimum position
-                position_size = max(1, position_size)
+                # Position size based on risk per trade (at least one share)
+                position_size = risk_position_size(
+                    available_capital, entry_price, stop_loss, self.settings.risk_per_trade
+                )
                 
                 # Only check margin if data_fetcher is available
                 if self.data_fetcher:
@@ -358,10 +377,8 @@ class RiskService:
                         except Exception:
                             req_margin_val = 0.0
 
-                    if req_margin_val and req_margin_val > available_capital * 0.8:  # Use max 80% of capital
-                        # Scale down position size
-                        scale_factor = (available_capital * 0.8) / req_margin_val
-                        position_size = max(1, int(position_size * scale_factor))
+                    # Scale down to use at most 80% of capital
+                    position_size = scale_to_margin(position_size, req_margin_val, available_capital)
                 
                 return position_size
                 
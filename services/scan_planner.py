@@ -0,0 +1,199 @@
+"""
+Planning for universe-scale strategy scans.
+
+``ScanPlanner`` builds the scan universe for each category and splits it into
+batches the broker rate limit can serve:
+
+- universe: for each category, the first non-empty source in
+  ``SCAN_UNIVERSE_SOURCES`` (default ``watchlist,file,static``). These are the
+  DB watchlist for the category, the index constituents file
+  (``SCAN_UNIVERSE_FILE``, default the Nifty 100 list) and the scheduler's
+  built-in symbol sets. A symbol in several categories is planned once.
+- batches: a batch holds the symbols whose candle requests the IIFL
+  historical limit can sustain in ``SCAN_BATCH_SECONDS``, so one batch's
+  fetches occupy the request budget for about that long.
+- time budget: the plan estimates the scan from its request count and keeps
+  only the batches that fit in the budget. Symbols left out are deferred and
+  planned first by the next scan with the same categories, so consecutive
+  scans rotate through a universe too large for one budget.
+
+The scheduler runs the batches through a fetch -> compute -> persist
+``pipeline.Pipeline``.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence
+
+from .rate_limiter import iifl_sustained_rate
+
+logger = logging.getLogger(__name__)
+
+UNIVERSE_SOURCES = ("watchlist", "file", "static")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, "") or default)
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+@dataclass
+class ScanBatch:
+    index: int
+    # Symbol -> categories it is scanned for
+    symbols: Dict[str, List[Any]]
+    calls: int
+
+
+@dataclass
+class ScanPlan:
+    batches: List[ScanBatch]
+    # Symbols left for the next scan because the budget ran out
+    deferred: List[str]
+    request_rate: float
+    time_budget: float
+
+    @property
+    def symbol_count(self) -> int:
+        return sum(len(batch.symbols) for batch in self.batches)
+
+    @property
+    def calls(self) -> int:
+        return sum(batch.calls for batch in self.batches)
+
+    @property
+    def estimated_seconds(self) -> float:
+        return self.calls / self.request_rate
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "symbols": self.symbol_count,
+            "batches": len(self.batches),
+            "requests": self.calls,
+            "request_rate": round(self.request_rate, 3),
+            "estimated_seconds": round(self.estimated_seconds, 1),
+            "time_budget": self.time_budget,
+            "deferred": len(self.deferred),
+        }
+
+
+class ScanPlanner:
+    """Builds per-category universes and rate-limit-sized, time-budgeted batch plans."""
+
+    def __init__(
+        self,
+        universe_file: Optional[str] = None,
+        sources: Optional[Sequence[str]] = None,
+        batch_seconds: Optional[float] = None,
+        request_rate: Optional[float] = None,
+    ):
+        self.universe_file = universe_file or os.getenv("SCAN_UNIVERSE_FILE", "data/ind_nifty100list.csv")
+        if sources is None:
+            raw = os.getenv("SCAN_UNIVERSE_SOURCES", ",".join(UNIVERSE_SOURCES))
+            sources = [s.strip().lower() for s in raw.split(",") if s.strip()]
+        self.sources = [s for s in sources if s in UNIVERSE_SOURCES] or list(UNIVERSE_SOURCES)
+        self.batch_seconds = batch_seconds or _env_float("SCAN_BATCH_SECONDS", 60)
+        self._request_rate = request_rate
+        self._file_symbols: Optional[List[str]] = None
+        self._file_mtime: Optional[float] = None
+        self._deferred: Dict[Hashable, List[str]] = {}
+
+    @property
+    def request_rate(self) -> float:
+        """Sustained candle requests per second (IIFL historical limit unless given)."""
+        return self._request_rate or iifl_sustained_rate("historical")
+
+    def file_symbols(self) -> List[str]:
+        """Symbols from ``universe_file`` (re-read when the file changes)."""
+        path = Path(self.universe_file)
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return []
+        if self._file_symbols is None or mtime != self._file_mtime:
+            from .watchlist import _load_symbols_from_csv
+            self._file_symbols = _load_symbols_from_csv(str(path), "Symbol")
+            self._file_mtime = mtime
+        return self._file_symbols
+
+    def resolve_universe(
+        self,
+        categories: Sequence[Any],
+        watchlists: Mapping[Any, Sequence[str]],
+        static: Mapping[Any, Iterable[str]],
+    ) -> Dict[str, List[Any]]:
+        """Symbol -> categories, from the first non-empty source per category, in source order."""
+        symbol_categories: Dict[str, List[Any]] = {}
+        for category in categories:
+            for source in self.sources:
+                if source == "watchlist":
+                    symbols = list(watchlists.get(category) or ())
+                elif source == "file":
+                    symbols = self.file_symbols()
+                else:
+                    symbols = sorted(static.get(category) or ())
+                if symbols:
+                    break
+            else:
+                logger.warning(f"No scan universe for {getattr(category, 'value', category)}")
+                continue
+            for symbol in symbols:
+                cats = symbol_categories.setdefault(symbol.upper(), [])
+                if category not in cats:
+                    cats.append(category)
+        return symbol_categories
+
+    def plan(
+        self,
+        symbol_categories: Mapping[str, List[Any]],
+        requests_for: Callable[[str, List[Any]], int],
+        time_budget: float,
+        key: Hashable = None,
+    ) -> ScanPlan:
+        """Batch ``symbol_categories`` within ``time_budget`` seconds of request capacity.
+
+        ``requests_for(symbol, categories)`` is the number of candle requests a
+        symbol needs this scan. Symbols deferred by the previous plan for
+        ``key`` go first.
+        """
+        rate = self.request_rate
+        carried = [s for s in self._deferred.get(key, []) if s in symbol_categories]
+        carried_set = set(carried)
+        order = carried + [s for s in symbol_categories if s not in carried_set]
+
+        per_batch = max(1, int(rate * self.batch_seconds))
+        # Leave one batch worth of time for computing and persisting the last batch
+        capacity = max(per_batch, int(rate * max(0.0, time_budget - self.batch_seconds)))
+
+        batches: List[ScanBatch] = []
+        current: Dict[str, List[Any]] = {}
+        current_calls = 0
+        total_calls = 0
+        deferred: List[str] = []
+        for symbol in order:
+            calls = max(0, requests_for(symbol, symbol_categories[symbol]))
+            if calls and total_calls and total_calls + calls > capacity:
+                deferred.append(symbol)
+                continue
+            if current and current_calls + calls > per_batch:
+                batches.append(ScanBatch(len(batches), current, current_calls))
+                current, current_calls = {}, 0
+            current[symbol] = list(symbol_categories[symbol])
+            current_calls += calls
+            total_calls += calls
+        if current:
+            batches.append(ScanBatch(len(batches), current, current_calls))
+
+        self._deferred[key] = deferred
+        return ScanPlan(batches, deferred, rate, time_budget)
+
+    def defer(self, key: Hashable, symbols: Sequence[str]) -> None:
+        """Put ``symbols`` (planned but not scanned) at the front of the next plan for ``key``."""
+        existing = [s for s in self._deferred.get(key, []) if s not in symbols]
+        self._deferred[key] = list(symbols) + existing
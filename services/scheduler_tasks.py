@@ -8,6 +8,7 @@ from services.watchlist import WatchlistService
 from services.iifl_api import IIFLAPIService
 from services.data_fetcher import DataFetcher
 from services.screener import ScreenerService
+from services.request_dispatcher import RequestPriority, request_priority
 
 logger = logging.getLogger(__name__)
 
@@ -70,7 +71,9 @@ async def _execute_prefetch():
             except Exception as e:
                 logger.warning(f"Prefetch failed for {sym}: {str(e)}")
     
-    await asyncio.gather(*[_prefetch_symbol(s) for s in symbols], return_exceptions=True)
+    # Backfill requests yield to orders and UI requests
+    with request_priority(RequestPriority.BULK):
+        await asyncio.gather(*[_prefetch_symbol(s) for s in symbols], return_exceptions=True)
     logger.info("Completed scheduled prefetch of watchlist historical data")
 
 async def _fetch_symbol_data(fetcher: DataFetcher, sym: str):
@@ -107,3 +110,24 @@ async def _execute_watchlist_build():
         watchlist_service = WatchlistService(session)
         screener_service = ScreenerService(watchlist_service)
         await screener_service.build_intraday_watchlist()
+
+
+async def refresh_contract_master() -> None:
+    """Download the NSEEQ contract file and rebuild the binary contract snapshot.
+
+    Runs once per weekday before the open (scheduled in main.py); on failure the
+    previous snapshot keeps being served.
+    """
+    from services.contract_master import get_contract_master
+    from services.instrument_resolver import InstrumentResolver, set_instrument_resolver
+
+    logger.info("Starting scheduled contract master refresh")
+    try:
+        snapshot = await asyncio.wait_for(get_contract_master().refresh(force=True), timeout=120)
+        if snapshot:
+            set_instrument_resolver(InstrumentResolver(snapshot.mapping))
+            logger.info(f"Contract master refreshed to {snapshot.version}")
+    except asyncio.TimeoutError:
+        logger.error("⏱️ Contract master refresh exceeded 2 minute timeout")
+    except Exception as e:
+        logger.error(f"❌ Contract master refresh failed: {e}")
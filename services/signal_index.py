@@ -0,0 +1,137 @@
+"""
+Content-hash index of active signals.
+
+Scans run every few minutes, so the same setup on the same bar is generated
+again and again. Without a check each repeat costs a capital lookup, a position
+size calculation, a broker margin call and a DB insert before it turns out to
+be a copy of a pending signal.
+
+``SignalIndex.claim`` hashes what makes a signal distinct (symbol, strategy,
+trading category, side, bar timestamp and entry/stop/target rounded to the
+tick size; the unified scan emits the same setup once per category, and each
+category keeps its own signal) and
+registers it for the life of a signal (``SIGNAL_TIMEOUT``). A repeat is
+rejected with one dict lookup. Claims are also written to Redis with
+``SET NX``, so the API server and batch scripts share the index; without Redis
+the index is per process.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional
+
+try:
+    from .redis_service import CacheKeys, get_connected_redis_service
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, "") or default)
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def _level(value: Any, tick: float) -> str:
+    try:
+        return str(int(round(float(value) / tick)))
+    except (TypeError, ValueError):
+        return ""
+
+
+def signal_fingerprint(signal_data: Mapping[str, Any], tick: float = 0.05) -> str:
+    """Hash of the fields that identify a signal; price levels are compared in ticks."""
+    side = signal_data.get("signal_type")
+    side = getattr(side, "value", side)
+    entry = signal_data.get("entry_price")
+    if entry is None:
+        entry = signal_data.get("price")
+    parts = (
+        str(signal_data.get("symbol", "")).upper(),
+        str(signal_data.get("strategy", "")),
+        str(signal_data.get("category") or ""),
+        str(side or "").lower(),
+        str(signal_data.get("bar_time") or ""),
+        _level(entry, tick),
+        _level(signal_data.get("stop_loss"), tick),
+        _level(signal_data.get("take_profit"), tick),
+    )
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+class SignalIndex:
+    """Active signal fingerprints with expiry, in memory and (when connected) in Redis."""
+
+    def __init__(self, tick: Optional[float] = None, max_entries: int = 50_000):
+        self.tick = tick or _env_float("SIGNAL_DEDUP_TICK", 0.05)
+        self.max_entries = max_entries
+        # Fingerprint -> expiry (epoch seconds), oldest claim first
+        self._active: "OrderedDict[str, float]" = OrderedDict()
+        self.claims = 0
+        self.duplicates = 0
+
+    def _prune(self, now: float) -> None:
+        while self._active:
+            key, expiry = next(iter(self._active.items()))
+            if expiry > now and len(self._active) <= self.max_entries:
+                break
+            del self._active[key]
+
+    async def claim(self, signal_data: Mapping[str, Any], ttl: int) -> Optional[str]:
+        """Register a signal; returns its fingerprint, or None when it is already active."""
+        key = signal_fingerprint(signal_data, self.tick)
+        now = time.time()
+        if self._active.get(key, 0.0) > now:
+            self.duplicates += 1
+            return None
+
+        redis = get_connected_redis_service() if REDIS_AVAILABLE else None
+        if redis is not None:
+            claimed = await redis.set_if_absent(CacheKeys.format_key(CacheKeys.SIGNAL_DEDUP, key=key), 1, ttl)
+            if claimed is False:
+                # Created by another process; remember it so repeats stay local
+                self._active[key] = now + ttl
+                self.duplicates += 1
+                return None
+
+        self._active[key] = now + ttl
+        self._active.move_to_end(key)
+        self._prune(now)
+        self.claims += 1
+        return key
+
+    async def release(self, key: str) -> None:
+        """Forget a claim whose signal was not created."""
+        self._active.pop(key, None)
+        redis = get_connected_redis_service() if REDIS_AVAILABLE else None
+        if redis is not None:
+            await redis.delete(CacheKeys.format_key(CacheKeys.SIGNAL_DEDUP, key=key))
+
+    async def clear(self) -> None:
+        self._active.clear()
+        redis = get_connected_redis_service() if REDIS_AVAILABLE else None
+        if redis is not None:
+            await redis.clear_pattern(CacheKeys.format_key(CacheKeys.SIGNAL_DEDUP, key="*"))
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"active": len(self._active), "claims": self.claims, "duplicates": self.duplicates}
+
+
+_signal_index: Optional[SignalIndex] = None
+
+
+def get_signal_index() -> SignalIndex:
+    """Process-wide index shared by every OrderManager."""
+    global _signal_index
+    if _signal_index is None:
+        _signal_index = SignalIndex()
+    return _signal_index
@@ -23,10 +23,11 @@ try:
     from anthropic import AsyncAnthropic  # type: ignore
 except Exception:
     AsyncAnthropic = None  # type: ignore
-import aiohttp
+import httpx
 
 from config.settings import get_settings
 from services.logging_service import trading_logger
+from services.http_transport import get_http_client
 
 class ValidationResult(Enum):
     APPROVE = "approve"
@@ -64,7 +65,7 @@ class SignalValidationService:
         # Initialize LLM clients
         self.openai_client = None
         self.anthropic_client = None
-        self.perplexity_session = None
+        self.perplexity_headers: Optional[Dict[str, str]] = None
         
         # Configuration
         self.validation_enabled = getattr(self.settings, 'LLM_VALIDATION_ENABLED', False)
@@ -96,12 +97,10 @@ class SignalValidationService:
             # Perplexity
             perplexity_key = getattr(self.settings, 'PERPLEXITY_API_KEY', None)
             if perplexity_key:
-                self.perplexity_session = aiohttp.ClientSession(
-                    headers={
-                        'Authorization': f'Bearer {perplexity_key}',
-                        'Content-Type': 'application/json'
-                    }
-                )
+                self.perplexity_headers = {
+                    'Authorization': f'Bearer {perplexity_key}',
+                    'Content-Type': 'application/json'
+                }
                 
             self.logger.info(f"LLM Signal Validation initialized with {self.primary_provider}")
             
@@ -141,7 +140,7 @@ class SignalValidationService:
                 response = await self._validate_with_openai(prompt)
             elif self.primary_provider == "anthropic" and self.anthropic_client:
                 response = await self._validate_with_anthropic(prompt)
-            elif self.primary_provider == "perplexity" and self.perplexity_session:
+            elif self.primary_provider == "perplexity" and self.perplexity_headers:
                 response = await self._validate_with_perplexity(prompt)
             else:
                 # Fallback to rule-based validation
@@ -311,24 +310,25 @@ Respond in JSON format:
                 "search_domain_filter": ["finance.yahoo.com", "marketwatch.com", "bloomberg.com"]
             }
             
-            async with self.perplexity_session.post(
+            response = await get_http_client().post(
                 "https://api.perplexity.ai/chat/completions",
                 json=payload,
-                timeout=aiohttp.ClientTimeout(total=self.validation_timeout)
-            ) as response:
-                if response.status != 200:
-                    raise Exception(f"Perplexity API returned status {response.status}")
-                
-                data = await response.json()
-                content = data["choices"][0]["message"]["content"]
-                
-                # Log citations if available
-                if "citations" in data:
-                    self.logger.info(f"Perplexity validation used sources: {data['citations']}")
-                
-                return self._parse_llm_response(content)
+                headers=self.perplexity_headers,
+                timeout=self.validation_timeout
+            )
+            if response.status_code != 200:
+                raise Exception(f"Perplexity API returned status {response.status_code}")
+            
+            data = response.json()
+            content = data["choices"][0]["message"]["content"]
+            
+            # Log citations if available
+            if "citations" in data:
+                self.logger.info(f"Perplexity validation used sources: {data['citations']}")
+            
+            return self._parse_llm_response(content)
                 
-        except asyncio.TimeoutError:
+        except (asyncio.TimeoutError, httpx.TimeoutException):
             raise Exception("Perplexity API timeout")
         except Exception as e:
             raise Exception(f"Perplexity API error: {e}")
@@ -484,9 +484,8 @@ Respond in JSON format:
         }
     
     async def cleanup(self):
-        """Clean up resources"""
-        if self.perplexity_session:
-            await self.perplexity_session.close()
+        """Clean up resources (the shared HTTP client is closed at application shutdown)"""
+        self.perplexity_headers = None
 
 # Global service instance
 _signal_validator = None
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 import logging
@@ -9,6 +11,10 @@ from models.signals import Signal, SignalType, SignalStatus
 from config.settings import get_settings
 from dataclasses import dataclass
 from .enhanced_logging import critical_events, log_operation, log_signal_processing
+from .strategy_registry import (
+    DEFAULT_LOOKBACK, get_strategy, min_lookback, register_signal_masks, register_strategy, required_indicators,
+    select_strategies,
+)
 
 # Logger for this module
 logger = logging.getLogger(__name__)
@@ -17,7 +23,6 @@ logger = logging.getLogger(__name__)
 try:
     import pandas as pd
     import numpy as np
-    import ta
     HAS_PANDAS = True
 except ImportError:
     HAS_PANDAS = False
@@ -46,6 +51,22 @@ except ImportError:
             mean_val = np.mean(data)
             return (sum((x - mean_val) ** 2 for x in data) / len(data)) ** 0.5
 
+# Array indicator and strategy machinery (needs NumPy/pandas); import errors here are real errors
+if HAS_PANDAS:
+    from .indicator_engine import build_panel, compute_indicators
+    from .indicator_state import IndicatorState
+    from .bar_view import LatestBars, as_latest_bars, panel_views
+    from .backtest_engine import SignalArrays, float_columns, previous
+    from .strategy_pool import get_strategy_pool
+
+
+# Candle interval and days of history each trading category is evaluated on
+CATEGORY_TIMEFRAMES: Dict[str, Tuple[str, int]] = {
+    "day_trading": ("5m", 2),    # last 2 days of 5-minute candles for intraday context
+    "long_term": ("1D", 250),    # ~1 year of data for long term trends
+}
+DEFAULT_TIMEFRAME: Tuple[str, int] = ("1D", 100)  # short term / swing trading
+
 
 @dataclass
 class TradingSignal:
@@ -75,20 +96,23 @@ class StrategyService:
         except Exception:
             self._notifier = None
 
-        self._strategy_map = {
-            "ema_crossover": self._ema_crossover_strategy,
-            "bollinger_bands": self._bollinger_bands_strategy,
-            "momentum": self._momentum_strategy,
-        }
+    @property
+    def _strategy_map(self) -> Dict[str, Any]:
+        """Registered strategies bound to this service, by name."""
+        return {name: spec.bind(self) for name, spec in select_strategies().items()}
+
+    def calculate_indicators(self, df, columns: Optional[List[str]] = None, min_bars: int = DEFAULT_LOOKBACK) -> Dict:
+        """Calculate technical indicators for the dataframe
 
-    def calculate_indicators(self, df) -> Dict:
-        """Calculate technical indicators for the dataframe"""
+        ``columns`` limits the work to those indicators (see
+        ``strategy_registry``); by default every indicator is added.
+        """
         try:
             if not HAS_PANDAS:
                 logger.warning("Pandas not available, using basic indicators")
                 return self._calculate_basic_indicators(df)
             
-            if df.empty or len(df) < 50:
+            if df.empty or len(df) < min_bars:
                 return df
             
             # Ensure we have the required columns
@@ -97,42 +121,9 @@ class StrategyService:
                 logger.error("Missing required OHLCV columns")
                 return df
             
-            # Moving Averages
-            df['ema_9'] = ta.trend.EMAIndicator(df['close'], window=9).ema_indicator()
-            df['ema_21'] = ta.trend.EMAIndicator(df['close'], window=21).ema_indicator()
-            df['ema_50'] = ta.trend.EMAIndicator(df['close'], window=50).ema_indicator()
-            df['sma_20'] = ta.trend.SMAIndicator(df['close'], window=20).sma_indicator()
-            
-            # Bollinger Bands
-            bb = ta.volatility.BollingerBands(df['close'], window=20, window_dev=2)
-            df['bb_upper'] = bb.bollinger_hband()
-            df['bb_middle'] = bb.bollinger_mavg()
-            df['bb_lower'] = bb.bollinger_lband()
-            df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / df['bb_middle']
-            
-            # RSI
-            df['rsi'] = ta.momentum.RSIIndicator(df['close'], window=14).rsi()
-            
-            # MACD
-            macd = ta.trend.MACD(df['close'])
-            df['macd'] = macd.macd()
-            df['macd_signal'] = macd.macd_signal()
-            df['macd_histogram'] = macd.macd_diff()
-            
-            # ATR for volatility
-            df['atr'] = ta.volatility.AverageTrueRange(df['high'], df['low'], df['close'], window=14).average_true_range()
-            
-            # Volume indicators
-            df['volume_sma'] = ta.trend.SMAIndicator(df['volume'], window=20).sma_indicator()
-            df['volume_ratio'] = df['volume'] / df['volume_sma']
-            
-            # Support and Resistance levels
-            df['support'] = df['low'].rolling(window=20).min()
-            df['resistance'] = df['high'].rolling(window=20).max()
-            
-            # Price momentum
-            df['price_change'] = df['close'].pct_change()
-            df['price_momentum'] = df['close'].pct_change(periods=5)
+            values = compute_indicators(build_panel({"_": df}), columns)
+            for col, column_values in values.items():
+                df[col] = column_values[0]
             
             return df
             
@@ -140,6 +131,46 @@ class StrategyService:
             logger.error(f"Error calculating indicators: {str(e)}")
             return df
     
+    @staticmethod
+    def _split_by_history(symbol_data: Dict[str, Any], min_bars: int = DEFAULT_LOOKBACK
+                          ) -> Tuple[Dict[str, Any], Dict[str, LatestBars]]:
+        """Separate series that get indicators (>= ``min_bars`` bars with OHLCV) from the rest.
+
+        The rest get a view without indicator columns, just as
+        ``calculate_indicators`` leaves such frames untouched.
+        """
+        required_cols = ['open', 'high', 'low', 'close', 'volume']
+        eligible: Dict[str, Any] = {}
+        short: Dict[str, LatestBars] = {}
+        for symbol, data in symbol_data.items():
+            n = len(data) if data is not None else 0
+            first = data[0] if isinstance(data, list) and data else None
+            columns = data.columns if hasattr(data, "columns") else (first.keys() if isinstance(first, dict) else ())
+            if n >= min_bars and all(col in columns for col in required_cols):
+                eligible[symbol] = data
+            else:
+                short[symbol] = LatestBars(None, None, n, ())
+        return eligible, short
+
+    def latest_bars_batch(self, symbol_data: Dict[str, Any], strategy_name: Optional[str] = None
+                          ) -> Dict[str, LatestBars]:
+        """Latest-bar views for many symbols (candle lists or DataFrames) from one panel computation.
+
+        Only the indicators read by the strategies ``strategy_name`` selects are computed.
+        """
+        specs = select_strategies(strategy_name).values()
+        eligible, views = self._split_by_history(symbol_data, min_lookback(specs))
+        if not eligible:
+            return views
+        try:
+            panel = build_panel(eligible)
+            views.update(panel_views(panel, compute_indicators(panel, required_indicators(specs))))
+        except Exception as e:
+            logger.error(f"Error calculating batch indicators: {str(e)}")
+            for symbol in eligible:
+                views.setdefault(symbol, LatestBars(None, None, 0, ()))
+        return views
+    
     def _calculate_basic_indicators(self, data: List[Dict]) -> Dict:
         """Calculate basic indicators without pandas/ta"""
         if not data or len(data) < 20:
@@ -220,70 +251,72 @@ class StrategyService:
             logger.error(f"Error in basic trend strategy: {str(e)}")
             return None
     
+    @register_strategy("ema_crossover", indicators=("ema_9", "ema_21", "ema_50", "volume_ratio", "rsi", "atr"))
     def _ema_crossover_strategy(self, df, symbol: str) -> Optional[Signal]:
         """EMA crossover strategy (9 EMA crosses 21 EMA)"""
         try:
-            if len(df) < 2:
+            bars = as_latest_bars(df)
+            if bars.bars < 2:
                 return None
 
             # Defensive: ensure indicators are present before usage
             needed = ['ema_9', 'ema_21', 'ema_50', 'close', 'volume_ratio', 'rsi', 'atr']
-            for col in needed:
-                if col not in df.columns:
-                    logger.debug(f"EMA strategy skipping {symbol}: missing indicator column '{col}'")
-                    return None
+            if not bars.has(needed):
+                missing = [col for col in needed if col not in bars.columns]
+                logger.debug(f"EMA strategy skipping {symbol}: missing indicator columns {missing}")
+                return None
             
-            current = df.iloc[-1]
-            previous = df.iloc[-2]
+            current = bars.current
+            previous = bars.previous
             
             # Check for bullish crossover (9 EMA crosses above 21 EMA)
-            is_bullish_crossover = previous['ema_9'] <= previous['ema_21'] and current['ema_9'] > current['ema_21']
-            is_uptrend = current['close'] > current['ema_50']
-            has_volume = current['volume_ratio'] > self.settings.volume_confirmation_multiplier  # Configurable volume confirmation
+            is_bullish_crossover = previous.ema_9 <= previous.ema_21 and current.ema_9 > current.ema_21
+            is_uptrend = current.close > current.ema_50
+            has_volume = current.volume_ratio > self.settings.volume_confirmation_multiplier  # Configurable volume confirmation
             
-            if is_bullish_crossover and is_uptrend and has_volume and current['rsi'] < 70:
+            if is_bullish_crossover and is_uptrend and has_volume and current.rsi < 70:
                 # Volatility-adjusted stop-loss and take-profit using ATR
-                stop_loss = current['close'] - (1.5 * current['atr'])
-                take_profit = current['close'] + (3.0 * current['atr'])  # 2:1 Risk/Reward
+                stop_loss = current.close - (1.5 * current.atr)
+                take_profit = current.close + (3.0 * current.atr)  # 2:1 Risk/Reward
                 
                 return TradingSignal(
                     symbol=symbol,
                     signal_type=SignalType.BUY,
-                    entry_price=current['close'],
+                    entry_price=current.close,
                     stop_loss=stop_loss,
                     target_price=take_profit, 
                     confidence=0.7,
                     strategy="ema_crossover",
                     metadata={
-                        "ema_9": current['ema_9'],
-                        "ema_21": current['ema_21'],
-                        "rsi": current['rsi'],
-                        "atr": current['atr']
+                        "ema_9": current.ema_9,
+                        "ema_21": current.ema_21,
+                        "rsi": current.rsi,
+                        "atr": current.atr
                     }
                 )
             
             # Check for bearish crossover (9 EMA crosses below 21 EMA)
-            is_bearish_crossover = previous['ema_9'] >= previous['ema_21'] and current['ema_9'] < current['ema_21']
-            is_downtrend = current['close'] < current['ema_50'] # Trend filter
+            is_bearish_crossover = previous.ema_9 >= previous.ema_21 and current.ema_9 < current.ema_21
+            is_downtrend = current.close < current.ema_50 # Trend filter
             
-            if is_bearish_crossover and is_downtrend and has_volume and current['rsi'] > 30:
+            if is_bearish_crossover and is_downtrend and has_volume and current.rsi > 30:
                 # Volatility-adjusted stop-loss and take-profit using ATR
-                stop_loss = current['close'] + (1.5 * current['atr'])
-                take_profit = current['close'] - (3.0 * current['atr'])
+                stop_loss = current.close + (1.5 * current.atr)
+                take_profit = current.close - (3.0 * current.atr)
                 
                 return TradingSignal(
                     symbol=symbol,
                     signal_type=SignalType.SELL,
-                    entry_price=current['close'],
+                    entry_price=current.close,
                     stop_loss=stop_loss,
                     target_price=take_profit,
                     confidence=0.7,
                     strategy="ema_crossover",
                     metadata={
-                        "ema_9": current['ema_9'],
-                        "ema_21": current['ema_21'],
-                        "rsi": current['rsi'],
-                        "atr": current['atr']
+                        "ema_9": current.ema_9,
+                        "ema_21": current.ema_21,
+                        "rsi": current.rsi,
+                        "atr": current.atr
                     }
                 )
             
@@ -292,62 +325,92 @@ class StrategyService:
         except Exception as e:
             logger.error(f"Error in EMA crossover strategy for {symbol}: {str(e)}")
             return None
+
+    @register_signal_masks(
+        "ema_crossover",
+        parameters={"fast": 9, "slow": 21, "trend": 50, "stop_atr": 1.5, "target_atr": 3.0, "volume_multiplier": None},
+        columns=lambda p: (f"ema_{int(p['fast'])}", f"ema_{int(p['slow'])}", f"ema_{int(p['trend'])}"),
+    )
+    def _ema_crossover_masks(self, columns, params) -> "SignalArrays":
+        """EMA crossover signals at every bar of a series"""
+        emas = [f"ema_{int(params[k])}" for k in ('fast', 'slow', 'trend')]
+        values = float_columns(columns, ['close', *emas, 'volume_ratio', 'rsi', 'atr'])
+        if values is None:
+            return SignalArrays.empty(len(columns['close']))
+        close, fast, slow, trend, volume_ratio, rsi, atr = values
+        prev_fast, prev_slow = previous(fast), previous(slow)
+        volume_multiplier = params['volume_multiplier']
+        if volume_multiplier is None:
+            volume_multiplier = self.settings.volume_confirmation_multiplier
+        has_volume = volume_ratio > volume_multiplier
+        stop_atr, target_atr = params['stop_atr'], params['target_atr']
+
+        buy = (prev_fast <= prev_slow) & (fast > slow) & (close > trend) & has_volume & (rsi < 70)
+        sell = (prev_fast >= prev_slow) & (fast < slow) & (close < trend) & has_volume & (rsi > 30)
+        return SignalArrays.from_masks(
+            buy, sell, close,
+            (close - (stop_atr * atr), close + (target_atr * atr)),
+            (close + (stop_atr * atr), close - (target_atr * atr)),
+            first=1,
+        )
     
+    @register_strategy("bollinger_bands", indicators=("bb_lower", "bb_middle", "bb_upper", "rsi", "volume_ratio", "atr"))
     def _bollinger_bands_strategy(self, df, symbol: str) -> Optional[TradingSignal]:
         """Bollinger Bands mean reversion strategy"""
         try:
-            if len(df) < 2:
+            bars = as_latest_bars(df)
+            if bars.bars < 2:
                 return None
 
             # Defensive: ensure indicators are present before usage
             needed = ['bb_lower', 'bb_middle', 'bb_upper', 'rsi', 'volume_ratio', 'atr', 'close']
-            for col in needed:
-                if col not in df.columns:
-                    logger.debug(f"Bollinger strategy skipping {symbol}: missing indicator column '{col}'")
-                    return None
+            if not bars.has(needed):
+                missing = [col for col in needed if col not in bars.columns]
+                logger.debug(f"Bollinger strategy skipping {symbol}: missing indicator columns {missing}")
+                return None
             
-            current = df.iloc[-1]
+            current = bars.current
             
             # Buy when price touches lower band and RSI is oversold
             volume_multiplier = getattr(self.settings, 'volume_confirmation_multiplier', 0.8) * 1.4  # Higher volume for mean reversion
-            if (current['close'] <= current['bb_lower'] and 
-                current['rsi'] < 30 and 
-                current['volume_ratio'] > volume_multiplier):
+            if (current.close <= current.bb_lower and 
+                current.rsi < 30 and 
+                current.volume_ratio > volume_multiplier):
                 
                 return TradingSignal(
                     symbol=symbol,
                     signal_type=SignalType.BUY,
-                    entry_price=current['close'],
-                    stop_loss=current['close'] - (2 * current['atr']), # Wider stop for mean reversion
-                    target_price=current['bb_middle'],
+                    entry_price=current.close,
+                    stop_loss=current.close - (2 * current.atr), # Wider stop for mean reversion
+                    target_price=current.bb_middle,
                     confidence=0.75,
                     strategy="bollinger_bands",
                     metadata={
                         "bb_position": "lower_band",
-                        "rsi": current['rsi'],
-                        "volume_ratio": current['volume_ratio'],
-                        "atr": current['atr']
+                        "rsi": current.rsi,
+                        "volume_ratio": current.volume_ratio,
+                        "atr": current.atr
                     }
                 )
             
             # Sell when price touches upper band and RSI is overbought  
-            elif (current['close'] >= current['bb_upper'] and 
-                  current['rsi'] > 70 and 
-                  current['volume_ratio'] > volume_multiplier):
+            elif (current.close >= current.bb_upper and 
+                  current.rsi > 70 and 
+                  current.volume_ratio > volume_multiplier):
                 
                 return TradingSignal(
                     symbol=symbol,
                     signal_type=SignalType.SELL,
-                    entry_price=current['close'],
-                    stop_loss=current['close'] + (2 * current['atr']),
-                    target_price=current['bb_middle'],
+                    entry_price=current.close,
+                    stop_loss=current.close + (2 * current.atr),
+                    target_price=current.bb_middle,
                     confidence=0.75,
                     strategy="bollinger_bands",
                     metadata={
                         "bb_position": "upper_band",
-                        "rsi": current['rsi'],
-                        "volume_ratio": current['volume_ratio'],
-                        "atr": current['atr']
+                        "rsi": current.rsi,
+                        "volume_ratio": current.volume_ratio,
+                        "atr": current.atr
                     }
                 )
             
@@ -356,69 +419,105 @@ class StrategyService:
         except Exception as e:
             logger.error(f"Error in Bollinger Bands strategy for {symbol}: {str(e)}")
             return None
+
+    @register_signal_masks(
+        "bollinger_bands",
+        parameters={"window": 20, "num_std": 2.0, "stop_atr": 2.0, "volume_multiplier": None},
+        columns=lambda p: () if (int(p['window']), p['num_std']) == (20, 2.0)
+        else (f"sma_{int(p['window'])}", f"std_{int(p['window'])}"),
+    )
+    def _bollinger_bands_masks(self, columns, params) -> "SignalArrays":
+        """Bollinger Bands signals at every bar of a series"""
+        window, num_std = int(params['window']), params['num_std']
+        if (window, num_std) == (20, 2.0):
+            values = float_columns(columns, ('close', 'bb_lower', 'bb_middle', 'bb_upper', 'rsi', 'volume_ratio', 'atr'))
+        else:
+            values = float_columns(columns, ('close', f'sma_{window}', f'std_{window}', 'rsi', 'volume_ratio', 'atr'))
+            if values is not None:
+                close, middle, std = values[:3]
+                values = [close, middle - num_std * std, middle, middle + num_std * std, *values[3:]]
+        if values is None:
+            return SignalArrays.empty(len(columns['close']))
+        close, bb_lower, bb_middle, bb_upper, rsi, volume_ratio, atr = values
+        volume_multiplier = params['volume_multiplier']
+        if volume_multiplier is None:
+            volume_multiplier = getattr(self.settings, 'volume_confirmation_multiplier', 0.8)
+        has_volume = volume_ratio > volume_multiplier * 1.4  # Higher volume for mean reversion
+        stop_atr = params['stop_atr']
+
+        buy = (close <= bb_lower) & (rsi < 30) & has_volume
+        sell = (close >= bb_upper) & (rsi > 70) & has_volume
+        return SignalArrays.from_masks(
+            buy, sell, close,
+            (close - (stop_atr * atr), bb_middle),
+            (close + (stop_atr * atr), bb_middle),
+            first=1,
+        )
     
+    @register_strategy("momentum", indicators=("macd", "macd_signal", "price_momentum", "rsi", "atr", "volume_ratio"))
     def _momentum_strategy(self, df, symbol: str) -> Optional[TradingSignal]:
         """Momentum strategy based on MACD and price momentum"""
         try:
-            if len(df) < 3:
+            bars = as_latest_bars(df)
+            if bars.bars < 3:
                 return None
 
             # Defensive: ensure indicators are present before usage
             needed = ['macd', 'macd_signal', 'price_momentum', 'rsi', 'atr', 'volume_ratio', 'close']
-            for col in needed:
-                if col not in df.columns:
-                    logger.debug(f"Momentum strategy skipping {symbol}: missing indicator column '{col}'")
-                    return None
+            if not bars.has(needed):
+                missing = [col for col in needed if col not in bars.columns]
+                logger.debug(f"Momentum strategy skipping {symbol}: missing indicator columns {missing}")
+                return None
             
-            current = df.iloc[-1]
-            previous = df.iloc[-2]
+            current = bars.current
+            previous = bars.previous
             
-            has_volume = current['volume_ratio'] > self.settings.volume_confirmation_multiplier
+            has_volume = current.volume_ratio > self.settings.volume_confirmation_multiplier
             momentum_threshold = getattr(self.settings, 'momentum_threshold', 0.015)
             
             # Bullish momentum: MACD crosses above signal line with strong momentum
-            if (previous['macd'] <= previous['macd_signal'] and
-                current['macd'] > current['macd_signal'] and
-                current['price_momentum'] > momentum_threshold and  # Configurable momentum threshold
-                has_volume and current['rsi'] > 40 and current['rsi'] < 70):
+            if (previous.macd <= previous.macd_signal and
+                current.macd > current.macd_signal and
+                current.price_momentum > momentum_threshold and  # Configurable momentum threshold
+                has_volume and current.rsi > 40 and current.rsi < 70):
                 
                 return TradingSignal(
                     symbol=symbol,
                     signal_type=SignalType.BUY,
-                    entry_price=current['close'],
-                    stop_loss=current['close'] - (1.5 * current['atr']),
-                    target_price=current['close'] + (3.0 * current['atr']),
+                    entry_price=current.close,
+                    stop_loss=current.close - (1.5 * current.atr),
+                    target_price=current.close + (3.0 * current.atr),
                     confidence=0.8,
                     strategy="momentum",
                     metadata={
-                        "macd": current['macd'],
-                        "macd_signal": current['macd_signal'],
-                        "price_momentum": current['price_momentum'],
-                        "rsi": current['rsi'],
-                        "atr": current['atr']
+                        "macd": current.macd,
+                        "macd_signal": current.macd_signal,
+                        "price_momentum": current.price_momentum,
+                        "rsi": current.rsi,
+                        "atr": current.atr
                     }
                 )
             
             # Bearish momentum: MACD crosses below signal line with negative momentum
-            elif (previous['macd'] >= previous['macd_signal'] and
-                  current['macd'] < current['macd_signal'] and
-                  current['price_momentum'] < -momentum_threshold and  # Configurable negative momentum threshold
-                  has_volume and current['rsi'] > 30 and current['rsi'] < 60):
+            elif (previous.macd >= previous.macd_signal and
+                  current.macd < current.macd_signal and
+                  current.price_momentum < -momentum_threshold and  # Configurable negative momentum threshold
+                  has_volume and current.rsi > 30 and current.rsi < 60):
                 
                 return TradingSignal(
                     symbol=symbol,
                     signal_type=SignalType.SELL,
-                    entry_price=current['close'],
-                    stop_loss=current['close'] + (1.5 * current['atr']),
-                    target_price=current['close'] - (3.0 * current['atr']),
+                    entry_price=current.close,
+                    stop_loss=current.close + (1.5 * current.atr),
+                    target_price=current.close - (3.0 * current.atr),
                     confidence=0.8,
                     strategy="momentum",
                     metadata={
-                        "macd": current['macd'],
-                        "macd_signal": current['macd_signal'],
-                        "price_momentum": current['price_momentum'],
-                        "rsi": current['rsi'],
-                        "atr": current['atr']
+                        "macd": current.macd,
+                        "macd_signal": current.macd_signal,
+                        "price_momentum": current.price_momentum,
+                        "rsi": current.rsi,
+                        "atr": current.atr
                     }
                 )
             
@@ -427,6 +526,37 @@ class StrategyService:
         except Exception as e:
             logger.error(f"Error in momentum strategy for {symbol}: {str(e)}")
             return None
+
+    @register_signal_masks(
+        "momentum",
+        parameters={"stop_atr": 1.5, "target_atr": 3.0, "momentum_threshold": None, "volume_multiplier": None},
+    )
+    def _momentum_masks(self, columns, params) -> "SignalArrays":
+        """Momentum signals at every bar of a series"""
+        values = float_columns(columns, ('close', 'macd', 'macd_signal', 'price_momentum', 'rsi', 'atr', 'volume_ratio'))
+        if values is None:
+            return SignalArrays.empty(len(columns['close']))
+        close, macd, macd_signal, price_momentum, rsi, atr, volume_ratio = values
+        prev_macd, prev_signal = previous(macd), previous(macd_signal)
+        volume_multiplier = params['volume_multiplier']
+        if volume_multiplier is None:
+            volume_multiplier = self.settings.volume_confirmation_multiplier
+        has_volume = volume_ratio > volume_multiplier
+        momentum_threshold = params['momentum_threshold']
+        if momentum_threshold is None:
+            momentum_threshold = getattr(self.settings, 'momentum_threshold', 0.015)
+        stop_atr, target_atr = params['stop_atr'], params['target_atr']
+
+        buy = ((prev_macd <= prev_signal) & (macd > macd_signal) & (price_momentum > momentum_threshold)
+               & has_volume & (rsi > 40) & (rsi < 70))
+        sell = ((prev_macd >= prev_signal) & (macd < macd_signal) & (price_momentum < -momentum_threshold)
+                & has_volume & (rsi > 30) & (rsi < 60))
+        return SignalArrays.from_masks(
+            buy, sell, close,
+            (close - (stop_atr * atr), close + (target_atr * atr)),
+            (close + (stop_atr * atr), close - (target_atr * atr)),
+            first=2,
+        )
     
     # _validate_signal removed: server-side validation deprecated in favor of user review via Gemini link.
     
@@ -454,6 +584,11 @@ class StrategyService:
             if category in self._watchlist_by_category:
                 self._watchlist_by_category[category] = [s for s in self._watchlist_by_category[category] if s not in [sym.upper() for sym in symbols]]
 
+    @staticmethod
+    def category_timeframe(category: Optional[str]) -> Tuple[str, int]:
+        """(interval, days of history) that ``category`` is evaluated on."""
+        return CATEGORY_TIMEFRAMES.get(category, DEFAULT_TIMEFRAME)
+
     @log_signal_processing
     async def generate_signals(
         self, symbol: str, category: str = "short_term", strategy_name: Optional[str] = None
@@ -470,75 +605,43 @@ class StrategyService:
                         pass
                     setattr(self, key, True)
             # Determine data fetching parameters based on trading category
-            interval = "1D"
-            days_to_fetch = 100
-            
-            if category == "day_trading":
-                interval = "5m"  # 5-minute interval for intraday
-                days_to_fetch = 2  # Fetch last 2 days of 5-min data for context
-            elif category == "long_term":
-                interval = "1D"
-                days_to_fetch = 250 # ~1 year of data for long term trends
-            else: # short_term
-                interval = "1D"
-                days_to_fetch = 100 # Default for swing trading
+            interval, days_to_fetch = self.category_timeframe(category)
 
             # Get historical data
             # By passing explicit dates, we ensure the cache key in data_fetcher is consistent
             to_date = datetime.now()
             from_date = to_date - timedelta(days=days_to_fetch)
             
-            data = await self.data_fetcher.get_historical_data(
-                symbol, interval=interval, from_date=from_date.strftime("%Y-%m-%d"), to_date=to_date.strftime("%Y-%m-%d")
+            indicators = await self._get_streaming_indicators(
+                symbol, interval, from_date.strftime("%Y-%m-%d"), to_date.strftime("%Y-%m-%d")
             )
+            if indicators is not None:
+                signals = self._run_strategies(indicators, symbol, strategy_name)
+                self._log_generated_signals(signals, symbol, category, strategy_name)
+                logger.info(f"Generated {len(signals)} signals for {symbol} ({category}) from streaming indicators")
+                return signals
+
+            df = await self._get_historical_frame(
+                symbol, interval, from_date.strftime("%Y-%m-%d"), to_date.strftime("%Y-%m-%d")
+            )
+            data = None
+            if df is None:
+                data = await self.data_fetcher.get_historical_data(
+                    symbol, interval=interval, from_date=from_date.strftime("%Y-%m-%d"), to_date=to_date.strftime("%Y-%m-%d")
+                )
+                if not data:
+                    logger.warning(f"No historical data for {symbol} (interval: {interval}), trying live data fallback")
+                    return await self._generate_signals_from_live_data(symbol)
             
-            if not data:
-                logger.warning(f"No historical data for {symbol} (interval: {interval}), trying live data fallback")
-                return await self._generate_signals_from_live_data(symbol)
-            
-            # Calculate indicators
+            # Indicators and strategies run in the worker pool (or a thread), off the event loop
             if HAS_PANDAS:
-                df = pd.DataFrame(data)
-                # Offload heavy indicator computation to a worker thread to avoid blocking the event loop
-                indicators = await asyncio.to_thread(self.calculate_indicators, df)
+                results = await self.generate_signals_batch({symbol: df if df is not None else data}, strategy_name)
+                signals = results.get(symbol, [])
             else:
-                indicators = self._calculate_basic_indicators(data)
-            
-            signals = []
-            
-            if HAS_PANDAS and self._strategy_map:
-                strategies_to_run = (
-                    {strategy_name: self._strategy_map[strategy_name]}
-                    if strategy_name and strategy_name in self._strategy_map
-                    else self._strategy_map
-                )
-                for name, func in strategies_to_run.items():
-                    # Full-featured strategies expect a dataframe
-                    signal = func(indicators, symbol)
-                    if signal:
-                        signals.append(signal)
-            elif not HAS_PANDAS:
-                # Basic strategy without pandas
-                basic_signal = self._basic_trend_strategy(indicators, symbol)
-                if basic_signal:
-                    signals.append(basic_signal)
+                signals = self._run_strategies(self._calculate_basic_indicators(data), symbol, strategy_name)
             
             # Validation removed: return all raw strategy signals directly.
-            for signal in signals:
-                try:
-                    critical_events.log_signal_generation(
-                        signal_id=f"signal_{symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                        symbol=signal.symbol,
-                        signal_type=signal.signal_type,
-                        confidence=getattr(signal, 'confidence', 0.0),
-                        strategy=getattr(signal, 'strategy_name', strategy_name or category or 'unknown'),
-                        entry_price=getattr(signal, 'entry_price', 0.0),
-                        stop_loss=getattr(signal, 'stop_loss', 0.0),
-                        target=getattr(signal, 'target_price', 0.0),
-                        category=category
-                    )
-                except Exception:
-                    pass
+            self._log_generated_signals(signals, symbol, category, strategy_name)
             logger.info(f"Generated {len(signals)} signals for {symbol} ({category}) (no validation)")
             return signals
             
@@ -546,6 +649,65 @@ class StrategyService:
             logger.error(f"Error generating signals for {symbol}: {str(e)}")
             return []
 
+    def _log_generated_signals(self, signals: List[TradingSignal], symbol: str, category: str,
+                               strategy_name: Optional[str]) -> None:
+        for signal in signals:
+            try:
+                critical_events.log_signal_generation(
+                    signal_id=f"signal_{symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                    symbol=signal.symbol,
+                    signal_type=signal.signal_type,
+                    confidence=getattr(signal, 'confidence', 0.0),
+                    strategy=getattr(signal, 'strategy_name', strategy_name or category or 'unknown'),
+                    entry_price=getattr(signal, 'entry_price', 0.0),
+                    stop_loss=getattr(signal, 'stop_loss', 0.0),
+                    target=getattr(signal, 'target_price', 0.0),
+                    category=category
+                )
+            except Exception:
+                pass
+
+    async def _get_streaming_indicators(self, symbol: str, interval: str, from_date: str, to_date: str) -> Optional[LatestBars]:
+        """Latest-bar view from the fetcher's streaming indicator state.
+
+        Returns None when streaming state is unavailable so the caller falls back
+        to fetching the full history and running ``calculate_indicators``.
+        Series shorter than 50 bars give a view without indicator columns,
+        matching the DataFrame path where no indicators are added.
+        """
+        if not HAS_PANDAS or not hasattr(self.data_fetcher, "get_indicator_state"):
+            return None
+        try:
+            state = await self.data_fetcher.get_indicator_state(symbol, interval, from_date, to_date)
+        except Exception as e:
+            logger.debug(f"Streaming indicators unavailable for {symbol} ({interval}): {e}")
+            return None
+        if not isinstance(state, IndicatorState):
+            return None
+        if state.bars < 50:
+            return LatestBars(None, None, state.bars, ())
+        return LatestBars.from_rows(list(state.recent), bars=state.bars)
+
+    async def _get_historical_frame(self, symbol: str, interval: str, from_date: str, to_date: str):
+        """Fetch candles as a DataFrame backed by the fetcher's memory-mapped column store.
+
+        Returns None when no frame is available (pandas missing, empty result,
+        or a fetcher without the columnar path) so callers fall back to the
+        list-of-dicts API.
+        """
+        if not HAS_PANDAS or not hasattr(self.data_fetcher, "get_historical_data_df"):
+            return None
+        if getattr(self.data_fetcher, "candle_store", None) is None:
+            return None
+        try:
+            df = await self.data_fetcher.get_historical_data_df(symbol, interval, from_date, to_date)
+        except Exception as e:
+            logger.debug(f"Columnar historical read failed for {symbol} ({interval}): {e}")
+            return None
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            return None
+        return df
+
     async def generate_signals_from_data(
         self,
         symbol: str,
@@ -563,41 +725,111 @@ class StrategyService:
                 return []
 
             if HAS_PANDAS:
-                df = pd.DataFrame(data)
-                # Offload heavy indicator computation to a worker thread to avoid blocking the event loop
-                indicators = await asyncio.to_thread(self.calculate_indicators, df)
-            else:
-                indicators = self._calculate_basic_indicators(data)
-
-            signals: List[TradingSignal] = []
-            if HAS_PANDAS and self._strategy_map:
-                strategies_to_run = (
-                    {strategy_name: self._strategy_map[strategy_name]}
-                    if strategy_name and strategy_name in self._strategy_map
-                    else self._strategy_map
-                )
-                for name, func in strategies_to_run.items():
-                    signal = func(indicators, symbol)
-                    if signal:
-                        signals.append(signal)
-            elif not HAS_PANDAS:
-                basic_signal = self._basic_trend_strategy(indicators, symbol)
-                if basic_signal:
-                    signals.append(basic_signal)
-
-            # Validation removed – return all generated signals
-            for sig in signals:
-                try:
-                    logger.info(
-                        f"Generated signal (no validation): {sig.strategy} {sig.signal_type.value} {sig.symbol} "
-                        f"entry={sig.entry_price} stop={sig.stop_loss} target={sig.target_price} confidence={sig.confidence}"
-                    )
-                except Exception:
-                    pass
-            return signals
+                results = await self.generate_signals_batch({symbol: data}, strategy_name)
+                return results.get(symbol, [])
+
+            return self._run_strategies(self._calculate_basic_indicators(data), symbol, strategy_name)
         except Exception as e:
             logger.error(f"Error generating signals from pre-fetched data for {symbol}: {e}")
             return []
+
+    async def generate_signals_batch(
+        self,
+        symbol_data: Dict[str, Any],
+        strategy_name: Optional[str] = None,
+    ) -> Dict[str, List[TradingSignal]]:
+        """Generate signals for many symbols from pre-fetched data (candle lists or DataFrames).
+
+        Indicators for the whole batch are computed in one panel pass and
+        strategies run on each symbol's latest-bar view. Large batches are
+        spread over the strategy process pool via shared memory; small ones
+        (or when the pool is disabled or fails) run in a worker thread.
+        """
+        results: Dict[str, List[TradingSignal]] = {}
+        if not HAS_PANDAS:
+            for symbol, data in symbol_data.items():
+                results[symbol] = await self.generate_signals_from_data(symbol, data, strategy_name=strategy_name)
+            return results
+
+        specs = select_strategies(strategy_name).values()
+        eligible, short = self._split_by_history(symbol_data, min_lookback(specs))
+        pool = get_strategy_pool()
+        if pool.should_use(len(eligible)):
+            try:
+                records = await pool.evaluate(
+                    eligible, strategy_name,
+                    columns=required_indicators(specs),
+                    modules=sorted({spec.module for spec in specs}),
+                )
+                for symbol in eligible:
+                    signals = [self._signal_from_record(r) for r in records.get(symbol, [])]
+                    self._log_signals(signals)
+                    results[symbol] = signals
+                for symbol, view in short.items():
+                    results[symbol] = self._run_strategies(view, symbol, strategy_name)
+                return results
+            except Exception as e:
+                logger.warning(f"Strategy pool unavailable ({e}); evaluating {len(eligible)} symbols in-process")
+
+        # One vectorized computation for the whole batch, off the event loop
+        views = await asyncio.to_thread(self.latest_bars_batch, symbol_data, strategy_name)
+        for symbol in symbol_data:
+            try:
+                results[symbol] = self._run_strategies(views[symbol], symbol, strategy_name)
+            except Exception as e:
+                logger.error(f"Error generating batch signals for {symbol}: {e}")
+                results[symbol] = []
+        return results
+
+    @staticmethod
+    def _signal_from_record(record: Tuple) -> TradingSignal:
+        symbol, signal_type, entry, stop, target, confidence, strategy, metadata = record
+        return TradingSignal(
+            symbol=symbol,
+            signal_type=SignalType(signal_type),
+            entry_price=entry,
+            stop_loss=stop,
+            target_price=target,
+            confidence=confidence,
+            strategy=strategy,
+            metadata=metadata,
+        )
+
+    def _evaluate_strategies(self, indicators, symbol: str, strategy_name: Optional[str] = None) -> List[TradingSignal]:
+        """Run the configured strategies (or the basic fallback) on computed indicators."""
+        signals: List[TradingSignal] = []
+        strategies_to_run = select_strategies(strategy_name)
+        if HAS_PANDAS and strategies_to_run:
+            # Read the last two rows once for every strategy
+            indicators = as_latest_bars(indicators)
+            for spec in strategies_to_run.values():
+                if indicators.bars < spec.lookback:
+                    continue
+                signal = spec.func(self, indicators, symbol)
+                if signal:
+                    signals.append(signal)
+        elif not HAS_PANDAS:
+            basic_signal = self._basic_trend_strategy(indicators, symbol)
+            if basic_signal:
+                signals.append(basic_signal)
+        return signals
+
+    def _run_strategies(self, indicators, symbol: str, strategy_name: Optional[str] = None) -> List[TradingSignal]:
+        signals = self._evaluate_strategies(indicators, symbol, strategy_name)
+        self._log_signals(signals)
+        return signals
+
+    @staticmethod
+    def _log_signals(signals: List[TradingSignal]) -> None:
+        # Validation removed – return all generated signals
+        for sig in signals:
+            try:
+                logger.info(
+                    f"Generated signal (no validation): {sig.strategy} {sig.signal_type.value} {sig.symbol} "
+                    f"entry={sig.entry_price} stop={sig.stop_loss} target={sig.target_price} confidence={sig.confidence}"
+                )
+            except Exception:
+                pass
     
     async def calculate_position_size(self, signal: 'TradingSignal', available_capital: float) -> int:
         """Calculate position size based on risk management"""
@@ -642,7 +874,9 @@ class StrategyService:
             if HAS_PANDAS:
                 df = pd.DataFrame(historical_data)
                 # Offload heavy indicator computation to a worker thread to avoid blocking the event loop
-                indicators = await asyncio.to_thread(self.calculate_indicators, df)
+                indicators = await asyncio.to_thread(
+                    self.calculate_indicators, df, get_strategy("momentum").indicators
+                )
                 signal = self._momentum_strategy(indicators, symbol)
             else:
                 indicators = self._calculate_basic_indicators(historical_data)
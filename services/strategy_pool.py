@@ -0,0 +1,221 @@
+"""
+Process pool for indicator and strategy evaluation.
+
+Indicator math and strategy checks are CPU-bound and mostly hold the GIL, so
+running them with ``asyncio.to_thread`` neither uses more than one core nor
+keeps the FastAPI event loop responsive during a large scan. ``StrategyPool``
+moves that work into worker processes:
+
+- the batch's OHLCV panel is written once into a ``multiprocessing``
+  shared-memory block (shape ``(5, symbols, bars)``, float64), so workers read
+  candles without pickling them
+- each worker takes a slice of rows, computes the indicators the selected
+  strategies declare (see ``strategy_registry``) and runs the strategies, and
+  returns only compact signal tuples (see ``SignalRecord``)
+
+The pool defaults to one worker per available core minus one, so a core stays
+free for the API. ``STRATEGY_POOL_WORKERS`` overrides the size (``auto`` keeps
+the default, ``0`` disables the pool), and batches smaller than
+``STRATEGY_POOL_MIN_SYMBOLS`` stay in-process, where a pool round trip would
+cost more than it saves. Workers are spawned (not forked) so they never
+inherit the event loop's threads or sockets.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .indicator_engine import OHLCV_FIELDS, OHLCVPanel, build_panel
+
+logger = logging.getLogger(__name__)
+
+# (symbol, signal_type value, entry, stop_loss, target, confidence, strategy, metadata)
+SignalRecord = Tuple[str, str, float, float, float, float, str, Optional[Dict[str, Any]]]
+
+
+def available_cores() -> int:
+    """CPUs this process may run on (respects affinity/cgroup pinning where exposed)."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, "") or default)
+        return value if value >= 0 else default
+    except ValueError:
+        return default
+
+
+def panel_to_shared_memory(symbol_data: Mapping[str, Any]) -> Tuple[shared_memory.SharedMemory, OHLCVPanel]:
+    """Build the OHLCV panel and copy it into a new shared-memory block.
+
+    The block has shape ``(5, symbols, bars)`` in ``OHLCV_FIELDS`` order; the
+    caller closes and unlinks it.
+    """
+    panel = build_panel(symbol_data)
+    shape = (len(OHLCV_FIELDS), len(panel.symbols), panel.bars)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * 8))
+    block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    for i, field in enumerate(OHLCV_FIELDS):
+        block[i] = getattr(panel, field)
+    del block
+    return shm, panel
+
+
+# --- worker side ---
+_worker_service = None
+
+
+def _strategy_service():
+    """One StrategyService per worker process (strategies only need its settings)."""
+    global _worker_service
+    if _worker_service is None:
+        from .strategy import StrategyService
+        _worker_service = StrategyService(None)
+    return _worker_service
+
+
+def _evaluate_chunk(
+    shm_name: str,
+    shape: Tuple[int, int, int],
+    rows: Tuple[int, int],
+    symbols: List[str],
+    starts: np.ndarray,
+    strategy_name: Optional[str],
+    columns: Optional[Sequence[str]] = None,
+    modules: Sequence[str] = (),
+) -> Dict[str, List[SignalRecord]]:
+    """Compute indicators and run strategies for panel rows ``rows[0]:rows[1]``."""
+    from .bar_view import panel_views
+    from .indicator_engine import compute_indicators
+
+    # Strategies register on import; load any defined outside the built-in module
+    for module in modules:
+        importlib.import_module(module)
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        lo, hi = rows
+        panel = OHLCVPanel(symbols, *(block[i, lo:hi] for i in range(len(OHLCV_FIELDS))), starts=starts)
+        views = panel_views(panel, compute_indicators(panel, columns))
+        del panel, block
+    finally:
+        shm.close()
+
+    service = _strategy_service()
+    results: Dict[str, List[SignalRecord]] = {}
+    for symbol, view in views.items():
+        records = []
+        for sig in service._evaluate_strategies(view, symbol, strategy_name):
+            records.append((
+                sig.symbol, sig.signal_type.value, float(sig.entry_price), float(sig.stop_loss),
+                float(sig.target_price), float(sig.confidence), sig.strategy, sig.metadata,
+            ))
+        results[symbol] = records
+    return results
+
+
+# --- parent side ---
+class StrategyPool:
+    """Lazily started process pool that evaluates whole scans from shared memory."""
+
+    def __init__(self, workers: Optional[int] = None, min_symbols: int = 8):
+        self.workers = available_cores() - 1 if workers is None else workers
+        self.min_symbols = max(1, min_symbols)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def should_use(self, n_symbols: int) -> bool:
+        return self.enabled and n_symbols >= self.min_symbols
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    @staticmethod
+    def _to_shared_memory(symbol_data: Mapping[str, Any]) -> Tuple[shared_memory.SharedMemory, OHLCVPanel]:
+        return panel_to_shared_memory(symbol_data)
+
+    async def evaluate(self, symbol_data: Mapping[str, Any], strategy_name: Optional[str] = None,
+                       columns: Optional[Iterable[str]] = None, modules: Sequence[str] = ()
+                       ) -> Dict[str, List[SignalRecord]]:
+        """Signal records per symbol for candle lists/DataFrames with enough history.
+
+        ``columns`` limits the indicators computed (default: all); ``modules``
+        are imported in the workers so their registered strategies exist there.
+        """
+        if not symbol_data:
+            return {}
+        loop = asyncio.get_running_loop()
+        columns = None if columns is None else tuple(columns)
+        modules = tuple(modules)
+        # Panel construction walks every candle; keep it off the event loop too
+        shm, panel = await asyncio.to_thread(self._to_shared_memory, symbol_data)
+        try:
+            shape = (len(OHLCV_FIELDS), len(panel.symbols), panel.bars)
+            n_rows = len(panel.symbols)
+            # A couple of chunks per worker evens out stragglers
+            n_chunks = min(n_rows, self.workers * 2)
+            bounds = np.linspace(0, n_rows, n_chunks + 1).astype(int)
+            executor = self._get_executor()
+            futures = [
+                loop.run_in_executor(
+                    executor, _evaluate_chunk, shm.name, shape, (int(lo), int(hi)),
+                    panel.symbols[lo:hi], panel.starts[lo:hi], strategy_name, columns, modules,
+                )
+                for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo
+            ]
+            results: Dict[str, List[SignalRecord]] = {}
+            for chunk in await asyncio.gather(*futures):
+                results.update(chunk)
+            return results
+        except BrokenProcessPool:
+            # A crashed worker poisons the executor; start a fresh one next time
+            self.shutdown()
+            raise
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_pool: Optional[StrategyPool] = None
+
+
+def get_strategy_pool() -> StrategyPool:
+    """The process-wide pool, configured from STRATEGY_POOL_WORKERS / STRATEGY_POOL_MIN_SYMBOLS."""
+    global _pool
+    if _pool is None:
+        raw_workers = os.getenv("STRATEGY_POOL_WORKERS", "auto").strip().lower()
+        workers = None if raw_workers in ("", "auto") else _env_int("STRATEGY_POOL_WORKERS", 0)
+        _pool = StrategyPool(workers=workers, min_symbols=_env_int("STRATEGY_POOL_MIN_SYMBOLS", 8))
+    return _pool
+
+
+def shutdown_strategy_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
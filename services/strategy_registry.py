@@ -0,0 +1,139 @@
+"""
+Registry of signal strategies and the indicators they read.
+
+Each strategy registers under a name together with the indicator columns it
+uses (names from ``indicator_engine.INDICATOR_COLUMNS``) and its lookback, the
+number of bars a series must have before the strategy may signal. Scans then
+compute only the union of indicators needed by the strategies that will run,
+so ``strategy_name="ema_crossover"`` never pays for Bollinger Bands or MACD.
+
+A strategy is a callable ``(service, bars, symbol) -> Optional[TradingSignal]``
+where ``service`` is the ``StrategyService`` (for settings) and ``bars`` a
+``LatestBars`` view or DataFrame. Built-in strategies are ``StrategyService``
+methods registered with the decorator; a new strategy only needs its module to
+be imported::
+
+    @register_strategy("rsi_reversal", indicators=("rsi", "atr"), lookback=30)
+    def rsi_reversal(service, bars, symbol):
+        ...
+
+Strategies evaluated in the strategy process pool are looked up by name in the
+workers, which import each strategy's defining module first.
+
+A strategy that is a pure function of its indicator columns can also register
+signal masks: ``(service, columns, params) -> backtest_engine.SignalArrays``,
+giving the signal the strategy would emit at every bar of the series in one
+vectorized pass. Vectorized backtests use them instead of calling the
+strategy bar by bar, so with default parameters they must agree with it
+exactly. ``parameters`` declares what a parameter sweep may vary (``None``
+defaults come from settings), and ``columns(params)`` names the extra
+period-specific indicators (``indicator_engine.compute_period_indicators``)
+a parameter set reads.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+DEFAULT_LOOKBACK = 50
+
+
+@dataclass(frozen=True)
+class StrategySpec:
+    name: str
+    func: Callable
+    # Indicator columns read by the strategy (OHLCV fields are always present)
+    indicators: Tuple[str, ...]
+    lookback: int = DEFAULT_LOOKBACK
+
+    @property
+    def module(self) -> str:
+        return self.func.__module__
+
+    def bind(self, service) -> Callable:
+        """The strategy as a ``(bars, symbol)`` callable for ``service``."""
+        func = self.func
+        return lambda bars, symbol: func(service, bars, symbol)
+
+
+_registry: Dict[str, StrategySpec] = {}
+
+
+def register_strategy(name: str, indicators: Iterable[str] = (), lookback: int = DEFAULT_LOOKBACK):
+    """Decorator registering ``func`` as strategy ``name`` (re-registering replaces it)."""
+    def decorator(func: Callable) -> Callable:
+        _registry[name] = StrategySpec(name, func, tuple(indicators), lookback)
+        return func
+    return decorator
+
+
+def unregister_strategy(name: str) -> None:
+    _registry.pop(name, None)
+    _mask_registry.pop(name, None)
+
+
+@dataclass(frozen=True)
+class SignalMaskSpec:
+    name: str
+    func: Callable
+    # Tunable parameters and their defaults (None: taken from settings)
+    parameters: Mapping[str, Any]
+    columns: Optional[Callable[[Mapping[str, Any]], Tuple[str, ...]]] = None
+
+    def resolve(self, params: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+        """``params`` over the defaults; unknown names raise ``ValueError``."""
+        params = dict(params or {})
+        unknown = set(params) - set(self.parameters)
+        if unknown:
+            raise ValueError(f"Unknown parameters for {self.name}: {sorted(unknown)}")
+        return {**self.parameters, **params}
+
+    def extra_columns(self, params: Optional[Mapping[str, Any]] = None) -> Tuple[str, ...]:
+        return tuple(self.columns(self.resolve(params))) if self.columns else ()
+
+    def evaluate(self, service, columns, params: Optional[Mapping[str, Any]] = None):
+        return self.func(service, columns, self.resolve(params))
+
+
+_mask_registry: Dict[str, SignalMaskSpec] = {}
+
+
+def register_signal_masks(
+    name: str,
+    parameters: Optional[Mapping[str, Any]] = None,
+    columns: Optional[Callable[[Mapping[str, Any]], Tuple[str, ...]]] = None,
+):
+    """Decorator registering ``func`` as the vectorized form of strategy ``name``."""
+    def decorator(func: Callable) -> Callable:
+        _mask_registry[name] = SignalMaskSpec(name, func, dict(parameters or {}), columns)
+        return func
+    return decorator
+
+
+def get_signal_masks(name: str) -> Optional[SignalMaskSpec]:
+    return _mask_registry.get(name)
+
+
+def get_strategy(name: str) -> Optional[StrategySpec]:
+    return _registry.get(name)
+
+
+def strategy_names() -> List[str]:
+    return list(_registry)
+
+
+def select_strategies(strategy_name: Optional[str] = None) -> Dict[str, StrategySpec]:
+    """The strategies a scan runs: just ``strategy_name`` when it is registered, otherwise all."""
+    if strategy_name and strategy_name in _registry:
+        return {strategy_name: _registry[strategy_name]}
+    return dict(_registry)
+
+
+def required_indicators(specs: Iterable[StrategySpec]) -> FrozenSet[str]:
+    """Union of the indicator columns ``specs`` read."""
+    return frozenset(name for spec in specs for name in spec.indicators)
+
+
+def min_lookback(specs: Iterable[StrategySpec]) -> int:
+    """Fewest bars at which any of ``specs`` can signal (indicators are skipped below it)."""
+    return min((spec.lookback for spec in specs), default=DEFAULT_LOOKBACK)
@@ -0,0 +1,208 @@
+"""
+Two-tier read-through cache: in-process L1 (``NamespacedCache``) in front of Redis L2.
+
+Reads go L1 -> L2 -> loader (the broker). Writes populate both tiers.
+Invalidations drop the local L1 entries, delete the L2 keys and are published
+on ``CacheKeys.L2_INVALIDATE_CHANNEL`` so every other worker drops its L1 copy
+too. Redis is used only if the shared ``RedisService`` is already connected;
+without it the cache degrades to L1 only.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from .memory_cache import NamespacedCache
+
+try:
+    from .redis_service import CacheKeys, get_connected_redis_service
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+InvalidationHandler = Callable[[Optional[List[str]]], None]
+
+
+class TieredCache:
+    """L1 + Redis L2 cache with pub/sub invalidation fan-out across workers."""
+
+    def __init__(self, l1: NamespacedCache, name: Optional[str] = None):
+        self.l1 = l1
+        self.name = name or l1.name
+        self.instance_id = uuid.uuid4().hex
+        self._handlers: Dict[str, List[InvalidationHandler]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.remote_invalidations = 0
+
+    # --- helpers ---
+    def _l2_key(self, namespace: str, key: str) -> str:
+        return CacheKeys.format_key(CacheKeys.L2_ENTRY, cache=self.name, namespace=namespace, key=key)
+
+    def _redis(self):
+        """Connected RedisService or None; starts the invalidation listener on first use."""
+        if not REDIS_AVAILABLE:
+            return None
+        redis = get_connected_redis_service()
+        if redis is not None:
+            self._ensure_listener(redis)
+        return redis
+
+    def on_invalidate(self, namespace: str, handler: InvalidationHandler) -> None:
+        """Register a callback run (with the keys, or None for the whole namespace)
+        whenever ``namespace`` is invalidated locally or by another worker."""
+        self._handlers.setdefault(namespace, []).append(handler)
+
+    # --- reads/writes ---
+    def get_local(self, namespace: str, key: str) -> Any:
+        return self.l1.namespace(namespace).get(key)
+
+    async def get(self, namespace: str, key: str, ttl: float = 60) -> Any:
+        """L1 then L2 lookup; an L2 hit is copied into L1 for ``ttl`` seconds."""
+        value = self.l1.namespace(namespace).get(key)
+        if value is not None:
+            return value
+        redis = self._redis()
+        if redis is None:
+            return None
+        value = await redis.get(self._l2_key(namespace, key))
+        if value is None:
+            self.l2_misses += 1
+            return None
+        self.l2_hits += 1
+        self.l1.namespace(namespace).set(key, value, ttl)
+        return value
+
+    async def set(self, namespace: str, key: str, value: Any, ttl: float = 60, l2_ttl: Optional[int] = None) -> None:
+        """Store in L1 for ``ttl`` seconds and in L2 for ``l2_ttl`` (defaults to ``ttl``)."""
+        self.l1.namespace(namespace).set(key, value, ttl)
+        redis = self._redis()
+        if redis is not None:
+            await redis.set(self._l2_key(namespace, key), value, ttl=max(1, int(l2_ttl or ttl)))
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float = 60,
+        l2_ttl: Optional[int] = None,
+    ) -> Any:
+        """Read-through: return the cached value or call ``loader`` and cache a non-None result."""
+        value = await self.get(namespace, key, ttl)
+        if value is not None:
+            return value
+        value = await loader()
+        if value is not None:
+            await self.set(namespace, key, value, ttl, l2_ttl)
+        return value
+
+    # --- invalidation ---
+    def _apply_invalidation(self, namespace: str, keys: Optional[List[str]]) -> None:
+        cache = self.l1.namespace(namespace)
+        if keys is None:
+            cache.clear()
+        else:
+            for k in keys:
+                cache.delete(k)
+        for handler in self._handlers.get(namespace, []):
+            try:
+                handler(keys)
+            except Exception as e:
+                logger.warning(f"Cache invalidation handler for {self.name}.{namespace} failed: {e}")
+
+    async def invalidate(self, namespace: str, keys: Optional[Iterable[str]] = None) -> None:
+        """Drop entries (or the whole namespace) in L1 and L2, and tell other workers."""
+        key_list = list(keys) if keys is not None else None
+        self._apply_invalidation(namespace, key_list)
+        await self._invalidate_remote(namespace, key_list)
+
+    def invalidate_nowait(self, namespace: str, keys: Optional[Iterable[str]] = None) -> None:
+        """Invalidate from synchronous code: L1 is dropped immediately, L2 and the
+        fan-out to other workers run as a background task."""
+        key_list = list(keys) if keys is not None else None
+        self._apply_invalidation(namespace, key_list)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        loop.create_task(self._invalidate_remote(namespace, key_list))
+
+    async def _invalidate_remote(self, namespace: str, key_list: Optional[List[str]]) -> None:
+        redis = self._redis()
+        if redis is None:
+            return
+        if key_list is None:
+            await redis.clear_pattern(self._l2_key(namespace, "*"))
+        elif key_list:
+            await redis.delete(*[self._l2_key(namespace, k) for k in key_list])
+        await redis.publish(CacheKeys.L2_INVALIDATE_CHANNEL, {
+            "origin": self.instance_id,
+            "cache": self.name,
+            "namespace": namespace,
+            "keys": key_list,
+        })
+
+    # --- pub/sub listener ---
+    def _ensure_listener(self, redis) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = self._listener
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        self._listener = loop.create_task(self._listen(redis))
+
+    async def _listen(self, redis) -> None:
+        """Apply invalidations published by other workers until cancelled."""
+        while True:
+            pubsub = redis.pubsub()
+            if pubsub is None:
+                return
+            try:
+                await pubsub.subscribe(CacheKeys.L2_INVALIDATE_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        payload = json.loads(message.get("data"))
+                    except Exception:
+                        continue
+                    if payload.get("cache") != self.name or payload.get("origin") == self.instance_id:
+                        continue
+                    self.remote_invalidations += 1
+                    self._apply_invalidation(payload.get("namespace", ""), payload.get("keys"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener for {self.name} failed, retrying: {e}")
+                await asyncio.sleep(5)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+    async def close(self) -> None:
+        if self._listener is not None and not self._listener.done():
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._listener = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "l2_hits": self.l2_hits,
+            "l2_misses": self.l2_misses,
+            "remote_invalidations": self.remote_invalidations,
+            "listening": self._listener is not None and not self._listener.done(),
+        }
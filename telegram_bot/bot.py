@@ -3,7 +3,7 @@ import logging
 from typing import Dict, Any, Optional
 from telegram import Bot, Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
-import httpx
+from services.http_transport import get_http_client
 from config.settings import get_settings
 
 logger = logging.getLogger(__name__)
@@ -238,23 +238,23 @@ class TelegramBot:
     async def _status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /status command"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.api_base_url}/system/status")
+            client = get_http_client()
+            response = await client.get(f"{self.api_base_url}/system/status")
                 
-                if response.status_code == 200:
-                    data = response.json()
+            if response.status_code == 200:
+                data = response.json()
                     
-                    message = (
-                        "📊 <b>System Status</b>\n\n"
-                        f"🔄 <b>Auto Trade:</b> {'✅ Enabled' if data.get('auto_trade') else '❌ Disabled'}\n"
-                        f"🔗 <b>IIFL API:</b> {'✅ Connected' if data.get('iifl_api_connected') else '❌ Disconnected'}\n"
-                        f"💾 <b>Database:</b> {'✅ Connected' if data.get('database_connected') else '❌ Disconnected'}\n"
-                        f"📈 <b>Max Positions:</b> {data.get('max_positions', 'N/A')}\n"
-                        f"⚠️ <b>Risk Per Trade:</b> {data.get('risk_per_trade', 0):.1%}\n"
-                        f"🛑 <b>Max Daily Loss:</b> {data.get('max_daily_loss', 0):.1%}"
-                    )
-                else:
-                    message = "❌ Unable to fetch system status"
+                message = (
+                    "📊 <b>System Status</b>\n\n"
+                    f"🔄 <b>Auto Trade:</b> {'✅ Enabled' if data.get('auto_trade') else '❌ Disabled'}\n"
+                    f"🔗 <b>IIFL API:</b> {'✅ Connected' if data.get('iifl_api_connected') else '❌ Disconnected'}\n"
+                    f"💾 <b>Database:</b> {'✅ Connected' if data.get('database_connected') else '❌ Disconnected'}\n"
+                    f"📈 <b>Max Positions:</b> {data.get('max_positions', 'N/A')}\n"
+                    f"⚠️ <b>Risk Per Trade:</b> {data.get('risk_per_trade', 0):.1%}\n"
+                    f"🛑 <b>Max Daily Loss:</b> {data.get('max_daily_loss', 0):.1%}"
+                )
+            else:
+                message = "❌ Unable to fetch system status"
             
             await update.message.reply_text(message, parse_mode='HTML')
             
@@ -264,26 +264,26 @@ class TelegramBot:
     async def _positions_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /positions command"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.api_base_url}/portfolio/positions")
+            client = get_http_client()
+            response = await client.get(f"{self.api_base_url}/portfolio/positions")
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    positions = data.get('positions', [])
-                    total_pnl = data.get('total_pnl', 0)
+            if response.status_code == 200:
+                data = response.json()
+                positions = data.get('positions', [])
+                total_pnl = data.get('total_pnl', 0)
                     
-                    if positions:
-                        message = f"📈 <b>Current Positions</b> (Total PnL: ₹{total_pnl:,.2f})\n\n"
+                if positions:
+                    message = f"📈 <b>Current Positions</b> (Total PnL: ₹{total_pnl:,.2f})\n\n"
                         
-                        for pos in positions[:10]:  # Limit to 10 positions
-                            symbol = pos.get('symbol', 'N/A')
-                            qty = pos.get('quantity', 0)
-                            pnl = pos.get('pnl', 0)
-                            message += f"• <b>{symbol}:</b> {qty} shares, PnL: ₹{pnl:,.2f}\n"
-                    else:
-                        message = "📈 <b>No open positions</b>"
+                    for pos in positions[:10]:  # Limit to 10 positions
+                        symbol = pos.get('symbol', 'N/A')
+                        qty = pos.get('quantity', 0)
+                        pnl = pos.get('pnl', 0)
+                        message += f"• <b>{symbol}:</b> {qty} shares, PnL: ₹{pnl:,.2f}\n"
                 else:
-                    message = "❌ Unable to fetch positions"
+                    message = "📈 <b>No open positions</b>"
+            else:
+                message = "❌ Unable to fetch positions"
             
             await update.message.reply_text(message, parse_mode='HTML')
             
@@ -293,26 +293,26 @@ class TelegramBot:
     async def _pnl_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /pnl command"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.api_base_url}/reports/pnl/daily")
+            client = get_http_client()
+            response = await client.get(f"{self.api_base_url}/reports/pnl/daily")
                 
-                if response.status_code == 200:
-                    data = response.json()
+            if response.status_code == 200:
+                data = response.json()
                     
-                    daily_pnl = data.get('daily_pnl', 0)
-                    cumulative_pnl = data.get('cumulative_pnl', 0)
-                    total_trades = data.get('total_trades', 0)
-                    win_rate = data.get('win_rate', 0)
+                daily_pnl = data.get('daily_pnl', 0)
+                cumulative_pnl = data.get('cumulative_pnl', 0)
+                total_trades = data.get('total_trades', 0)
+                win_rate = data.get('win_rate', 0)
                     
-                    message = (
-                        "💰 <b>P&L Summary</b>\n\n"
-                        f"📅 <b>Today's PnL:</b> ₹{daily_pnl:,.2f}\n"
-                        f"📈 <b>Cumulative PnL:</b> ₹{cumulative_pnl:,.2f}\n"
-                        f"🔢 <b>Total Trades:</b> {total_trades}\n"
-                        f"🎯 <b>Win Rate:</b> {win_rate:.1%}"
-                    )
-                else:
-                    message = "❌ Unable to fetch P&L data"
+                message = (
+                    "💰 <b>P&L Summary</b>\n\n"
+                    f"📅 <b>Today's PnL:</b> ₹{daily_pnl:,.2f}\n"
+                    f"📈 <b>Cumulative PnL:</b> ₹{cumulative_pnl:,.2f}\n"
+                    f"🔢 <b>Total Trades:</b> {total_trades}\n"
+                    f"🎯 <b>Win Rate:</b> {win_rate:.1%}"
+                )
+            else:
+                message = "❌ Unable to fetch P&L data"
             
             await update.message.reply_text(message, parse_mode='HTML')
             
@@ -322,13 +322,13 @@ class TelegramBot:
     async def _halt_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /halt command"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(f"{self.api_base_url}/system/halt")
+            client = get_http_client()
+            response = await client.post(f"{self.api_base_url}/system/halt")
                 
-                if response.status_code == 200:
-                    message = "🛑 <b>Trading Halted</b>\n\nAll trading activities have been stopped."
-                else:
-                    message = "❌ Unable to halt trading"
+            if response.status_code == 200:
+                message = "🛑 <b>Trading Halted</b>\n\nAll trading activities have been stopped."
+            else:
+                message = "❌ Unable to halt trading"
             
             await update.message.reply_text(message, parse_mode='HTML')
             
@@ -338,13 +338,13 @@ class TelegramBot:
     async def _resume_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /resume command"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(f"{self.api_base_url}/system/resume")
+            client = get_http_client()
+            response = await client.post(f"{self.api_base_url}/system/resume")
                 
-                if response.status_code == 200:
-                    message = "✅ <b>Trading Resumed</b>\n\nTrading activities have been resumed."
-                else:
-                    message = "❌ Unable to resume trading"
+            if response.status_code == 200:
+                message = "✅ <b>Trading Resumed</b>\n\nTrading activities have been resumed."
+            else:
+                message = "❌ Unable to resume trading"
             
             await update.message.reply_text(message, parse_mode='HTML')
             
@@ -363,34 +363,34 @@ class TelegramBot:
             # The bot must authenticate itself to the API using the shared secret key
             headers = {"X-API-Key": self.settings.api_secret_key}
             
-            async with httpx.AsyncClient() as client:
-                if action == "approve":
-                    response = await client.post(f"{self.api_base_url}/signals/{signal_id}/approve", headers=headers)
-                elif action == "reject":
-                    response = await client.post(f"{self.api_base_url}/signals/{signal_id}/reject", headers=headers)
-                else:
-                    await query.edit_message_text("❌ Invalid action")
-                    return
+            client = get_http_client()
+            if action == "approve":
+                response = await client.post(f"{self.api_base_url}/signals/{signal_id}/approve", headers=headers)
+            elif action == "reject":
+                response = await client.post(f"{self.api_base_url}/signals/{signal_id}/reject", headers=headers)
+            else:
+                await query.edit_message_text("❌ Invalid action")
+                return
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    if result.get("success"):
-                        await query.edit_message_text(
-                            f"✅ Signal {signal_id} {action}ed successfully",
-                            parse_mode='HTML'
-                        )
-                    else:
-                        await query.edit_message_text(
-                            f"❌ Failed to {action} signal: {result.get('message', 'Unknown error')}",
-                            parse_mode='HTML'
-                        )
+            if response.status_code == 200:
+                result = response.json()
+                if result.get("success"):
+                    await query.edit_message_text(
+                        f"✅ Signal {signal_id} {action}ed successfully",
+                        parse_mode='HTML'
+                    )
                 else:
-                    error_detail = "Unknown error"
-                    try:
-                        error_detail = response.json().get('detail', 'Unknown API error')
-                    except Exception:
-                        pass
-                    await query.edit_message_text(f"❌ API error ({response.status_code}): {error_detail}")
+                    await query.edit_message_text(
+                        f"❌ Failed to {action} signal: {result.get('message', 'Unknown error')}",
+                        parse_mode='HTML'
+                    )
+            else:
+                error_detail = "Unknown error"
+                try:
+                    error_detail = response.json().get('detail', 'Unknown API error')
+                except Exception:
+                    pass
+                await query.edit_message_text(f"❌ API error ({response.status_code}): {error_detail}")
             
         except Exception as e:
             logger.error(f"Error handling callback: {str(e)}")
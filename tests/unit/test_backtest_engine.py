@@ -0,0 +1,104 @@
+"""
+Unit tests for the array backtest core
+Vectorized signal masks and bar-by-bar strategies give the same trades
+"""
+
+from unittest.mock import AsyncMock, Mock
+
+import numpy as np
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pd = pytest.importorskip("pandas")
+
+from services.backtest import BacktestService
+from services.backtest_engine import BUY, SELL, SignalArrays, signals_from_strategy, simulate
+from services.bar_view import BAR_FIELDS
+from services.strategy import StrategyService
+from services.strategy_registry import get_signal_masks, get_strategy
+
+STRATEGIES = ("ema_crossover", "bollinger_bands", "momentum")
+
+
+def _frame(n=1200, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close * (1 + rng.uniform(0, 0.02, n)),
+            "low": close * (1 - rng.uniform(0, 0.02, n)),
+            "close": close,
+            "volume": rng.integers(10_000, 1_000_000, n).astype(float),
+        },
+        index=pd.date_range("2019-01-01", periods=n, freq="D"),
+    )
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = StrategyService(Mock())
+    # Looser volume filter so every strategy trades on random data
+    monkeypatch.setattr(service.settings, "volume_confirmation_multiplier", 0.7)
+    return service
+
+
+class TestBacktestEngine:
+    """Test suite for backtest_engine and BacktestService's vectorized mode"""
+
+    @pytest.mark.parametrize("name", STRATEGIES)
+    def test_masks_match_strategy_at_every_bar(self, service, name):
+        spec = get_strategy(name)
+        df = service.calculate_indicators(_frame(), columns=spec.indicators)
+        columns = {field: df[field].to_numpy() for field in BAR_FIELDS if field in df.columns}
+
+        expected = signals_from_strategy(spec.bind(service), columns, "X", 1)
+        masks = get_signal_masks(name).evaluate(service, columns)
+
+        assert np.count_nonzero(expected.side == BUY) > 0
+        np.testing.assert_array_equal(masks.side[1:], expected.side[1:])
+        for field in ("entry", "stop", "target"):
+            np.testing.assert_array_equal(getattr(masks, field)[1:], getattr(expected, field)[1:])
+
+    @pytest.mark.parametrize("name", STRATEGIES)
+    async def test_vectorized_backtest_reproduces_trades_and_metrics(self, service, name):
+        fetcher = Mock()
+        fetcher.get_historical_data_df = AsyncMock(return_value=_frame(seed=11))
+        backtest = BacktestService(fetcher, service)
+
+        args = (name, "X", "2019-01-01", "2022-12-31")
+        by_bar = await backtest.run_backtest(*args)
+        vectorized = await backtest.run_backtest(*args, vectorized=True)
+
+        assert by_bar["status"] == vectorized["status"] == "completed"
+        assert by_bar["metrics"]["total_trades"] > 0
+        assert vectorized["results"] == by_bar["results"]
+        assert vectorized["metrics"] == by_bar["metrics"]
+
+    def test_exit_order_and_equity_curve(self):
+        index = pd.date_range("2024-01-01", periods=8, freq="D")
+        close = np.array([100, 100, 100, 101, 104, 103, 99, 100], dtype=float)
+        columns = {"close": close, "high": close + 1, "low": close - 1}
+        signals = SignalArrays.empty(8)
+        # Buy on bar 1 (stop 95, target 105): bar 4's high reaches the target
+        signals.side[1], signals.entry[1], signals.stop[1], signals.target[1] = BUY, 100, 95, 105
+        # Buy again on bar 5; a sell signal on bar 6 exits before the stop is touched
+        signals.side[5], signals.entry[5], signals.stop[5], signals.target[5] = BUY, 103, 90, 120
+        signals.side[6] = SELL
+
+        result = simulate(columns, index, signals, 1, 10_000, 0.02, 0.0, 0.0)
+        trades = result["trades"]
+        assert [t["type"] for t in trades] == ["BUY", "SELL", "BUY", "SELL"]
+        assert [t.get("reason") for t in trades[1::2]] == ["Take Profit", "Strategy Exit"]
+        # 2% of cash over the stop distance: 200 / 5 = 40 shares, then 203.2 / 13 = 15
+        assert [t["quantity"] for t in trades[::2]] == [40, 15]
+        assert [t["pnl"] for t in trades[1::2]] == [160, -60]
+
+        # Equity at each bar's start, valued at the previous close
+        equity = [point["equity"] for point in result["equity_curve"]]
+        assert result["equity_curve"][0]["date"] == "2024-01-01T00:00:00"
+        assert equity == [10_000, 10_000, 10_000, 10_040, 10_160, 10_160, 10_100]
+        assert result["equity"] == 10_100
@@ -0,0 +1,174 @@
+"""
+Unit tests for the backtest result store
+Columnar trade and equity files, paginated queries, LTTB downsampling and stored runs
+"""
+
+from unittest.mock import AsyncMock, Mock
+
+import numpy as np
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pd = pytest.importorskip("pandas")
+
+from services.backtest import BacktestService
+from services.backtest_store import BacktestResultStore, SweepRecorder, lttb_indices
+from services.backtest_sweep import ParameterSweep, SweepResults, parameter_grid
+from services.strategy import StrategyService
+
+
+def _frames(n=600):
+    rng = np.random.default_rng(5)
+    frames = {}
+    for symbol in ("A", "B", "C"):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        frames[symbol] = pd.DataFrame(
+            {"open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+             "volume": rng.integers(10_000, 1_000_000, n).astype(float)},
+            index=pd.date_range("2020-01-01", periods=n, freq="D"),
+        )
+    return frames
+
+
+async def _portfolio_result(monkeypatch):
+    frames = _frames()
+    fetcher = Mock()
+    fetcher.get_historical_data_df = AsyncMock(side_effect=lambda symbol, *args: frames[symbol])
+    service = StrategyService(fetcher)
+    monkeypatch.setattr(service.settings, "volume_confirmation_multiplier", 0.7)
+    result = await BacktestService(fetcher, service).run_portfolio_backtest(
+        "ema_crossover", list(frames), "2020-01-01", "2021-08-31"
+    )
+    assert result["status"] == "completed"
+    return result
+
+
+class TestBacktestStore:
+    """Test suite for BacktestResultStore"""
+
+    def test_lttb_keeps_endpoints_and_extremes(self):
+        x = np.arange(10_000, dtype=float)
+        y = np.sin(x / 500)
+        y[4321] = 25.0
+        keep = lttb_indices(x, y, 200)
+        assert len(keep) == 200 and keep[0] == 0 and keep[-1] == 9_999
+        assert (np.diff(keep) > 0).all()
+        assert 4321 in keep
+        np.testing.assert_array_equal(lttb_indices(x[:50], y[:50], 200), np.arange(50))
+
+    async def test_trades_round_trip_and_paginate(self, tmp_path, monkeypatch):
+        result = await _portfolio_result(monkeypatch)
+        trades = result["results"]["trades"]
+        assert len(trades) > 20
+        store = BacktestResultStore(root=str(tmp_path))
+        rows = store.write_files(7, result["results"])
+        assert rows == {"trades": len(trades), "equity": len(result["results"]["equity_curve"])}
+
+        pages = [store.trades(7, offset, 10) for offset in range(0, len(trades), 10)]
+        assert all(page["total"] == len(trades) for page in pages)
+        stored = [t for page in pages for t in page["trades"]]
+        assert [{**t, "date": t["date"][:10]} for t in stored] == [{**t, "date": t["date"][:10]} for t in trades]
+
+        exits_of_b = store.trades(7, 0, 1000, symbol="B", side="SELL")
+        expected = [t for t in trades if t["symbol"] == "B" and t["type"] == "SELL"]
+        assert exits_of_b["total"] == len(expected)
+        assert [t["pnl"] for t in exits_of_b["trades"]] == [t["pnl"] for t in expected]
+        assert store.trades(7, 0, 10, symbol="Z")["total"] == 0
+
+        with pytest.raises(KeyError):
+            store.trades(8)
+
+    def test_single_symbol_trades_and_equity_window(self, tmp_path):
+        dates = pd.date_range("2021-01-01", periods=1_000, freq="D")
+        equity = 100000 + np.cumsum(np.random.default_rng(1).normal(0, 500, len(dates)))
+        results = {
+            "trades": [
+                {"type": "BUY", "date": "2021-02-01T00:00:00", "price": 10.0, "quantity": 5, "value": 50.0,
+                 "commission": 0.1},
+                {"type": "SELL", "date": "2021-03-01T00:00:00", "price": 12.0, "quantity": 5, "value": 60.0,
+                 "pnl": 9.8, "reason": "Take Profit", "commission": 0.1},
+            ],
+            "equity_curve": [{"date": d.isoformat(), "equity": v} for d, v in zip(dates, equity.tolist())],
+        }
+        store = BacktestResultStore(root=str(tmp_path))
+        store.write_files(1, results, symbol="RELIANCE")
+
+        assert [t["symbol"] for t in store.trades(1)["trades"]] == ["RELIANCE", "RELIANCE"]
+        assert "pnl" not in store.trades(1)["trades"][0]
+        assert store.trades(1, side="SELL")["trades"][0]["reason"] == "Take Profit"
+
+        curve = store.equity_curve(1, points=100)
+        assert curve["total"] == 1_000 and len(curve["points"]) == 100
+        assert curve["points"][0] == results["equity_curve"][0]
+        assert curve["points"][-1] == results["equity_curve"][-1]
+        window = store.equity_curve(1, points=1_000, start="2021-03-01", end="2021-03-31")
+        assert window["total"] == 31
+        assert window["points"][0]["date"][:10] == "2021-03-01" and window["points"][-1]["date"][:10] == "2021-03-31"
+
+    async def test_sweep_recorder_rows_rank_like_sweep_results(self, tmp_path):
+        frames = {s: df for s, df in _frames(800).items() if s != "C"}
+        grid = [{"volume_multiplier": 0.7, **p} for p in parameter_grid({"fast": [5, 9], "slow": [21, 30, 50]})]
+        recorder, reference = SweepRecorder(), SweepResults()
+        await ParameterSweep(workers=0).run("ema_crossover", frames, grid, store=recorder)
+        await ParameterSweep(workers=0).run("ema_crossover", frames, grid, store=reference)
+        assert len(recorder) == len(reference) == 12
+
+        store = BacktestResultStore(root=str(tmp_path))
+        assert store.write_files(3, sweep=recorder) == {"sweep": 12}
+        ranked = store.sweep_rows(3, limit=3, order_by="sharpe_ratio", symbol="A")
+        expected = sorted((r for r in reference.rows if r["symbol"] == "A"),
+                          key=lambda r: -r["metrics"]["sharpe_ratio"])[:3]
+        assert ranked["total"] == 6
+        assert [(r["params"], r["metrics"]["sharpe_ratio"], r["start"]) for r in ranked["rows"]] == [
+            (r["params"], r["metrics"]["sharpe_ratio"], r["start"]) for r in expected
+        ]
+        with pytest.raises(ValueError):
+            store.sweep_rows(3, order_by="luck")
+
+    async def test_runs_are_saved_listed_compared_and_deleted(self, tmp_path, monkeypatch):
+        pytest.importorskip("greenlet")
+        pytest.importorskip("aiosqlite")
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        from models.database import Base
+
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'runs.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        store = BacktestResultStore(root=str(tmp_path / "runs"),
+                                    session_factory=async_sessionmaker(engine, expire_on_commit=False))
+
+        result = await _portfolio_result(monkeypatch)
+        first = await store.save(result, kind="portfolio")
+        worse = {**result, "metrics": {**result["metrics"], "sharpe_ratio": -5.0, "max_drawdown": 0.9}}
+        second = await store.save(worse, kind="portfolio")
+
+        run = await store.get_run(first)
+        assert run["symbols"] == ["A", "B", "C"] and run["trade_rows"] == len(result["results"]["trades"])
+        listed = await store.list_runs(order_by="sharpe_ratio")
+        assert listed["total"] == 2 and [r["id"] for r in listed["runs"]] == [first, second]
+        comparison = await store.compare([first, second, 99], ["sharpe_ratio", "max_drawdown"])
+        assert comparison["best"] == {"sharpe_ratio": first, "max_drawdown": first}
+        assert comparison["missing"] == [99]
+
+        assert await store.delete(second)
+        assert await store.get_run(second) is None and not (tmp_path / "runs" / str(second)).exists()
+        await engine.dispose()
+
+    async def test_run_result_survives_a_failed_save(self, monkeypatch):
+        pytest.importorskip("fastapi")
+        import api.backtest as backtest_api
+
+        store = Mock()
+        store.save = AsyncMock(side_effect=OSError("disk full"))
+        monkeypatch.setattr(backtest_api, "get_result_store", lambda: store)
+        monkeypatch.setattr(backtest_api, "run_actual_backtest", AsyncMock(return_value=None))
+        monkeypatch.setattr(backtest_api.asyncio, "sleep", AsyncMock())
+
+        config = backtest_api.BacktestConfig(strategy="short_term", start_date="2024-01-01", end_date="2024-06-30")
+        result = await backtest_api.execute_backtest(config, 5)
+        store.save.assert_awaited_once()
+        assert result["id"] is None
+        assert result["strategy"] == "short_term" and "total_return" in result
@@ -0,0 +1,199 @@
+"""
+Unit tests for parameter sweeps and walk-forward analysis
+Sweep runs reproduce single vectorized backtests, in-process and in the pool
+"""
+
+import threading
+from unittest.mock import AsyncMock, Mock
+
+import numpy as np
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pd = pytest.importorskip("pandas")
+
+from services import backtest_sweep, progress
+from services.backtest import BacktestService
+from services.backtest_sweep import (
+    ParameterSweep, SweepResults, WalkForward, parameter_grid, random_parameters,
+)
+from services.backtest_engine import SignalArrays
+from services.strategy import StrategyService
+from services.strategy_registry import register_signal_masks, register_strategy
+
+# Looser volume filter so the strategies trade on random data
+LOOSE = {"volume_multiplier": 0.7}
+
+
+# Registered when this module is imported, as a user strategy would be: spawned
+# sweep workers only see it if they import this module too
+@register_strategy("test_sweep_breakout", indicators=("atr",), lookback=30)
+def _breakout(service, bars, symbol):
+    return None
+
+
+@register_signal_masks("test_sweep_breakout", parameters={"window": 20})
+def _breakout_masks(service, columns, params):
+    close = np.asarray(columns["close"], dtype=float)
+    high = pd.Series(close).rolling(params["window"]).max().shift(1).to_numpy()
+    atr = np.asarray(columns["atr"], dtype=float)
+    with np.errstate(invalid="ignore"):
+        buy = close > high
+    return SignalArrays.from_masks(buy, np.zeros_like(buy), close, (close - 2 * atr, close + 3 * atr),
+                                   (close, close))
+
+
+def _frame(n=900, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close * (1 + rng.uniform(0, 0.02, n)),
+            "low": close * (1 - rng.uniform(0, 0.02, n)),
+            "close": close,
+            "volume": rng.integers(10_000, 1_000_000, n).astype(float),
+        },
+        index=pd.date_range("2019-01-01", periods=n, freq="D"),
+    )
+
+
+class TestBacktestSweep:
+    """Test suite for ParameterSweep"""
+
+    def test_grid_and_random_parameters(self):
+        grid = parameter_grid({"fast": [5, 9], "slow": [21, 30, 50]})
+        assert len(grid) == 6 and {"fast": 9, "slow": 50} in grid
+
+        sampled = random_parameters({"fast": (3, 12), "stop_atr": (1.0, 2.5), "trend": [50, 100]}, 10, seed=1)
+        assert len(sampled) == 10
+        assert all(3 <= p["fast"] <= 12 and isinstance(p["fast"], int) for p in sampled)
+        assert all(1.0 <= p["stop_atr"] <= 2.5 and p["trend"] in (50, 100) for p in sampled)
+
+    @pytest.mark.parametrize("name", ("ema_crossover", "bollinger_bands", "momentum"))
+    async def test_default_parameters_match_vectorized_backtest(self, name, monkeypatch):
+        frames = {"A": _frame(seed=11), "B": _frame(seed=12)}
+        store = SweepResults()
+        summary = await ParameterSweep(workers=0).run(name, frames, [LOOSE], store=store)
+
+        service = StrategyService(Mock())
+        monkeypatch.setattr(service.settings, "volume_confirmation_multiplier", 0.7)
+        for symbol, df in frames.items():
+            fetcher = Mock()
+            fetcher.get_historical_data_df = AsyncMock(return_value=df)
+            expected = await BacktestService(fetcher, service).run_backtest(
+                name, symbol, "2019-01-01", "2021-12-31", vectorized=True
+            )
+            assert expected["metrics"]["total_trades"] > 0
+            assert summary["best"][symbol]["metrics"] == expected["metrics"]
+        assert len(store) == 2
+
+    async def test_parameter_sets_are_swept_per_symbol(self):
+        frames = {"A": _frame(seed=11), "B": _frame(seed=12)}
+        grid = [{**LOOSE, **p} for p in parameter_grid({"fast": [5, 9], "slow": [21, 30]})]
+        sweep = ParameterSweep(workers=0, chunks_per_worker=4)
+        store = SweepResults()
+        await sweep.run("ema_crossover", frames, grid, store=store)
+
+        assert len(store) == 8
+        assert {(r["symbol"], r["params"]["fast"], r["params"]["slow"]) for r in store.rows} == {
+            (s, f, w) for s in frames for f in (5, 9) for w in (21, 30)
+        }
+        # Different periods give different trades
+        assert len({r["metrics"]["total_return"] for r in store.rows if r["symbol"] == "A"}) > 1
+        # Two chunks of two parameter sets per symbol
+        state = await progress.get_state()
+        assert state["phase"] == "completed" and state["processed"] == state["total"] == 4
+
+        with pytest.raises(ValueError):
+            await sweep.run("ema_crossover", frames, [{"fastest": 3}])
+
+    async def test_in_process_chunks_run_off_the_event_loop_and_release_rows(self, monkeypatch):
+        threads = []
+        real = backtest_sweep._run_chunk
+
+        def recording(*args):
+            threads.append(threading.current_thread())
+            return real(*args)
+
+        monkeypatch.setattr(backtest_sweep, "_run_chunk", recording)
+        frames = {"A": _frame(seed=11), "B": _frame(seed=12)}
+        await ParameterSweep(workers=0).run("ema_crossover", frames, [LOOSE], store=SweepResults())
+
+        assert threads and threading.main_thread() not in threads
+        assert not backtest_sweep._worker_rows
+
+    async def test_walk_forward_picks_train_best_and_tests_out_of_sample(self):
+        frames = {"A": _frame(seed=11)}
+        grid = [{**LOOSE, **p} for p in parameter_grid({"stop_atr": [1.0, 2.0], "target_atr": [2.0, 4.0]})]
+        store = SweepResults()
+        summary = await ParameterSweep(workers=0).run(
+            "ema_crossover", frames, grid, walk_forward=WalkForward(train=250, test=100), store=store
+        )
+
+        # Bars 50..900: windows start at 50, 150, ..., while train + test fits
+        windows = summary["walk_forward"]["A"]["windows"]
+        assert len(windows) == 6
+        assert len([r for r in store.rows if r["phase"] == "train"]) == 6 * 4
+        tests = sorted((r for r in store.rows if r["phase"] == "test"), key=lambda r: r["segment"])
+        assert len(tests) == 6
+        for window, row in zip(windows, tests):
+            train = [r for r in store.rows if r["phase"] == "train" and r["segment"] == row["segment"]]
+            best = max(train, key=lambda r: r["metrics"]["sharpe_ratio"])
+            assert row["params"] == best["params"] == window["params"]
+            assert window["test"] == row["metrics"] and row["start"] > best["end"]
+        expected = np.prod([1 + w["test"]["total_return"] for w in windows]) - 1
+        assert summary["walk_forward"]["A"]["test_return"] == pytest.approx(expected)
+
+    async def test_process_pool_matches_in_process(self):
+        frames = {"A": _frame(seed=11), "B": _frame(seed=12), "C": _frame(seed=13)}
+        grid = [{**LOOSE, "fast": f} for f in (5, 9, 12)]
+        local, pooled = SweepResults(), SweepResults()
+        await ParameterSweep(workers=0).run("ema_crossover", frames, grid, store=local)
+        sweep = ParameterSweep(workers=2)
+        try:
+            await sweep.run("ema_crossover", frames, grid, store=pooled)
+        finally:
+            sweep.shutdown()
+
+        def key(row):
+            return row["symbol"], row["param_id"]
+
+        assert len(pooled) == 9
+        assert [r["metrics"] for r in sorted(pooled.rows, key=key)] == [r["metrics"] for r in sorted(local.rows, key=key)]
+
+    async def test_workers_import_the_strategy_module_and_progress_totals_submitted_jobs(self, monkeypatch):
+        frames = {"A": _frame(seed=11), "B": _frame(seed=12)}
+        grid = [{"window": w} for w in (10, 20, 40)]
+        totals, processed = [], []
+        update = progress.update
+
+        async def record(**kwargs):
+            if kwargs.get("total") is not None:
+                totals.append(kwargs["total"])
+            if kwargs.get("processed") is not None:
+                processed.append(kwargs["processed"])
+            await update(**kwargs)
+
+        monkeypatch.setattr(progress, "update", record)
+        local, pooled = SweepResults(), SweepResults()
+        walk_forward = WalkForward(train=250, test=100)
+        await ParameterSweep(workers=0).run("test_sweep_breakout", frames, grid, walk_forward, store=local)
+        # Every submitted job was counted: progress ends exactly at the settled total
+        assert processed[-1] == totals[-1]
+
+        sweep = ParameterSweep(workers=2)
+        try:
+            await sweep.run("test_sweep_breakout", frames, grid, walk_forward, store=pooled)
+        finally:
+            sweep.shutdown()
+
+        def key(row):
+            return row["symbol"], row["phase"], row["segment"], row["param_id"]
+
+        assert len(pooled) == len(local) > 0
+        assert any(r["metrics"]["total_trades"] for r in local.rows)
+        assert [r["metrics"] for r in sorted(pooled.rows, key=key)] == [r["metrics"] for r in sorted(local.rows, key=key)]
@@ -0,0 +1,87 @@
+"""
+Unit tests for the latest-bar strategy view
+Views built from frames, panel columns and rows must agree, and strategies
+must give the same signals on a view as on the full DataFrame
+"""
+
+from unittest.mock import Mock
+
+import pytest
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.bar_view import BAR_FIELDS, LatestBars, as_latest_bars
+from services.indicator_engine import INDICATOR_COLUMNS, build_panel, compute_indicators
+
+pd = pytest.importorskip("pandas")
+
+
+def _indicator_frame(n=200, seed=5):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+    df = pd.DataFrame({
+        "open": close,
+        "high": close * (1 + rng.uniform(0, 0.02, n)),
+        "low": close * (1 - rng.uniform(0, 0.02, n)),
+        "close": close,
+        "volume": rng.integers(10_000, 1_000_000, n).astype(float),
+    })
+    values = compute_indicators(build_panel({"X": df}))
+    for name in INDICATOR_COLUMNS:
+        df[name] = values[name][0]
+    df["date"] = pd.date_range("2024-01-01", periods=n)
+    return df
+
+
+def _same_bar(a, b):
+    return all(a[n] == b[n] or (np.isnan(a[n]) and np.isnan(b[n])) for n in BAR_FIELDS)
+
+
+class TestLatestBars:
+    """Test suite for LatestBars"""
+
+    def test_sources_agree(self):
+        df = _indicator_frame()
+        columns = {name: df[name].to_numpy() for name in BAR_FIELDS}
+        rows = df.tail(3).to_dict("records")
+
+        views = [
+            LatestBars.from_frame(df),
+            LatestBars.from_columns(columns, len(df)),
+            LatestBars.from_rows(rows, bars=len(df)),
+        ]
+        for view in views:
+            assert len(view) == 200
+            assert view.has(BAR_FIELDS)
+            assert _same_bar(view.current, views[0].current)
+            assert _same_bar(view.previous, views[0].previous)
+        assert views[0].current["close"] == df["close"].iloc[-1]
+        assert views[0].previous.ema_9 == df["ema_9"].iloc[-2]
+
+    def test_from_columns_end_and_missing_fields(self):
+        columns = {"close": np.arange(10.0), "volume": np.ones(10)}
+        view = LatestBars.from_columns(columns, 4, end=4)
+        assert (view.current.close, view.previous.close) == (3.0, 2.0)
+        assert np.isnan(view.current.rsi)
+        assert not view.has(["rsi"])
+
+        single = as_latest_bars(pd.DataFrame({"close": [1.0]}))
+        assert single.bars == 1 and single.previous is None
+
+    def test_strategies_match_dataframe_path(self):
+        from services.strategy import StrategyService
+
+        service = StrategyService(Mock())
+        df = _indicator_frame(n=300, seed=11)
+        columns = {name: df[name].to_numpy() for name in BAR_FIELDS}
+
+        for name, func in service._strategy_map.items():
+            for i in range(50, len(df)):
+                from_frame = func(df.iloc[:i + 1], "X")
+                from_view = func(LatestBars.from_columns(columns, i + 1, end=i + 1), "X")
+                assert (from_frame is None) == (from_view is None), (name, i)
+                if from_frame is not None:
+                    assert from_frame == from_view
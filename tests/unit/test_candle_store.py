@@ -0,0 +1,147 @@
+"""
+Unit tests for the columnar candle store
+Tests full writes, delta appends, de-duplication and read shapes
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.candle_store import CandleIndex, CandleStore, candles_to_columns, columns_to_frame, columns_to_records
+from services.data_fetcher import DataFetcher
+
+
+def _candles(days, start_price=100.0):
+    return [
+        {
+            "date": f"2024-01-{d:02d}T00:00:00",
+            "open": start_price + d,
+            "high": start_price + d + 1,
+            "low": start_price + d - 1,
+            "close": start_price + d + 0.5,
+            "volume": 1000 + d,
+        }
+        for d in days
+    ]
+
+
+class TestCandleStore:
+    """Test suite for CandleStore"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return CandleStore(root=str(tmp_path / "hist_cache"))
+
+    def test_write_and_read_arrays(self, store):
+        rows = store.write("RELIANCE", "1D", _candles([3, 1, 2]))
+        assert rows == 3
+
+        cols = store.read_arrays("RELIANCE", "1D")
+        assert cols is not None
+        assert list(cols["close"]) == [101.5, 102.5, 103.5]
+        assert np.all(np.diff(cols["ts"]) > 0)
+
+    def test_append_only_adds_newer_rows(self, store):
+        store.write("TCS", "1D", _candles([1, 2, 3]))
+        added = store.append("TCS", "1D", _candles([2, 3, 4, 5]))
+        assert added == 2
+
+        index = store.get_index("TCS", "1D")
+        assert index.rows == 5
+        assert index.last_candle_dt.day == 5
+
+    def test_append_replaces_a_last_bar_stored_while_forming(self, store):
+        store.write("TCS", "1D", _candles([1, 2, 3]))
+        mapped = store.read_arrays("TCS", "1D")
+        final = [{**c, "close": 555.0, "volume": 9999.0} for c in _candles([3])]
+        assert store.append("TCS", "1D", final + _candles([4])) == 1
+
+        cols = store.read_arrays("TCS", "1D")
+        assert store.get_index("TCS", "1D").rows == 4
+        assert list(cols["close"]) == [101.5, 102.5, 555.0, 104.5]
+        assert cols["volume"][2] == 9999.0
+        # A mapping taken before the append still reads the committed rows
+        assert len(mapped["close"]) == 3 and mapped["close"][0] == 101.5
+
+    async def test_delta_fetch_corrects_the_partial_last_bar(self, store):
+        def bars(closes):
+            return [
+                {"date": f"2024-01-02T09:{15 + 5 * i:02d}:00", "open": 100.0, "high": 110.0, "low": 90.0,
+                 "close": close, "volume": 10.0}
+                for i, close in enumerate(closes)
+            ]
+
+        DataFetcher._instance = None
+        fetcher = DataFetcher(MagicMock(), test_mode=True)
+        fetcher.candle_store = store
+        # The 09:25 bar was stored mid-bar; it is stale by more than one bar interval
+        store.write("INFY", "5m", bars([101.0, 102.0, 102.5]))
+        index = store.get_index("INFY", "5m")
+        store._write_index(store._series_dir("INFY", "5m"), CandleIndex(
+            rows=index.rows, first_ts=index.first_ts, last_ts=index.last_ts,
+            last_updated=(datetime.now() - timedelta(minutes=10)).isoformat(),
+        ))
+        fetcher._fetch_once_no_fallback = AsyncMock(return_value=bars([101.0, 102.0, 103.0, 104.0]))
+        try:
+            cols = await fetcher._get_candle_columns("INFY", "5m", "2024-01-01", "2024-01-02")
+        finally:
+            DataFetcher._instance = None
+
+        fetcher._fetch_once_no_fallback.assert_awaited_once()
+        assert list(cols["close"]) == [101.0, 102.0, 103.0, 104.0]
+
+    def test_append_without_existing_series_writes(self, store):
+        assert store.append("INFY", "1D", _candles([1, 2])) == 2
+        assert store.get_index("INFY", "1D").rows == 2
+
+    def test_duplicate_timestamps_keep_last(self):
+        candles = _candles([1]) + [{**_candles([1])[0], "close": 999.0}]
+        cols = candles_to_columns(candles)
+        assert len(cols["ts"]) == 1
+        assert cols["close"][0] == 999.0
+
+    def test_invalid_dates_are_dropped(self):
+        candles = _candles([1]) + [{"date": "not-a-date", "close": 1.0}]
+        cols = candles_to_columns(candles)
+        assert len(cols["ts"]) == 1
+
+    def test_records_and_frame_shapes(self, store):
+        store.write("SBIN", "1D", _candles([1, 2]))
+        records = store.read_records("SBIN", "1D")
+        assert records[0]["date"] == "2024-01-01T00:00:00"
+        assert records[1]["volume"] == 1002.0
+
+        df = store.read_frame("SBIN", "1D")
+        assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+        assert df.index.name == "date"
+        assert len(df) == 2
+
+    def test_frame_drops_incomplete_rows_without_copying_complete_series(self, store):
+        pytest.importorskip("pandas")
+        store.write("SBIN", "1D", _candles([1, 2, 3]))
+        cols = store.read_arrays("SBIN", "1D")
+        df = columns_to_frame(cols, dropna=True)
+        assert len(df) == 3
+        assert np.shares_memory(df["close"].to_numpy(), cols["close"])
+
+        holed = {name: np.array(values) for name, values in cols.items()}
+        holed["volume"][1] = np.nan
+        df = columns_to_frame(holed, dropna=True)
+        assert list(df["close"]) == [101.5, 103.5]
+        assert list(df.index.day) == [1, 3]
+
+    def test_missing_series_returns_none(self, store):
+        assert store.get_index("UNKNOWN", "1D") is None
+        assert store.read_arrays("UNKNOWN", "1D") is None
+        assert columns_to_records({}) == []
+
+    def test_delete(self, store):
+        store.write("HDFC", "1D", _candles([1]))
+        store.delete("HDFC", "1D")
+        assert store.get_index("HDFC", "1D") is None
@@ -0,0 +1,115 @@
+"""
+Unit tests for the contract master snapshot
+Tests binary snapshot round-trips, corruption handling and offline JSON ingest
+"""
+
+import asyncio
+import json
+from datetime import date, timedelta
+
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.contract_master import (
+    ContractMaster,
+    normalize_contract_map,
+    parse_contracts_payload,
+    read_snapshot,
+    write_snapshot,
+)
+
+
+class TestContractMaster:
+    """Test suite for the contract master subsystem"""
+
+    def test_snapshot_round_trip(self, tmp_path):
+        path = str(tmp_path / "contracts.snap")
+        mapping = normalize_contract_map({"RELIANCE-EQ": "2885", "M&M-EQ": "2031"})
+        written = write_snapshot(path, mapping, date(2024, 1, 2))
+
+        loaded = read_snapshot(path)
+        assert loaded is not None
+        assert loaded.mapping == mapping
+        assert list(loaded.mapping) == list(mapping)
+        assert loaded.version == written.version
+        assert loaded.version.startswith("20240102-")
+
+    def test_corrupt_snapshot_is_ignored(self, tmp_path):
+        path = tmp_path / "contracts.snap"
+        write_snapshot(str(path), {"TCS-EQ": "11536"})
+        raw = bytearray(path.read_bytes())
+        raw[-1] ^= 0xFF
+        path.write_bytes(bytes(raw))
+        assert read_snapshot(str(path)) is None
+        assert read_snapshot(str(tmp_path / "missing.snap")) is None
+
+    def test_parse_contracts_payload_filters_exchange(self):
+        payload = {"result": [
+            {"tradingSymbol": "infy-eq", "exchange": "NSEEQ", "instrumentId": 1594},
+            {"tradingSymbol": "NIFTY24JANFUT", "exchange": "NSEFO", "instrumentId": 1},
+        ]}
+        assert parse_contracts_payload(payload) == {"INFY-EQ": "1594"}
+
+    @pytest.mark.asyncio
+    async def test_load_local_ingests_json(self, tmp_path):
+        json_path = tmp_path / "contracts.json"
+        json_path.write_text(json.dumps({"SBIN-EQ": "3045"}), encoding="utf-8")
+        master = ContractMaster(
+            snapshot_path=str(tmp_path / "contracts.snap"),
+            json_path=str(json_path),
+            url="http://127.0.0.1:9/unreachable",
+        )
+
+        snapshot = await master.load_local()
+        assert snapshot.mapping["SBIN-EQ"] == "3045"
+        assert (tmp_path / "contracts.snap").exists()
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_serves_stale_snapshot(self, tmp_path):
+        snap_path = str(tmp_path / "contracts.snap")
+        write_snapshot(snap_path, {"SBIN-EQ": "3045"}, date.today() - timedelta(days=3))
+        master = ContractMaster(
+            snapshot_path=snap_path,
+            json_path=str(tmp_path / "missing.json"),
+            url="http://127.0.0.1:9/unreachable",
+        )
+
+        snapshot = await master.get_snapshot()
+        assert snapshot is not None
+        assert not snapshot.is_current()
+        assert snapshot.mapping == {"SBIN-EQ": "3045"}
+
+        # The download ran in the background, failed, and is not retried for an hour
+        await master._refresh_task
+        assert master._last_failed_refresh is not None
+        assert await master.get_snapshot() is snapshot
+        assert master._refresh_task.done()
+
+    @pytest.mark.asyncio
+    async def test_stale_snapshot_is_served_while_refresh_runs(self, tmp_path, monkeypatch):
+        snap_path = str(tmp_path / "contracts.snap")
+        write_snapshot(snap_path, {"SBIN-EQ": "3045"}, date.today() - timedelta(days=1))
+        master = ContractMaster(snapshot_path=snap_path, json_path=str(tmp_path / "missing.json"))
+        release = asyncio.Event()
+        downloads = []
+
+        async def slow_refresh(force=False):
+            downloads.append(force)
+            await release.wait()
+            master._snapshot = write_snapshot(snap_path, {"SBIN-EQ": "3045", "TCS-EQ": "11536"})
+            return master._snapshot
+
+        monkeypatch.setattr(master, "refresh", slow_refresh)
+        stale = await asyncio.wait_for(master.get_snapshot(), timeout=1)
+        assert not stale.is_current()
+        assert await master.get_snapshot() is stale
+        await asyncio.sleep(0)
+        assert downloads == [False]
+
+        release.set()
+        await master._refresh_task
+        current = await master.get_snapshot()
+        assert current.is_current() and "TCS-EQ" in current.mapping
@@ -0,0 +1,82 @@
+"""
+Unit tests for DataFetcher single-flight request coalescing
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.data_fetcher import DataFetcher
+
+
+class TestDataFetcherCoalescing:
+    """Concurrent identical requests should share one provider call"""
+
+    @pytest.fixture
+    def data_fetcher(self):
+        DataFetcher._instance = None
+        fetcher = DataFetcher(MagicMock(), test_mode=True)
+        yield fetcher
+        DataFetcher._instance = None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_share_one_fetch(self, data_fetcher):
+        calls = []
+
+        async def slow_fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"bids": [1]}
+
+        results = await asyncio.gather(*[
+            data_fetcher._coalesce(("depth", "RELIANCE"), slow_fetch) for _ in range(5)
+        ])
+
+        assert len(calls) == 1
+        assert all(r == {"bids": [1]} for r in results)
+        assert data_fetcher.coalesced_requests == 4
+        assert data_fetcher._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_different_keys_are_not_coalesced(self, data_fetcher):
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        await asyncio.gather(
+            data_fetcher._coalesce(("price", "TCS"), fetch),
+            data_fetcher._coalesce(("price", "INFY"), fetch),
+        )
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_shared_fetch(self, data_fetcher):
+        async def slow_fetch():
+            await asyncio.sleep(0.05)
+            return 42.0
+
+        first = asyncio.create_task(data_fetcher._coalesce(("price", "SBIN"), slow_fetch))
+        second = asyncio.create_task(data_fetcher._coalesce(("price", "SBIN"), slow_fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == 42.0
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_and_release_key(self, data_fetcher):
+        async def failing_fetch():
+            raise RuntimeError("provider down")
+
+        with pytest.raises(RuntimeError):
+            await data_fetcher._coalesce(("hist", "TCS"), failing_fetch)
+        assert data_fetcher._inflight == {}
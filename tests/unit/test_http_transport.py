@@ -0,0 +1,73 @@
+"""
+Unit tests for the shared pooled HTTP transport
+Uses httpx.MockTransport in place of the network
+"""
+
+import asyncio
+
+import httpx
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import services.http_transport as http_transport_module
+from services.http_transport import PooledTransport, get_http_client, close_http_client
+
+
+class TestHttpTransport:
+    """Test suite for PooledTransport and the shared client"""
+
+    async def test_shared_client_is_reused(self):
+        client = get_http_client()
+        assert get_http_client() is client
+        await close_http_client()
+        assert client.is_closed
+        assert get_http_client() is not client
+        await close_http_client()
+
+    async def test_per_host_cap_and_slot_release(self):
+        active = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return httpx.Response(200, text="ok")
+
+        transport = PooledTransport(per_host_limit=2, transport=httpx.MockTransport(handler))
+        async with httpx.AsyncClient(transport=transport) as client:
+            responses = await asyncio.gather(*[client.get("http://capped.test/x") for _ in range(6)])
+
+        assert [r.text for r in responses] == ["ok"] * 6
+        assert peak == 2
+        assert transport._host_slots["capped.test"]._value == 2
+
+    async def test_trace_events_feed_stats_and_hooks(self, monkeypatch):
+        monkeypatch.setattr(http_transport_module, "_host_stats", {})
+        monkeypatch.setattr(http_transport_module, "_timing_hooks", [])
+        seen = []
+        http_transport_module.register_timing_hook(lambda host, timings: seen.append((host, timings)))
+
+        async def handler(request):
+            trace = request.extensions["trace"]
+            for event in ("connection.connect_tcp", "connection.start_tls",
+                          "http11.send_request_headers", "http11.receive_response_headers"):
+                await trace(f"{event}.started", {})
+                await trace(f"{event}.complete", {})
+            return httpx.Response(200)
+
+        transport = PooledTransport(per_host_limit=4, transport=httpx.MockTransport(handler))
+        async with httpx.AsyncClient(transport=transport) as client:
+            await client.get("https://traced.test/")
+
+        stats = http_transport_module.get_http_stats()["hosts"]["traced.test"]
+        assert stats["requests"] == 1
+        assert stats["new_connections"] == 1
+        assert stats["tls_handshakes"] == 1
+        host, timings = seen[0]
+        assert host == "traced.test"
+        assert set(timings) == {"connect_ms", "tls_ms", "ttfb_ms"}
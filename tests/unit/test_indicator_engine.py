@@ -0,0 +1,111 @@
+"""
+Unit tests for the vectorized indicator panel
+Compares every column against the per-symbol ta computation it replaces
+"""
+
+import pytest
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.indicator_engine import INDICATOR_COLUMNS, build_panel, compute_indicators, resolve_indicators
+
+pd = pytest.importorskip("pandas")
+ta = pytest.importorskip("ta")
+
+
+def _frame(n, seed, flat_at=None):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    if flat_at is not None:
+        close[flat_at:flat_at + 10] = close[flat_at - 1]
+    return pd.DataFrame({
+        "open": close * (1 + rng.normal(0, 0.005, n)),
+        "high": close * (1 + rng.uniform(0, 0.02, n)),
+        "low": close * (1 - rng.uniform(0, 0.02, n)),
+        "close": close,
+        "volume": rng.integers(10_000, 1_000_000, n).astype(float),
+    })
+
+
+def _ta_reference(df):
+    """The ta-based indicator set calculate_indicators used to compute."""
+    df = df.copy()
+    df["ema_9"] = ta.trend.EMAIndicator(df["close"], window=9).ema_indicator()
+    df["ema_21"] = ta.trend.EMAIndicator(df["close"], window=21).ema_indicator()
+    df["ema_50"] = ta.trend.EMAIndicator(df["close"], window=50).ema_indicator()
+    df["sma_20"] = ta.trend.SMAIndicator(df["close"], window=20).sma_indicator()
+    bb = ta.volatility.BollingerBands(df["close"], window=20, window_dev=2)
+    df["bb_upper"] = bb.bollinger_hband()
+    df["bb_middle"] = bb.bollinger_mavg()
+    df["bb_lower"] = bb.bollinger_lband()
+    df["bb_width"] = (df["bb_upper"] - df["bb_lower"]) / df["bb_middle"]
+    df["rsi"] = ta.momentum.RSIIndicator(df["close"], window=14).rsi()
+    macd = ta.trend.MACD(df["close"])
+    df["macd"] = macd.macd()
+    df["macd_signal"] = macd.macd_signal()
+    df["macd_histogram"] = macd.macd_diff()
+    df["atr"] = ta.volatility.AverageTrueRange(df["high"], df["low"], df["close"], window=14).average_true_range()
+    df["volume_sma"] = ta.trend.SMAIndicator(df["volume"], window=20).sma_indicator()
+    df["volume_ratio"] = df["volume"] / df["volume_sma"]
+    df["support"] = df["low"].rolling(window=20).min()
+    df["resistance"] = df["high"].rolling(window=20).max()
+    df["price_change"] = df["close"].pct_change()
+    df["price_momentum"] = df["close"].pct_change(periods=5)
+    return df
+
+
+class TestIndicatorEngine:
+    """Test suite for build_panel and compute_indicators"""
+
+    def test_build_panel_right_aligns_histories(self):
+        panel = build_panel({
+            "A": {f: np.arange(5.0) for f in ("open", "high", "low", "close", "volume")},
+            "B": [{"open": 1, "high": 1, "low": 1, "close": 7, "volume": 1}] * 3,
+        })
+        assert panel.symbols == ["A", "B"]
+        assert panel.close.shape == (2, 5)
+        assert list(panel.starts) == [0, 2]
+        assert np.isnan(panel.close[1, :2]).all()
+        assert list(panel.close[1, 2:]) == [7.0, 7.0, 7.0]
+
+    def test_matches_ta_for_mixed_lengths(self):
+        frames = {
+            "LONG": _frame(250, 1),
+            "MID": _frame(120, 2),
+            "SHORT": _frame(60, 3),
+            "FLAT": _frame(200, 4, flat_at=100),
+        }
+        values = compute_indicators(build_panel(frames))
+
+        for row, (symbol, df) in enumerate(frames.items()):
+            expected = _ta_reference(df)
+            n = len(df)
+            for col in INDICATOR_COLUMNS:
+                actual = values[col][row, -n:]
+                np.testing.assert_array_equal(
+                    np.isnan(actual), np.isnan(expected[col].to_numpy()), err_msg=f"{symbol}.{col}"
+                )
+                np.testing.assert_allclose(actual, expected[col].to_numpy(), rtol=1e-12, err_msg=f"{symbol}.{col}")
+
+    def test_recursive_indicators_are_bit_identical(self):
+        df = _frame(180, 7)
+        expected = _ta_reference(df)
+        values = compute_indicators(build_panel({"X": df, "PAD": _frame(250, 8)}))
+        for col in ("ema_9", "ema_50", "rsi", "macd_signal", "atr"):
+            np.testing.assert_array_equal(values[col][0, -180:], expected[col].to_numpy(), err_msg=col)
+
+    def test_subset_computes_only_requested_columns(self):
+        panel = build_panel({"X": _frame(120, 9)})
+        full = compute_indicators(panel)
+        subset = compute_indicators(panel, ["bb_width", "macd_histogram", "volume_ratio"])
+
+        assert list(subset) == ["bb_width", "macd_histogram", "volume_ratio"]
+        for col, values in subset.items():
+            np.testing.assert_array_equal(values, full[col], err_msg=col)
+        assert resolve_indicators(["bb_width"]) == ("sma_20", "bb_upper", "bb_middle", "bb_lower", "bb_width")
+        assert compute_indicators(panel, []) == {}
+        with pytest.raises(ValueError):
+            compute_indicators(panel, ["vwap"])
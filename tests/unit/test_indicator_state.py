@@ -0,0 +1,125 @@
+"""
+Unit tests for streaming indicator state
+Checks candle-by-candle updates against the batch indicator panel
+"""
+
+import json
+
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.indicator_engine import INDICATOR_COLUMNS, build_panel, compute_indicators
+from services.indicator_state import IndicatorState, IndicatorStateStore
+
+
+def _columns(n, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    close[100:125] = close[99]  # a flat stretch longer than the 20-bar windows
+    return {
+        "ts": np.arange(n, dtype=np.int64) * 300,
+        "open": close * 1.001,
+        "high": close * (1 + rng.uniform(0, 0.02, n)),
+        "low": close * (1 - rng.uniform(0, 0.02, n)),
+        "close": close,
+        "volume": rng.integers(10_000, 1_000_000, n).astype(float),
+    }
+
+
+def _same(a, b):
+    return (np.isnan(a) and np.isnan(b)) or a == b
+
+
+class TestIndicatorState:
+    """Test suite for IndicatorState and IndicatorStateStore"""
+
+    def test_every_update_matches_batch_panel(self):
+        cols = _columns(250)
+        expected = compute_indicators(build_panel({"X": cols}))
+        state = IndicatorState("X", "5m")
+
+        for t in range(250):
+            row = state.update(*(float(cols[f][t]) for f in ("open", "high", "low", "close", "volume")))
+            for name in INDICATOR_COLUMNS:
+                assert _same(row[name], expected[name][0, t]), (name, t)
+
+    def test_snapshot_resumes_identically(self):
+        cols = _columns(250)
+        full = IndicatorState("X", "5m")
+        full.apply_columns(cols)
+
+        partial = IndicatorState("X", "5m")
+        partial.apply_columns({k: v[:180] for k, v in cols.items()})
+        restored = IndicatorState.from_dict(json.loads(json.dumps(partial.to_dict())))
+        assert restored.apply_columns(cols) == 70
+
+        assert restored.bars == 250
+        assert all(_same(restored.latest[n], full.latest[n]) for n in INDICATOR_COLUMNS)
+        assert [r["close"] for r in restored.recent] == [r["close"] for r in full.recent]
+
+    def test_store_applies_only_new_candles_and_rebuilds_on_new_history(self, tmp_path):
+        cols = _columns(200)
+        store = IndicatorStateStore(root=str(tmp_path))
+        store.sync("abc", "5m", {k: v[:150] for k, v in cols.items()})
+
+        # A fresh store picks the snapshot up from disk and appends the rest
+        reloaded = IndicatorStateStore(root=str(tmp_path))
+        state = reloaded.sync("ABC", "5m", cols)
+        assert state.bars == 200
+        assert state.last_ts == int(cols["ts"][-1])
+
+        # History that no longer starts where the state did is replayed from scratch
+        shifted = {k: v[10:] for k, v in cols.items()}
+        rebuilt = reloaded.sync("ABC", "5m", shifted)
+        assert rebuilt.bars == 190
+        assert rebuilt.first_ts == int(shifted["ts"][0])
+
+    def test_forming_bar_is_provisional_until_its_interval_closes(self, tmp_path):
+        final = _columns(200)
+        partial = {k: v.copy() for k, v in final.items()}
+        # The last 5m bar was stored two minutes in, before its close settled
+        partial["close"][-1] *= 0.97
+        partial["low"][-1] = min(partial["low"][-1], partial["close"][-1])
+        partial["volume"][-1] /= 3
+        last_ts = int(final["ts"][-1])
+        store = IndicatorStateStore(root=str(tmp_path))
+
+        def batch(cols):
+            values = compute_indicators(build_panel({"X": cols}))
+            return {name: values[name][0, -1] for name in INDICATOR_COLUMNS}
+
+        seen = store.sync("X", "5m", partial, now=last_ts + 120)
+        assert all(_same(seen.latest[n], v) for n, v in batch(partial).items())
+        # Only closed bars are committed, in memory and in the snapshot
+        assert store.get("X", "5m").last_ts == int(final["ts"][-2])
+        assert IndicatorStateStore(root=str(tmp_path)).get("X", "5m").bars == 199
+
+        settled = store.sync("X", "5m", final, now=last_ts + 300)
+        assert settled is store.get("X", "5m") and settled.bars == 200
+        assert all(_same(settled.latest[n], v) for n, v in batch(final).items())
+
+    def test_bar_committed_before_its_final_values_is_replaced(self, tmp_path):
+        final = _columns(200)
+        partial = {k: v.copy() for k, v in final.items()}
+        partial["close"][-1] *= 0.9
+        partial["low"][-1] = min(partial["low"][-1], partial["close"][-1])
+        last_ts = int(final["ts"][-1])
+        store = IndicatorStateStore(root=str(tmp_path))
+        expected = compute_indicators(build_panel({"X": final}))
+
+        # Synced from the clock only, the partial bar looks closed at +360 and is committed
+        store.sync("X", "5m", partial, now=last_ts + 120)
+        assert store.sync("X", "5m", partial, now=last_ts + 360).bars == 200
+        # The refetch overwrote it with its final values: the state is rebuilt from them
+        settled = store.sync("X", "5m", final, now=last_ts + 420)
+        assert settled.bars == 200
+        assert all(_same(settled.latest[n], expected[n][0, -1]) for n in INDICATOR_COLUMNS)
+
+        # Synced with the fetch time, the partial bar is never committed
+        store = IndicatorStateStore(root=str(tmp_path / "fetched"))
+        store.sync("X", "5m", partial, now=last_ts + 120)
+        assert store.sync("X", "5m", partial, now=last_ts + 120).bars == 200
+        assert store.get("X", "5m").bars == 199
@@ -0,0 +1,80 @@
+"""
+Unit tests for the indexed instrument resolver
+Tests exact, normalized, suffix and substring resolution plus reverse lookups
+"""
+
+import json
+import random
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.instrument_resolver import InstrumentResolver, normalize_contract_map
+
+
+class TestInstrumentResolver:
+    """Test suite for InstrumentResolver"""
+
+    @pytest.fixture
+    def resolver(self):
+        raw = {
+            "RELIANCE-EQ": "2885",
+            "M&M-EQ": "2031",
+            "BAJAJ-AUTO-EQ": "16669",
+            "TCS-EQ": "11536",
+            "NIFTYBEES-EQ": "10576",
+        }
+        return InstrumentResolver(normalize_contract_map(raw))
+
+    def test_exact_and_suffix_variants(self, resolver):
+        assert resolver.resolve_id("RELIANCE-EQ") == "2885"
+        assert resolver.resolve_id("reliance") == "2885"
+        assert resolver.resolve_id(" TCS ") == "11536"
+
+    def test_normalized_alnum_keys(self, resolver):
+        assert resolver.resolve_id("M&M") == "2031"
+        assert resolver.resolve_id("MM") == "2031"
+
+    def test_substring_fallback_uses_map_order(self, resolver):
+        # "NIFTY" is not a key variant; first key containing it wins
+        assert resolver.resolve_id("NIFTY") == "10576"
+        assert resolver.resolve_id("BAJAJ") == "16669"
+
+    def test_substring_index_matches_a_linear_scan(self):
+        rng = random.Random(5)
+        keys = [
+            "".join(rng.choice("ABCDE&-") for _ in range(rng.randint(2, 10))) + "-EQ" for _ in range(2000)
+        ]
+        resolver = InstrumentResolver({k: str(i) for i, k in enumerate(dict.fromkeys(keys))})
+        keys = list(resolver.mapping)
+        for _ in range(300):
+            needle = "".join(rng.choice("ABCDE-") for _ in range(rng.randint(1, 4)))
+            expected = next((i for i, k in enumerate(keys) if needle in k), None)
+            assert resolver._first_containing("", needle) == expected
+
+    def test_unknown_symbol(self, resolver):
+        assert resolver.resolve_id("DOESNOTEXIST") is None
+        assert resolver.resolve_id("") is None
+        # Misses are memoised too
+        assert resolver.resolve_id("DOESNOTEXIST") is None
+
+    def test_trading_symbol_resolution(self, resolver):
+        assert resolver.resolve_trading_symbol("RELIANCE") == "RELIANCE-EQ"
+        assert resolver.resolve_trading_symbol("BAJAJ-AUTO") == "BAJAJ-AUTO-EQ"
+        assert resolver.resolve_trading_symbol("NIFTY") == "NIFTYBEES-EQ"
+
+    def test_reverse_lookup(self, resolver):
+        assert resolver.symbol_for("2885") == "RELIANCE-EQ"
+        assert resolver.symbol_for(11536) == "TCS-EQ"
+        assert resolver.symbol_for("0") is None
+
+    def test_from_file(self, tmp_path):
+        path = tmp_path / "contracts_nseeq.json"
+        path.write_text(json.dumps({"INFY-EQ": "1594"}), encoding="utf-8")
+        resolver = InstrumentResolver.from_file(str(path))
+        assert resolver.resolve_id("INFY") == "1594"
+
+        missing = InstrumentResolver.from_file(str(tmp_path / "missing.json"))
+        assert len(missing) == 0
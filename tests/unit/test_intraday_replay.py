@@ -0,0 +1,151 @@
+"""
+Unit tests for the intraday replay backtest
+Bars from the candle store replayed across symbols with market hours and square-off
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock
+
+import numpy as np
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("pandas")
+
+from services.backtest import BacktestService
+from services.candle_store import CandleStore
+from services.indicator_engine import build_panel, compute_indicators
+from services.portfolio_backtest import PortfolioLimits
+from services.strategy import StrategyService, TradingSignal
+from services.strategy_registry import register_strategy, unregister_strategy
+from models.signals import SignalType
+
+BUY_MARK, SELL_MARK = 7777.0, 8888.0
+LIMITS = PortfolioLimits(risk_per_trade=0.01, max_positions=1, max_position_value=1e9, max_daily_loss=0)
+
+
+def _candles(marks=(), spikes=(), days=3):
+    """5m candles 09:00-15:25 on consecutive days; ``marks`` {(day, "HH:MM"): volume}, ``spikes`` raise the high."""
+    marks, spikes = dict(marks), set(spikes)
+    candles = []
+    for day in range(days):
+        start = datetime(2024, 1, 1 + day, 9, 0)
+        for i in range(78):
+            when = start + timedelta(minutes=5 * i)
+            close = 100 + np.sin((day * 78 + i) / 5)
+            key = (day, when.strftime("%H:%M"))
+            candles.append({
+                "date": when.isoformat(), "open": close, "high": close + (2.0 if key in spikes else 0.5),
+                "low": close - 0.5, "close": close, "volume": marks.get(key, 1000.0),
+            })
+    return candles
+
+
+@pytest.fixture
+def marker_strategy():
+    seen = []
+
+    @register_strategy("test_volume_marker", indicators=("ema_9",), lookback=1)
+    def volume_marker(service, bars, symbol):
+        current = bars.current
+        seen.append((symbol, len(bars), current.ema_9))
+        if current.volume == BUY_MARK:
+            return TradingSignal(symbol, SignalType.BUY, current.close, current.close - 5, current.close + 5,
+                                 0.5, "test_volume_marker")
+        if current.volume == SELL_MARK:
+            return TradingSignal(symbol, SignalType.SELL, current.close, current.close + 1, current.close - 5,
+                                 0.5, "test_volume_marker")
+        return None
+
+    yield seen
+    unregister_strategy("test_volume_marker")
+
+
+def _data():
+    return {
+        "A": _candles({(0, "10:00"): BUY_MARK, (1, "09:30"): BUY_MARK}),
+        "B": _candles({(0, "11:00"): SELL_MARK, (1, "09:30"): BUY_MARK}, spikes={(0, "12:00")}),
+        "C": _candles({(0, "09:05"): BUY_MARK, (0, "15:10"): BUY_MARK}),
+    }
+
+
+class TestIntradayReplay:
+    """Test suite for BacktestService.run_intraday_backtest"""
+
+    async def test_replay_honours_market_hours_limits_and_square_off(self, tmp_path, marker_strategy):
+        store = CandleStore(root=str(tmp_path))
+        for symbol, candles in _data().items():
+            store.write(symbol, "5m", candles)
+        fetcher = Mock()
+        fetcher.candle_store = store
+        fetcher.get_historical_data = AsyncMock(return_value=None)
+
+        result = await BacktestService(fetcher, StrategyService(fetcher)).run_intraday_backtest(
+            "test_volume_marker", ["A", "B", "C"], "2024-01-01", "2024-01-03", limits=LIMITS
+        )
+
+        assert result["status"] == "completed"
+        fetcher.get_historical_data.assert_not_called()
+        trades = [(t["symbol"], t["type"], t["position"], t["date"][5:16], t.get("reason")) for t in result["results"]["trades"]]
+        assert trades == [
+            ("A", "BUY", "long", "01-01T10:00", None),
+            # B's short waits for A's slot; A is squared off on the bar ending at 15:15
+            ("A", "SELL", "long", "01-01T15:10", "Square Off"),
+            ("A", "BUY", "long", "01-02T09:30", None),
+            ("A", "SELL", "long", "01-02T15:10", "Square Off"),
+        ]
+        metrics = result["metrics"]
+        # 09:00-09:10 bars are pre-open; C's 15:10 buy is on the square-off bar
+        assert metrics["bars_replayed"] == 3 * 3 * 75
+        assert metrics["skipped_signals"] == {"max_positions": 2, "daily_loss": 0, "cash": 0}
+        assert metrics["squared_off"] == 2 and metrics["total_trades"] == 2
+        assert len(result["results"]["equity_curve"]) == 3 * 75
+
+        # Streaming indicators equal the batch engine over the same session bars
+        session = [c for c in _data()["A"] if c["date"][11:16] >= "09:15"]
+        ema_9 = compute_indicators(build_panel({"A": session}), ["ema_9"])["ema_9"][0]
+        seen_a = [(bars, ema) for symbol, bars, ema in marker_strategy if symbol == "A"]
+        assert len(seen_a) > 150
+        np.testing.assert_allclose([ema for _, ema in seen_a], ema_9[[bars - 1 for bars, _ in seen_a]])
+
+    async def test_store_missing_part_of_the_period_is_refetched(self, tmp_path, marker_strategy):
+        data = _data()
+        store = CandleStore(root=str(tmp_path))
+        # The stored series stops a day short of the requested period
+        store.write("A", "5m", data["A"][:2 * 78])
+        fetcher = Mock()
+        fetcher.candle_store = store
+        fetcher.get_historical_data = AsyncMock(side_effect=lambda symbol, *args, **kwargs: data[symbol])
+        service = BacktestService(fetcher, StrategyService(fetcher))
+
+        covered = await service.run_intraday_backtest("test_volume_marker", ["A"], "2024-01-01", "2024-01-02",
+                                                      limits=LIMITS)
+        fetcher.get_historical_data.assert_not_called()
+        result = await service.run_intraday_backtest("test_volume_marker", ["A"], "2024-01-01", "2024-01-03",
+                                                     limits=LIMITS)
+        fetcher.get_historical_data.assert_awaited_once()
+        assert covered["metrics"]["bars_replayed"] == 2 * 75
+        assert result["metrics"]["bars_replayed"] == 3 * 75
+
+    async def test_shorts_stop_out_and_fetch_fallback(self, marker_strategy):
+        data = _data()
+        fetcher = Mock()
+        fetcher.candle_store = None
+        fetcher.get_historical_data = AsyncMock(side_effect=lambda symbol, *args, **kwargs: data[symbol])
+        limits = PortfolioLimits(risk_per_trade=0.01, max_positions=5, max_position_value=1e9, max_daily_loss=0)
+
+        result = await BacktestService(fetcher, StrategyService(fetcher)).run_intraday_backtest(
+            "test_volume_marker", ["B"], "2024-01-01", "2024-01-01", limits=limits, slippage=0.0, commission=0.0
+        )
+
+        trades = result["results"]["trades"]
+        assert [(t["type"], t["position"], t.get("reason")) for t in trades] == [
+            ("SELL", "short", None), ("BUY", "short", "Stop Loss"),
+        ]
+        # Short at the 11:00 close, covered at the 12:00 close: the pnl follows the price down
+        assert trades[1]["pnl"] == pytest.approx((trades[0]["price"] - trades[1]["price"]) * trades[0]["quantity"])
+        assert result["results"]["equity"] == pytest.approx(100000.0 + trades[1]["pnl"])
+        assert result["metrics"]["bars_replayed"] == 75
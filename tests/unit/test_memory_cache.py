@@ -0,0 +1,55 @@
+"""
+Unit tests for the bounded in-process LRU/TTL cache
+"""
+
+import time
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.memory_cache import LRUTTLCache, NamespacedCache, get_memory_cache_stats
+
+
+class TestLRUTTLCache:
+    """Test suite for LRUTTLCache and NamespacedCache"""
+
+    def test_hit_miss_counters(self):
+        cache = LRUTTLCache("t", capacity=10)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction(self):
+        cache = LRUTTLCache("t", capacity=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3)
+        assert "b" not in cache
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+
+    def test_ttl_expiry(self):
+        cache = LRUTTLCache("t", capacity=10)
+        cache.set("a", 1, ttl=0.01)
+        time.sleep(0.02)
+        assert "a" not in cache
+        assert cache.get("a") is None
+        assert cache.expirations == 1
+        assert len(cache) == 0
+
+    def test_namespaces_are_bounded_independently(self):
+        cache = NamespacedCache("test_ns", capacities={"price": 2}, default_capacity=5)
+        for i in range(5):
+            cache.namespace("price").set(f"price_{i}", i)
+        cache.namespace("default").set("other", 1)
+
+        assert len(cache.namespace("price")) == 2
+        assert cache.namespace("default").get("other") == 1
+        assert get_memory_cache_stats()["test_ns"]["price"]["evictions"] == 3
@@ -0,0 +1,29 @@
+"""
+Unit tests for the optimized logging handlers
+Error aggregation must not block the thread that logs
+"""
+
+import logging
+import threading
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.optimized_logging import ErrorAggregationHandler
+
+
+class TestErrorAggregationHandler:
+    """Test suite for ErrorAggregationHandler"""
+
+    def test_error_records_are_counted_without_deadlock(self):
+        handler = ErrorAggregationHandler(window_minutes=5)
+        record = logging.LogRecord("x", logging.ERROR, __file__, 1, "boom", (), None)
+
+        worker = threading.Thread(target=lambda: [handler.handle(record) for _ in range(3)], daemon=True)
+        worker.start()
+        worker.join(timeout=5)
+
+        assert not worker.is_alive()
+        # The first record is passed on, the next two are counted for the window
+        assert list(handler.error_counts.values()) == [2]
@@ -0,0 +1,149 @@
+"""
+Unit tests for the optimized scheduler's unified scan
+A symbol shared by several categories is fetched and analysed once per interval
+"""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("pandas")
+pytest.importorskip("apscheduler")
+
+from services.optimized_scheduler import OptimizedTradingScheduler, StrategyCategory, SymbolData
+from services.scan_planner import ScanBatch
+from services.strategy import StrategyService
+
+
+def _candles(n=260, seed=4):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return [
+        {"date": f"2024-01-{i % 28 + 1:02d}", "open": c, "high": c * 1.01, "low": c * 0.99,
+         "close": c, "volume": float(v)}
+        for i, (c, v) in enumerate(zip(close, rng.integers(10_000, 1_000_000, n)))
+    ]
+
+
+@pytest.fixture
+def scheduler():
+    data_fetcher = Mock()
+    data_fetcher.candle_store = None
+    data_fetcher.get_historical_data = AsyncMock(return_value=_candles())
+    scheduler = OptimizedTradingScheduler()
+    scheduler.data_fetcher = data_fetcher
+    scheduler.strategy_service = StrategyService(data_fetcher)
+    scheduler.strategy_service._notifier = AsyncMock()
+    return scheduler
+
+
+class TestOptimizedScheduler:
+    """Test suite for OptimizedTradingScheduler"""
+
+    async def test_categories_share_fetch_and_indicators_per_interval(self, scheduler, monkeypatch):
+        computed = []
+        real = StrategyService.latest_bars_batch
+
+        def counting(service, symbol_data, strategy_name=None):
+            computed.append(tuple(symbol_data))
+            return real(service, symbol_data, strategy_name)
+
+        monkeypatch.setattr(StrategyService, "latest_bars_batch", counting)
+        categories = list(StrategyCategory)
+        symbol_data = await scheduler.fetch_and_cache_symbol_data("RELIANCE", categories)
+        batch = ScanBatch(index=0, symbols={"RELIANCE": categories}, calls=2)
+        await scheduler._compute_batch_signals(batch, {"RELIANCE": symbol_data})
+
+        # One daily fetch (with the longest history any category needs) and one 5m fetch
+        calls = sorted((c.args[1], c.kwargs["days"]) for c in scheduler.data_fetcher.get_historical_data.call_args_list)
+        assert calls == [("1D", 250), ("5m", 2)]
+        # Three daily categories, one computation; plus one for the 5m series
+        assert computed == [("RELIANCE",), ("RELIANCE",)]
+
+    async def test_cached_candles_are_reused_while_fresh_and_long_enough(self, scheduler):
+        fetch = scheduler.data_fetcher.get_historical_data
+        await scheduler.fetch_and_cache_symbol_data("TCS", [StrategyCategory.SHORT_TERM])
+        await scheduler.fetch_and_cache_symbol_data("TCS", [StrategyCategory.SHORT_SELLING])
+        assert fetch.call_count == 1
+
+        # Long term needs more history than the cached 100 days
+        await scheduler.fetch_and_cache_symbol_data("TCS", [StrategyCategory.LONG_TERM])
+        await scheduler.fetch_and_cache_symbol_data("TCS", [StrategyCategory.SHORT_TERM])
+        assert fetch.call_count == 2
+
+        cached = scheduler.symbol_cache["TCS"]
+        assert cached.has_fresh("1D", 250) and cached.is_valid()
+        assert not SymbolData("X").has_fresh("5m")
+
+    async def test_unified_scan_pipelines_planned_batches(self, scheduler):
+        from services.scan_planner import ScanPlanner
+
+        scheduler.scan_planner = ScanPlanner(sources=["static"], batch_seconds=3, request_rate=1.0)
+        scheduler.strategy_symbols = {
+            StrategyCategory.SHORT_TERM: {"A", "B", "C", "D", "E"},
+            StrategyCategory.LONG_TERM: {"A", "F"},
+        }
+        saved = Mock(symbol="A", signal_type=Mock(value="buy"))
+        scheduler.order_manager = Mock()
+        scheduler.order_manager.create_signal = AsyncMock(return_value=saved)
+
+        await scheduler.execute_unified_scan([StrategyCategory.SHORT_TERM, StrategyCategory.LONG_TERM])
+        report = scheduler.get_scan_report()
+
+        # Six symbols, one daily request each, three per batch
+        assert report["plan"]["symbols"] == 6 and report["plan"]["batches"] == 2
+        assert report["symbols_scanned"] == 6 and report["deferred"] == 0
+        assert scheduler.data_fetcher.get_historical_data.call_count == 6
+        for name in ("fetch", "compute", "persist"):
+            assert report["stages"][name]["batches"] == 2
+        assert report["stages"]["fetch"]["items"] == 6
+        assert report["signals_saved"] == scheduler.order_manager.create_signal.call_count
+        assert report["signals_saved"] == sum(report["signals_generated"].values())
+        assert scheduler.execution_stats["long_term"]["successful_runs"] == 1
+
+    async def test_unified_scan_defers_symbols_past_budget(self, scheduler):
+        from services.scan_planner import ScanPlanner
+
+        scheduler.scan_planner = ScanPlanner(sources=["static"], batch_seconds=2, request_rate=1.0)
+        scheduler.daily_scan_time_budget = 4
+        scheduler.strategy_symbols = {StrategyCategory.LONG_TERM: {f"S{i}" for i in range(6)}}
+
+        await scheduler.execute_unified_scan([StrategyCategory.LONG_TERM])
+        first = scheduler.get_scan_report()
+        assert first["symbols_scanned"] == 2 and first["deferred"] == 4
+
+        await scheduler.execute_unified_scan([StrategyCategory.LONG_TERM])
+        # Two deferred symbols go first; the two scanned ones are still cached and cost nothing
+        second = scheduler.get_scan_report()
+        assert second["symbols_scanned"] == 4 and second["deferred"] == 2
+        assert scheduler.data_fetcher.get_historical_data.call_count == 4
+
+    async def test_coarser_intraday_interval_is_resampled_from_base(self, scheduler, monkeypatch):
+        import pandas as pd
+        from services import strategy
+
+        monkeypatch.setitem(strategy.CATEGORY_TIMEFRAMES, "short_selling", ("15m", 2))
+        start = pd.Timestamp("2024-01-02 09:15")
+        scheduler.data_fetcher.get_historical_data = AsyncMock(return_value=[
+            {"date": (start + pd.Timedelta(minutes=5 * i)).isoformat(), "open": 100.0 + i,
+             "high": 101.0 + i, "low": 99.0 + i, "close": 100.5 + i, "volume": 10.0}
+            for i in range(75)
+        ])
+
+        fetch, derived = scheduler.plan_symbol_fetch("INFY", [StrategyCategory.DAY_TRADING, StrategyCategory.SHORT_SELLING])
+        assert fetch == {"5m": 2} and derived == {"15m": 2}
+
+        data = await scheduler.fetch_and_cache_symbol_data(
+            "INFY", [StrategyCategory.DAY_TRADING, StrategyCategory.SHORT_SELLING]
+        )
+        # One intraday request; the 15m series is aggregated from it
+        assert scheduler.data_fetcher.get_historical_data.call_count == 1
+        assert len(data.candles["15m"]) == 25
+        assert data.candles["15m"][0]["volume"] == 30.0
+        assert data.has_fresh("15m", 2)
+        assert scheduler.plan_symbol_fetch("INFY", [StrategyCategory.SHORT_SELLING]) == ({}, {})
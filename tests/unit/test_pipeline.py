@@ -0,0 +1,93 @@
+"""
+Unit tests for the staged producer/consumer pipeline
+Stages overlap, bounded queues apply backpressure and failures stay per item
+"""
+
+import asyncio
+
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.pipeline import Pipeline, Stage, StageStats
+
+
+class TestPipeline:
+    """Test suite for Pipeline"""
+
+    async def test_items_flow_through_stages_in_order(self):
+        out = []
+
+        async def double(x):
+            return x * 2
+
+        async def keep_even(x):
+            return x if x % 4 == 0 else None
+
+        async def sink(x):
+            out.append(x)
+
+        stats = await Pipeline([Stage("double", double), Stage("filter", keep_even), Stage("sink", sink)]).run(range(6))
+        assert out == [0, 4, 8]
+        assert stats["double"].items == 6 and stats["sink"].items == 3
+
+    async def test_bounded_queues_keep_work_in_flight_flat(self):
+        in_flight = 0
+        peak = 0
+
+        async def produce(x):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            return x
+
+        async def slow_consume(x):
+            nonlocal in_flight
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+
+        await Pipeline([Stage("produce", produce), Stage("consume", slow_consume)], queue_size=2).run(range(50))
+        # Produced-but-unconsumed items are capped by the queue, not the input size
+        assert peak <= 4
+
+    async def test_last_stage_starts_before_source_is_exhausted(self):
+        events = []
+
+        async def source():
+            for i in range(5):
+                events.append(("fetch", i))
+                yield i
+
+        async def persist(x):
+            events.append(("persist", x))
+
+        await Pipeline([Stage("persist", persist)], queue_size=1).run(source())
+        assert events.index(("persist", 0)) < events.index(("fetch", 4))
+
+    async def test_failed_item_is_dropped_and_counted(self):
+        out = []
+
+        async def fragile(x):
+            if x == 2:
+                raise RuntimeError("boom")
+            return x
+
+        async def sink(x):
+            out.append(x)
+
+        stats = await Pipeline([Stage("fragile", fragile, concurrency=3), Stage("sink", sink)]).run(range(5))
+        assert sorted(out) == [0, 1, 3, 4]
+        assert stats["fragile"].errors == 1 and stats["fragile"].concurrency == 3
+
+    def test_stage_stats_throughput(self):
+        stats = StageStats("fetch", concurrency=4)
+        stats.record(10, started=100.0, ended=105.0)
+        stats.record(10, started=104.0, ended=110.0)
+        assert stats.wall_seconds == 10.0 and stats.busy_seconds == 11.0
+        assert stats.as_dict()["items_per_second"] == 2.0
+
+    def test_pipeline_needs_a_stage(self):
+        with pytest.raises(ValueError):
+            Pipeline([])
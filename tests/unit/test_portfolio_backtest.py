@@ -0,0 +1,170 @@
+"""
+Unit tests for the portfolio backtest
+Shared cash, position limits, live sizing and the daily loss limit
+"""
+
+from unittest.mock import AsyncMock, Mock
+
+import numpy as np
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pd = pytest.importorskip("pandas")
+
+from services.backtest import BacktestService
+from services.backtest_engine import BUY, SignalArrays, run_simulation
+from services.portfolio_backtest import PortfolioLimits, PortfolioPanel, simulate_portfolio
+from services.risk import RiskService
+from services.strategy import StrategyService
+
+NO_LIMITS = PortfolioLimits(risk_per_trade=0.01, max_positions=10, max_position_value=1e9, max_daily_loss=0)
+
+
+def _series(close, buys, start_day="2024-01-01"):
+    """Flat-range bars around ``close`` with buy signals {bar: (entry, stop, target)}."""
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    signals = SignalArrays.empty(n)
+    for bar, (entry, stop, target) in buys.items():
+        signals.side[bar] = BUY
+        signals.entry[bar], signals.stop[bar], signals.target[bar] = entry, stop, target
+    columns = {"close": close, "high": close + 1, "low": close - 1}
+    return pd.date_range(start_day, periods=n, freq="D"), columns, signals, 1
+
+
+def _run(series, limits=NO_LIMITS, capital=100000.0):
+    panel = PortfolioPanel.from_series(series)
+    return simulate_portfolio(panel, capital, limits, commission=0.0, slippage=0.0)
+
+
+class TestPortfolioBacktest:
+    """Test suite for portfolio_backtest"""
+
+    def test_max_positions_fills_best_reward_to_risk_first(self):
+        sim = _run({
+            "A": _series([100] * 5, {1: (100, 95, 110)}),
+            "B": _series([100] * 5, {1: (100, 95, 120)}),
+            "C": _series([100] * 5, {1: (100, 98, 103)}),
+        }, limits=PortfolioLimits(0.01, 2, 1e9, 0))
+
+        buys = [(t["symbol"], t["quantity"]) for t in sim.trades if t["type"] == "BUY"]
+        # B risks 1% of 100,000 over 5 a share; A then sizes off the 80,000 left
+        assert buys == [("B", 200), ("A", 160)]
+        assert sim.skipped == {"max_positions": 1, "daily_loss": 0, "cash": 0}
+        assert sim.max_open_positions == 2
+        assert [t["reason"] for t in sim.trades if t["type"] == "SELL"] == ["End of Period"] * 2
+        assert sim.final_equity == pytest.approx(100000.0)
+        np.testing.assert_allclose(sim.equity, 100000.0)
+
+    async def test_sizing_matches_risk_service(self, monkeypatch):
+        fetcher = Mock()
+        fetcher.calculate_required_margin = AsyncMock(side_effect=lambda symbol, qty, side, price: qty * price)
+        risk = RiskService(fetcher)
+        monkeypatch.setattr(risk.settings, "risk_per_trade", 0.05)
+        expected = await risk.calculate_position_size(
+            signal={"symbol": "A", "entry_price": 100.0, "stop_loss": 99.0, "signal_type": "buy"},
+            available_capital=100000.0,
+        )
+
+        sim = _run({"A": _series([100] * 4, {1: (100, 99, 130)})}, limits=PortfolioLimits(0.05, 10, 1e9, 0))
+        # 5,000 shares by risk, scaled to 80% of capital as margin
+        assert sim.trades[0]["quantity"] == expected == 800
+
+        capped = _run({"A": _series([100] * 4, {1: (100, 99, 130)})}, limits=PortfolioLimits(0.05, 10, 5000, 0))
+        assert capped.trades[0]["quantity"] == 50
+
+    def test_daily_loss_limit_blocks_entries_until_next_day(self):
+        sim = _run({
+            "A": _series([100, 100, 80, 80, 80], {1: (100, 50, 200)}),
+            "B": _series([100] * 5, {2: (100, 95, 110), 3: (100, 95, 110)}),
+        }, limits=PortfolioLimits(0.5, 10, 1e9, 0.06))
+
+        # 800 A shares lose 16,000 (16%) on bar 2: B's signal that day is refused
+        assert sim.skipped["daily_loss"] == 1
+        buys = [(t["symbol"], t["date"][:10]) for t in sim.trades if t["type"] == "BUY"]
+        assert buys == [("A", "2024-01-02"), ("B", "2024-01-04")]
+        assert sim.equity[2] == pytest.approx(84000.0)
+
+    def test_symbols_on_different_calendars_share_one_axis(self):
+        sim_series = {
+            "A": _series([100] * 6, {1: (100, 95, 101)}),
+            "B": _series([100] * 4, {1: (100, 95, 101)}, start_day="2024-01-03"),
+        }
+        panel = PortfolioPanel.from_series(sim_series)
+        assert len(panel.axis) == 6 and np.isnan(panel.close[1, :2]).all()
+
+        sim = _run(sim_series)
+        # Both hit the 101 target the bar after entry (high = close + 1)
+        exits = [(t["symbol"], t["date"][:10], t["reason"]) for t in sim.trades if t["type"] == "SELL"]
+        assert exits == [("A", "2024-01-03", "Take Profit"), ("B", "2024-01-05", "Take Profit")]
+
+    def test_no_reentry_on_the_exit_bar(self):
+        # The 101 target is hit on bar 2, which also signals a buy
+        sim = _run({"A": _series([100] * 5, {1: (100, 95, 101), 2: (100, 95, 101), 3: (100, 95, 101)})})
+        assert [(t["type"], t["date"][:10]) for t in sim.trades] == [
+            ("BUY", "2024-01-02"), ("SELL", "2024-01-03"), ("BUY", "2024-01-04"), ("SELL", "2024-01-05"),
+        ]
+
+    def test_single_symbol_matches_backtest_engine(self):
+        rng = np.random.default_rng(17)
+        n = 600
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        columns = {"close": close, "high": close * 1.015, "low": close * 0.985}
+        index = pd.date_range("2019-01-01", periods=n, freq="D")
+        # Dense signals so exits and new buys often fall on the same bar
+        signals = SignalArrays.from_masks(rng.random(n) < 0.3, rng.random(n) < 0.05, close,
+                                          (close * 0.97, close * 1.02), (close, close))
+        limits = PortfolioLimits(risk_per_trade=0.005, max_positions=1, max_position_value=1e9, max_daily_loss=0)
+
+        engine = run_simulation(columns, signals, 1, 100000.0, limits.risk_per_trade, 0.0005, 0.0005, index)
+        portfolio = simulate_portfolio(PortfolioPanel.from_series({"X": (index, columns, signals, 1)}),
+                                       100000.0, limits, 0.0005, 0.0005)
+
+        def fills(trades):
+            return [(t["type"], t["date"], t["quantity"], round(t["price"], 9), t.get("reason")) for t in trades]
+
+        assert len(engine.trades) > 40
+        assert fills(portfolio.trades) == fills(engine.trades)
+        assert portfolio.final_equity == pytest.approx(engine.final_equity)
+
+    async def test_run_portfolio_backtest(self, monkeypatch):
+        rng = np.random.default_rng(5)
+        frames = {}
+        for i, symbol in enumerate(("A", "B", "C", "D")):
+            # Later listings: each symbol starts 40 days after the previous one
+            index = pd.date_range("2020-01-01", periods=700, freq="D")[40 * i:]
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(index))))
+            frames[symbol] = pd.DataFrame(
+                {"open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+                 "volume": rng.integers(10_000, 1_000_000, len(index)).astype(float)},
+                index=index,
+            )
+        fetcher = Mock()
+        fetcher.get_historical_data_df = AsyncMock(side_effect=lambda symbol, *args: frames[symbol])
+        service = StrategyService(fetcher)
+        monkeypatch.setattr(service.settings, "volume_confirmation_multiplier", 0.7)
+        limits = PortfolioLimits(risk_per_trade=0.02, max_positions=2, max_position_value=40000, max_daily_loss=0.06)
+
+        result = await BacktestService(fetcher, service).run_portfolio_backtest(
+            "ema_crossover", list(frames), "2020-01-01", "2021-12-31", limits=limits
+        )
+
+        assert result["status"] == "completed"
+        trades = result["results"]["trades"]
+        assert result["metrics"]["total_trades"] == len([t for t in trades if t["type"] == "SELL"]) > 0
+        assert len(result["results"]["equity_curve"]) == 700
+        # Replay: never more than two positions, never more than 40,000 per order
+        open_now, cash = set(), 100000.0
+        for trade in sorted(trades, key=lambda t: (t["date"], t["type"] == "BUY")):
+            if trade["type"] == "BUY":
+                open_now.add(trade["symbol"])
+                assert len(open_now) <= 2 and trade["value"] <= 40000
+                cash -= trade["value"] + trade["commission"]
+            else:
+                open_now.discard(trade["symbol"])
+                cash += trade["value"] - trade["commission"]
+            assert cash >= 0
+        assert cash == pytest.approx(result["results"]["equity"])
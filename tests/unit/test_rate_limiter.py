@@ -0,0 +1,108 @@
+"""
+Unit tests for the shared IIFL token-bucket rate limiter
+Redis is replaced by a stand-in that records script calls
+"""
+
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import services.rate_limiter as rate_limiter_module
+from services.rate_limiter import (
+    LANE_BULK,
+    LANE_CRITICAL,
+    BucketSpec,
+    RateLimiter,
+    build_iifl_rate_limiter,
+    classify_iifl_request,
+)
+
+
+class FakeRedis:
+    def __init__(self, result=0):
+        self.result = result
+        self.calls = []
+
+    async def eval_script(self, script, keys, args):
+        self.calls.append((keys, args))
+        return self.result
+
+
+def make_limiter():
+    return RateLimiter(
+        "test",
+        global_buckets={"global:second": BucketSpec(capacity=4, rate=4)},
+        endpoint_buckets={"historical": BucketSpec(capacity=2, rate=0.001)},
+    )
+
+
+class TestRateLimiter:
+    """Test suite for RateLimiter"""
+
+    @pytest.fixture
+    def no_redis(self, monkeypatch):
+        monkeypatch.setattr(rate_limiter_module, "get_connected_redis_service", lambda: None)
+
+    def test_classify_iifl_request(self):
+        assert classify_iifl_request("POST", "/orders") == ("orders", LANE_CRITICAL)
+        assert classify_iifl_request("GET", "/orders") == ("orders", "normal")
+        assert classify_iifl_request("POST", "/marketdata/historicaldata") == ("historical", LANE_BULK)
+        assert classify_iifl_request("POST", "/marketdata/marketquotes") == ("quotes", "normal")
+        assert classify_iifl_request("GET", "/profile") == ("default", "normal")
+
+    async def test_local_fallback_enforces_endpoint_bucket(self, no_redis):
+        limiter = make_limiter()
+        await limiter.acquire("historical", LANE_CRITICAL)
+        await limiter.acquire("historical", LANE_CRITICAL)
+        # Endpoint bucket is empty and refills far too slowly to wait for
+        assert await limiter._try_acquire("historical", LANE_CRITICAL) > 1
+        assert limiter.local_acquires == 2
+
+    async def test_bulk_lane_leaves_headroom_for_critical(self, no_redis):
+        limiter = make_limiter()
+        # Bulk may only take tokens while more than half the global bucket remains
+        await limiter.acquire("default", LANE_BULK)
+        await limiter.acquire("default", LANE_BULK)
+        assert await limiter._try_acquire("default", LANE_BULK) > 0
+        assert await limiter._try_acquire("default", LANE_CRITICAL) == 0
+        assert await limiter._try_acquire("default", LANE_CRITICAL) == 0
+
+    async def test_iifl_limiter_admits_at_most_rpm_per_minute_after_idle(self, no_redis, monkeypatch):
+        monkeypatch.setenv("IIFL_MAX_RPS", "3")
+        monkeypatch.setenv("IIFL_MAX_RPM", "60")
+        clock = [1000.0]
+        monkeypatch.setattr(rate_limiter_module.time, "monotonic", lambda: clock[0])
+        limiter = build_iifl_rate_limiter()
+
+        # Buckets start full, as after an idle period; try a request every 10 ms for one minute
+        admitted = 0
+        while clock[0] < 1060.0:
+            if await limiter._try_acquire("default", LANE_CRITICAL) == 0:
+                admitted += 1
+            clock[0] += 0.01
+        assert 50 <= admitted <= 60
+
+    async def test_redis_script_receives_all_buckets(self, monkeypatch):
+        fake = FakeRedis(result=0)
+        monkeypatch.setattr(rate_limiter_module, "get_connected_redis_service", lambda: fake)
+        limiter = make_limiter()
+
+        await limiter.acquire("historical", LANE_BULK)
+
+        keys, args = fake.calls[0]
+        assert keys == ["ratelimit:test:global:second", "ratelimit:test:historical"]
+        # capacity, tokens per ms, reserved tokens for each key
+        assert args == [4, 0.004, 2.0, 2, 0.000001, 0.0]
+        assert limiter.redis_acquires == 1
+        assert limiter.local_acquires == 0
+
+    async def test_redis_error_falls_back_to_local(self, monkeypatch):
+        fake = FakeRedis(result=None)
+        monkeypatch.setattr(rate_limiter_module, "get_connected_redis_service", lambda: fake)
+        limiter = make_limiter()
+
+        assert await limiter.acquire("default", LANE_CRITICAL) == pytest.approx(0, abs=0.01)
+        assert limiter.local_acquires == 1
+        assert limiter.stats()["lanes"]["default:critical"]["acquired"] == 1
@@ -0,0 +1,103 @@
+"""
+Unit tests for the prioritized IIFL request dispatcher
+"""
+
+import asyncio
+
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.request_dispatcher import (
+    PriorityDispatcher,
+    RequestPriority,
+    request_priority,
+    resolve_priority,
+)
+
+
+def make_dispatcher(shared_limit=1):
+    return PriorityDispatcher(
+        {RequestPriority.CRITICAL: 2, RequestPriority.INTERACTIVE: 2, RequestPriority.BULK: 1},
+        shared_limit=shared_limit,
+    )
+
+
+class TestPriorityDispatcher:
+    """Test suite for PriorityDispatcher"""
+
+    def test_resolve_priority(self):
+        assert resolve_priority("POST", "/orders") == RequestPriority.CRITICAL
+        assert resolve_priority("POST", "/marketdata/historicaldata") == RequestPriority.BULK
+        assert resolve_priority("GET", "/holdings") == RequestPriority.INTERACTIVE
+        with request_priority(RequestPriority.BULK):
+            assert resolve_priority("GET", "/holdings") == RequestPriority.BULK
+            # An explicit priority beats the surrounding block
+            assert resolve_priority("POST", "/orders", RequestPriority.CRITICAL) == RequestPriority.CRITICAL
+        assert resolve_priority("GET", "/holdings") == RequestPriority.INTERACTIVE
+
+    async def test_critical_bypasses_busy_shared_slots(self):
+        dispatcher = make_dispatcher()
+        release = asyncio.Event()
+
+        async def bulk():
+            async with dispatcher.slot(RequestPriority.BULK):
+                await release.wait()
+
+        task = asyncio.create_task(bulk())
+        await asyncio.sleep(0)
+
+        async with dispatcher.slot(RequestPriority.CRITICAL) as queued:
+            assert queued < 0.01
+            assert dispatcher.stats()["bulk"]["in_flight"] == 1
+
+        release.set()
+        await task
+
+    async def test_freed_slot_goes_to_higher_class_first(self):
+        dispatcher = make_dispatcher()
+        order = []
+        release = asyncio.Event()
+
+        async def run(priority, name, wait=False):
+            async with dispatcher.slot(priority):
+                order.append(name)
+                if wait:
+                    await release.wait()
+
+        first = asyncio.create_task(run(RequestPriority.BULK, "bulk-1", wait=True))
+        await asyncio.sleep(0)
+        bulk = asyncio.create_task(run(RequestPriority.BULK, "bulk-2"))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(run(RequestPriority.INTERACTIVE, "ui"))
+        await asyncio.sleep(0)
+
+        release.set()
+        await asyncio.gather(first, bulk, interactive)
+
+        assert order == ["bulk-1", "ui", "bulk-2"]
+        assert dispatcher.stats()["interactive"]["completed"] == 1
+
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        dispatcher = make_dispatcher()
+        release = asyncio.Event()
+
+        async def hold():
+            async with dispatcher.slot(RequestPriority.INTERACTIVE):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        release.set()
+        await holder
+        stats = dispatcher.stats()["interactive"]
+        assert stats["in_flight"] == 0
+        assert stats["queued"] == 0
@@ -0,0 +1,144 @@
+"""
+Unit tests for local OHLCV resampling
+Coarser timeframes derived from a base series match a direct aggregation
+"""
+
+import numpy as np
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.resample import (
+    DAY_SECONDS,
+    SESSION_OPEN_SECONDS,
+    ResampleCache,
+    can_derive,
+    interval_seconds,
+    resample_candles,
+    resample_columns,
+)
+
+
+def _session(days=2, bars=75, seed=7):
+    """5-minute candle columns for ``days`` NSE sessions starting 09:15."""
+    rng = np.random.default_rng(seed)
+    day0 = 19_723 * DAY_SECONDS  # 2024-01-01
+    ts = np.concatenate([
+        day0 + d * DAY_SECONDS + SESSION_OPEN_SECONDS + np.arange(bars) * 300 for d in range(days)
+    ]).astype(np.int64)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, len(ts)))
+    return {
+        "ts": ts,
+        "open": close + rng.normal(0, 0.1, len(ts)),
+        "high": close + 1.0,
+        "low": close - 1.0,
+        "close": close,
+        "volume": rng.integers(100, 1000, len(ts)).astype(np.float64),
+    }
+
+
+class TestResample:
+    """Test suite for resample_columns and ResampleCache"""
+
+    def test_interval_parsing_and_derivability(self):
+        assert interval_seconds("5m") == 300 and interval_seconds("15") == 900
+        assert interval_seconds("1H") == 3600 and interval_seconds("1D") == DAY_SECONDS
+        assert interval_seconds("weekly") is None
+        assert can_derive("15m", "5m") and can_derive("1H", "5m")
+        assert not can_derive("5m", "5m") and not can_derive("7m", "5m")
+        # Daily bars come from the broker unless explicitly allowed
+        assert not can_derive("1D", "5m") and can_derive("1D", "5m", intraday_only=False)
+
+    def test_intraday_buckets_align_to_session_open(self):
+        cols = _session(days=1)
+        hourly = resample_columns(cols, "1H")
+        offsets = hourly["ts"] % DAY_SECONDS
+        assert offsets[0] == SESSION_OPEN_SECONDS and np.all(np.diff(offsets) == 3600)
+        # 75 five-minute bars: six full hours and a 15-minute closing bucket
+        assert len(hourly["ts"]) == 7
+
+        first = slice(0, 12)
+        assert hourly["open"][0] == cols["open"][0]
+        assert hourly["high"][0] == cols["high"][first].max()
+        assert hourly["low"][0] == cols["low"][first].min()
+        assert hourly["close"][0] == cols["close"][11]
+        assert hourly["volume"][0] == cols["volume"][first].sum()
+        assert hourly["volume"].sum() == cols["volume"].sum()
+
+    def test_daily_buckets_per_calendar_day(self):
+        cols = _session(days=3)
+        daily = resample_columns(cols, "1D")
+        assert len(daily["ts"]) == 3 and np.all(daily["ts"] % DAY_SECONDS == 0)
+        assert daily["close"][1] == cols["close"][149]
+        assert daily["high"][2] == cols["high"][150:].max()
+
+    def test_cache_extends_incrementally_on_append(self):
+        cols = _session(days=2)
+        cache = ResampleCache()
+        head = {k: v[:100] for k, v in cols.items()}
+
+        first = cache.get("X", head, "15m")
+        assert cache.get("X", head, "15m") is first
+        extended = cache.get("X", cols, "15m")
+
+        assert cache.full_builds == 1 and cache.incremental_builds == 1
+        expected = resample_columns(cols, "15m")
+        for name, values in expected.items():
+            np.testing.assert_array_equal(extended[name], values)
+
+    def test_last_bar_updated_in_place_extends_the_cached_series(self):
+        cols = _session(days=2)
+        cache = ResampleCache()
+        head = {k: v[:100].copy() for k, v in cols.items()}
+        cache.get("X", head, "15m")
+
+        # A delta refetch overwrites the last cached bar and appends new ones
+        refetched = {k: v.copy() for k, v in cols.items()}
+        refetched["close"][99] += 3.0
+        refetched["high"][99] += 3.0
+        extended = cache.get("X", refetched, "15m")
+        assert cache.full_builds == 1 and cache.incremental_builds == 1
+
+        # The same revision with nothing appended still rebuilds the last bucket
+        revised = {k: v.copy() for k, v in refetched.items()}
+        revised["close"][-1] -= 2.0
+        latest = cache.get("X", revised, "15m")
+        assert cache.full_builds == 1 and cache.incremental_builds == 2
+
+        for result, base in ((extended, refetched), (latest, revised)):
+            expected = resample_columns(base, "15m")
+            for name, values in expected.items():
+                np.testing.assert_array_equal(result[name], values)
+
+    def test_rewritten_base_is_resampled_from_scratch(self):
+        cols = _session(days=1)
+        cache = ResampleCache()
+        cache.get("X", cols, "15m")
+
+        # The closing bar of the last settled bucket changes
+        revised = {k: v.copy() for k, v in cols.items()}
+        revised["close"][71] += 5.0
+        result = cache.get("X", revised, "15m")
+        assert cache.full_builds == 2 and cache.incremental_builds == 0
+        assert result["close"][-2] == revised["close"][71]
+
+        cache.invalidate("X")
+        cache.get("X", revised, "15m")
+        assert cache.full_builds == 3
+
+    def test_candles_keep_their_shape(self):
+        pd = pytest.importorskip("pandas")
+        cols = _session(days=1)
+        frame = pd.DataFrame(
+            {name: cols[name] for name in ("open", "high", "low", "close", "volume")},
+            index=pd.to_datetime(cols["ts"], unit="s"),
+        )
+        resampled = resample_candles(frame, "30m")
+        assert isinstance(resampled, pd.DataFrame) and len(resampled) == 13
+        assert resampled.index[0].strftime("%H:%M") == "09:15"
+
+        records = resample_candles(frame.reset_index(names="date").to_dict("records"), "30m")
+        assert isinstance(records, list) and len(records) == 13
+        assert records[0]["volume"] == resampled["volume"].iloc[0]
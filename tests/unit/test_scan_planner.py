@@ -0,0 +1,68 @@
+"""
+Unit tests for the scan planner
+Universes come from the first available source per category, batches are sized
+to the broker rate limit and symbols beyond the time budget rotate to the next scan
+"""
+
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.rate_limiter import iifl_sustained_rate
+from services.scan_planner import ScanPlanner
+
+NIFTY_100 = str(Path(__file__).parent.parent.parent / "data" / "ind_nifty100list.csv")
+
+
+class TestScanPlanner:
+    """Test suite for ScanPlanner"""
+
+    def test_sustained_rate_follows_slowest_limit(self, monkeypatch):
+        monkeypatch.setenv("IIFL_MAX_RPS", "3")
+        monkeypatch.setenv("IIFL_MAX_RPM", "60")
+        monkeypatch.setenv("IIFL_HISTORICAL_MAX_RPS", "2")
+        # The minute bucket keeps a 3-request burst, so 57 requests refill per minute
+        assert iifl_sustained_rate("historical") == pytest.approx(57 / 60)
+        monkeypatch.setenv("IIFL_MAX_RPM", "600")
+        assert iifl_sustained_rate("historical") == 2.0
+
+    def test_universe_uses_first_non_empty_source(self):
+        planner = ScanPlanner(universe_file=NIFTY_100, sources=["watchlist", "file", "static"])
+        universe = planner.resolve_universe(
+            ["day", "long"], watchlists={"day": ["zzscan", "TCS"]}, static={"long": {"SBIN"}},
+        )
+        # "day" has a watchlist; "long" has none and falls back to the index file, not the static set
+        assert universe["ZZSCAN"] == ["day"]
+        assert universe["TCS"] == ["day", "long"]
+        assert "SBIN" in universe and len(universe) >= 100
+
+        static_only = ScanPlanner(universe_file="missing.csv", sources=["file", "static"])
+        assert static_only.resolve_universe(["long"], {}, {"long": {"SBIN", "ITC"}}) == {"ITC": ["long"], "SBIN": ["long"]}
+
+    def test_batches_sized_to_rate_limit(self):
+        planner = ScanPlanner(batch_seconds=10, request_rate=1.0)
+        universe = {f"S{i}": ["long"] for i in range(25)}
+        plan = planner.plan(universe, lambda symbol, cats: 1, time_budget=1000)
+
+        assert [len(b.symbols) for b in plan.batches] == [10, 10, 5]
+        assert plan.calls == 25 and plan.estimated_seconds == 25
+        assert not plan.deferred
+
+    def test_budget_defers_and_rotates_symbols(self):
+        planner = ScanPlanner(batch_seconds=10, request_rate=2.0)
+        universe = {f"S{i:03d}": ["long"] for i in range(500)}
+        # Two requests per symbol at 2/s: 180s (360 requests) after reserving one batch
+        first = planner.plan(universe, lambda symbol, cats: 2, time_budget=190, key="daily")
+        assert first.calls == 360 and first.symbol_count == 180
+        assert first.estimated_seconds == 180
+        assert len(first.deferred) == 320
+
+        second = planner.plan(universe, lambda symbol, cats: 2, time_budget=190, key="daily")
+        assert list(second.batches[0].symbols)[0] == first.deferred[0]
+        # Other plan keys keep their own rotation
+        assert list(planner.plan(universe, lambda s, c: 2, 190, key="other").batches[0].symbols)[0] == "S000"
+
+        planner.defer("daily", ["S001"])
+        assert list(planner.plan(universe, lambda s, c: 2, 190, key="daily").batches[0].symbols)[0] == "S001"
@@ -0,0 +1,86 @@
+"""
+Unit tests for the active signal index
+Repeats of a pending signal are dropped before margin calls or DB writes
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.order_manager import OrderManager
+from models.signals import SignalType
+from services.signal_index import SignalIndex, signal_fingerprint
+
+
+def _signal(**overrides):
+    signal = {
+        "symbol": "RELIANCE", "signal_type": SignalType.BUY, "entry_price": 2500.0,
+        "stop_loss": 2450.0, "take_profit": 2600.0, "strategy": "ema_crossover",
+        "bar_time": "2024-01-02 10:15:00",
+    }
+    signal.update(overrides)
+    return signal
+
+
+@pytest.fixture
+def order_manager():
+    risk = MagicMock()
+    risk.calculate_position_size = AsyncMock(return_value=10)
+    data_fetcher = MagicMock()
+    data_fetcher.get_margin_info = AsyncMock(return_value={"availableMargin": 100000})
+    data_fetcher.calculate_required_margin = AsyncMock(return_value={"current_order_margin": 5000})
+    return OrderManager(MagicMock(), risk_service=risk, data_fetcher=data_fetcher, signal_index=SignalIndex())
+
+
+class TestSignalIndex:
+    """Test suite for SignalIndex and its use in OrderManager.create_signal"""
+
+    def test_fingerprint_fields(self):
+        base = signal_fingerprint(_signal())
+        # Enum or string side, and price noise inside one tick, are the same signal
+        assert signal_fingerprint(_signal(signal_type="BUY", entry_price=2500.01)) == base
+        assert signal_fingerprint(_signal(symbol="reliance")) == base
+        for changed in ({"bar_time": "2024-01-02 10:20:00"}, {"strategy": "momentum"},
+                        {"signal_type": SignalType.SELL}, {"stop_loss": 2440.0}, {"category": "long_term"}):
+            assert signal_fingerprint(_signal(**changed)) != base
+
+    async def test_claim_expires_and_releases(self):
+        index = SignalIndex()
+        key = await index.claim(_signal(), ttl=60)
+        assert key and await index.claim(_signal(), ttl=60) is None
+
+        await index.release(key)
+        assert await index.claim(_signal(), ttl=60) == key
+        # Expired entries no longer block
+        index._active[key] = 0.0
+        assert await index.claim(_signal(), ttl=60) == key
+        assert index.get_stats() == {"active": 1, "claims": 3, "duplicates": 1}
+
+    async def test_duplicate_skips_margin_and_sizing(self, order_manager):
+        first = await order_manager.create_signal(_signal())
+        repeat = await order_manager.create_signal(_signal())
+
+        assert first is not None and first.quantity == 10
+        assert repeat is None
+        assert order_manager.data_fetcher.calculate_required_margin.await_count == 1
+        assert order_manager.risk.calculate_position_size.await_count == 1
+
+        # Explicit creation bypasses the index
+        assert await order_manager.create_signal(_signal(), dedupe=False) is not None
+
+    async def test_each_category_keeps_its_signal(self, order_manager):
+        # The unified scan fans one daily setup out to several categories
+        for category in ("swing", "short_term", "long_term"):
+            assert await order_manager.create_signal(_signal(category=category)) is not None
+        assert await order_manager.create_signal(_signal(category="swing")) is None
+
+    async def test_failed_creation_releases_claim(self, order_manager):
+        order_manager.risk.calculate_position_size = AsyncMock(side_effect=RuntimeError("down"))
+        assert await order_manager.create_signal(_signal()) is None
+
+        order_manager.risk.calculate_position_size = AsyncMock(return_value=5)
+        assert await order_manager.create_signal(_signal()) is not None
@@ -0,0 +1,88 @@
+"""
+Unit tests for the strategy process pool
+Worker chunks are exercised in-process against the shared-memory panel
+"""
+
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import services.strategy_pool as strategy_pool_module
+from services.bar_view import panel_views
+from services.indicator_engine import build_panel, compute_indicators
+from services.strategy_pool import StrategyPool, available_cores, get_strategy_pool
+
+
+class _Signal:
+    def __init__(self, symbol, close):
+        self.symbol = symbol
+        self.signal_type = type("T", (), {"value": "buy"})()
+        self.entry_price = close
+        self.stop_loss = close * 0.95
+        self.target_price = close * 1.1
+        self.confidence = 0.5
+        self.strategy = "rsi_above_50"
+        self.metadata = None
+
+
+class _RsiService:
+    """Stands in for StrategyService inside the worker: one signal when RSI > 50."""
+
+    def _evaluate_strategies(self, view, symbol, strategy_name):
+        return [_Signal(symbol, view.current.close)] if view.current.rsi > 50 else []
+
+
+def _universe(n_symbols=12, bars=120):
+    rng = np.random.default_rng(9)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_symbols, bars)), axis=1))
+    return {
+        f"S{i}": {"open": close[i], "high": close[i] * 1.01, "low": close[i] * 0.99,
+                  "close": close[i], "volume": np.full(bars, 1e5)}
+        for i in range(n_symbols)
+    }
+
+
+class TestStrategyPool:
+    """Test suite for StrategyPool"""
+
+    def test_chunks_match_in_process_evaluation(self, monkeypatch):
+        monkeypatch.setattr(strategy_pool_module, "_worker_service", _RsiService())
+        data = _universe()
+        shm, panel = StrategyPool._to_shared_memory(data)
+        try:
+            shape = (5, len(panel.symbols), panel.bars)
+            results = {}
+            for lo, hi in ((0, 5), (5, 12)):
+                results.update(strategy_pool_module._evaluate_chunk(
+                    shm.name, shape, (lo, hi), panel.symbols[lo:hi], panel.starts[lo:hi], None
+                ))
+        finally:
+            shm.close()
+            shm.unlink()
+
+        reference = build_panel(data)
+        views = panel_views(reference, compute_indicators(reference))
+        expected = {s for s, view in views.items() if view.current.rsi > 50}
+        assert set(results) == set(data)
+        assert {s for s, records in results.items() if records} == expected
+        for symbol, records in results.items():
+            for record in records:
+                assert record[0] == symbol
+                assert record[2] == views[symbol].current.close
+
+    def test_sizing_and_thresholds(self, monkeypatch):
+        assert StrategyPool().workers == available_cores() - 1
+        pool = StrategyPool(workers=2, min_symbols=10)
+        assert not pool.should_use(9)
+        assert pool.should_use(10)
+        assert not StrategyPool(workers=0).should_use(1000)
+
+        monkeypatch.setattr(strategy_pool_module, "_pool", None)
+        monkeypatch.setenv("STRATEGY_POOL_WORKERS", "0")
+        assert not get_strategy_pool().enabled
+        monkeypatch.setattr(strategy_pool_module, "_pool", None)
+        monkeypatch.setenv("STRATEGY_POOL_WORKERS", "auto")
+        assert get_strategy_pool().workers == available_cores() - 1
+        monkeypatch.setattr(strategy_pool_module, "_pool", None)
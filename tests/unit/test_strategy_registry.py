@@ -0,0 +1,84 @@
+"""
+Unit tests for the strategy registry
+Strategies declare their indicators, scans compute only the union of what
+the selected strategies read, and new strategies run without service changes
+"""
+
+from unittest.mock import Mock
+
+import pytest
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pd = pytest.importorskip("pandas")
+
+import services.strategy as strategy_module
+from services.strategy import StrategyService, TradingSignal
+from services.strategy_registry import (
+    get_strategy, register_strategy, required_indicators, select_strategies, strategy_names, unregister_strategy,
+)
+from models.signals import SignalType
+
+
+def _candles(n=120, seed=21):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return [
+        {"open": c, "high": c * 1.01, "low": c * 0.99, "close": c, "volume": float(v)}
+        for c, v in zip(close, rng.integers(10_000, 1_000_000, n))
+    ]
+
+
+@pytest.fixture
+def rsi_strategy():
+    @register_strategy("test_rsi_above_50", indicators=("rsi",), lookback=30)
+    def rsi_above_50(service, bars, symbol):
+        if bars.current.rsi > 50:
+            return TradingSignal(symbol, SignalType.BUY, bars.current.close, bars.current.close * 0.95,
+                                 bars.current.close * 1.1, 0.5, "test_rsi_above_50")
+        return None
+
+    yield get_strategy("test_rsi_above_50")
+    unregister_strategy("test_rsi_above_50")
+
+
+class TestStrategyRegistry:
+    """Test suite for strategy_registry"""
+
+    def test_builtin_strategies_declare_indicators(self):
+        assert {"ema_crossover", "bollinger_bands", "momentum"} <= set(strategy_names())
+        ema = select_strategies("ema_crossover")
+        assert list(ema) == ["ema_crossover"]
+        assert required_indicators(ema.values()) == {"ema_9", "ema_21", "ema_50", "volume_ratio", "rsi", "atr"}
+        # Unknown names keep the old behaviour of running everything
+        assert set(select_strategies("nope")) == set(strategy_names())
+
+    def test_scan_computes_only_selected_indicators(self, monkeypatch):
+        requested = []
+        real = strategy_module.compute_indicators
+
+        def recording(panel, columns=None):
+            requested.append(columns)
+            return real(panel, columns)
+
+        monkeypatch.setattr(strategy_module, "compute_indicators", recording)
+        service = StrategyService(Mock())
+        views = service.latest_bars_batch({"X": _candles()}, "ema_crossover")
+
+        assert requested == [required_indicators(select_strategies("ema_crossover").values())]
+        assert views["X"].has(["ema_9", "ema_50", "atr"])
+        assert not views["X"].has(["bb_upper"]) and not views["X"].has(["macd"])
+
+    async def test_registered_strategy_runs_without_service_changes(self, rsi_strategy):
+        service = StrategyService(Mock())
+        data = _candles()
+        results = await service.generate_signals_batch({"X": data, "SHORT": data[:20]}, "test_rsi_above_50")
+
+        expected = service.latest_bars_batch({"X": data}, "test_rsi_above_50")["X"].current.rsi > 50
+        assert [s.strategy for s in results["X"]] == (["test_rsi_above_50"] if expected else [])
+        # Below its 30-bar lookback the strategy is not evaluated at all
+        assert results["SHORT"] == []
+        assert "test_rsi_above_50" in service._strategy_map
@@ -0,0 +1,145 @@
+"""
+Unit tests for the two-tier (L1 + Redis L2) cache
+Uses an in-memory stand-in for RedisService
+"""
+
+import asyncio
+import fnmatch
+import json
+
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import services.tiered_cache as tiered_cache_module
+from services.memory_cache import NamespacedCache
+from services.tiered_cache import TieredCache
+
+
+class FakePubSub:
+    def __init__(self, messages):
+        self.messages = messages
+
+    async def subscribe(self, channel):
+        self.channel = channel
+
+    async def listen(self):
+        for message in self.messages:
+            yield message
+        # Park like a real subscription until cancelled
+        await asyncio.Event().wait()
+
+    async def close(self):
+        pass
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.published = []
+        self.incoming = []
+
+    async def get(self, key, default=None):
+        return self.store.get(key, default)
+
+    async def set(self, key, value, ttl=None):
+        self.store[key] = value
+        return True
+
+    async def delete(self, *keys):
+        return sum(1 for k in keys if self.store.pop(k, None) is not None)
+
+    async def clear_pattern(self, pattern):
+        keys = [k for k in self.store if fnmatch.fnmatch(k, pattern)]
+        for k in keys:
+            del self.store[k]
+        return len(keys)
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+        return 1
+
+    def pubsub(self):
+        return FakePubSub(self.incoming)
+
+
+class TestTieredCache:
+    """Test suite for TieredCache"""
+
+    @pytest.fixture
+    def redis(self, monkeypatch):
+        fake = FakeRedis()
+        monkeypatch.setattr(tiered_cache_module, "get_connected_redis_service", lambda: fake)
+        return fake
+
+    @pytest.fixture
+    async def cache(self, redis):
+        tiered = TieredCache(NamespacedCache("tiered_test"))
+        yield tiered
+        await tiered.close()
+
+    async def test_l2_hit_populates_l1(self, cache, redis):
+        await cache.set("price", "price_TCS", 3500.0, ttl=5)
+        cache.l1.clear()
+
+        assert await cache.get("price", "price_TCS", ttl=5) == 3500.0
+        assert cache.l2_hits == 1
+        assert cache.get_local("price", "price_TCS") == 3500.0
+
+    async def test_get_or_load_calls_loader_once(self, cache):
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return {"bids": []}
+
+        assert await cache.get_or_load("depth", "depth_TCS", loader, ttl=2) == {"bids": []}
+        assert await cache.get_or_load("depth", "depth_TCS", loader, ttl=2) == {"bids": []}
+        assert len(calls) == 1
+
+    async def test_invalidate_clears_both_tiers_and_publishes(self, cache, redis):
+        dropped = []
+        cache.on_invalidate("portfolio", lambda keys: dropped.append(keys))
+        await cache.set("portfolio", "summary", {"holdings": [1]}, ttl=60)
+
+        await cache.invalidate("portfolio")
+
+        assert cache.get_local("portfolio", "summary") is None
+        assert redis.store == {}
+        assert dropped == [None]
+        channel, payload = redis.published[-1]
+        assert payload["namespace"] == "portfolio"
+        assert payload["origin"] == cache.instance_id
+
+    async def test_order_cancel_clears_l2_before_returning(self, cache, redis):
+        from unittest.mock import AsyncMock, MagicMock
+        from services.data_fetcher import DataFetcher
+        from services.order_manager import OrderManager
+
+        data_fetcher = DataFetcher(MagicMock(), test_mode=True)
+        data_fetcher.tiered_cache = cache
+        iifl = MagicMock()
+        iifl.cancel_order = AsyncMock(return_value={"Success": True})
+        manager = OrderManager(iifl_service=iifl, data_fetcher=data_fetcher, signal_index=MagicMock())
+        await cache.set("portfolio", "summary", {"holdings": [1]}, ttl=60)
+
+        assert (await manager.cancel_order("B1"))["Success"]
+        # No background task left to run: a read right after the order sees no stale snapshot
+        assert redis.store == {}
+        assert await cache.get("portfolio", "summary") is None
+
+    async def test_remote_invalidation_drops_l1(self, cache, redis):
+        cache.l1.namespace("portfolio").set("summary", {"holdings": [1]}, 60)
+        redis.incoming.append({
+            "type": "message",
+            "data": json.dumps({"origin": "other-worker", "cache": "tiered_test",
+                                "namespace": "portfolio", "keys": None}),
+        })
+
+        await cache.get("price", "price_X")  # first Redis use starts the listener
+        await asyncio.sleep(0.01)
+
+        assert cache.remote_invalidations == 1
+        assert cache.get_local("portfolio", "summary") is None